@@ -3,6 +3,7 @@ import re
 import subprocess
 from pathlib import Path
 
+from ai_todo.cli import formatters
 from ai_todo.cli.config_ops import (
     detect_coordination_command,
     list_mode_backups_command,
@@ -24,40 +25,29 @@ from ai_todo.cli.utility_ops import (
     uninstall_command,
     version_command,
 )
-from ai_todo.core.config import Config
-from ai_todo.core.coordination import CoordinationManager
 from ai_todo.core.file_ops import FileOps
-from ai_todo.core.task import Task, TaskManager, TaskStatus
+from ai_todo.core.task import Task, TaskManager
+from ai_todo.core.task_id import TaskId
+from ai_todo.core.task_service import TaskService
+from ai_todo.core.task_service import expand_task_ids as _expand_task_ids
+from ai_todo.core.task_store import get_task_store
 
-# Global file_ops cache to preserve relationships across operations
-_file_ops_cache: dict[str, FileOps] = {}
 
+def get_manager(todo_path: str = "TODO.md", readonly: bool = False) -> TaskManager:
+    """Initialize core components and return TaskManager.
 
-def get_manager(todo_path: str = "TODO.md") -> TaskManager:
-    """Initialize core components and return TaskManager."""
-    file_ops = FileOps(todo_path)
-    tasks = file_ops.read_tasks()
-    # Cache file_ops to preserve relationships
-    _file_ops_cache[todo_path] = file_ops
-    return TaskManager(tasks)
+    Args:
+        todo_path: Path to TODO.md file
+        readonly: Share the resident manager instead of a private copy; callers
+            passing True must not modify the returned tasks
+    """
+    return get_task_store(todo_path).get_manager(readonly=readonly)
 
 
 def save_changes(manager: TaskManager, todo_path: str = "TODO.md") -> None:
     """Save tasks back to file, preserving relationships."""
-    # Use cached file_ops if available to preserve relationships
-    file_ops = _file_ops_cache.get(todo_path)
-    if file_ops is None:
-        file_ops = FileOps(todo_path)
-        file_ops.read_tasks()  # Read to get relationships and original blank line state
-        # Cache it for future operations
-        _file_ops_cache[todo_path] = file_ops
-    else:
-        # Re-read to get latest file state (in case file was modified externally)
-        # Phase 13: Structure is now preserved via snapshot, no state restoration needed
-        file_ops.read_tasks()
-    tasks = manager.list_tasks()
     # Phase 13: Structure preservation is handled automatically by snapshot
-    file_ops.write_tasks(tasks)
+    get_task_store(todo_path).save(manager)
 
 
 def _resolve_git_root(cwd: str) -> str | None:
@@ -134,122 +124,33 @@ def show_root_command(root_override: str | None = None) -> None:
     print(f"Resolved root: {root} (source: {source})")
 
 
-def add_command(description: str, tags: list[str], todo_path: str = "TODO.md"):
-    """Add a new task."""
-    # Use cached file_ops if available, otherwise create new one
-    file_ops = _file_ops_cache.get(todo_path)
-    if file_ops is None:
-        file_ops = FileOps(todo_path)
-        file_ops.read_tasks()
-        _file_ops_cache[todo_path] = file_ops
-    else:
-        # Re-read to get latest state
-        file_ops.read_tasks()
-
-    tasks = file_ops.read_tasks()
-    manager = TaskManager(tasks)
-
-    # ID Generation
-    config_dir = Path(todo_path).parent / ".ai-todo"
-    if not config_dir.exists():
-        config_dir = Path(todo_path).parent / ".todo.ai"
-    config_path = config_dir / "config.yaml"
-    config = Config(str(config_path))
-    coord_manager = CoordinationManager(config)
-    new_id = coord_manager.get_next_task_id(manager, file_ops)
-
-    # Create task
-    task = manager.add_task(description, tags, task_id=new_id)
-
-    # CRITICAL: New tasks must appear at the TOP of the Tasks section
-    # Reorder tasks to put newly added task first
-    all_tasks = manager.list_tasks()
-    reordered_tasks = [task] + [t for t in all_tasks if t.id != task.id]
-
-    # Phase 14: Structure preservation is handled automatically by snapshot
-    # No manual file editing needed
-    file_ops.write_tasks(reordered_tasks)
-
-    # Update serial file with new task ID
-    # Extract numeric part from task ID
-    task_id_num = new_id
-    if "-" in task_id_num:
-        task_id_num = task_id_num.split("-")[-1]
-    if "." in task_id_num:
-        task_id_num = task_id_num.split(".")[0]
-    try:
-        serial_value = int(task_id_num)
-        file_ops.set_serial(serial_value)
-    except ValueError:
-        pass
-
-    # Format output with tags
-    tag_str = " ".join([f"`#{tag}`" for tag in sorted(task.tags)]) if task.tags else ""
-    output = f"Added: #{task.id} {task.description}"
-    if tag_str:
-        output += f" {tag_str}"
-    print(output)
-
-
-def _insert_subtask_after_parent(tasks: list[Task], parent_id: str, subtask: Task) -> list[Task]:
-    """Insert a subtask immediately after its parent (newest on top)."""
-    parent_index = None
-
-    for index, task in enumerate(tasks):
-        if task.id == parent_id:
-            parent_index = index
-            break  # Found parent, stop searching
-
-    if parent_index is not None:
-        insert_at = parent_index + 1
-    else:
-        insert_at = len(tasks)
+def _emit(text: str) -> None:
+    """Print formatted command output, if any."""
+    if text:
+        print(text)
+
 
-    return tasks[:insert_at] + [subtask] + tasks[insert_at:]
+def add_command(
+    description: str, tags: list[str], todo_path: str = "TODO.md", notes: str | None = None
+):
+    """Add a new task (optionally with notes, in the same write)."""
+    result = TaskService(todo_path).add_task(description, tags, notes=notes)
+    _emit(formatters.format_added(result))
 
 
 def add_subtask_command(
-    parent_id: str, description: str, tags: list[str], todo_path: str = "TODO.md"
+    parent_id: str,
+    description: str,
+    tags: list[str],
+    todo_path: str = "TODO.md",
+    notes: str | None = None,
 ):
-    """Add a subtask to an existing task."""
-    file_ops = _file_ops_cache.get(todo_path)
-    if file_ops is None:
-        file_ops = FileOps(todo_path)
-        tasks = file_ops.read_tasks()
-        _file_ops_cache[todo_path] = file_ops
-    else:
-        tasks = file_ops.read_tasks()
-
-    manager = TaskManager(tasks)
+    """Add a subtask to an existing task (optionally with notes, in the same write)."""
     try:
-        parent = manager.get_task(parent_id)
-        if not parent:
-            raise ValueError(f"Parent task {parent_id} not found")
-
-        # Check nesting depth (allow 3 levels: task → subtask → sub-subtask)
-        if parent.id.count(".") >= 2:
-            raise ValueError("Maximum nesting depth is 3 levels (task.subtask.sub-subtask)")
-
-        config_dir = Path(todo_path).parent / ".ai-todo"
-        if not config_dir.exists():
-            config_dir = Path(todo_path).parent / ".todo.ai"
-        config_path = config_dir / "config.yaml"
-        config = Config(str(config_path))
-        coord_manager = CoordinationManager(config)
-        subtask_id = coord_manager.get_next_subtask_id(parent_id, manager)
-
-        subtask = manager.add_subtask(parent_id, description, tags, task_id=subtask_id)
-        ordered_tasks = _insert_subtask_after_parent(tasks, parent_id, subtask)
-        file_ops.write_tasks(ordered_tasks)
-
-        # Format output with tags
-        tag_str = " ".join([f"`#{tag}`" for tag in sorted(subtask.tags)]) if subtask.tags else ""
-        output = f"Added subtask: #{subtask.id} {subtask.description}"
-        if tag_str:
-            output += f" {tag_str}"
-        print(output)
+        result = TaskService(todo_path).add_subtask(parent_id, description, tags, notes=notes)
+        _emit(formatters.format_added_subtask(result))
     except ValueError as e:
-        print(f"Error: {e}")
+        _emit(formatters.format_error(e))
 
 
 def list_command(
@@ -258,155 +159,73 @@ def list_command(
     parents_only: bool = False,
     has_subtasks: bool = False,
     todo_path: str = "TODO.md",
+    tags: list[str] | None = None,
+    match_any: bool = False,
+    statuses: list[str] | None = None,
+    id_range: str | None = None,
 ):
     """List tasks with optional filters."""
-    manager = get_manager(todo_path)
-    tasks = manager.list_tasks()
+    import sys
 
-    # Filter by status (only pending tasks)
-    if incomplete_only:
-        tasks = [t for t in tasks if t.status.value == "pending"]
-
-    # Filter by tag
-    if tag:
-        tasks = [t for t in tasks if tag in (t.tags or [])]
-
-    # Filter by subtask presence
-    if has_subtasks:
-        subtask_ids = {t.id.rsplit(".", 1)[0] for t in tasks if "." in t.id}
-        tasks = [t for t in tasks if t.id in subtask_ids]
-
-    # Filter to only parent tasks
-    if parents_only:
-        tasks = [t for t in tasks if "." not in t.id]
-
-    # Display tasks
-    for task in tasks:
-        checkbox = "[x]" if task.status.value != "pending" else "[ ]"
-        indent = "  " * (task.id.count("."))
-        tag_str = " ".join([f"`#{tag}`" for tag in sorted(task.tags)]) if task.tags else ""
-        description = task.description
-        if tag_str:
-            description = f"{description} {tag_str}".strip()
-        print(f"{indent}- {checkbox} **#{task.id}** {description}")
+    try:
+        tasks = TaskService(todo_path).list_tasks(
+            tag=tag,
+            incomplete_only=incomplete_only,
+            parents_only=parents_only,
+            has_subtasks=has_subtasks,
+            tags=tags,
+            match_any=match_any,
+            statuses=statuses,
+            id_range=id_range,
+        )
+    except ValueError as e:
+        print(formatters.format_error(e))
+        sys.exit(1)
+    _emit(formatters.format_task_list(tasks))
 
 
 def complete_command(task_ids: list[str], with_subtasks: bool = False, todo_path: str = "TODO.md"):
     """Mark task(s) as completed."""
-    manager = get_manager(todo_path)
-
-    # Expand task IDs (ranges, with-subtasks, etc.)
-    expanded_ids = expand_task_ids(task_ids, with_subtasks, todo_path)
-
-    completed_tasks = []
-    for task_id in expanded_ids:
-        try:
-            task = manager.complete_task(task_id)
-            if task:
-                completed_tasks.append(task)
-        except ValueError as e:
-            print(f"Error: {e}")
-
-    if completed_tasks:
-        save_changes(manager, todo_path)
-        # Output format: "Completed: #X Task Description" for each task
-        for task in completed_tasks:
-            print(f"Completed: #{task.id} {task.description}")
+    result = TaskService(todo_path).complete_tasks(task_ids, with_subtasks)
+    # Output format: "Completed: #X Task Description" for each task
+    _emit(formatters.format_completed(result))
 
 
 def modify_command(
-    task_id: str, description: str, tags: list[str] | None = None, todo_path: str = "TODO.md"
+    task_id: str,
+    description: str,
+    tags: list[str] | None = None,
+    todo_path: str = "TODO.md",
+    notes: str | None = None,
 ):
-    """Modify a task's description and/or tags."""
-    manager = get_manager(todo_path)
+    """Modify a task's description, tags and (optionally) notes in one write."""
     try:
-        # Get existing task to preserve tags if not explicitly changing them
-        existing_task = manager.get_task(task_id)
-        if not existing_task:
-            raise ValueError(f"Task {task_id} not found")
-
-        # Extract tags from description if they're in backticks (format: `#tag`)
-        tag_pattern = re.compile(r"`#([a-zA-Z0-9_-]+)`")
-        found_tags = tag_pattern.findall(description)
-
-        # Remove tags from description
-        description = tag_pattern.sub("", description).strip()
-
-        # Combine tags from description and explicit tags argument
-        # CRITICAL: If no new tags provided, preserve existing tags
-        if tags:
-            all_tags: list[str] | None = list(set(found_tags + tags))
-        elif found_tags:
-            all_tags = found_tags
-        else:
-            # No new tags - preserve existing tags
-            all_tags = list(existing_task.tags) if existing_task.tags else None
-
-        task = manager.modify_task(task_id, description, all_tags)
-        save_changes(manager, todo_path)
-
-        # Format output with tags
-        tag_str = " ".join([f"`#{tag}`" for tag in sorted(task.tags)]) if task.tags else ""
-        output = f"Modified: #{task.id} {task.description}"
-        if tag_str:
-            output += f" {tag_str}"
-        print(output)
+        result = TaskService(todo_path).modify_task(task_id, description, tags, notes=notes)
+        _emit(formatters.format_modified(result))
     except ValueError as e:
-        print(f"Error: {e}")
+        _emit(formatters.format_error(e))
 
 
 def start_command(task_id: str, todo_path: str = "TODO.md"):
     """Mark a task as in progress."""
-    manager = get_manager(todo_path)
     try:
-        task = manager.start_task(task_id)
-        save_changes(manager, todo_path)
-        print(f"Started task #{task.id}: {task.description}")
+        _emit(formatters.format_started(TaskService(todo_path).start_task(task_id)))
     except ValueError as e:
-        print(f"Error: {e}")
+        _emit(formatters.format_error(e))
 
 
 def stop_command(task_id: str, todo_path: str = "TODO.md"):
     """Stop progress on a task."""
-    manager = get_manager(todo_path)
     try:
-        task = manager.stop_task(task_id)
-        save_changes(manager, todo_path)
-        print(f"Stopped task #{task.id}: {task.description}")
+        _emit(formatters.format_stopped(TaskService(todo_path).stop_task(task_id)))
     except ValueError as e:
-        print(f"Error: {e}")
+        _emit(formatters.format_error(e))
 
 
 def delete_command(task_ids: list[str], with_subtasks: bool = True, todo_path: str = "TODO.md"):
     """Soft delete task(s) to Deleted section (includes subtasks by default)."""
-    manager = get_manager(todo_path)
-
-    # Expand task IDs
-    expanded_ids = expand_task_ids(task_ids, with_subtasks, todo_path)
-
-    deleted_count = 0
-    for task_id in expanded_ids:
-        try:
-            task = manager.delete_task(task_id)
-            if task:
-                deleted_count += 1
-        except ValueError as e:
-            print(f"Error: {e}")
-
-    if deleted_count > 0:
-        save_changes(manager, todo_path)
-        print(f"Deleted {deleted_count} task(s)")
-
-        # Auto-run empty trash after deletion (silent)
-        try:
-            from ai_todo.core.empty_trash import EmptyTrashManager
-
-            trash_mgr = EmptyTrashManager(todo_path)
-            trash_mgr.empty_trash(dry_run=False)
-            # Silent operation - FileOps handles logging automatically
-        except Exception:
-            # Fail silently - don't block delete operation
-            pass
+    result = TaskService(todo_path).delete_tasks(task_ids, with_subtasks)
+    _emit(formatters.format_deleted(result))
 
 
 def archive_command(
@@ -416,31 +235,11 @@ def archive_command(
     todo_path: str = "TODO.md",
 ):
     """Move task(s) to Archived Tasks section."""
-    manager = get_manager(todo_path)
-
     # Note: Archive cooldown is now handled session-based in MCP server (server.py)
     # The file-based approach was broken because completed_at is set to datetime.now()
     # when parsing, not the actual completion time.
-
-    # Expand task IDs (with subtasks by default)
-    expanded_ids = expand_task_ids(task_ids, with_subtasks, todo_path)
-
-    archived_count = 0
-    # Process in reverse order so parent ends up on top (newest) in Archived Tasks
-    for task_id in reversed(expanded_ids):
-        try:
-            task = manager.archive_task(task_id)
-            if task and reason:
-                # Add reason as note
-                manager.add_note_to_task(task_id, f"Reason: {reason}")
-            if task:
-                archived_count += 1
-        except ValueError as e:
-            print(f"Error: {e}")
-
-    if archived_count > 0:
-        save_changes(manager, todo_path)
-        print(f"Archived {archived_count} task(s)")
+    result = TaskService(todo_path).archive_tasks(task_ids, reason, with_subtasks)
+    _emit(formatters.format_archived(result))
 
 
 def restore_command(task_ids: list[str], todo_path: str = "TODO.md"):
@@ -450,234 +249,73 @@ def restore_command(task_ids: list[str], todo_path: str = "TODO.md"):
         task_ids: List of task IDs to restore (1 to n items)
         todo_path: Path to TODO.md file
     """
-    restored_count = 0
-    for task_id in task_ids:
-        try:
-            _restore_single_task(task_id, todo_path)
-            restored_count += 1
-        except ValueError as e:
-            print(f"Error restoring {task_id}: {e}")
-
-    if restored_count == 0 and len(task_ids) > 0:
+    result = TaskService(todo_path).restore_tasks(task_ids)
+    _emit(formatters.format_restored_tasks(result))
+
+    if not result.restored and len(task_ids) > 0:
         import sys
 
         sys.exit(1)
 
 
-def _restore_single_task(task_id: str, todo_path: str = "TODO.md"):
-    """Restore a single task from Deleted or Archived Tasks to active Tasks."""
-    manager = get_manager(todo_path)
-
-    # Read file state BEFORE restore
-    file_ops = FileOps(todo_path)
-    file_ops.read_tasks()
-
-    task = manager.restore_task(task_id)
-
-    # CRITICAL: Positioning depends on whether this is a root task or subtask
-    all_tasks = manager.list_tasks()
-
-    # Check if this is a subtask (contains a dot in the ID)
-    if "." in task_id:
-        # Subtask: Insert after parent
-        parent_id = task_id.rsplit(".", 1)[0]
-        tasks_without_restored = [t for t in all_tasks if t.id != task.id]
-
-        # Find parent index
-        parent_index = -1
-        for i, t in enumerate(tasks_without_restored):
-            if t.id == parent_id:
-                parent_index = i
-                break
-
-        if parent_index != -1:
-            # Insert after parent
-            reordered_tasks = (
-                tasks_without_restored[: parent_index + 1]
-                + [task]
-                + tasks_without_restored[parent_index + 1 :]
-            )
-        else:
-            # Parent not found, put at top as fallback
-            reordered_tasks = [task] + tasks_without_restored
-    else:
-        # Root task: Put at the TOP of the Tasks section
-        reordered_tasks = [task] + [t for t in all_tasks if t.id != task.id]
-
-    # Phase 14: Structure preservation is handled automatically by snapshot
-    # No manual file editing needed
-    file_ops.write_tasks(reordered_tasks)
-
-    print(f"Restored task #{task.id} to Tasks section")
-
-    # Idempotent/Self-healing restore: Check for missing subtasks and restore them
-    # This handles cases where a previous restore failed or was incomplete
-    subtasks = manager.get_subtasks(task_id)
-    restored_subtasks = []
-    for subtask in subtasks:
-        # Check if subtask is "missing" (not in Tasks section)
-        # A subtask is missing if it is ARCHIVED or DELETED
-        if subtask.status in (TaskStatus.ARCHIVED, TaskStatus.DELETED):
-            subtask.restore()
-            restored_subtasks.append(subtask)
-
-    if restored_subtasks:
-        # Re-write tasks to save restored subtasks
-        # CRITICAL: Use reordered_tasks (with parent at top), not a fresh fetch
-        # If we re-fetch from manager, we lose the top position!
-
-        # 1. Remove restored subtasks from their current position in reordered_tasks
-        tasks_without_subtasks = [t for t in reordered_tasks if t not in restored_subtasks]
-
-        # 2. Find parent index
-        parent_index = -1
-        for i, t in enumerate(tasks_without_subtasks):
-            if t.id == task_id:
-                parent_index = i
-                break
-
-        # 3. Insert subtasks after parent
-        if parent_index != -1:
-            final_tasks = (
-                tasks_without_subtasks[: parent_index + 1]
-                + sorted(
-                    restored_subtasks,
-                    key=lambda t: [int(x) for x in t.id.split(".")],
-                    reverse=True,
-                )
-                + tasks_without_subtasks[parent_index + 1 :]
-            )
-            file_ops.write_tasks(final_tasks)
-            print(f"  Also restored {len(restored_subtasks)} subtask(s)")
-
-
 def undo_command(task_id: str, todo_path: str = "TODO.md"):
     """Reopen (undo) a completed task."""
-    manager = get_manager(todo_path)
     try:
-        task = manager.undo_task(task_id)
-        save_changes(manager, todo_path)
-        print(f"Reopened task #{task.id}")
+        _emit(formatters.format_reopened(TaskService(todo_path).undo_task(task_id)))
     except ValueError as e:
-        print(f"Error: {e}")
+        _emit(formatters.format_error(e))
 
 
 def note_command(task_id: str, note_text: str, todo_path: str = "TODO.md"):
     """Add a note to a task."""
-    manager = get_manager(todo_path)
     try:
-        task = manager.add_note_to_task(task_id, note_text)
-        save_changes(manager, todo_path)
-        print(f"Added note to task #{task.id}")
+        _emit(formatters.format_note_added(TaskService(todo_path).add_note(task_id, note_text)))
     except ValueError as e:
-        print(f"Error: {e}")
+        _emit(formatters.format_error(e))
 
 
 def delete_note_command(task_id: str, todo_path: str = "TODO.md"):
     """Delete all notes from a task."""
-    manager = get_manager(todo_path)
     try:
-        task = manager.get_task(task_id)
-        if not task:
-            raise ValueError(f"Task {task_id} not found")
-
-        if not task.notes:
-            print(f"Task #{task_id} has no notes to delete")
-            return
-
-        manager.delete_notes_from_task(task_id)
-        save_changes(manager, todo_path)
-        print(f"Deleted notes from task #{task_id}")
+        _emit(formatters.format_notes_deleted(TaskService(todo_path).delete_notes(task_id)))
     except ValueError as e:
-        print(f"Error: {e}")
+        _emit(formatters.format_error(e))
 
 
 def update_note_command(task_id: str, new_note_text: str, todo_path: str = "TODO.md"):
     """Replace all notes for a task with new text."""
-    manager = get_manager(todo_path)
     try:
-        task = manager.get_task(task_id)
-        if not task:
-            raise ValueError(f"Task {task_id} not found")
-
-        if not task.notes:
-            print(f"Error: Task #{task_id} has no notes to update")
-            print(f"Hint: Use 'note {task_id} \"text\"' to add notes")
-            return
-
-        # Show preview (matching shell script behavior)
-        old_count = len(task.notes)
-        new_count = len(new_note_text.split("\n"))
-        print(f"Task #{task_id} currently has {old_count} note(s).")
-        print(f"New note will have {new_count} line(s).")
-
-        task = manager.update_notes_for_task(task_id, new_note_text)
-        save_changes(manager, todo_path)
-        print(f"Updated notes for task #{task.id}")
+        result = TaskService(todo_path).update_notes(task_id, new_note_text)
+        _emit(formatters.format_notes_updated(result, new_note_text))
     except ValueError as e:
-        print(f"Error: {e}")
+        _emit(formatters.format_error(e))
 
 
-def _get_checkbox(status_value: str) -> str:
-    """Get the appropriate checkbox for a task status."""
-    if status_value == "pending":
-        return "[ ]"
-    elif status_value == "deleted":
-        return "[D]"
-    else:  # completed, archived
-        return "[x]"
+def set_description_command(task_id: str, description: str, todo_path: str = "TODO.md"):
+    """Set or clear a task's description (notes); "" clears it."""
+    try:
+        result = TaskService(todo_path).set_description(task_id, description)
+        _emit(formatters.format_description_set(result, description))
+    except ValueError as e:
+        _emit(formatters.format_error(e))
 
 
-def show_command(task_id: str, todo_path: str = "TODO.md"):
-    """Display task with subtasks, relationships, and notes."""
-    file_ops = FileOps(todo_path)
-    tasks = file_ops.read_tasks()
-    manager = TaskManager(tasks)
+def set_tags_command(task_id: str, tags: list[str], todo_path: str = "TODO.md"):
+    """Set a task's tags (replaces all existing tags)."""
+    try:
+        _emit(formatters.format_tags_set(TaskService(todo_path).set_tags(task_id, tags)))
+    except ValueError as e:
+        _emit(formatters.format_error(e))
 
-    task = manager.get_task(task_id)
-    if not task:
-        print(f"Error: Task #{task_id} not found")
-        return
 
-    # Display task line
-    checkbox = _get_checkbox(task.status.value)
-    indent = "  " * (task.id.count("."))
-    tag_str = " ".join([f"`#{tag}`" for tag in sorted(task.tags)]) if task.tags else ""
-    description = task.description
-    if tag_str:
-        description = f"{description} {tag_str}".strip()
-    print(f"{indent}- {checkbox} **#{task.id}** {description}")
-
-    # Display notes
-    for note in task.notes:
-        print(f"{indent}  > {note}")
-
-    # Display subtasks
-    subtasks = manager.get_subtasks(task_id)
-    if subtasks:
-        for subtask in sorted(subtasks, key=lambda t: t.id):
-            sub_checkbox = _get_checkbox(subtask.status.value)
-            sub_indent = "  " * (subtask.id.count("."))
-            sub_tag_str = (
-                " ".join([f"`#{tag}`" for tag in sorted(subtask.tags)]) if subtask.tags else ""
-            )
-            sub_description = subtask.description
-            if sub_tag_str:
-                sub_description = f"{sub_description} {sub_tag_str}".strip()
-            print(f"{sub_indent}- {sub_checkbox} **#{subtask.id}** {sub_description}")
-            for note in subtask.notes:
-                print(f"{sub_indent}  > {note}")
-
-    # Display relationships
-    relationships = file_ops.get_relationships(task_id)
-    if relationships:
-        for rel_type, targets in sorted(relationships.items()):
-            # Format relationship type
-            formatted_type = rel_type.replace("-", " ").title()
-            targets_str = " ".join(targets)
-            print(f"  ↳ {formatted_type}: {targets_str}")
-    else:
-        print("  (No relationships)")
+def show_command(task_id: str, archived: bool = False, todo_path: str = "TODO.md"):
+    """Display task with subtasks, relationships, and notes (or a pruned task from the archive)."""
+    try:
+        service = TaskService(todo_path)
+        details = service.show_archived_task(task_id) if archived else service.show_task(task_id)
+        _emit(formatters.format_task_details(details))
+    except ValueError as e:
+        _emit(formatters.format_error(e))
 
 
 def relate_command(
@@ -687,87 +325,46 @@ def relate_command(
     todo_path: str = "TODO.md",
 ):
     """Add a task relationship."""
-    file_ops = FileOps(todo_path)
-    tasks = file_ops.read_tasks()  # This also parses relationships
-    manager = TaskManager(tasks)
-
-    # Verify task exists
-    task = manager.get_task(task_id)
-    if not task:
-        print(f"Error: Task #{task_id} not found")
-        return
-
-    # Validate relationship type
-    valid_types = ["completed-by", "depends-on", "blocks", "related-to", "duplicate-of"]
-    if rel_type not in valid_types:
-        print(f"Error: Invalid relationship type '{rel_type}'")
-        print(f"Valid types: {', '.join(valid_types)}")
-        return
-
-    # Add relationship
-    file_ops.add_relationship(task_id, rel_type, target_ids)
-    file_ops.write_tasks(tasks)  # Write back to preserve relationships
-
-    targets_str = " ".join(target_ids)
-    print(f"Added relationship: #{task_id} {rel_type} {targets_str}")
-
+    try:
+        result = TaskService(todo_path).relate(task_id, rel_type, target_ids)
+        _emit(formatters.format_relationship_added(result, rel_type, target_ids))
+    except ValueError as e:
+        _emit(formatters.format_error(e))
 
-# Helper functions for task ID expansion
-def expand_task_range(task_id: str) -> list[str]:
-    """Expand a task range like '104.3-104.10' into a list of task IDs."""
-    if "-" not in task_id:
-        return [task_id]
 
-    start_str, end_str = task_id.split("-", 1)
-    # Extract base and numbers
-    # Pattern: "104.3" -> base="104", num=3
-    start_match = re.match(r"^([0-9]+(?:\.\d+)?)\.?(\d+)?$", start_str)
-    end_match = re.match(r"^([0-9]+(?:\.\d+)?)\.?(\d+)?$", end_str)
+def batch_command(operations_json: str, todo_path: str = "TODO.md"):
+    """Apply a JSON list of operations in one transaction (one TODO.md write).
 
-    if not start_match or not end_match:
-        return [task_id]  # Invalid range, return as-is
+    Args:
+        operations_json: JSON array of operation objects, e.g.
+            '[{"op": "complete", "task_ids": ["1"]}, {"op": "note", "task_id": "2", "note": "x"}]'
+        todo_path: Path to TODO.md file
+    """
+    import json
+    import sys
 
-    start_base = start_match.group(1)
-    start_num = int(start_match.group(2) or 0)
-    end_base = end_match.group(1)
-    end_num = int(end_match.group(2) or 0)
+    try:
+        operations = json.loads(operations_json)
+        if not isinstance(operations, list):
+            raise ValueError("Batch input must be a JSON array of operations")
+        result = TaskService(todo_path).batch(operations)
+    except ValueError as e:  # json.JSONDecodeError is a ValueError
+        print(formatters.format_error(e))
+        print("No changes were written")
+        sys.exit(1)
+    _emit(formatters.format_batch(result))
 
-    # If bases don't match, can't expand
-    if start_base != end_base:
-        return [task_id]
 
-    result = []
-    for num in range(start_num, end_num + 1):
-        result.append(f"{start_base}.{num}")
-    return result
+def flush_command(todo_path: str = "TODO.md"):
+    """Write journaled operations to TODO.md."""
+    _emit(formatters.format_flushed(TaskService(todo_path).flush()))
 
 
 def expand_task_ids(
     task_ids: list[str], with_subtasks: bool = False, todo_path: str = "TODO.md"
 ) -> list[str]:
     """Expand task IDs including ranges and optionally subtasks."""
-    expanded = []
-    manager = get_manager(todo_path)
-
-    for task_id in task_ids:
-        # Expand ranges
-        if "-" in task_id:
-            expanded.extend(expand_task_range(task_id))
-        else:
-            expanded.append(task_id)
-
-    # Add subtasks if requested
-    if with_subtasks:
-        final_expanded = []
-        for task_id in expanded:
-            final_expanded.append(task_id)
-            # Get subtasks
-            subtasks = manager.get_subtasks(task_id)
-            for subtask in subtasks:
-                final_expanded.append(subtask.id)
-        return final_expanded
-
-    return expanded
+    return _expand_task_ids(get_manager(todo_path, readonly=True), task_ids, with_subtasks)
 
 
 def lint_command(todo_path: str = "TODO.md"):
@@ -1175,8 +772,8 @@ def reorder_command(todo_path: str = "TODO.md"):
         subtasks_map: dict[str, list[Task]] = {}  # parent_id -> list[Task]
 
         for task in tasks:
-            if "." in task.id:
-                parent_id = task.id.rsplit(".", 1)[0]
+            parent_id = TaskId.of(task.id).parent
+            if parent_id is not None:
                 if parent_id not in subtasks_map:
                     subtasks_map[parent_id] = []
                 subtasks_map[parent_id].append(task)
@@ -1191,7 +788,7 @@ def reorder_command(todo_path: str = "TODO.md"):
                 # Sort subtasks descending by ID (newest on top)
                 sorted_subtasks = sorted(
                     subtasks_map[root_task.id],
-                    key=lambda t: [int(x) for x in t.id.split(".")],
+                    key=lambda t: TaskId.of(t.id).sort_key,
                     reverse=True,
                 )
                 new_task_list.extend(sorted_subtasks)
@@ -1390,10 +987,14 @@ def edit_command(todo_path: str = "TODO.md"):
 
 # Phase 5: System Operations
 def log_command(
-    filter_text: str | None = None, lines: int | None = None, todo_path: str = "TODO.md"
+    filter_text: str | None = None,
+    lines: int | None = None,
+    todo_path: str = "TODO.md",
+    task_id: str | None = None,
+    since: str | None = None,
 ) -> None:
-    """View TODO operation log (with --filter and --lines options)."""
-    view_log_command(filter_text, lines, todo_path)
+    """View TODO operation log (with --filter, --lines, --task and --since options)."""
+    view_log_command(filter_text, lines, todo_path, task_id=task_id, since=since)
 
 
 def update_tool_command() -> None:
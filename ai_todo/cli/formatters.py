@@ -0,0 +1,214 @@
+"""Text formatting for task service results, shared by the CLI and the MCP server.
+
+Every formatter returns the text both interfaces show for an operation, one
+line per message, without a trailing newline ("" when there is nothing to say).
+"""
+
+from collections.abc import Callable
+from typing import Any
+
+from ai_todo.core.task import Task
+from ai_todo.core.task_service import (
+    BatchResult,
+    FlushResult,
+    NotesResult,
+    RestoreResult,
+    RestoreTasksResult,
+    TaskDetails,
+    TaskResult,
+    TasksResult,
+)
+
+
+def format_tags(task: Task) -> str:
+    """Format a task's tags as sorted `#tag` markers ("" if it has none)."""
+    return " ".join([f"`#{tag}`" for tag in sorted(task.tags)]) if task.tags else ""
+
+
+def _with_tags(text: str, task: Task) -> str:
+    tag_str = format_tags(task)
+    return f"{text} {tag_str}" if tag_str else text
+
+
+def _display_description(task: Task) -> str:
+    tag_str = format_tags(task)
+    return f"{task.description} {tag_str}".strip() if tag_str else task.description
+
+
+def _get_checkbox(status_value: str) -> str:
+    """Get the appropriate checkbox for a task status."""
+    if status_value == "pending":
+        return "[ ]"
+    elif status_value == "deleted":
+        return "[D]"
+    else:  # completed, archived
+        return "[x]"
+
+
+def format_error(error: Exception | str) -> str:
+    return f"Error: {error}"
+
+
+def format_added(result: TaskResult) -> str:
+    return _with_tags(f"Added: #{result.task.id} {result.task.description}", result.task)
+
+
+def format_added_subtask(result: TaskResult) -> str:
+    return _with_tags(f"Added subtask: #{result.task.id} {result.task.description}", result.task)
+
+
+def format_modified(result: TaskResult) -> str:
+    return _with_tags(f"Modified: #{result.task.id} {result.task.description}", result.task)
+
+
+def format_completed(result: TasksResult) -> str:
+    lines = [format_error(e) for e in result.errors]
+    lines += [f"Completed: #{task.id} {task.description}" for task in result.tasks]
+    return "\n".join(lines)
+
+
+def format_deleted(result: TasksResult) -> str:
+    lines = [format_error(e) for e in result.errors]
+    if result.tasks:
+        lines.append(f"Deleted {len(result.tasks)} task(s)")
+    return "\n".join(lines)
+
+
+def format_archived(result: TasksResult) -> str:
+    lines = [format_error(e) for e in result.errors]
+    if result.tasks:
+        lines.append(f"Archived {len(result.tasks)} task(s)")
+    return "\n".join(lines)
+
+
+def format_restored(result: RestoreResult) -> str:
+    lines = [f"Restored task #{result.task.id} to Tasks section"]
+    if result.subtasks:
+        lines.append(f"  Also restored {len(result.subtasks)} subtask(s)")
+    return "\n".join(lines)
+
+
+def format_restored_tasks(result: RestoreTasksResult) -> str:
+    lines = [format_restored(restored) for restored in result.restored]
+    lines += [f"Error restoring {task_id}: {error}" for task_id, error in result.errors]
+    return "\n".join(lines)
+
+
+def format_started(result: TaskResult) -> str:
+    return f"Started task #{result.task.id}: {result.task.description}"
+
+
+def format_stopped(result: TaskResult) -> str:
+    return f"Stopped task #{result.task.id}: {result.task.description}"
+
+
+def format_reopened(result: TaskResult) -> str:
+    return f"Reopened task #{result.task.id}"
+
+
+def format_note_added(result: TaskResult) -> str:
+    return f"Added note to task #{result.task.id}"
+
+
+def format_notes_deleted(result: NotesResult) -> str:
+    if not result.previous_count:
+        return f"Task #{result.task.id} has no notes to delete"
+    return f"Deleted notes from task #{result.task.id}"
+
+
+def format_notes_updated(result: NotesResult, new_note_text: str) -> str:
+    # Preview matches the shell script behavior
+    new_count = len(new_note_text.split("\n"))
+    return "\n".join(
+        [
+            f"Task #{result.task.id} currently has {result.previous_count} note(s).",
+            f"New note will have {new_count} line(s).",
+            f"Updated notes for task #{result.task.id}",
+        ]
+    )
+
+
+def format_description_set(result: NotesResult, description: str) -> str:
+    if description == "":
+        return format_notes_deleted(result)
+    if result.previous_count:
+        return format_notes_updated(result, description)
+    return format_note_added(result)
+
+
+def format_tags_set(result: TaskResult) -> str:
+    if result.task.tags:
+        return f"Set tags on #{result.task.id}: {format_tags(result.task)}"
+    return f"Cleared tags from #{result.task.id}"
+
+
+def format_relationship_added(result: TaskResult, rel_type: str, target_ids: list[str]) -> str:
+    return f"Added relationship: #{result.task.id} {rel_type} {' '.join(target_ids)}"
+
+
+def format_flushed(result: FlushResult) -> str:
+    if not result.operations:
+        return "Nothing to flush: TODO.md is up to date"
+    return f"Wrote {result.operations} journaled operation(s) to TODO.md"
+
+
+def format_task_list(tasks: list[Task]) -> str:
+    lines = []
+    for task in tasks:
+        checkbox = "[x]" if task.status.value != "pending" else "[ ]"
+        indent = "  " * (task.id.count("."))
+        lines.append(f"{indent}- {checkbox} **#{task.id}** {_display_description(task)}")
+    return "\n".join(lines)
+
+
+def _format_task_block(task: Task) -> list[str]:
+    indent = "  " * (task.id.count("."))
+    checkbox = _get_checkbox(task.status.value)
+    lines = [f"{indent}- {checkbox} **#{task.id}** {_display_description(task)}"]
+    lines += [f"{indent}  > {note}" for note in task.notes]
+    return lines
+
+
+def format_task_details(details: TaskDetails) -> str:
+    lines = _format_task_block(details.task)
+    for subtask in details.subtasks:
+        lines += _format_task_block(subtask)
+
+    if details.relationships:
+        for rel_type, targets in sorted(details.relationships.items()):
+            formatted_type = rel_type.replace("-", " ").title()
+            lines.append(f"  ↳ {formatted_type}: {' '.join(targets)}")
+    else:
+        lines.append("  (No relationships)")
+    return "\n".join(lines)
+
+
+def _format_batch_operation(operation: dict[str, Any], result: Any) -> str:
+    name = operation["op"]
+    if name == "set_description":
+        return format_description_set(result, operation["description"])
+    if name == "relate":
+        return format_relationship_added(result, operation["rel_type"], operation["target_ids"])
+    return _BATCH_FORMATTERS[name](result)
+
+
+_BATCH_FORMATTERS: dict[str, Callable[[Any], str]] = {
+    "add": format_added,
+    "add_subtask": format_added_subtask,
+    "complete": format_completed,
+    "undo": format_reopened,
+    "start": format_started,
+    "stop": format_stopped,
+    "modify": format_modified,
+    "set_tags": format_tags_set,
+    "note": format_note_added,
+    "delete": format_deleted,
+    "restore": format_restored_tasks,
+    "archive": format_archived,
+}
+
+
+def format_batch(result: BatchResult) -> str:
+    lines = [_format_batch_operation(op, op_result) for op, op_result in result.results]
+    lines.append(f"Applied {len(result.results)} operation(s)")
+    return "\n".join(line for line in lines if line)
@@ -4,32 +4,34 @@ from ai_todo.cli.commands import (
     add_command,
     add_subtask_command,
     archive_command,
+    batch_command,
     complete_command,
     config_command,
     delete_command,
-    delete_note_command,
     detect_coordination_tool_command,
     empty_trash_command,
+    flush_command,
     lint_command,
     list_command,
+    log_command,
     modify_command,
-    note_command,
     prune_command,
     reformat_command,
     relate_command,
     reorder_command,
     resolve_conflicts_command,
     restore_command,
+    set_description_command,
+    set_tags_command,
     setup_coordination_tool_command,
     setup_wizard_tool_command,
     show_command,
     show_root_command,
     switch_mode_tool_command,
     undo_command,
-    update_note_command,
     version_tool_command,
 )
-from ai_todo.core.exceptions import TamperError
+from ai_todo.core.exceptions import ConcurrentModificationError, LockTimeoutError, TamperError
 
 
 @click.group()
@@ -64,6 +66,11 @@ def main():
         print("")
         import sys
 
+        sys.exit(1)
+    except (LockTimeoutError, ConcurrentModificationError) as e:
+        print(f"Error: {e}")
+        import sys
+
         sys.exit(1)
     except Exception as e:
         # Let other exceptions bubble up or handle them if needed
@@ -77,23 +84,7 @@ def main():
 @click.pass_context
 def add_task(ctx, title, description, tags):
     """Add a new task."""
-    add_command(title, list(tags), todo_path=ctx.obj["todo_file"])
-    # If description provided, add notes
-    if description:
-        import re
-
-        from ai_todo.cli.commands import get_manager
-
-        manager = get_manager(ctx.obj["todo_file"])
-        # Find the task we just added (newest task)
-        tasks = manager.list_tasks()
-        if tasks:
-            # Get task IDs and find highest
-            task_ids = [t.id for t in tasks if "." not in t.id]
-            if task_ids:
-                # Find newest task (highest ID)
-                newest_id = max(task_ids, key=lambda x: int(re.sub(r"[^0-9]", "", x) or "0"))
-                note_command(newest_id, description, todo_path=ctx.obj["todo_file"])
+    add_command(title, list(tags), todo_path=ctx.obj["todo_file"], notes=description)
 
 
 @cli.command("add-subtask")
@@ -104,18 +95,9 @@ def add_task(ctx, title, description, tags):
 @click.pass_context
 def add_subtask(ctx, parent_id, title, description, tags):
     """Add a subtask."""
-    add_subtask_command(parent_id, title, list(tags), todo_path=ctx.obj["todo_file"])
-    # If description provided, add notes
-    if description:
-        from ai_todo.cli.commands import get_manager
-
-        manager = get_manager(ctx.obj["todo_file"])
-        # Find subtasks of this parent and get the newest one
-        subtasks = manager.get_subtasks(parent_id)
-        if subtasks:
-            # Get newest subtask (highest ID)
-            newest_subtask = max(subtasks, key=lambda t: [int(x) for x in t.id.split(".")])
-            note_command(newest_subtask.id, description, todo_path=ctx.obj["todo_file"])
+    add_subtask_command(
+        parent_id, title, list(tags), todo_path=ctx.obj["todo_file"], notes=description
+    )
 
 
 @cli.command()
@@ -123,17 +105,40 @@ def add_subtask(ctx, parent_id, title, description, tags):
 @click.option("--with-subtasks", is_flag=True, help="Include subtasks in operation")
 @click.pass_context
 def complete(ctx, task_ids, with_subtasks):
-    """Mark task(s) as complete."""
+    """Mark task(s) as complete.
+
+    TASK_IDS may also be selectors: 104.3-104.10 (subtask range), 10-50 (root
+    tasks), 104.* (all subtasks of 104), tag:bug or status:pending.
+    """
     complete_command(list(task_ids), with_subtasks, todo_path=ctx.obj["todo_file"])
 
 
+def _split_values(values: tuple[str, ...]) -> list[str]:
+    """Flatten repeated and comma-separated option values."""
+    return [item.strip() for value in values for item in value.split(",") if item.strip()]
+
+
 @cli.command("list")
-@click.option("--status", help="Filter by status")
-@click.option("--tag", help="Filter by tag")
+@click.option(
+    "--status", multiple=True, help="Filter by status (repeatable or comma-separated, e.g. pending)"
+)
+@click.option("--tag", multiple=True, help="Filter by tag (repeatable; all must match)")
+@click.option("--any-tag", is_flag=True, help="Match tasks with any of the given tags")
+@click.option("--range", "id_range", help="Only tasks under root IDs in this range, e.g. 10-50")
+@click.option("--parents-only", is_flag=True, help="Only root tasks (no subtasks)")
+@click.option("--has-subtasks", is_flag=True, help="Only tasks with matching subtasks")
 @click.pass_context
-def list_tasks(ctx, status, tag):
+def list_tasks(ctx, status, tag, any_tag, id_range, parents_only, has_subtasks):
     """List tasks."""
-    list_command(status, tag, todo_path=ctx.obj["todo_file"])
+    list_command(
+        parents_only=parents_only,
+        has_subtasks=has_subtasks,
+        todo_path=ctx.obj["todo_file"],
+        tags=_split_values(tag),
+        match_any=any_tag,
+        statuses=_split_values(status),
+        id_range=id_range,
+    )
 
 
 @cli.command("modify-task")
@@ -144,13 +149,7 @@ def list_tasks(ctx, status, tag):
 @click.pass_context
 def modify_task(ctx, task_id, title, description, tags):
     """Modify a task's title, description, and/or tags."""
-    modify_command(task_id, title, list(tags), todo_path=ctx.obj["todo_file"])
-    # If description provided, update notes
-    if description is not None:
-        if description == "":
-            delete_note_command(task_id, todo_path=ctx.obj["todo_file"])
-        else:
-            update_note_command(task_id, description, todo_path=ctx.obj["todo_file"])
+    modify_command(task_id, title, list(tags), todo_path=ctx.obj["todo_file"], notes=description)
 
 
 @cli.command()
@@ -187,7 +186,11 @@ def get_active_tasks(ctx):
 )
 @click.pass_context
 def delete(ctx, task_ids, no_subtasks):
-    """Delete task(s) and their subtasks - move to Deleted section."""
+    """Delete task(s) and their subtasks - move to Deleted section.
+
+    TASK_IDS may also be selectors: 104.3-104.10 (subtask range), 10-50 (root
+    tasks), 104.* (all subtasks of 104), tag:bug or status:pending.
+    """
     delete_command(list(task_ids), with_subtasks=not no_subtasks, todo_path=ctx.obj["todo_file"])
 
 
@@ -196,7 +199,11 @@ def delete(ctx, task_ids, no_subtasks):
 @click.option("--reason", help="Reason for archiving incomplete tasks")
 @click.pass_context
 def archive(ctx, task_ids, reason):
-    """Archive task(s) - move to Recently Completed section."""
+    """Archive task(s) - move to Recently Completed section.
+
+    TASK_IDS may also be selectors: 104.3-104.10 (subtask range), 10-50 (root
+    tasks), 104.* (all subtasks of 104), tag:bug or status:pending.
+    """
     archive_command(list(task_ids), reason=reason, todo_path=ctx.obj["todo_file"])
 
 
@@ -265,18 +272,7 @@ def set_description(ctx, task_id, description):
 
     Use "" (empty string) to clear the description.
     """
-    from ai_todo.cli.commands import get_manager
-
-    if description == "":
-        delete_note_command(task_id, todo_path=ctx.obj["todo_file"])
-    else:
-        # Check if task has existing notes - if so, update; otherwise add
-        manager = get_manager(ctx.obj["todo_file"])
-        task = manager.get_task(task_id)
-        if task and task.notes:
-            update_note_command(task_id, description, todo_path=ctx.obj["todo_file"])
-        else:
-            note_command(task_id, description, todo_path=ctx.obj["todo_file"])
+    set_description_command(task_id, description, todo_path=ctx.obj["todo_file"])
 
 
 @cli.command("set-tags")
@@ -288,31 +284,16 @@ def set_tags(ctx, task_id, tags):
 
     Use no tags to clear all tags from the task.
     """
-    from ai_todo.cli.commands import get_manager, save_changes
-
-    manager = get_manager(ctx.obj["todo_file"])
-    task = manager.get_task(task_id)
-    if not task:
-        print(f"Error: Task {task_id} not found")
-        return
-
-    # Set tags (replaces existing)
-    task.tags = set(tags)
-    save_changes(manager, ctx.obj["todo_file"])
-
-    if tags:
-        tag_str = " ".join([f"`#{tag}`" for tag in sorted(tags)])
-        print(f"Set tags on #{task_id}: {tag_str}")
-    else:
-        print(f"Cleared tags from #{task_id}")
+    set_tags_command(task_id, list(tags), todo_path=ctx.obj["todo_file"])
 
 
 @cli.command()
 @click.argument("task_id")
+@click.option("--archived", is_flag=True, help="Show a task pruned from TODO.md (from the archive)")
 @click.pass_context
-def show(ctx, task_id):
+def show(ctx, task_id, archived):
     """Display task with subtasks, relationships, and notes."""
-    show_command(task_id, todo_path=ctx.obj["todo_file"])
+    show_command(task_id, archived=archived, todo_path=ctx.obj["todo_file"])
 
 
 @cli.command()
@@ -360,6 +341,25 @@ def relate(ctx, task_id, completed_by, depends_on, blocks, related_to, duplicate
     relate_command(task_id, rel_type, targets, todo_path=ctx.obj["todo_file"])
 
 
+@cli.command()
+@click.pass_context
+def batch(ctx):
+    """Apply a JSON array of operations from stdin in a single write.
+
+    Example: echo '[{"op": "complete", "task_ids": ["12", "13"]}]' | ai-todo batch
+    """
+    import sys
+
+    batch_command(sys.stdin.read(), todo_path=ctx.obj["todo_file"])
+
+
+@cli.command()
+@click.pass_context
+def flush(ctx):
+    """Write journaled operations to TODO.md (journal mode; run before committing)."""
+    flush_command(todo_path=ctx.obj["todo_file"])
+
+
 @cli.command()
 @click.pass_context
 def lint(ctx):
@@ -390,6 +390,17 @@ def resolve_conflicts(ctx, dry_run):
     resolve_conflicts_command(dry_run, todo_path=ctx.obj["todo_file"])
 
 
+@cli.command("log")
+@click.option("--filter", "filter_text", help="Only entries containing this text")
+@click.option("--lines", "-n", type=int, help="Number of entries (default: 50 newest)")
+@click.option("--task", "task_id", help="Only entries for this task ID")
+@click.option("--since", help="Only entries at or after this date (YYYY-MM-DD)")
+@click.pass_context
+def log(ctx, filter_text, lines, task_id, since):
+    """View the operation log (newest entries)."""
+    log_command(filter_text, lines, todo_path=ctx.obj["todo_file"], task_id=task_id, since=since)
+
+
 # Phase 5: Configuration and Setup
 @cli.command("config")
 @click.pass_context
@@ -563,12 +574,22 @@ def tamper():
 
 
 @tamper.command("diff")
+@click.option("--version", help="Compare with this recorded version (checksum prefix)")
 @click.pass_context
-def tamper_diff(ctx):
+def tamper_diff(ctx, version):
     """Show diff between current file and last valid state."""
     from ai_todo.cli.tamper_ops import tamper_diff_command
 
-    tamper_diff_command(todo_path=ctx.obj["todo_file"])
+    tamper_diff_command(todo_path=ctx.obj["todo_file"], version=version)
+
+
+@tamper.command("history")
+@click.pass_context
+def tamper_history(ctx):
+    """List recorded versions of the file."""
+    from ai_todo.cli.tamper_ops import tamper_history_command
+
+    tamper_history_command(todo_path=ctx.obj["todo_file"])
 
 
 @tamper.command("accept")
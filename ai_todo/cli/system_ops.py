@@ -6,19 +6,29 @@ from datetime import datetime
 from pathlib import Path
 
 
-def view_log_command(
-    filter_text: str | None = None, lines: int | None = None, todo_path: str = "TODO.md"
-) -> None:
-    """View TODO operation log (with --filter and --lines options)."""
-    # Check new location first, then legacy
+def find_log_file(todo_path: str = "TODO.md") -> Path | None:
+    """Return the operation log next to TODO.md (new location first, then legacy)."""
     config_dir = Path(todo_path).parent / ".ai-todo"
     if not config_dir.exists():
         config_dir = Path(todo_path).parent / ".todo.ai"
     log_file = config_dir / ".ai-todo.log"
     if not log_file.exists():
         log_file = config_dir / ".todo.ai.log"
+    return log_file if log_file.exists() else None
 
-    if not log_file.exists():
+
+def view_log_command(
+    filter_text: str | None = None,
+    lines: int | None = None,
+    todo_path: str = "TODO.md",
+    task_id: str | None = None,
+    since: str | None = None,
+) -> None:
+    """View the newest TODO operation log entries (with --filter, --lines, --task, --since)."""
+    from ai_todo.core.action_log import ActionLog
+
+    log_file = find_log_file(todo_path)
+    if log_file is None:
         print("No log file found")
         return
 
@@ -26,22 +36,14 @@ def view_log_command(
     print("=================")
     print("")
 
-    content = log_file.read_text(encoding="utf-8")
-    log_lines = [line for line in content.splitlines() if line.strip() and not line.startswith("#")]
-
     if filter_text:
         print(f"Filtering by: {filter_text}")
         print("")
-        filtered = [line for line in log_lines if filter_text.lower() in line.lower()]
-        log_lines = filtered
-
-    if lines:
-        log_lines = log_lines[:lines]
-    else:
-        log_lines = log_lines[:50]  # Default to 50 lines
 
-    for line in log_lines:
-        print(line)
+    # Default to the 50 newest entries, printed oldest first
+    page = ActionLog(log_file).read(lines or 50, filter_text, task_id=task_id, since=since)
+    for entry in reversed(page.entries):
+        print(entry.line)
 
 
 def update_command() -> None:
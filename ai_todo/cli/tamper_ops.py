@@ -4,8 +4,8 @@ import sys
 from ai_todo.core.file_ops import FileOps
 
 
-def tamper_diff_command(todo_path: str = "TODO.md") -> None:
-    """Show diff between current TODO.md and shadow copy."""
+def tamper_diff_command(todo_path: str = "TODO.md", version: str | None = None) -> None:
+    """Show diff between current TODO.md and shadow copy (or a recorded version)."""
     # Initialize with skip_verify=True to avoid raising TamperError immediately
     file_ops = FileOps(todo_path, skip_verify=True)
 
@@ -13,21 +13,25 @@ def tamper_diff_command(todo_path: str = "TODO.md") -> None:
         print("Error: TODO.md not found")
         return
 
-    if not file_ops.shadow_path.exists():
+    if not file_ops.shadow.exists():
         print("Error: No shadow copy found. Cannot show diff.")
         return
 
     try:
         current_lines = file_ops.todo_path.read_text(encoding="utf-8").splitlines()
-        shadow_lines = file_ops.shadow_path.read_text(encoding="utf-8").splitlines()
+        shadow_content = file_ops.shadow.read(version)
     except Exception as e:
         print(f"Error reading files: {e}")
         return
+    if shadow_content is None:
+        print(f"Error: Version {version} not found. See 'ai-todo tamper history'.")
+        return
+    shadow_lines = shadow_content.splitlines()
 
     diff = difflib.unified_diff(
         shadow_lines,
         current_lines,
-        fromfile="Shadow Copy (Last Valid)",
+        fromfile=f"Shadow Copy ({version})" if version else "Shadow Copy (Last Valid)",
         tofile="Current File (Tampered)",
         lineterm="",
     )
@@ -50,6 +54,23 @@ def tamper_diff_command(todo_path: str = "TODO.md") -> None:
             print(line)
 
 
+def tamper_history_command(todo_path: str = "TODO.md") -> None:
+    """List the recorded versions of TODO.md, newest first."""
+    file_ops = FileOps(todo_path, skip_verify=True)
+    versions = file_ops.shadow.history()
+    if not versions:
+        print("No recorded versions.")
+        return
+
+    print("Recorded Versions:")
+    print("==================")
+    for version in reversed(versions):
+        recorded_at = version.recorded_at.strftime("%Y-%m-%d %H:%M:%S")
+        print(f"{version.checksum[:12]}  {recorded_at}  {version.kind:<8}  {version.size} bytes")
+    print()
+    print("Use 'ai-todo tamper diff --version <checksum>' to compare with a version.")
+
+
 def tamper_accept_command(reason: str, todo_path: str = "TODO.md") -> None:
     """Accept external changes."""
     # Initialize with skip_verify=True to bypass the check
@@ -332,11 +332,10 @@ def _generate_bug_report(error_message: str, error_context: str | None, command:
         log_path = Path(".todo.ai") / ".todo.ai.log"
     if log_path.exists():
         try:
-            content = log_path.read_text(encoding="utf-8")
-            log_lines = [
-                line for line in content.splitlines() if line.strip() and not line.startswith("#")
-            ]
-            log_info = "\n".join(log_lines[:50])  # Last 50 lines
+            from ai_todo.core.action_log import ActionLog
+
+            entries = ActionLog(log_path).read(50).entries  # Last 50 entries
+            log_info = "\n".join(entry.line for entry in reversed(entries))
         except Exception:
             log_info = "Could not read log file"
 
@@ -0,0 +1,520 @@
+"""Rotating operation log (``.ai-todo/.ai-todo.log`` and ``state/audit.log``).
+
+Entries are appended to the active log file. Once it grows past
+``logging.rotate_bytes`` (default 1 MiB) or its first entry is older than
+``logging.rotate_days`` (default 30), it is rotated into a gzip segment
+``<log>.<NNNNNN>.gz`` next to it, with a sidecar index ``<log>.<NNNNNN>.idx``
+(time range of the segment, the offsets of each task ID's entries and of its
+gzip members, one per ~64 KiB of lines, so single entries can be read without
+decompressing the whole segment).
+Only the newest ``logging.keep_segments`` segments (default 20) are kept.
+
+Each process has one writer per log file (get_action_log()). It keeps the
+file open and buffers entries until flush(), which callers invoke at the
+end of a write transaction; buffered entries are also flushed when the
+buffer fills up, before a query, and at interpreter exit. With
+``logging.format: json`` entries are JSON objects (one per line) instead
+of pipe-separated text; queries understand both.
+
+Queries read newest first: the active file backwards in blocks from its
+end, then segments, skipping segments by their index. Asking for the last N
+entries reads about N entries, not the whole history. Entries are addressed
+by a cursor ``<segment number>:<offset>``; the active file already carries
+the number it will get when rotated, so cursors survive rotation.
+"""
+
+import atexit
+import gzip
+import io
+import json
+import os
+import re
+import threading
+import time
+from bisect import bisect_right
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass
+from datetime import datetime
+from functools import partial
+from pathlib import Path
+from typing import BinaryIO, TextIO
+
+DEFAULT_ROTATE_BYTES = 1024 * 1024
+DEFAULT_ROTATE_DAYS = 30
+DEFAULT_KEEP_SEGMENTS = 20
+MAX_BUFFERED = 100  # Entries held before a flush is forced
+
+# Field order of a text entry: TIMESTAMP | USER | INTERFACE | ACTION | TASK_ID | CHECKSUM | ...
+ENTRY_FIELDS = ("timestamp", "user", "interface", "action", "task_id", "checksum", "description")
+
+# The writer for each log file in this process (see get_action_log)
+_action_logs: dict[str, "ActionLog"] = {}
+_action_logs_lock = threading.Lock()
+
+_BLOCK_SIZE = 64 * 1024
+
+
+@dataclass
+class LogEntry:
+    """One line of the operation log."""
+
+    line: str
+    timestamp: str
+    task_id: str
+    cursor: str  # Pass as ``before`` to continue with older entries
+
+
+@dataclass
+class LogPage:
+    """A page of log entries, newest first."""
+
+    entries: list[LogEntry]
+    next_cursor: str | None  # None when there are no older entries
+
+
+class ActionLog:
+    """Operation log file with rotation into indexed gzip segments."""
+
+    def __init__(
+        self,
+        path: Path,
+        rotate_bytes: int = DEFAULT_ROTATE_BYTES,
+        rotate_days: float = DEFAULT_ROTATE_DAYS,
+        keep_segments: int = DEFAULT_KEEP_SEGMENTS,
+    ):
+        self.path = path
+        self.rotate_bytes = rotate_bytes
+        self.rotate_days = rotate_days
+        self.keep_segments = max(1, keep_segments)
+        self._segment_pattern = re.compile(re.escape(path.name) + r"\.(\d{6})(\.gz)?$")
+        self._started: tuple[int, str] | None = None  # (inode, first timestamp) of the active file
+        self._buffer: list[str] = []
+        self._file: TextIO | None = None
+        self._file_ino: int | None = None
+        self._lock = threading.RLock()
+
+    def append(self, line: str) -> None:
+        """Buffer one entry; it is written by the next flush()."""
+        with self._lock:
+            self._buffer.append(line)
+            if len(self._buffer) >= MAX_BUFFERED:
+                self.flush()
+
+    def flush(self) -> None:
+        """Write the buffered entries in one append (rotating first if the file is due)."""
+        with self._lock:
+            if not self._buffer:
+                return
+            if self._rotation_due():
+                self.rotate()
+            f = self._open()
+            f.write("".join(line + "\n" for line in self._buffer))
+            f.flush()
+            self._buffer.clear()
+
+    def close(self) -> None:
+        """Flush and close the file."""
+        with self._lock:
+            try:
+                self.flush()
+            finally:
+                if self._file is not None:
+                    self._file.close()
+                self._file = self._file_ino = None
+
+    def _open(self) -> TextIO:
+        """Return the open active file, reopening it if it was rotated or removed meanwhile."""
+        try:
+            current_ino: int | None = os.stat(self.path).st_ino
+        except FileNotFoundError:
+            current_ino = None
+        if self._file is None or current_ino != self._file_ino:
+            if self._file is not None:
+                self._file.close()
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = open(self.path, "a", encoding="utf-8")
+            self._file_ino = os.fstat(self._file.fileno()).st_ino
+        return self._file
+
+    def rotate(self) -> None:
+        """Move the active file into a new compressed, indexed segment."""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = self._file_ino = None
+        while True:
+            number = self._active_number()
+            pending = self._segment_path(number, compressed=False)
+            try:
+                # Claim the number: a concurrent rotation picks the next one
+                os.close(os.open(pending, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o644))
+                break
+            except FileExistsError:
+                continue
+        try:
+            os.replace(self.path, pending)
+        except FileNotFoundError:
+            pending.unlink(missing_ok=True)
+            return
+        for number, path in self._segments():
+            if path.suffix != ".gz":
+                self._compress(number, path)
+        for _, path in self._segments()[: -self.keep_segments]:
+            path.unlink(missing_ok=True)
+            self._index_path(path).unlink(missing_ok=True)
+
+    def read(
+        self,
+        lines: int = 50,
+        filter_text: str | None = None,
+        task_id: str | None = None,
+        since: str | None = None,
+        before: str | None = None,
+    ) -> LogPage:
+        """Return the newest matching entries.
+
+        Args:
+            lines: Maximum number of entries
+            filter_text: Only entries containing this text (case-insensitive)
+            task_id: Only entries for this task ID
+            since: Only entries at or after this time (``YYYY-MM-DD[ HH:MM:SS]``)
+            before: Cursor of an entry returned earlier; only older entries
+
+        Returns:
+            The entries, newest first, and the cursor to continue from
+        """
+        self.flush()
+        needle = filter_text.lower() if filter_text else None
+        start_number, start_offset = _parse_cursor(before) if before else (None, None)
+        sources = [(self._active_number(), self.path)] + list(reversed(self._segments()))
+
+        entries: list[LogEntry] = []
+        for number, path in sources:
+            if start_number is not None and number > start_number:
+                continue
+            end = start_offset if number == start_number else None
+            index = self._read_index(path) if path.suffix == ".gz" else None
+            if since and index is not None and index.last < since:
+                break  # This segment and all older ones end before ``since``
+            offsets = index.task_offsets(task_id) if task_id and index is not None else None
+            blocks = index.blocks if index is not None else None
+            for offset, text in _read_source(path, end, offsets, blocks):
+                timestamp, entry_task_id = _entry_fields(text)
+                if not timestamp:
+                    continue
+                if task_id and task_id not in entry_task_id.split(","):
+                    continue
+                if since and timestamp < since:
+                    continue
+                if needle and needle not in text.lower():
+                    continue
+                entries.append(LogEntry(text, timestamp, entry_task_id, f"{number}:{offset}"))
+                if len(entries) == lines:
+                    return LogPage(entries, entries[-1].cursor)
+        return LogPage(entries, None)
+
+    def _rotation_due(self) -> bool:
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return False
+        if self.rotate_bytes and st.st_size >= self.rotate_bytes:
+            return True
+        if self.rotate_days and st.st_size:
+            if self._started is None or self._started[0] != st.st_ino:
+                self._started = (st.st_ino, _first_timestamp(self.path))
+            first = self._started[1]
+            if first:
+                try:
+                    started = datetime.strptime(first[:19], "%Y-%m-%d %H:%M:%S").timestamp()
+                except ValueError:
+                    return False
+                return time.time() - started > self.rotate_days * 86400
+        return False
+
+    def _segments(self) -> list[tuple[int, Path]]:
+        """Segments (number, path), oldest first; a compressed one wins over its source."""
+        found: dict[int, Path] = {}
+        try:
+            names = os.listdir(self.path.parent)
+        except FileNotFoundError:
+            return []
+        for name in names:
+            match = self._segment_pattern.match(name)
+            if match:
+                number = int(match.group(1))
+                if match.group(2) or number not in found:
+                    found[number] = self.path.parent / name
+        return sorted(found.items())
+
+    def _active_number(self) -> int:
+        segments = self._segments()
+        return segments[-1][0] + 1 if segments else 1
+
+    def _segment_path(self, number: int, compressed: bool = True) -> Path:
+        suffix = ".gz" if compressed else ""
+        return self.path.with_name(f"{self.path.name}.{number:06d}{suffix}")
+
+    def _index_path(self, segment: Path) -> Path:
+        return segment.with_name(segment.name.removesuffix(".gz") + ".idx")
+
+    def _compress(self, number: int, pending: Path) -> None:
+        data = pending.read_bytes()
+        target = self._segment_path(number)
+        tmp = target.with_name(f"{target.name}.{os.getpid()}.tmp")
+        compressed, blocks = _compress_blocks(data)
+        tmp.write_bytes(compressed)
+        self._index_path(target).write_bytes(_build_index(data, blocks))
+        os.replace(tmp, target)
+        pending.unlink(missing_ok=True)
+
+    def _read_index(self, segment: Path) -> "_SegmentIndex | None":
+        try:
+            return _SegmentIndex.parse(self._index_path(segment).read_bytes())
+        except (OSError, ValueError):
+            return None
+
+
+def get_action_log(path: Path, **settings: float) -> ActionLog:
+    """Return this process's writer for the log file at ``path``.
+
+    Args:
+        path: Log file
+        **settings: ActionLog rotation settings (applied to an existing writer too)
+    """
+    key = os.path.abspath(path)
+    with _action_logs_lock:
+        log = _action_logs.get(key)
+        if log is None:
+            log = _action_logs[key] = ActionLog(path, **settings)  # type: ignore[arg-type]
+        else:
+            for name, value in settings.items():
+                setattr(log, name, value)
+        return log
+
+
+@atexit.register
+def flush_all() -> None:
+    """Flush and close every writer (also run at interpreter exit)."""
+    with _action_logs_lock:
+        logs = list(_action_logs.values())
+    for log in logs:
+        try:
+            log.close()
+        except OSError:
+            pass  # Nothing left to report to at exit
+
+
+def _forget_after_fork() -> None:
+    """Drop writers inherited by a forked child so it does not write the parent's entries."""
+    global _action_logs_lock
+    _action_logs_lock = threading.Lock()
+    for log in _action_logs.values():
+        log._buffer = []
+        log._file = log._file_ino = None
+        log._lock = threading.RLock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_forget_after_fork)
+
+
+def format_entry(fields: dict[str, str], json_lines: bool = False) -> str:
+    """Format one log entry (keys from ENTRY_FIELDS) as pipe-separated text or JSON."""
+    if json_lines:
+        return json.dumps({name: fields.get(name, "") for name in ENTRY_FIELDS}, ensure_ascii=False)
+    return " | ".join(fields.get(name, "") for name in ENTRY_FIELDS)
+
+
+def _entry_fields(line: str) -> tuple[str, str]:
+    """Return (timestamp, task IDs) of a log line, or ("", "") for headers and blanks.
+
+    Text lines are ``TIMESTAMP | USER | INTERFACE | ACTION | TASK_ID | CHECKSUM |
+    DESCRIPTION``, where TASK_ID may list several IDs separated by commas; lines
+    written by the shell version lack INTERFACE and CHECKSUM. JSON lines carry
+    the same fields by name.
+    """
+    if not line.strip() or line.startswith("#"):
+        return "", ""
+    if line.startswith("{"):
+        try:
+            entry = json.loads(line)
+            return str(entry.get("timestamp", "")), str(entry.get("task_id", ""))
+        except (ValueError, AttributeError):
+            return "", ""
+    fields = line.split(" | ")
+    task_id = fields[4] if len(fields) >= 7 else fields[3] if len(fields) >= 4 else ""
+    return fields[0].strip(), task_id.strip()
+
+
+def _build_index(data: bytes, blocks: list[list[int]]) -> bytes:
+    """Return the sidecar index of a segment's (uncompressed) ``data``."""
+    tasks: dict[str, list[int]] = {}
+    first = last = ""
+    offset = 0
+    for raw in data.split(b"\n"):
+        timestamp, task_id = _entry_fields(raw.decode("utf-8", errors="replace"))
+        if timestamp:
+            first = min(first, timestamp) if first else timestamp
+            last = max(last, timestamp)
+            for one_id in filter(None, task_id.split(",")):
+                tasks.setdefault(one_id, []).append(offset)
+        offset += len(raw) + 1
+    lines = [
+        f"first\t{first}",
+        f"last\t{last}",
+        "blocks\t" + " ".join(f"{start}:{gz_start}" for start, gz_start in blocks),
+    ]
+    lines += [f"task\t{task_id}\t{' '.join(map(str, o))}" for task_id, o in tasks.items()]
+    return ("\n".join(lines) + "\n").encode("utf-8")
+
+
+@dataclass
+class _SegmentIndex:
+    """Sidecar index of a segment.
+
+    Tab-separated lines: ``first``/``last`` timestamps, ``blocks`` (offset and
+    gzip offset of each member) and one ``task <id> <offsets>`` line per task
+    ID. A task's line is found by a byte search, so a lookup does not parse
+    the lines of all other tasks.
+    """
+
+    first: str
+    last: str
+    blocks: list[list[int]]
+    data: bytes
+
+    @classmethod
+    def parse(cls, data: bytes) -> "_SegmentIndex":
+        header = data.split(b"\n", 3)
+        fields = dict(line.decode("utf-8").split("\t", 1) for line in header[:3])
+        blocks = [[int(n) for n in pair.split(":")] for pair in fields["blocks"].split()]
+        return cls(fields["first"], fields["last"], blocks, data)
+
+    def task_offsets(self, task_id: str) -> list[int]:
+        key = f"\ntask\t{task_id}\t".encode()
+        start = self.data.find(key)
+        if start == -1:
+            return []
+        start += len(key)
+        end = self.data.find(b"\n", start)
+        return [int(n) for n in self.data[start:end].split()]
+
+
+def _read_source(
+    path: Path, end: int | None, offsets: list[int] | None, blocks: list[list[int]] | None
+) -> Iterator[tuple[int, str]]:
+    """Yield (offset, line) of a log file or segment, newest first, before ``end``.
+
+    With ``offsets`` (from a segment index), only the lines starting there are
+    read; with ``blocks``, only the gzip members holding them are decompressed.
+    """
+    try:
+        parts = _parts(path, blocks)
+    except FileNotFoundError:
+        return
+    starts = [start for start, _ in parts]
+    if offsets is not None:
+        loaded: dict[int, BinaryIO] = {}
+        for offset in reversed(offsets):
+            if end is not None and offset >= end:
+                continue
+            k = bisect_right(starts, offset) - 1
+            if k not in loaded:
+                loaded = {k: parts[k][1]()}
+            f = loaded[k]
+            f.seek(offset - starts[k])
+            yield offset, f.readline().rstrip(b"\r\n").decode("utf-8", errors="replace")
+        return
+    for start, load in reversed(parts):
+        if end is not None and start >= end:
+            continue
+        with load() as f:
+            size = f.seek(0, os.SEEK_END)
+            local_end = size if end is None else min(end - start, size)
+            for offset, raw in _reverse_lines(f, local_end):
+                yield start + offset, raw.decode("utf-8", errors="replace")
+
+
+def _parts(path: Path, blocks: list[list[int]] | None) -> list[tuple[int, Callable[[], BinaryIO]]]:
+    """Split a log file or segment into (offset, opener) parts that can be read separately."""
+    if path.suffix != ".gz":
+        f = open(path, "rb")
+        return [(0, lambda: f)]
+    data = path.read_bytes()
+    if not blocks:
+        return [(0, lambda: io.BytesIO(gzip.decompress(data)))]
+    ends = [gz_start for _, gz_start in blocks[1:]] + [len(data)]
+    return [
+        (start, partial(_decompress_block, data, gz_start, gz_end))
+        for (start, gz_start), gz_end in zip(blocks, ends, strict=True)
+    ]
+
+
+def _decompress_block(data: bytes, start: int, end: int) -> BinaryIO:
+    """Decompress the gzip member at ``data[start:end]``."""
+    return io.BytesIO(gzip.decompress(data[start:end]))
+
+
+def _compress_blocks(data: bytes) -> tuple[bytes, list[list[int]]]:
+    """Compress ``data`` as one gzip member per block of whole lines.
+
+    Returns:
+        The gzip data (a valid multi-member .gz file) and [offset, gzip offset]
+        of each block
+    """
+    out = io.BytesIO()
+    blocks = []
+    start = 0
+    while start < len(data):
+        cut = data.find(b"\n", start + _BLOCK_SIZE)
+        end = len(data) if cut == -1 else cut + 1
+        blocks.append([start, out.tell()])
+        out.write(gzip.compress(data[start:end]))
+        start = end
+    return out.getvalue(), blocks
+
+
+def _reverse_lines(f: BinaryIO, end: int) -> Iterator[tuple[int, bytes]]:
+    """Yield (offset, line) for the lines before ``end``, last first, reading blocks backwards."""
+    position = end
+    partial = b""  # Start of the line that continues into the block after this one
+    while position > 0:
+        size = min(_BLOCK_SIZE, position)
+        position -= size
+        f.seek(position)
+        chunk = f.read(size) + partial
+        lines = chunk.split(b"\n")
+        partial = lines[0]
+        offset = position + len(partial) + 1
+        starts = []
+        for line in lines[1:]:
+            starts.append(offset)
+            offset += len(line) + 1
+        for start, line in zip(reversed(starts), reversed(lines[1:]), strict=True):
+            if line.strip():
+                yield start, line.rstrip(b"\r")
+    if partial.strip():
+        yield 0, partial.rstrip(b"\r")
+
+
+def _first_timestamp(path: Path) -> str:
+    """Timestamp of the first entry in a log file (reads its first block only)."""
+    try:
+        with open(path, "rb") as f:
+            head = f.read(_BLOCK_SIZE)
+    except OSError:
+        return ""
+    for raw in head.split(b"\n")[:-1]:
+        timestamp, _ = _entry_fields(raw.decode("utf-8", errors="replace"))
+        if timestamp:
+            return timestamp
+    return ""
+
+
+def _parse_cursor(cursor: str) -> tuple[int, int]:
+    try:
+        number, offset = cursor.split(":")
+        return int(number), int(offset)
+    except ValueError:
+        raise ValueError(f"Invalid log cursor: {cursor}") from None
@@ -1,11 +1,22 @@
+import copy
+import os
 from pathlib import Path
 from typing import Any
 
 import yaml
 
+# Parsed config files by absolute path, with the (size, mtime_ns, inode) they were parsed at
+_config_cache: dict[str, tuple[tuple[int, int, int], dict[str, Any]]] = {}
+
 
 class Config:
-    """Manages ai-todo configuration."""
+    """Manages ai-todo configuration.
+
+    Parsed files are cached per path and reused until the file's size, mtime
+    or inode changes, so constructing a Config is a stat() in the common case.
+    Instances share the cached data: values returned by get() must not be
+    modified in place (use set()).
+    """
 
     # Data directory names
     NEW_DATA_DIR = ".ai-todo"
@@ -18,12 +29,21 @@ class Config:
 
     def _load(self) -> None:
         """Load configuration from YAML file."""
-        if not self.config_path.exists():
+        try:
+            st = os.stat(self.config_path)
+        except OSError:
+            return
+        key = os.path.abspath(self.config_path)
+        file_key = (st.st_size, st.st_mtime_ns, st.st_ino)
+        cached = _config_cache.get(key)
+        if cached is not None and cached[0] == file_key:
+            self._data = cached[1]
             return
 
         try:
             content = self.config_path.read_text(encoding="utf-8")
             self._data = yaml.safe_load(content) or {}
+            _config_cache[key] = (file_key, self._data)
         except Exception as e:
             # Fallback to empty config on error
             print(f"Warning: Failed to load config: {e}")
@@ -52,6 +72,8 @@ class Config:
         Saves to file immediately.
         """
         keys = key.split(".")
+        # Copy before modifying: the parsed data is shared through the cache
+        self._data = copy.deepcopy(self._data)
         target = self._data
 
         # Traverse to the last dict
@@ -2,6 +2,7 @@ import subprocess
 
 from ai_todo.core.config import Config
 from ai_todo.core.github_client import GitHubClient
+from ai_todo.core.task_id import TaskId
 
 
 class CoordinationManager:
@@ -145,24 +146,9 @@ class CoordinationManager:
         """
         Get next task ID for a new task.
         Wrapper around generate_next_task_id that extracts current_max and stored_serial from TaskManager.
-        """  # Get current max task ID from manager
-        tasks = task_manager.list_tasks()
-        current_max = 0
-        for task in tasks:
-            # Extract numeric part from task ID
-            task_id = task.id
-            # Remove prefix if present (e.g., "fxstein-50" -> "50")
-            if "-" in task_id:
-                task_id = task_id.split("-")[-1]
-            # Extract base number (e.g., "50.1" -> "50")
-            if "." in task_id:
-                task_id = task_id.split(".")[0]
-            try:
-                num = int(task_id)
-                if num > current_max:
-                    current_max = num
-            except ValueError:
-                pass
+        """
+        # Highest root serial in use, maintained by the TaskManager as tasks are added
+        current_max = task_manager.max_serial()
 
         # Get stored serial from file
         if file_ops is None:
@@ -178,25 +164,8 @@ class CoordinationManager:
         """
         Get next subtask ID for a parent task.
         """
-        # Get all subtasks of this parent
-        subtasks = task_manager.get_subtasks(parent_id)
-        current_max = 0
-
-        for subtask in subtasks:
-            # Extract subtask number (e.g., "50.3" -> 3, "fxstein-50.3" -> 3)
-            subtask_id = subtask.id
-            # Remove prefix if present
-            if "-" in subtask_id:
-                subtask_id = subtask_id.split("-", 1)[1]
-            # Extract subtask number
-            if "." in subtask_id:
-                subtask_num_str = subtask_id.split(".")[-1]
-                try:
-                    num = int(subtask_num_str)
-                    if num > current_max:
-                        current_max = num
-                except ValueError:
-                    pass
+        # Highest direct-child ordinal (e.g., "50.3" -> 3), kept by the TaskManager index
+        current_max = task_manager.max_child_ordinal(parent_id)
 
         # Next subtask number
         next_num = current_max + 1
@@ -206,15 +175,12 @@ class CoordinationManager:
         if mode == "multi-user":
             user_id = self._get_github_user_id()
             # Parent ID might already have prefix, extract base number
-            base_parent = parent_id.split("-")[-1] if "-" in parent_id else parent_id
-            return f"{user_id}-{base_parent}.{next_num}"
+            return f"{user_id}-{TaskId.of(parent_id).base}.{next_num}"
         elif mode == "branch":
             branch = self._get_branch_name()
             # Parent ID might already have prefix, extract base number
-            base_parent = parent_id.split("-")[-1] if "-" in parent_id else parent_id
-            return f"{branch}-{base_parent}.{next_num}"
+            return f"{branch}-{TaskId.of(parent_id).base}.{next_num}"
         else:
             # Single-user or enhanced - just use parent_id.next_num
             # Parent ID might have prefix, extract base number
-            base_parent = parent_id.split("-")[-1] if "-" in parent_id else parent_id
-            return f"{base_parent}.{next_num}"
+            return f"{TaskId.of(parent_id).base}.{next_num}"
@@ -3,8 +3,12 @@
 from dataclasses import dataclass
 from datetime import datetime, timezone
 
+from ai_todo.core.config import Config
 from ai_todo.core.file_ops import FileOps
-from ai_todo.core.task import Task, TaskStatus
+from ai_todo.core.locking import lock_timeout, todo_lock
+from ai_todo.core.migrations import run_migrations
+from ai_todo.core.task import Task, TaskManager, TaskStatus
+from ai_todo.core.task_service import TaskService
 
 
 @dataclass
@@ -48,29 +52,9 @@ class EmptyTrashManager:
         Returns:
             List of expired deleted tasks (includes root + subtasks)
         """
-        current_date = datetime.now(timezone.utc)
-        expired = []
-
-        for task in tasks:
-            # Must be deleted with expiration date
-            if task.status != TaskStatus.DELETED:
-                continue
-            if task.expires_at is None:
-                continue
-
-            # Normalize expires_at to UTC if needed
-            expires = task.expires_at
-            if expires.tzinfo is not None:
-                expires_utc = expires.astimezone(timezone.utc)
-            else:
-                # Naive datetime - assume it's already UTC
-                expires_utc = expires.replace(tzinfo=timezone.utc)
-
-            # Check if expired
-            if expires_utc < current_date:
-                expired.append(task)
-
-        return expired
+        # Range query on the expires_at index of the deleted tasks
+        manager = TaskManager(tasks)
+        return manager.tasks_dated_before(TaskStatus.DELETED, datetime.now(timezone.utc))
 
     def empty_trash(self, dry_run: bool = False) -> EmptyTrashResult:
         """
@@ -93,7 +77,22 @@ class EmptyTrashManager:
             4. Remove expired tasks from task list
             5. Write remaining tasks via FileOps
             6. Return result
+
+        Raises:
+            LockTimeoutError: If another writer holds TODO.md for too long
         """
+        # Dry runs need no migration: deletion dates parse from the task lines
+        if dry_run:
+            return self._empty_trash(dry_run)
+        # Files written before task dates were persisted get them once
+        run_migrations(self.todo_path)
+        config = Config(str(self.file_ops.config_dir / "config.yaml"))
+        with todo_lock(self.todo_path).locked(lock_timeout(config)):
+            # Journaled operations must be in TODO.md before it is rewritten
+            TaskService(self.todo_path).flush()
+            return self._empty_trash(dry_run)
+
+    def _empty_trash(self, dry_run: bool) -> EmptyTrashResult:
         # Read tasks
         tasks = self.file_ops.read_tasks()
 
@@ -11,3 +11,17 @@ class TamperError(TodoAIError):
         self.expected_hash = expected_hash
         self.actual_hash = actual_hash
         super().__init__(message)
+
+
+class LockTimeoutError(TodoAIError):
+    """Raised when the TODO.md write lock cannot be acquired in time."""
+
+    def __init__(self, message: str, holder: str | None = None):
+        self.holder = holder
+        super().__init__(message)
+
+
+class ConcurrentModificationError(TodoAIError):
+    """Raised when TODO.md changed between reading and writing it (optimistic mode)."""
+
+    pass
@@ -1,49 +1,37 @@
+import copy
+import functools
 import hashlib
+import marshal
 import os
-import re
 import shutil
-from dataclasses import dataclass
+import threading
+import time
+from bisect import bisect_left, insort
+from collections.abc import Callable
+from dataclasses import dataclass, field
 from datetime import datetime
 from pathlib import Path
 
+from ai_todo.core.action_log import (
+    DEFAULT_KEEP_SEGMENTS,
+    DEFAULT_ROTATE_BYTES,
+    DEFAULT_ROTATE_DAYS,
+    format_entry,
+    get_action_log,
+)
 from ai_todo.core.config import Config
 from ai_todo.core.exceptions import TamperError
-from ai_todo.core.task import Task, TaskStatus
-
-
-@dataclass(frozen=True)
-class FileStructureSnapshot:
-    """Immutable snapshot of file structure captured from pristine file.
-
-    This snapshot is captured ONCE when FileOps first reads a file, and
-    is never modified, even if the file is re-read after modifications.
-    This ensures consistent structure preservation across all operations.
-    """
-
-    # Tasks section header format
-    tasks_header_format: str  # "# Tasks" or "## Tasks"
-
-    # Blank line preservation
-    blank_after_tasks_header: bool  # True if blank line after header
-    blank_between_tasks: bool  # True if blank lines between tasks in Tasks section
-    blank_after_tasks_section: bool  # True if blank line after Tasks (before other sections)
-
-    # File sections
-    header_lines: tuple[str, ...]  # Immutable tuple of header lines
-    footer_lines: tuple[str, ...]  # Immutable tuple of footer lines
-
-    # Metadata
-    has_original_header: bool  # True if file had header before Tasks section
-    metadata_lines: tuple[str, ...]  # HTML comments, relationships, etc.
-
-    # Interleaved content (non-task lines in Tasks section)
-    # Key: task_id (of preceding task), Value: tuple[str, ...] (lines of comments/whitespace)
-    # Preserves user comments, notes, or other content between tasks
-    interleaved_content: dict[str, tuple[str, ...]]
-
-    # Original task order in Tasks section (to preserve order of existing tasks)
-    # New tasks (not in this list) should appear first, then existing tasks in this order
-    original_task_order: tuple[str, ...]
+from ai_todo.core.locking import lock_timeout, todo_lock
+from ai_todo.core.shadow_store import DEFAULT_KEEP_PACKS, DEFAULT_SNAPSHOT_INTERVAL, ShadowStore
+from ai_todo.core.task import DATE_FIELDS, Task, TaskStatus
+from ai_todo.core.task_id import TaskId
+from ai_todo.parsers.cache import dump_parse_result, load_parse_result
+from ai_todo.parsers.markdown import (
+    FileStructureSnapshot,
+    ParseResult,
+    create_default_snapshot,
+    parse_markdown,
+)
 
 
 class FileOps:
@@ -67,10 +55,35 @@ class FileOps:
         self.state_dir = self.config_dir / "state"
         self.serial_path = self.config_dir / ".ai-todo.serial"
         self.checksum_path = self.state_dir / "checksum"
-        self.shadow_path = self.state_dir / "TODO.md"
+        # Checksum plus (size, mtime_ns, inode) of the TODO.md it was verified against
+        self.checksum_stat_path = self.state_dir / "checksum.stat"
         self.log_path = self.config_dir / ".ai-todo.log"
         self.audit_log_path = self.state_dir / "audit.log"
         self.tamper_mode_path = self.state_dir / "tamper_mode"
+        self.parse_cache_path = self.state_dir / "parse_cache"
+        # Layout of the last written document, so the next process can write incrementally
+        self.render_cache_path = self.state_dir / "render_cache"
+        # Names the checksum of a TODO.md write in progress (see _commit_content)
+        self.journal_path = self.state_dir / "write_journal"
+        # History of verified contents: the last valid state for tamper diff/accept
+        config = Config(str(self.config_dir / "config.yaml"))
+        self.shadow = ShadowStore(
+            self.state_dir / "shadow",
+            legacy_path=self.state_dir / "TODO.md",
+            snapshot_interval=int(
+                config.get("security.shadow_snapshot_interval", DEFAULT_SNAPSHOT_INTERVAL)
+            ),
+            keep_packs=int(config.get("security.shadow_history", DEFAULT_KEEP_PACKS)),
+        )
+        # Shared log (git-tracked) and local audit log: buffered, flushed per write
+        log_settings = {
+            "rotate_bytes": int(config.get("logging.rotate_bytes", DEFAULT_ROTATE_BYTES)),
+            "rotate_days": float(config.get("logging.rotate_days", DEFAULT_ROTATE_DAYS)),
+            "keep_segments": int(config.get("logging.keep_segments", DEFAULT_KEEP_SEGMENTS)),
+        }
+        self.action_log = get_action_log(self.log_path, **log_settings)
+        self.audit_log = get_action_log(self.audit_log_path, **log_settings)
+        self.log_json = config.get("logging.format", "text") == "json"
 
         # State to preserve file structure
         self.header_lines: list[str] = []
@@ -97,6 +110,11 @@ class FileOps:
         # Phase 11: Structure snapshot - captured once, never modified
         self._structure_snapshot: FileStructureSnapshot | None = None
         self._snapshot_mtime: float = 0.0  # File modification time when snapshot was captured
+        # Last document written, reused to re-render only the changed parts on the next write
+        self._rendered: RenderedDocument | None = None
+        # Display order of the Archived and Deleted sections, kept across writes
+        self._archived_order = SectionOrder("archived_at")
+        self._deleted_order = SectionOrder("deleted_at")
         # Used to detect external file modifications (e.g., user edits in editor)
         # If file mtime > snapshot_mtime, snapshot is stale and must be recaptured
 
@@ -105,11 +123,26 @@ class FileOps:
             self.config_dir.mkdir(parents=True, exist_ok=True)
         if not self.state_dir.exists():
             self.state_dir.mkdir(parents=True, exist_ok=True)
+        self._ignore_local_state()
 
         # Verify integrity on init (Gatekeeper)
         if not skip_verify:
             self.verify_integrity()
 
+    def _ignore_local_state(self) -> None:
+        """Keep the machine-local caches and journals in the state directory out of git.
+
+        The checksum, tamper mode and audit log stay tracked as before; the
+        ignore file is written once and left alone after that.
+        """
+        ignore_path = self.state_dir / ".gitignore"
+        if ignore_path.exists():
+            return
+        try:
+            ignore_path.write_text(STATE_GITIGNORE, encoding="utf-8")
+        except OSError:
+            pass  # Read-only checkout: the files just show up as untracked
+
     def _migrate_data_directory(self) -> None:
         """Migrate from .todo.ai/ to .ai-todo/ if needed."""
         old_dir = self.todo_path.parent / self.OLD_DATA_DIR
@@ -166,8 +199,26 @@ class FileOps:
         return hashlib.sha256(encoded).hexdigest()
 
     def verify_integrity(self) -> None:
-        """Verify TODO.md integrity against stored checksum."""
-        if not self.todo_path.exists():
+        """Verify TODO.md integrity against stored checksum.
+
+        When TODO.md has the size, mtime and inode recorded the last time it
+        matched the checksum, it is not read and hashed again (see
+        _known_checksum()).
+        """
+        try:
+            self._verify_integrity()
+        finally:
+            self.flush_logs()
+
+    def _verify_integrity(self) -> None:
+        file_key = _stat_key(self.todo_path)
+        if file_key is None:
+            return
+
+        config = Config(str(self.config_dir / "config.yaml"))
+        known_hash = self._known_checksum(file_key)
+        if known_hash is not None and self._stored_checksum() == known_hash:
+            self._sync_tamper_mode(config, known_hash)
             return
 
         try:
@@ -178,9 +229,66 @@ class FileOps:
             # Let other methods handle file not found or permission errors.
             return
 
-        # Check configuration for tamper proof mode
-        config = Config(str(self.config_dir / "config.yaml"))
-        tamper_proof = config.get("security.tamper_proof", False)
+        if self.journal_path.exists() or self._stored_checksum() not in (None, current_hash):
+            # Possibly a writer in the middle of a commit: look again once it is done
+            with todo_lock(str(self.todo_path)).locked(lock_timeout(config)):
+                try:
+                    content = self.todo_path.read_text(encoding="utf-8")
+                    current_hash = self.calculate_checksum(content)
+                except Exception:
+                    return
+                if self.journal_path.exists():
+                    self._recover_interrupted_write(content, current_hash)
+                self._check_integrity(content, current_hash, config)
+            return
+        self._check_integrity(content, current_hash, config)
+        if self._stored_checksum() == current_hash:
+            self._record_checksum_stat(current_hash, file_key)
+
+    def _stored_checksum(self) -> str | None:
+        try:
+            return self.checksum_path.read_text(encoding="utf-8").strip()
+        except FileNotFoundError:
+            return None
+
+    def _known_checksum(self, file_key: tuple[int, int, int]) -> str | None:
+        """Return the checksum of TODO.md without reading it, if it is known.
+
+        It is known when TODO.md still has the size, mtime and inode recorded
+        in checksum.stat, no write is in progress, and TODO.md was last modified
+        before checksum.stat was written. Like git's racy-clean check, the last
+        condition catches a same-size edit within the file system's timestamp
+        granularity of the recording; such a file is hashed once more and
+        recorded again.
+        """
+        try:
+            record = self.checksum_stat_path.read_text(encoding="utf-8").split()
+            recorded_at = os.stat(self.checksum_stat_path).st_mtime_ns
+        except OSError:
+            return None
+        if len(record) != 4 or self.journal_path.exists():
+            return None
+        checksum, *numbers = record
+        if tuple(int(n) for n in numbers if n.isdigit()) != file_key:
+            return None
+        if file_key[1] >= recorded_at:
+            return None
+        return checksum
+
+    def _record_checksum_stat(self, checksum: str, file_key: tuple[int, int, int] | None) -> None:
+        """Record that TODO.md with this (size, mtime_ns, inode) has this checksum."""
+        if file_key is None or _stat_key(self.todo_path) != file_key:
+            return  # Changed since it was hashed
+        try:
+            self.checksum_stat_path.write_text(
+                f"{checksum} {file_key[0]} {file_key[1]} {file_key[2]}\n", encoding="utf-8"
+            )
+        except OSError:
+            pass  # Only an optimization: the next check hashes TODO.md instead
+
+    def _sync_tamper_mode(self, config: Config, current_hash: str) -> bool:
+        """Record (and log) a change of the tamper-proof setting; return the setting."""
+        tamper_proof = bool(config.get("security.tamper_proof", False))
 
         # Update tamper mode state file if changed
         current_mode_str = "true" if tamper_proof else "false"
@@ -196,6 +304,10 @@ class FileOps:
                 current_hash[:8],
                 f"Tamper proof mode changed to {tamper_proof}",
             )
+        return tamper_proof
+
+    def _check_integrity(self, content: str, current_hash: str, config: Config) -> None:
+        tamper_proof = self._sync_tamper_mode(config, current_hash)
 
         if not self.checksum_path.exists():
             # First run or missing checksum - initialize it
@@ -205,6 +317,8 @@ class FileOps:
         stored_hash = self.checksum_path.read_text(encoding="utf-8").strip()
 
         if current_hash != stored_hash:
+            # Cached parse results describe the last known-good content
+            self.invalidate_parse_cache()
             if tamper_proof:
                 raise TamperError(
                     "External modification detected in TODO.md",
@@ -222,23 +336,60 @@ class FileOps:
                 self.update_integrity(content)
 
     def update_integrity(self, content: str) -> str:
-        """Update checksum and shadow copy."""
-        # Calculate new hash
+        """Update checksum and record the content in the shadow store."""
+        return self._commit_content(content, write_todo=False)
+
+    def _commit_content(self, content: str, write_todo: bool = True) -> str:
+        """Write TODO.md, its checksum and the shadow record as one recoverable unit.
+
+        The new checksum is first recorded in a journal, then TODO.md (if
+        write_todo) and the checksum are each replaced atomically, the content is
+        appended to the shadow store, and the journal is removed, all under the
+        write lock. A reader or a crash in between never sees a torn file;
+        _recover_interrupted_write() finishes or discards the unit depending on
+        whether TODO.md already holds the new content.
+
+        Returns:
+            The checksum of the new content
+        """
         new_hash = self.calculate_checksum(content)
 
         # Ensure state directory exists
         if not self.state_dir.exists():
             self.state_dir.mkdir(parents=True, exist_ok=True)
 
-        # Write checksum
-        self.checksum_path.write_text(new_hash + "\n", encoding="utf-8")
+        config = Config(str(self.config_dir / "config.yaml"))
+        with todo_lock(str(self.todo_path)).locked(lock_timeout(config)):
+            atomic_write_text(self.journal_path, new_hash + "\n")
+            if write_todo:
+                atomic_write_text(self.todo_path, content)
+            self._write_integrity_state(content, new_hash)
+            self.journal_path.unlink(missing_ok=True)
+            if write_todo:
+                self._record_checksum_stat(new_hash, _stat_key(self.todo_path))
+        return new_hash
+
+    def _write_integrity_state(self, content: str, checksum: str) -> None:
+        self.checksum_stat_path.unlink(missing_ok=True)
+        atomic_write_text(self.checksum_path, checksum + "\n")
+        self.shadow.record(content, checksum)
 
-        # Update shadow copy
-        # Atomic write for shadow copy not strictly necessary but good practice
-        # We'll just write directly for now
-        self.shadow_path.write_text(content, encoding="utf-8")
+    def _recover_interrupted_write(self, content: str, current_hash: str) -> None:
+        """Finish or discard a write that stopped before its journal was removed.
 
-        return new_hash
+        If TODO.md already holds the journaled content, the checksum and shadow
+        store are brought up to date (roll forward). Otherwise TODO.md was never
+        replaced, so the checksum and shadow store still describe it (roll back).
+        Called with the write lock held, so the writer is no longer running.
+        """
+        try:
+            journaled_hash = self.journal_path.read_text(encoding="utf-8").strip()
+        except FileNotFoundError:
+            return
+        if journaled_hash == current_hash:
+            self._write_integrity_state(content, current_hash)
+            self._log_action("RECOVER", "system", current_hash[:8], "Completed interrupted write")
+        self.journal_path.unlink(missing_ok=True)
 
     def backfill_timestamps(self, task: Task) -> None:
         """Backfill timestamps for a task that is being mutated.
@@ -271,30 +422,30 @@ class FileOps:
         task.updated_at = now
 
     def _log_action(self, action: str, task_id: str, checksum: str, description: str = "") -> None:
-        """Log action to .ai-todo.log and local audit.log."""
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        user = os.environ.get("USER") or os.environ.get("USERNAME") or "unknown"
-
-        # Format: TIMESTAMP | USER | INTERFACE | ACTION | TASK_ID | CHECKSUM | DESCRIPTION
-        log_entry = f"{timestamp} | {user} | {self.interface} | {action} | {task_id} | {checksum} | {description}"
-
-        # Write to shared log (git-tracked)
-        try:
-            with open(self.log_path, "a", encoding="utf-8") as f:
-                f.write(log_entry + "\n")
-        except Exception as e:
-            print(f"Warning: Failed to write to shared log: {e}")
-
-        # Write to local audit log (untracked, persists across checkouts)
-        try:
-            # Ensure state directory exists
-            if not self.state_dir.exists():
-                self.state_dir.mkdir(parents=True, exist_ok=True)
-
-            with open(self.audit_log_path, "a", encoding="utf-8") as f:
-                f.write(log_entry + "\n")
-        except Exception as e:
-            print(f"Warning: Failed to write to audit log: {e}")
+        """Log action to .ai-todo.log and local audit.log (written by the next flush_logs())."""
+        log_entry = format_entry(
+            {
+                "timestamp": _log_timestamp(),
+                "user": _log_user(),
+                "interface": self.interface,
+                "action": action,
+                "task_id": task_id,
+                "checksum": checksum,
+                "description": description,
+            },
+            json_lines=self.log_json,
+        )
+        # Shared log (git-tracked) and local audit log (untracked, persists across checkouts)
+        self.action_log.append(log_entry)
+        self.audit_log.append(log_entry)
+
+    def flush_logs(self) -> None:
+        """Write buffered log entries (called at the end of each write)."""
+        for log, name in ((self.action_log, "shared log"), (self.audit_log, "audit log")):
+            try:
+                log.flush()
+            except Exception as e:
+                print(f"Warning: Failed to write to {name}: {e}")
 
     def accept_tamper(self, reason: str) -> None:
         """Accept external changes and update integrity."""
@@ -308,20 +459,23 @@ class FileOps:
         event_dir = self.config_dir / "tamper" / timestamp
         event_dir.mkdir(parents=True, exist_ok=True)
 
-        # Save shadow copy (original) if it exists
-        if self.shadow_path.exists():
-            shutil.copy2(self.shadow_path, event_dir / "original.md")
+        # Save the last valid content (original) if there is one
+        original = self.shadow.read()
+        if original is not None:
+            (event_dir / "original.md").write_text(original, encoding="utf-8")
 
         # Save current file (forced)
         shutil.copy2(self.todo_path, event_dir / "forced.md")
 
         # Update integrity
+        self.invalidate_parse_cache()
         new_hash = self.update_integrity(content)
 
         # Log event
         self._log_action(
             "FORCE_ACCEPT", "system", new_hash[:8], f"Accepted external changes: {reason}"
         )
+        self.flush_logs()
 
     def read_tasks(self) -> list[Task]:
         """Read tasks from TODO.md.
@@ -339,25 +493,44 @@ class FileOps:
             self.relationships = {}
             return []
 
+        st = self.todo_path.stat()
+        current_mtime = st.st_mtime
+        # Unchanged since its checksum was verified: a parse cache hit needs no read at all
+        checksum = self._known_checksum((st.st_size, st.st_mtime_ns, st.st_ino))
+        result = self._load_parse_cache(checksum) if checksum is not None else None
+        if result is None:
+            content = self.todo_path.read_text(encoding="utf-8")
+            checksum = self.calculate_checksum(content)
+            result = self._load_parse_cache(checksum)
+            if result is None:
+                # Single pass: tasks, metadata and structure snapshot come from the same scan
+                result = parse_markdown(content)
+                self._store_parse_cache(checksum, result)
+
         # Check if file was modified externally (e.g., by user in editor)
         # If so, invalidate snapshot and recapture
-        current_mtime = self.todo_path.stat().st_mtime
         if self._structure_snapshot is None or current_mtime > self._snapshot_mtime:
-            self._structure_snapshot = self._capture_structure_snapshot()
+            self._structure_snapshot = result.snapshot
             self._snapshot_mtime = current_mtime
 
-        # Reset relationships before parsing (relationships can change)
-        self.relationships = {}
-        content = self.todo_path.read_text(encoding="utf-8")
-        return self._parse_markdown(content)
+        return self._apply_parse_result(result)
 
-    def write_tasks(self, tasks: list[Task], action: str = "UPDATE", task_id: str = "") -> None:
+    def write_tasks(
+        self,
+        tasks: list[Task],
+        action: str = "UPDATE",
+        task_id: str = "",
+        previous: Callable[[str], Task | None] | None = None,
+    ) -> None:
         """Write tasks to TODO.md using preserved structure snapshot.
 
         Args:
             tasks: List of tasks to write
             action: Action name for logging (default: UPDATE)
             task_id: Task ID associated with action (default: empty)
+            previous: Returns the task by ID as read from the current TODO.md. With
+                it, the first write of this FileOps can already be incremental
+                (see _resume_rendered()).
         """
         # Phase 14: Ensure snapshot is available (should always be set by read_tasks())
         if self._structure_snapshot is None:
@@ -367,11 +540,18 @@ class FileOps:
         if self._structure_snapshot is None:
             raise ValueError("Structure snapshot must be available for writing tasks")
 
-        content = self._generate_markdown(tasks, self._structure_snapshot)
-        self.todo_path.write_text(content, encoding="utf-8")
-
-        # Update integrity and log
-        checksum = self.update_integrity(content)
+        # Reuse the last rendered document when only task contents changed. It is
+        # updated in place, so forget it until the new content is on disk.
+        if self._rendered is None and previous is not None:
+            self._rendered = self._resume_rendered(previous)
+        document = self._render_incremental(tasks, self._structure_snapshot)
+        self._rendered = None
+        if document is None:
+            document = self._render_document(tasks, self._structure_snapshot)
+        content = document.content()
+        checksum = self._commit_content(content)
+        self._rendered = document
+        self._store_render_cache(checksum, document)
 
         # Determine description based on action (simplified)
         description = ""
@@ -383,6 +563,69 @@ class FileOps:
                     break
 
         self._log_action(action, task_id, checksum[:8], description)
+        self.flush_logs()
+
+    def written_tasks(
+        self, tasks: list[Task], previous: Callable[[str], Task | None]
+    ) -> list[Task]:
+        """Return the tasks just written as read_tasks() would parse them, in file order.
+
+        A task that renders the same as its previous version (as parsed or
+        returned by this method before) is that version. Only the others are
+        parsed again, from a document of just their blocks and TASK_METADATA
+        lines, so the cost follows the changes rather than the size of TODO.md.
+
+        Args:
+            tasks: The tasks passed to the last write_tasks()
+            previous: Returns the previous version of a task by ID (None if new)
+        """
+        unchanged: dict[str, Task] = {}
+        changed = []
+        for t in tasks:
+            old = previous(t.id)
+            if (
+                old is not None
+                and self._block_key(old) == self._block_key(t)
+                and self._timestamp_key(old) == self._timestamp_key(t)
+            ):
+                unchanged[t.id] = old
+            else:
+                changed.append(t)
+
+        reread: dict[str, Task] = {}
+        if changed:
+            sections: dict[str, list[str]] = {
+                "Tasks": [],
+                "Archived Tasks": [],
+                "Deleted Tasks": [],
+            }
+            for t in changed:
+                if t.status == TaskStatus.ARCHIVED:
+                    sections["Archived Tasks"].append(self._format_archived_task(t))
+                elif t.status == TaskStatus.DELETED:
+                    sections["Deleted Tasks"].append(self._format_task(t))
+                else:
+                    sections["Tasks"].append(self._format_task(t))
+            lines = []
+            for title, blocks in sections.items():
+                if blocks:
+                    lines.extend([f"## {title}", "", *blocks, ""])
+            lines.extend(["<!-- TASK_METADATA", TIMESTAMPS_FORMAT_LINE])
+            lines.extend(self._format_timestamps(t) for t in changed)
+            lines.append("-->")
+            result = parse_markdown("\n".join(lines) + "\n")
+            self.deleted_task_formats.update(result.deleted_task_formats)
+            reread = {t.id: t for t in result.tasks}
+            if any(t.id not in reread for t in changed):
+                return self.read_tasks()  # Not a task line on its own; parse the whole file
+
+        written = [unchanged.get(t.id) or reread[t.id] for t in tasks]
+        document = self._rendered
+        if document is not None and document.task_ids == [t.id for t in tasks]:
+            # File order: the order of the task blocks in the rendered document
+            order = document.task_elements
+            written = [t for _, t in sorted(zip(order, written, strict=True), key=lambda p: p[0])]
+        return written
 
     def get_serial(self) -> int:
         """Get the current serial number from file."""
@@ -409,569 +652,274 @@ class FileOps:
         # Replace existing relationship of this type
         self.relationships[task_id][rel_type] = target_ids
 
-    def _parse_markdown(self, content: str) -> list[Task]:
-        """Parse TODO.md content into Task objects."""
-        tasks = []
-        lines = content.splitlines()
-
-        current_task: Task | None = None
-        current_section = "Header"  # Start in Header mode
-        seen_tasks_section = False  # Track if we've seen any task section
-
-        self.header_lines = []
-        self.footer_lines = []
-        self.metadata_lines = []
-        self.relationships = {}  # Will be populated during parsing
-        self.task_timestamps = {}  # Will be populated during parsing
-        self.interleaved_content = {}  # Reset interleaved content for each parse
-
-        # Regex patterns
-        # Match [ ], [x], or [D] checkboxes
-        task_pattern = re.compile(r"^\s*-\s*\[([ xD])\]\s*\*\*#([0-9\.]+)\*\*\s*(.*)$")
-        tag_pattern = re.compile(r"`#([a-zA-Z0-9_-]+)`")
-        section_pattern = re.compile(r"^##\s+(.*)$")
-        # Also match single # for "Tasks" section (common format)
-        single_section_pattern = re.compile(r"^#\s+Tasks\s*$")
-        relationship_pattern = re.compile(r"^([0-9\.]+):([a-z-]+):(.+)$")
-
-        # Sections that contain tasks
-        TASK_SECTIONS = {"Tasks", "Recently Completed", "Archived Tasks", "Deleted Tasks"}
-        in_relationships_section = False
-        in_timestamps_section = False
-        in_metadata_section = False
-
-        for line in lines:
-            line_stripped = line.strip()
-
-            # Check for separator lines - may indicate footer start
-            if line_stripped == "---":
-                # Mark that we've seen a separator - next timestamp might be footer
-                # We don't transition yet, continue parsing
-                continue
-
-            # Check for single # Tasks section (common format)
-            single_section_match = single_section_pattern.match(line)
-            if single_section_match:
-                # Preserve the original header line format
-                self.tasks_header_format = line
-                # If this is the first line (no header), mark that we had no original header
-                if not seen_tasks_section and len(self.header_lines) == 0:
-                    self.has_original_header = False
-                # Blank line detection now handled by snapshot
-                # Don't add to header_lines - it's the tasks section header, not a header line
-                # We'll write it separately in _generate_markdown
-                current_section = "Tasks"
-                seen_tasks_section = True
-                current_task = None
-                in_metadata_section = False
-                continue
-
-            # Check for section header
-            section_match = section_pattern.match(line)
-            if section_match:
-                section_name = section_match.group(1).strip()
-                if section_name in TASK_SECTIONS:
-                    # If this is the first section and we're still in Header, mark no original header
-                    if (
-                        current_section == "Header"
-                        and section_name == "Tasks"
-                        and len(self.header_lines) == 0
-                    ):
-                        self.has_original_header = False
-                    # Check if this is Tasks section and next line is blank or a task
-                    if section_name == "Tasks":
-                        self.tasks_header_format = line
-                        # Blank line detection now handled by snapshot
-                    current_section = section_name
-                    seen_tasks_section = True
-                    current_task = None
-                    in_metadata_section = False
-                    continue
-                elif section_name == "Task Metadata":
-                    in_metadata_section = True
-                    self.metadata_lines.append(line)
-                    continue
-                else:
-                    # Unknown section? Treat as footer if we've already seen tasks?
-                    # Or treat as content if in Header?
-                    # For now, if we are past "Tasks", any unknown section might be footer
-                    if current_section != "Header" and not in_metadata_section:
-                        current_section = "Footer"
-
-            # Check for Footer start via separator
-            if (
-                line_stripped == "------------------"
-                and current_section != "Header"
-                and not in_metadata_section
-            ):
-                current_section = "Footer"
-
-            # Check for timestamps section
-            if line_stripped == "<!-- TASK_METADATA":
-                in_timestamps_section = True
-                in_metadata_section = True
-                self.metadata_lines.append(line)
-                continue
-
-            # Check for relationships section directly (even without Task Metadata header)
-            if line_stripped == "<!-- TASK RELATIONSHIPS":
-                in_relationships_section = True
-                in_metadata_section = True
-                self.metadata_lines.append(line)
-                continue
+    def _load_parse_cache(self, checksum: str) -> ParseResult | None:
+        """Return the cached parse result for content with this checksum, if any."""
+        try:
+            data = self.parse_cache_path.read_bytes()
+        except OSError:
+            return None
+        return load_parse_result(data, checksum)
 
-            # Handle metadata section
-            if in_metadata_section:
-                # Check for timestamps section
-                if line_stripped == "<!-- TASK_METADATA":
-                    in_timestamps_section = True
-                    self.metadata_lines.append(line)
-                    continue
-
-                # Check for Task Metadata section
-                if line_stripped == "<!-- TASK RELATIONSHIPS":
-                    in_relationships_section = True
-                    self.metadata_lines.append(line)
-                    continue
-
-                if in_timestamps_section:
-                    if line_stripped == "-->":
-                        in_timestamps_section = False
-                        self.metadata_lines.append(line)
-                        continue
-                    # Parse timestamp line: task_id:created_at[:updated_at]
-                    # Skip comment lines starting with #
-                    if line_stripped.startswith("#"):
-                        self.metadata_lines.append(line)
-                        continue
-                    if ":" in line_stripped:
-                        # Split only on first colon to get task_id
-                        first_colon = line_stripped.index(":")
-                        task_id = line_stripped[:first_colon]
-                        timestamps_part = line_stripped[first_colon + 1 :]
-                        # Format: created_at[:updated_at] where each is ISO format
-                        # Look for pattern YYYY-MM-DDTHH:MM:SS and split on T-separator
-                        # to find where one timestamp ends and another begins
-                        try:
-                            # Check if there's a second ISO timestamp (starts with year)
-                            # by looking for pattern like :2026- or :2025- etc.
-                            second_ts_match = re.search(r":(\d{4}-\d{2}-\d{2}T)", timestamps_part)
-                            if second_ts_match:
-                                split_pos = second_ts_match.start()
-                                created_str = timestamps_part[:split_pos]
-                                updated_str = timestamps_part[split_pos + 1 :]
-                                created_at = datetime.fromisoformat(created_str)
-                                updated_at = datetime.fromisoformat(updated_str)
-                                self.task_timestamps[task_id] = {
-                                    "created_at": created_at,
-                                    "updated_at": updated_at,
-                                }
-                            else:
-                                # Only created_at
-                                created_at = datetime.fromisoformat(timestamps_part)
-                                self.task_timestamps[task_id] = {"created_at": created_at}
-                        except ValueError:
-                            pass  # Skip malformed timestamp lines
-                    self.metadata_lines.append(line)
-                    continue
-
-                if in_relationships_section:
-                    if line_stripped == "-->":
-                        in_relationships_section = False
-                        self.metadata_lines.append(line)
-                        continue
-                    # Parse relationship line: task_id:rel_type:targets
-                    rel_match = relationship_pattern.match(line_stripped)
-                    if rel_match:
-                        task_id, rel_type, targets = rel_match.groups()
-                        if task_id not in self.relationships:
-                            self.relationships[task_id] = {}
-                        # Targets can be space-separated list
-                        target_list = [t.strip() for t in targets.split() if t.strip()]
-                        self.relationships[task_id][rel_type] = target_list
-                    self.metadata_lines.append(line)
-                    continue
-                else:
-                    # Other metadata lines (descriptions, etc.)
-                    self.metadata_lines.append(line)
-                    continue
-
-            # Handle Header
-            if current_section == "Header":
-                self.header_lines.append(line)
-                self.has_original_header = True
-                continue
+    def _store_parse_cache(self, checksum: str, result: ParseResult) -> None:
+        """Persist a parse result keyed by the checksum of the parsed content."""
+        try:
+            if not self.state_dir.exists():
+                self.state_dir.mkdir(parents=True, exist_ok=True)
+            # Write to a temp file and rename so readers never see a partial cache
+            tmp_path = self.parse_cache_path.with_name(self.parse_cache_path.name + ".tmp")
+            tmp_path.write_bytes(dump_parse_result(result, checksum))
+            os.replace(tmp_path, self.parse_cache_path)
+        except OSError:
+            # The cache is an optimization only; a failed write just means a re-parse
+            pass
 
-            # Handle Footer
-            if current_section == "Footer":
-                self.footer_lines.append(line)
-                continue
+    def _resume_rendered(self, previous: Callable[[str], Task | None]) -> "RenderedDocument | None":
+        """Rebuild the document last written to TODO.md, as if this FileOps had written it.
 
-            # Handle Task Sections
-            # Check for task/subtask
-            task_match = task_pattern.match(line)
-
-            if task_match:
-                completed_char, task_id, description = task_match.groups()
-
-                # Extract tags and remove them from description
-                tags = set()
-                tag_matches = tag_pattern.findall(description)
-                for tag in tag_matches:
-                    tags.add(tag)
-
-                # Remove tags from description (format: `#tag`)
-                if tag_matches:
-                    description = tag_pattern.sub("", description).strip()
-
-                # Parse archive date if present: (YYYY-MM-DD) at end of description
-                archived_at = None
-                archive_date_match = re.search(r" \(([0-9]{4}-[0-9]{2}-[0-9]{2})\)$", description)
-                if archive_date_match:
-                    try:
-                        date_str = archive_date_match.group(1)
-                        # Always remove date from description to avoid duplication (format_task adds it back)
-                        description = re.sub(
-                            r" \(([0-9]{4}-[0-9]{2}-[0-9]{2})\)$", "", description
-                        ).strip()
-
-                        # Only use as archived_at if in Archived section
-                        if (
-                            current_section == "Recently Completed"
-                            or current_section == "Archived Tasks"
-                        ):
-                            archived_at = datetime.strptime(date_str, "%Y-%m-%d")
-                    except ValueError:
-                        pass
-
-                # Determine status - section takes precedence over checkbox
-                # Fix for GitHub Issue #49: Tasks in archived sections should be ARCHIVED
-                # regardless of checkbox state (handles orphan subtasks with [ ] under [x] parents)
-                status = TaskStatus.PENDING
-                completed_at = None
-                if current_section == "Recently Completed" or current_section == "Archived Tasks":
-                    # All tasks in archived sections are ARCHIVED, regardless of checkbox
-                    status = TaskStatus.ARCHIVED
-                    # Fix for #204: Treat archived tasks as completed for restore purposes
-                    if completed_char.lower() == "x":
-                        completed_at = archived_at or datetime.now()
-                elif current_section == "Deleted Tasks":
-                    # All tasks in deleted section are DELETED
-                    status = TaskStatus.DELETED
-                elif completed_char.lower() == "x":
-                    # Only in Tasks section: [x] means COMPLETED
-                    status = TaskStatus.COMPLETED
-                    completed_at = (
-                        datetime.now()
-                    )  # Approximate since we don't store separate completed_at in file
-
-                # Check for [D] checkbox (deleted tasks) - overrides status
-                if completed_char.upper() == "D":
-                    status = TaskStatus.DELETED
-
-                # Parse deletion metadata if present: (deleted YYYY-MM-DD, expires YYYY-MM-DD)
-                deleted_at = None
-                expires_at = None
-                if status == TaskStatus.DELETED or current_section == "Deleted Tasks":
-                    deletion_match = re.search(
-                        r"\(deleted ([0-9]{4}-[0-9]{2}-[0-9]{2}), expires ([0-9]{4}-[0-9]{2}-[0-9]{2})\)",
-                        description,
+        The element text comes from the file itself and its layout from the
+        render cache of the same content. A task block renders as its version
+        as read; a TASK_METADATA line is keyed by the dates it holds, which a
+        read does not always keep (e.g. an archive date of a reopened task).
+        Returns None if the cache does not describe the current content or a
+        task is not known to ``previous``.
+        """
+        try:
+            data = self.render_cache_path.read_bytes()
+            content = self.todo_path.read_text(encoding="utf-8")
+        except OSError:
+            return None
+        document = RenderedDocument.load(data, self.calculate_checksum(content), content)
+        if document is None:
+            return None
+        read = []
+        for task_id in document.task_ids:
+            task = previous(task_id)
+            if task is None:
+                return None
+            read.append(task)
+        document.task_keys = [self._block_key(t) for t in read]
+        if document.timestamp_elements:
+            for task_id in document.task_ids:
+                stored = self.task_timestamps.get(task_id)
+                if stored is None:
+                    return None
+                created_at = stored["created_at"]
+                # Laid out like _timestamp_key()
+                document.timestamp_keys.append(
+                    (
+                        created_at,
+                        stored.get("updated_at", created_at),
+                        *(stored.get(name) for name in DATE_FIELDS),
                     )
-                    if deletion_match:
-                        try:
-                            deleted_at = datetime.strptime(deletion_match.group(1), "%Y-%m-%d")
-                            expires_at = datetime.strptime(deletion_match.group(2), "%Y-%m-%d")
-                            # Remove deletion metadata from description
-                            description = re.sub(
-                                r" *\(deleted [0-9]{4}-[0-9]{2}-[0-9]{2}, expires [0-9]{4}-[0-9]{2}-[0-9]{2}\)",
-                                "",
-                                description,
-                            ).strip()
-                            status = TaskStatus.DELETED
-                        except ValueError:
-                            pass
-
-                task = Task(id=task_id, description=description.strip(), status=status, tags=tags)
-                if deleted_at:
-                    task.deleted_at = deleted_at
-                if expires_at:
-                    task.expires_at = expires_at
-                if archived_at:
-                    task.archived_at = archived_at
-                if completed_at:
-                    task.completed_at = completed_at
-                # Preserve original checkbox format for deleted tasks (for tasks already in Deleted section)
-                if status == TaskStatus.DELETED and current_section == "Deleted Tasks":
-                    self.deleted_task_formats[task_id] = completed_char
-                tasks.append(task)
-                current_task = task
-                continue
-
-            # Check for notes
-            if current_task and line_stripped.startswith(">"):
-                note_content = line_stripped[1:].strip()
-                current_task.add_note(note_content)
-                continue
-
-            # Phase 10: Capture interleaved content (non-task lines in Tasks section)
-            # This includes comments or other markdown content between tasks
-            # Note: Blank lines are handled by existing blank line logic, not captured here
-            # (They will be handled properly in Phase 12 with the snapshot system)
-            if current_section in TASK_SECTIONS and current_task and line_stripped:
-                # Skip orphaned ai-todo timestamp lines (GitHub Issue #47)
-                # These are malformed footer lines that should be ignored, not captured
-                if line_stripped.startswith("**ai-todo**") and "Last Updated:" in line_stripped:
-                    continue
-
-                # Skip metadata HTML comments (TASK_METADATA, TASK RELATIONSHIPS)
-                # These should not be captured as interleaved content
-                if line_stripped.startswith("<!-- TASK"):
-                    in_metadata_section = True
-                    continue
-                if in_metadata_section:
-                    if line_stripped == "-->":
-                        in_metadata_section = False
-                    continue
-
-                # We're in a task section and have a current task
-                # This line is not a task, not a note, not a section header, not metadata, and not blank
-                # Capture it as interleaved content keyed by the preceding task ID
-                if current_task.id not in self.interleaved_content:
-                    self.interleaved_content[current_task.id] = []
-                self.interleaved_content[current_task.id].append(line)
-                continue
+                )
+        return document
 
-            # Ignore empty lines inside task sections to clean up output?
-            # Or preserve? If we ignore, we generate standard spacing.
+    def _store_render_cache(self, checksum: str, document: "RenderedDocument") -> None:
+        """Persist the layout of the document just written (content ``checksum``)."""
+        try:
+            tmp_path = self.render_cache_path.with_name(
+                f"{self.render_cache_path.name}.{os.getpid()}.tmp"
+            )
+            tmp_path.write_bytes(document.dump(checksum))
+            os.replace(tmp_path, self.render_cache_path)
+        except OSError:
+            # Like the parse cache, an optimization only: the next process renders in full
             pass
 
-        # Apply timestamps from TASK_METADATA to tasks
-        for task in tasks:
-            if task.id in self.task_timestamps:
-                ts = self.task_timestamps[task.id]
-                if "created_at" in ts:
-                    task.created_at = ts["created_at"]
-                if "updated_at" in ts:
-                    task.updated_at = ts["updated_at"]
+    def invalidate_parse_cache(self) -> None:
+        """Drop the on-disk parse cache."""
+        try:
+            self.parse_cache_path.unlink()
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            print(f"Warning: Failed to remove parse cache: {e}")
 
-        return tasks
+    def _parse_markdown(self, content: str) -> list[Task]:
+        """Parse TODO.md content into Task objects."""
+        return self._apply_parse_result(parse_markdown(content))
+
+    def _apply_parse_result(self, result: ParseResult) -> list[Task]:
+        """Load parsed file state (preserved lines, relationships, timestamps) into self."""
+        self.header_lines = result.header_lines
+        self.footer_lines = result.footer_lines
+        self.metadata_lines = result.metadata_lines
+        self.relationships = result.relationships
+        self.task_timestamps = result.task_timestamps
+        self.interleaved_content = result.interleaved_content
+        self.deleted_task_formats.update(result.deleted_task_formats)
+        if result.tasks_header_format is not None:
+            self.tasks_header_format = result.tasks_header_format
+        self.has_original_header = result.has_original_header
+        return result.tasks
 
     def _create_default_snapshot(self) -> FileStructureSnapshot:
         """Create a default structure snapshot for files that don't exist yet."""
-        return FileStructureSnapshot(
-            tasks_header_format="## Tasks",
-            blank_after_tasks_header=True,
-            blank_between_tasks=False,
-            blank_after_tasks_section=False,
-            header_lines=(),
-            footer_lines=(),
-            has_original_header=False,
-            metadata_lines=(),
-            interleaved_content={},
-            original_task_order=(),
-        )
+        return create_default_snapshot()
 
-    def _capture_structure_snapshot(self) -> FileStructureSnapshot:
-        """Capture structure snapshot from pristine file.
+    def _generate_markdown(
+        self, tasks: list[Task], snapshot: FileStructureSnapshot | None = None
+    ) -> str:
+        """Generate TODO.md content from Task objects using structure snapshot.
 
-        This is called ONCE when FileOps first reads a file, or when file is modified externally.
-        The snapshot is immutable and never modified.
+        Args:
+            tasks: List of tasks to generate markdown for
+            snapshot: Structure snapshot to use. Must not be None (raises ValueError if None).
         """
-        if not self.todo_path.exists():
-            return self._create_default_snapshot()
-
-        content = self.todo_path.read_text(encoding="utf-8")
-        lines = content.splitlines()
-
-        # Parse structure elements
-        header_lines: list[str] = []
-        footer_lines: list[str] = []
-        metadata_lines: list[str] = []
-        tasks_header_format: str | None = None
-        blank_after_tasks_header = False
-        blank_between_tasks = False
-        blank_after_tasks_section = False
-        has_original_header = False
-        interleaved_content: dict[str, list[str]] = {}  # Will be converted to tuple
-
-        # Regex patterns
-        task_pattern = re.compile(r"^\s*-\s*\[([ xD])\]\s*\*\*#([0-9\.]+)\*\*\s*(.*)$")
-        section_pattern = re.compile(r"^##\s+(.*)$")
-        single_section_pattern = re.compile(r"^#\s+Tasks\s*$")
-
-        # Sections that contain tasks
-        TASK_SECTIONS = {"Tasks", "Recently Completed", "Archived Tasks", "Deleted Tasks"}
-        current_section = "Header"
-        seen_tasks_section = False
-        in_relationships_section = False
-        in_metadata_section = False
-        current_task_id: str | None = None
-        tasks_in_section: list[str] = []  # Track task IDs to detect blank lines between
-
-        for line_idx, line in enumerate(lines):
-            line_stripped = line.strip()
-
-            # Check for separator lines - may indicate footer start
-            if line_stripped == "---":
-                continue
-
-            # Check for single # Tasks section
-            single_section_match = single_section_pattern.match(line)
-            if single_section_match:
-                tasks_header_format = line
-                if not seen_tasks_section and len(header_lines) == 0:
-                    has_original_header = False
-                # Check if next line is blank
-                if line_idx + 1 < len(lines):
-                    next_line = lines[line_idx + 1]
-                    if next_line.strip() == "":
-                        blank_after_tasks_header = True
-                current_section = "Tasks"
-                seen_tasks_section = True
-                current_task_id = None
-                in_metadata_section = False
-                continue
-
-            # Check for section header
-            section_match = section_pattern.match(line)
-            if section_match:
-                section_name = section_match.group(1).strip()
-                if section_name in TASK_SECTIONS:
-                    if (
-                        current_section == "Header"
-                        and section_name == "Tasks"
-                        and len(header_lines) == 0
-                    ):
-                        has_original_header = False
-                    if section_name == "Tasks":
-                        tasks_header_format = line
-                        blank_after_tasks_header = False
-                        if line_idx + 1 < len(lines):
-                            next_line = lines[line_idx + 1]
-                            if next_line.strip() == "":
-                                blank_after_tasks_header = True
-                        tasks_in_section = []  # Reset for Tasks section
-                    elif section_name == "Recently Completed" or section_name == "Archived Tasks":
-                        # Check if there's a blank line before this section (after Tasks)
-                        if current_section == "Tasks" and tasks_in_section:
-                            if line_idx > 0 and lines[line_idx - 1].strip() == "":
-                                blank_after_tasks_section = True
-                    current_section = section_name
-                    seen_tasks_section = True
-                    current_task_id = None
-                    in_metadata_section = False
-                    continue
-                elif section_name == "Task Metadata":
-                    in_metadata_section = True
-                    metadata_lines.append(line)
-                    continue
-                else:
-                    if current_section != "Header" and not in_metadata_section:
-                        current_section = "Footer"
-
-            # Check for Footer start
-            if (
-                line_stripped == "------------------"
-                and current_section != "Header"
-                and not in_metadata_section
-            ):
-                current_section = "Footer"
-
-            # Check for relationships section
-            if line_stripped == "<!-- TASK RELATIONSHIPS":
-                in_relationships_section = True
-                in_metadata_section = True
-                metadata_lines.append(line)
-                continue
-
-            # Handle metadata section
-            if in_metadata_section:
-                if line_stripped == "<!-- TASK RELATIONSHIPS":
-                    in_relationships_section = True
-                    metadata_lines.append(line)
-                    continue
-                if in_relationships_section:
-                    if line_stripped == "-->":
-                        in_relationships_section = False
-                    metadata_lines.append(line)
-                    continue
-                else:
-                    metadata_lines.append(line)
-                    continue
-
-            # Handle Header
-            if current_section == "Header":
-                header_lines.append(line)
-                has_original_header = True
-                continue
+        # Phase 13: Always use snapshot (no fallback)
+        if snapshot is None:
+            raise ValueError("Structure snapshot must be available for generation")
+        return self._render_document(tasks, snapshot).content()
 
-            # Handle Footer
-            if current_section == "Footer":
-                footer_lines.append(line)
-                continue
+    def _render_inputs(self, snapshot: FileStructureSnapshot) -> tuple:
+        """The parts of the snapshot the rendered document depends on.
 
-            # Handle Task Sections - detect tasks and interleaved content
-            task_match = task_pattern.match(line)
-            if task_match:
-                task_id = task_match.group(2)
-                # Check for blank line between tasks
-                if current_section == "Tasks" and tasks_in_section:
-                    # Check if previous line was blank
-                    if line_idx > 0 and lines[line_idx - 1].strip() == "":
-                        blank_between_tasks = True
-                if current_section == "Tasks":
-                    tasks_in_section.append(task_id)
-                current_task_id = task_id
-                continue
+        Preserved metadata lines are not among them: they are only written when
+        there are neither timestamps nor relationships, which _render_incremental()
+        always renders in full.
+        """
+        if snapshot.has_original_header and snapshot.header_lines:
+            header = snapshot.header_lines
+        else:
+            # Default Header (Enforced Standard for new files or files without header)
+            header = DEFAULT_HEADER_LINES
+        return (header, snapshot.tasks_header_format, snapshot.interleaved_content)
 
-            # Check for notes (blockquotes) - these are part of tasks, not interleaved
-            if current_task_id and line_stripped.startswith(">"):
-                continue
+    def _block_key(self, task: Task) -> tuple:
+        """Everything a task's rendered block depends on.
 
-            # Phase 10: Capture interleaved content (non-task, non-note, non-blank lines)
-            if current_section == "Tasks" and current_task_id and line_stripped:
-                # Skip orphaned ai-todo timestamp lines (GitHub Issue #47)
-                # These are malformed footer lines that should be ignored, not captured
-                if line_stripped.startswith("**ai-todo**") and "Last Updated:" in line_stripped:
-                    continue
-
-                # Skip metadata HTML comments (TASK_METADATA, TASK RELATIONSHIPS, etc.)
-                # These should not be captured as interleaved content
-                if line_stripped.startswith("<!-- TASK"):
-                    in_metadata_section = True
-                    continue
-                if in_metadata_section:
-                    if line_stripped == "-->":
-                        in_metadata_section = False
-                    continue
-
-                if current_task_id not in interleaved_content:
-                    interleaved_content[current_task_id] = []
-                interleaved_content[current_task_id].append(line)
-                continue
+        Status, archived_at and deleted_at (positions 0, 5 and 6) also decide the
+        task's section (see _SECTIONS) and its place in it.
+        """
+        completed_at = task.completed_at
+        return (
+            task.status,
+            task.description,
+            frozenset(task.tags),
+            tuple(task.notes),
+            completed_at.date()
+            if completed_at is not None and task.status == TaskStatus.COMPLETED
+            else None,
+            task.archived_at,
+            task.deleted_at,
+            task.expires_at,
+            self.deleted_task_formats.get(task.id),
+        )
 
-        return FileStructureSnapshot(
-            tasks_header_format=tasks_header_format or "## Tasks",
-            blank_after_tasks_header=blank_after_tasks_header,
-            blank_between_tasks=blank_between_tasks,
-            blank_after_tasks_section=blank_after_tasks_section,
-            header_lines=tuple(header_lines),
-            footer_lines=tuple(footer_lines),
-            has_original_header=has_original_header,
-            metadata_lines=tuple(metadata_lines),
-            interleaved_content={k: tuple(v) for k, v in interleaved_content.items()},
-            original_task_order=tuple(tasks_in_section),
+    def _format_task(self, t: Task) -> str:
+        """Format a task line and its notes."""
+        # Determine checkbox
+        if t.status == TaskStatus.DELETED:
+            # Use preserved format if available, otherwise use [D] for newly deleted tasks
+            if t.id in self.deleted_task_formats:
+                checkbox = self.deleted_task_formats[t.id]  # Preserve original format
+            elif t.deleted_at and t.expires_at:
+                checkbox = "D"  # Use [D] for newly deleted tasks with metadata
+            else:
+                checkbox = " "  # Preserve [ ] for old deleted tasks without metadata
+        elif t.status != TaskStatus.PENDING:
+            checkbox = "x"
+        else:
+            checkbox = " "
+
+        # Strict indentation: 0, 2, 4 spaces
+        indent_level = t.id.count(".")
+        if indent_level > 2:
+            indent_level = 2  # Max depth 2 (3 levels)
+        indent = "  " * indent_level
+
+        # Format description with tags
+        description = t.description
+        if t.tags:
+            # Tags must be wrapped in backticks
+            tag_str = " ".join(
+                [f"`{tag}`" if tag.startswith("#") else f"`#{tag}`" for tag in sorted(t.tags)]
+            )
+            description = f"{description} {tag_str}".strip()
+
+        line = f"{indent}- [{checkbox}] **#{t.id}** {description}"
+
+        # Add completed date for completed tasks
+        if t.status == TaskStatus.COMPLETED and t.completed_at:
+            completed_date = t.completed_at.strftime("%Y-%m-%d")
+            line += f" ({completed_date})"
+
+        # Add deletion metadata for deleted tasks
+        if t.status == TaskStatus.DELETED and t.deleted_at and t.expires_at:
+            delete_date = t.deleted_at.strftime("%Y-%m-%d")
+            expire_date = t.expires_at.strftime("%Y-%m-%d")
+            line += f" (deleted {delete_date}, expires {expire_date})"
+
+        for note in t.notes:
+            # Strict note formatting: indent + 2 spaces + > + space
+            note_indent = indent + "  "
+            line += f"\n{note_indent}> {note}"
+        return line
+
+    def _format_archived_task(self, t: Task) -> str:
+        """Format a task for the Archived Tasks section (with its archive date)."""
+        task_line = self._format_task(t)
+        # Add archive date if present (shell script format)
+        if t.archived_at:
+            archive_date = t.archived_at.strftime("%Y-%m-%d")
+            # Insert date before notes (if any) or at end
+            if "\n" in task_line:
+                # Has notes - insert date before first note line
+                parts = task_line.split("\n", 1)
+                # Check if date already exists (e.g. completed date)
+                if f"({archive_date})" not in parts[0]:
+                    task_line = f"{parts[0]} ({archive_date})\n{parts[1]}"
+            else:
+                if f"({archive_date})" not in task_line:
+                    task_line = f"{task_line} ({archive_date})"
+        return task_line
+
+    @staticmethod
+    def _format_timestamps(t: Task) -> str:
+        """Format a task's TASK_METADATA line (task_id:created_at[:updated_at] [dates])."""
+        line = f"{t.id}:{t.created_at.isoformat()}"
+        if t.updated_at is not None and t.updated_at != t.created_at:
+            line += f":{t.updated_at.isoformat()}"
+        for name in DATE_FIELDS:
+            value = getattr(t, name)
+            if value is not None:
+                line += f" {name}={value.isoformat()}"
+        return line
+
+    @staticmethod
+    def _timestamp_key(t: Task) -> tuple:
+        """Everything a task's TASK_METADATA line depends on (created_at first)."""
+        return (
+            t.created_at,
+            t.updated_at,
+            t.completed_at,
+            t.archived_at,
+            t.deleted_at,
+            t.expires_at,
         )
 
-    def _generate_markdown(
-        self, tasks: list[Task], snapshot: FileStructureSnapshot | None = None
-    ) -> str:
-        """Generate TODO.md content from Task objects using structure snapshot.
+    def _format_relationships(self) -> str:
+        lines = ["<!-- TASK RELATIONSHIPS"]
+        for task_id in sorted(self.relationships.keys()):
+            for rel_type in sorted(self.relationships[task_id].keys()):
+                targets = " ".join(self.relationships[task_id][rel_type])
+                lines.append(f"{task_id}:{rel_type}:{targets}")
+        lines.append("-->")
+        return "\n".join(lines)
+
+    @staticmethod
+    def _format_footer() -> str:
+        # Always regenerate with current timestamp
+        # (snapshot.footer_lines captured for parsing but we always generate fresh footer)
+        return f"**ai-todo** | Last Updated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
+
+    def _render_document(
+        self, tasks: list[Task], snapshot: FileStructureSnapshot
+    ) -> "RenderedDocument":
+        """Render the whole document, remembering where each task's pieces are."""
+        inputs = self._render_inputs(snapshot)
+        header, tasks_header_format, interleaved_content = inputs
 
-        Args:
-            tasks: List of tasks to generate markdown for
-            snapshot: Structure snapshot to use. Must not be None (raises ValueError if None).
-        """
         # Organize tasks by section
         active_tasks = []
         archived_tasks = []
@@ -992,261 +940,453 @@ class FileOps:
         # The ADD operation handles putting new tasks at the top BEFORE calling write.
         # All other operations (modify, complete, undo) preserve existing order.
 
-        def order_tasks_with_hierarchy(tasks: list[Task], date_attr: str) -> list[Task]:
-            """Order tasks preserving parent-child hierarchy.
-
-            Groups tasks by root parent ID, sorts groups by most recent date,
-            and within each group puts parent first, then subtasks in reverse order.
-
-            Args:
-                tasks: List of tasks to order
-                date_attr: Attribute name for the date to sort by ('archived_at' or 'deleted_at')
-
-            Returns:
-                Ordered list of tasks
-            """
-            if not tasks:
-                return tasks
-
-            # Group tasks by root parent ID (first number in ID)
-            groups: dict[str, list[Task]] = {}
-            for task in tasks:
-                # Extract root ID (e.g., "104" from "104.1" or "104" from "104")
-                root_id = task.id.split(".")[0]
-                if root_id not in groups:
-                    groups[root_id] = []
-                groups[root_id].append(task)
-
-            # For each group, find the most recent date and sort tasks within group
-            group_info: list[tuple[datetime, str, list[Task]]] = []
-            for root_id, group_tasks in groups.items():
-                # Find most recent date in group
-                max_date = datetime.min
-                for t in group_tasks:
-                    task_date = getattr(t, date_attr, None)
-                    if task_date and task_date > max_date:
-                        max_date = task_date
-
-                # Sort tasks within group: parent first, then subtasks in reverse order
-                # Parent has no dot, subtasks have dots
-                group_tasks.sort(
-                    key=lambda t: (
-                        0 if "." not in t.id else 1,  # Parent first
-                        # Subtasks in reverse order (highest number first)
-                        [-int(x) for x in t.id.split(".")[1:]] if "." in t.id else [],
-                    )
-                )
-                group_info.append((max_date, root_id, group_tasks))
-
-            # Sort groups by most recent date (newest first), then by root ID (reverse)
-            group_info.sort(key=lambda x: (x[0], int(x[1]) if x[1].isdigit() else 0), reverse=True)
-
-            # Flatten groups back into ordered list
-            result: list[Task] = []
-            for _, _, group_tasks in group_info:
-                result.extend(group_tasks)
+        # Order archived and deleted tasks preserving hierarchy
+        archived_tasks = self._archived_order.order(archived_tasks)
+        deleted_tasks = self._deleted_order.order(deleted_tasks)
 
-            return result
-
-        # Order archived tasks preserving hierarchy
-        archived_tasks = order_tasks_with_hierarchy(archived_tasks, "archived_at")
-        # Order deleted tasks preserving hierarchy
-        deleted_tasks = order_tasks_with_hierarchy(deleted_tasks, "deleted_at")
+        document = RenderedDocument(
+            inputs=inputs,
+            task_ids=[t.id for t in tasks],
+            has_relationships=bool(self.relationships),
+        )
+        elements = document.elements
 
-        lines: list[str] = []
+        task_elements: dict[str, int] = {}
 
-        # Phase 13: Always use snapshot (no fallback)
-        if snapshot is None:
-            raise ValueError("Structure snapshot must be available for generation")
+        def add_task_block(t: Task, block: str) -> None:
+            task_elements[t.id] = len(elements)
+            elements.append(block)
 
         # 1. Header
-        if snapshot.has_original_header and snapshot.header_lines:
-            lines.extend(snapshot.header_lines)
-        else:
-            # Default Header (Enforced Standard for new files or files without header)
-            lines.extend(
-                [
-                    "# ai-todo Task List",
-                    "",
-                    "> ⚠️ **MANAGED FILE**: Do not edit manually. Use `ai-todo` (CLI/MCP) to manage tasks.",
-                    "",
-                ]
-            )
+        elements.extend(header)
 
         # 2. Tasks Section
-        lines.append(snapshot.tasks_header_format)
+        elements.append(tasks_header_format)
         # Enforce blank line after header if there are tasks
         if active_tasks:
-            lines.append("")
-
-        def format_task(t: Task) -> str:
-            # Determine checkbox
-            if t.status == TaskStatus.DELETED:
-                # Use preserved format if available, otherwise use [D] for newly deleted tasks
-                if t.id in self.deleted_task_formats:
-                    checkbox = self.deleted_task_formats[t.id]  # Preserve original format
-                elif t.deleted_at and t.expires_at:
-                    checkbox = "D"  # Use [D] for newly deleted tasks with metadata
-                else:
-                    checkbox = " "  # Preserve [ ] for old deleted tasks without metadata
-            elif t.status != TaskStatus.PENDING:
-                checkbox = "x"
-            else:
-                checkbox = " "
-
-            # Strict indentation: 0, 2, 4 spaces
-            indent_level = t.id.count(".")
-            if indent_level > 2:
-                indent_level = 2  # Max depth 2 (3 levels)
-            indent = "  " * indent_level
-
-            # Format description with tags
-            description = t.description
-            if t.tags:
-                # Tags must be wrapped in backticks
-                tag_str = " ".join(
-                    [f"`{tag}`" if tag.startswith("#") else f"`#{tag}`" for tag in sorted(t.tags)]
-                )
-                description = f"{description} {tag_str}".strip()
+            elements.append("")
 
-            line = f"{indent}- [{checkbox}] **#{t.id}** {description}"
-
-            # Add completed date for completed tasks
-            if t.status == TaskStatus.COMPLETED and t.completed_at:
-                completed_date = t.completed_at.strftime("%Y-%m-%d")
-                line += f" ({completed_date})"
-
-            # Add deletion metadata for deleted tasks
-            if t.status == TaskStatus.DELETED and t.deleted_at and t.expires_at:
-                delete_date = t.deleted_at.strftime("%Y-%m-%d")
-                expire_date = t.expires_at.strftime("%Y-%m-%d")
-                line += f" (deleted {delete_date}, expires {expire_date})"
-
-            for note in t.notes:
-                # Strict note formatting: indent + 2 spaces + > + space
-                note_indent = indent + "  "
-                line += f"\n{note_indent}> {note}"
-            return line
-
-        # Add active tasks
         for i, t in enumerate(active_tasks):
-            lines.append(format_task(t))
+            add_task_block(t, self._format_task(t))
             # Insert interleaved content if any
-            if t.id in snapshot.interleaved_content:
-                lines.extend(snapshot.interleaved_content[t.id])
+            if t.id in interleaved_content:
+                elements.extend(interleaved_content[t.id])
 
             # Spacing Rules:
-            # Root tasks: 1 blank line between them (and before them if following a subtask)
-            # Subtasks: 0 blank lines (handled by not adding one here)
-            # Logic: Add blank line if NEXT task is a root task
-            # BUT: Do not add blank line if the current task is a subtask and the next task is a subtask of the SAME parent
-            # Actually, the rule is simpler:
             # - Between root tasks: Blank line
             # - Between subtasks of same parent: No blank line
             # - Between subtask and NEXT root task: Blank line
-
-            if i < len(active_tasks) - 1:
-                next_task = active_tasks[i + 1]
-                # Debug print (remove later)
-                # print(f"DEBUG: Current: {t.id}, Next: {next_task.id}, Dot in next: {'.' in next_task.id}")
-
-                # If next task is a root task, always add a blank line
-                if "." not in next_task.id:
-                    lines.append("")
-                # If next task is a subtask, check if it belongs to a different parent
-                # (This shouldn't happen in a sorted list where subtasks follow parents,
-                # but if we have orphaned subtasks or mixed hierarchy, we might want separation)
-                # For now, strictly following: Root tasks get separation. Subtasks don't.
-                # If current is root and next is subtask (child), NO blank line.
-                # If current is subtask and next is subtask (sibling), NO blank line.
-                # If current is subtask and next is root (new parent), YES blank line (handled by first check).
+            if i < len(active_tasks) - 1 and "." not in active_tasks[i + 1].id:
+                elements.append("")
 
         # 3. Archived Tasks Section
         if archived_tasks:
-            lines.append("")
-            lines.append("---")
-            lines.append("")
-            lines.append("## Archived Tasks")
+            elements.extend(["", "---", "", "## Archived Tasks"])
             for t in archived_tasks:
-                task_line = format_task(t)
-                # Add archive date if present (shell script format)
-                if t.archived_at:
-                    archive_date = t.archived_at.strftime("%Y-%m-%d")
-                    # Insert date before notes (if any) or at end
-                    if "\n" in task_line:
-                        # Has notes - insert date before first note line
-                        parts = task_line.split("\n", 1)
-                        # Check if date already exists (e.g. completed date)
-                        if f"({archive_date})" not in parts[0]:
-                            task_line = f"{parts[0]} ({archive_date})\n{parts[1]}"
-                    else:
-                        if f"({archive_date})" not in task_line:
-                            task_line = f"{task_line} ({archive_date})"
-                lines.append(task_line)
+                add_task_block(t, self._format_archived_task(t))
 
         # 4. Deleted Tasks Section
         if deleted_tasks:
-            lines.append("")
-            lines.append("---")
-            lines.append("")
-            lines.append("## Deleted Tasks")
+            elements.extend(["", "---", "", "## Deleted Tasks"])
             for t in deleted_tasks:
-                lines.append(format_task(t))
+                add_task_block(t, self._format_task(t))
 
         # 5. Task Metadata Section (if relationships, timestamps, or section was present)
         metadata_lines_to_use = snapshot.metadata_lines
         has_timestamps = any(t.created_at is not None or t.updated_at is not None for t in tasks)
         if self.relationships or has_timestamps or metadata_lines_to_use:
-            lines.append("")
-            lines.append("---")
-            lines.append("")
-            # Check if metadata section header exists in preserved lines
-            has_metadata_header = any("## Task Metadata" in line for line in metadata_lines_to_use)
-            if not has_metadata_header and (self.relationships or has_timestamps):
-                lines.append("## Task Metadata")
-                lines.append("")
-                lines.append("Task relationships and dependencies (managed by ai-todo).")
-                lines.append("View with: `ai-todo show <task-id>`")
-                lines.append("")
+            elements.extend(["", "---", ""])
+            # Preserved metadata lines are only written back when there is nothing to
+            # generate, so the generated section always brings its own heading
+            if self.relationships or has_timestamps:
+                elements.extend(
+                    [
+                        "## Task Metadata",
+                        "",
+                        "Task relationships and dependencies (managed by ai-todo).",
+                        "View with: `ai-todo show <task-id>`",
+                        "",
+                    ]
+                )
 
             # Write timestamps if any tasks have them
             if has_timestamps:
-                lines.append("<!-- TASK_METADATA")
-                lines.append("# Format: task_id:created_at[:updated_at]")
+                elements.append("<!-- TASK_METADATA")
+                elements.append(TIMESTAMPS_FORMAT_LINE)
+                document.timestamp_keys = [self._timestamp_key(t) for t in tasks]
                 for t in sorted(tasks, key=lambda x: x.id):
                     if t.created_at is not None:
-                        created_str = t.created_at.isoformat()
-                        if t.updated_at is not None and t.updated_at != t.created_at:
-                            updated_str = t.updated_at.isoformat()
-                            lines.append(f"{t.id}:{created_str}:{updated_str}")
-                        else:
-                            lines.append(f"{t.id}:{created_str}")
-                lines.append("-->")
-                lines.append("")
+                        document.timestamp_elements[t.id] = len(elements)
+                        elements.append(self._format_timestamps(t))
+                elements.append("-->")
+                elements.append("")
 
             # Write relationships if any
             if self.relationships:
-                lines.append("<!-- TASK RELATIONSHIPS")
-                # Write relationships
-                for task_id in sorted(self.relationships.keys()):
-                    for rel_type in sorted(self.relationships[task_id].keys()):
-                        targets = " ".join(self.relationships[task_id][rel_type])
-                        lines.append(f"{task_id}:{rel_type}:{targets}")
-                lines.append("-->")
+                document.relationships = copy.deepcopy(self.relationships)
+                document.relationships_element = len(elements)
+                elements.append(self._format_relationships())
 
             # Preserve other existing metadata if no relationships or timestamps
             if not self.relationships and not has_timestamps and metadata_lines_to_use:
-                lines.extend(metadata_lines_to_use)
-
-        # 6. Footer - Always regenerate with current timestamp
-        # (snapshot.footer_lines captured for parsing but we always generate fresh footer)
-        lines.extend(
-            [
-                "",
-                "---",
-                f"**ai-todo** | Last Updated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
+                elements.extend(metadata_lines_to_use)
+
+        # 6. Footer
+        elements.extend(["", "---", self._format_footer()])
+
+        document.elements = [_strip_line_ends(element) for element in elements]
+        document.task_elements = [task_elements[t.id] for t in tasks]
+        document.task_keys = [self._block_key(t) for t in tasks]
+        return document
+
+    def _render_incremental(
+        self, tasks: list[Task], snapshot: FileStructureSnapshot
+    ) -> "RenderedDocument | None":
+        """Update the last written document in place for edits that keep its structure.
+
+        Only the blocks of changed tasks, their TASK_METADATA lines, the relationships
+        block and the footer are re-rendered. Returns None (use a full render) when the
+        layout changes: tasks added, removed, reordered or moved between sections (a
+        completed or reopened task stays in the Tasks section), or different header,
+        interleaved content or metadata preamble.
+        """
+        document = self._rendered
+        if document is None or len(tasks) != len(document.task_ids):
+            return None
+        if document.has_relationships != bool(self.relationships):
+            return None
+        relationships_element = document.relationships_element
+        if self.relationships and relationships_element is None:
+            return None  # Relationships kept as preserved metadata lines, not a block
+        if not document.timestamp_keys and not document.has_relationships:
+            return None  # Metadata section (if any) is the preserved original lines
+        if [t.id for t in tasks] != document.task_ids:
+            return None
+        if self._render_inputs(snapshot) != document.inputs:
+            return None
+
+        keys = [self._block_key(t) for t in tasks]
+        changed_blocks = [
+            i
+            for i, (key, previous) in enumerate(zip(keys, document.task_keys, strict=True))
+            if key != previous
+        ]
+        for i in changed_blocks:
+            key, previous = keys[i], document.task_keys[i]
+            if (
+                _SECTIONS[key[0]] != _SECTIONS[previous[0]]
+                or key[5] != previous[5]
+                or key[6] != previous[6]
+            ):
+                return None  # Section or position within the section changed
+
+        if document.timestamp_keys:
+            times = [self._timestamp_key(t) for t in tasks]
+            changed_timestamps = [
+                i
+                for i, (current, previous) in enumerate(
+                    zip(times, document.timestamp_keys, strict=True)
+                )
+                if current != previous
             ]
+            for i in changed_timestamps:
+                current, previous = times[i], document.timestamp_keys[i]
+                if (current[0] is None) != (previous[0] is None) or (current[1] is None) != (
+                    previous[1] is None
+                ):
+                    return None  # TASK_METADATA line added or removed
+        elif any(t.created_at is not None or t.updated_at is not None for t in tasks):
+            return None
+        else:
+            times, changed_timestamps = [], []
+
+        elements = document.elements
+        for i in changed_blocks:
+            t = tasks[i]
+            block = (
+                self._format_archived_task(t)
+                if t.status == TaskStatus.ARCHIVED
+                else self._format_task(t)
+            )
+            elements[document.task_elements[i]] = _strip_line_ends(block)
+        document.task_keys = keys
+        for i in changed_timestamps:
+            t = tasks[i]
+            elements[document.timestamp_elements[t.id]] = _strip_line_ends(
+                self._format_timestamps(t)
+            )
+        document.timestamp_keys = times
+        if relationships_element is not None and self.relationships != document.relationships:
+            document.relationships = copy.deepcopy(self.relationships)
+            elements[relationships_element] = _strip_line_ends(self._format_relationships())
+        elements[-1] = _strip_line_ends(self._format_footer())
+        return document
+
+
+def _stat_key(path: Path) -> tuple[int, int, int] | None:
+    """Return (size, mtime_ns, inode) of a file, or None if it does not exist."""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return st.st_size, st.st_mtime_ns, st.st_ino
+
+
+@functools.cache
+def _log_user() -> str:
+    """User name for log entries (resolved once per process)."""
+    return os.environ.get("USER") or os.environ.get("USERNAME") or "unknown"
+
+
+_log_second: tuple[int, str] = (0, "")
+
+
+def _log_timestamp() -> str:
+    """Local time for log entries, formatted at most once per second."""
+    global _log_second
+    now = int(time.time())
+    if _log_second[0] != now:
+        _log_second = (now, datetime.fromtimestamp(now).strftime("%Y-%m-%d %H:%M:%S"))
+    return _log_second[1]
+
+
+def _fsync_directory(path: Path) -> None:
+    """Make renames in a directory durable (not supported on Windows)."""
+    if not hasattr(os, "O_DIRECTORY"):
+        return
+    fd = os.open(path, os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def atomic_write_text(path: Path, text: str, sync_dir: bool = True) -> None:
+    """Replace a file's contents so readers see either the old or the new text.
+
+    Writes a temp file next to ``path``, fsyncs it and renames it over ``path``.
+
+    Args:
+        path: File to replace
+        text: New contents (written as UTF-8 text)
+        sync_dir: Also fsync the directory so the rename survives a crash
+            (skip only when a later write in the same directory syncs it)
+    """
+    # Unique per writer so concurrent writers never share a temp file
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}-{threading.get_ident()}.tmp")
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+    if sync_dir:
+        _fsync_directory(path.parent)
+
+
+TIMESTAMPS_FORMAT_LINE = (
+    "# Format: task_id:created_at[:updated_at] [completed_at|archived_at|deleted_at|expires_at=...]"
+)
+
+# Section each status is rendered in (see FileOps._render_document)
+_SECTIONS = {
+    TaskStatus.PENDING: "Tasks",
+    TaskStatus.COMPLETED: "Tasks",
+    TaskStatus.ARCHIVED: "Archived Tasks",
+    TaskStatus.DELETED: "Deleted Tasks",
+}
+
+# Bump when the layout stored by RenderedDocument.dump() changes
+RENDER_CACHE_VERSION = 1
+
+# Written to .ai-todo/state/.gitignore (see FileOps._ignore_local_state)
+STATE_GITIGNORE = """\
+# Machine-local caches and journals written by ai-todo
+checksum.stat
+parse_cache
+render_cache
+lock
+op_journal
+write_journal
+archive_dates
+shadow/
+audit.log.*
+*.tmp
+"""
+
+DEFAULT_HEADER_LINES = (
+    "# ai-todo Task List",
+    "",
+    "> ⚠️ **MANAGED FILE**: Do not edit manually. Use `ai-todo` (CLI/MCP) to manage tasks.",
+    "",
+)
+
+
+@dataclass
+class RenderedDocument:
+    """The last TODO.md content FileOps rendered, split for incremental rewrites.
+
+    ``elements`` are newline-free units (a line, or a task line with its notes);
+    the file content is ``elements`` joined with newlines plus a final newline.
+    """
+
+    inputs: tuple  # Snapshot-derived inputs (see FileOps._render_inputs)
+    task_ids: list[str]  # Task IDs in the order they were passed to the writer
+    has_relationships: bool
+    elements: list[str] = field(default_factory=list)
+    # Per task, in task_ids order: element index of its block and FileOps._block_key
+    task_elements: list[int] = field(default_factory=list)
+    task_keys: list[tuple] = field(default_factory=list)
+    # _timestamp_key() per task in task_ids order; empty without TASK_METADATA
+    timestamp_keys: list[tuple] = field(default_factory=list)
+    timestamp_elements: dict[str, int] = field(default_factory=dict)  # task_id -> index
+    relationships: dict[str, dict[str, list[str]]] = field(default_factory=dict)
+    relationships_element: int | None = None
+
+    def content(self) -> str:
+        return "\n".join(self.elements) + "\n"
+
+    def dump(self, checksum: str) -> bytes:
+        """Serialize the layout for the content identified by ``checksum``.
+
+        Element text and task keys are not stored: load() takes the text from
+        the file and FileOps the keys from the tasks read from it. Tasks are
+        stored in file order, the order a read of the file returns them in.
+        """
+        order = sorted(range(len(self.task_ids)), key=self.task_elements.__getitem__)
+        spans = [(i, e.count("\n") + 1) for i, e in enumerate(self.elements) if "\n" in e]
+        layout = (
+            self.inputs,
+            [self.task_ids[i] for i in order],
+            [self.task_elements[i] for i in order],
+            self.has_relationships,
+            self.timestamp_elements,
+            self.relationships,
+            self.relationships_element,
+            len(self.elements),
+            spans,
+        )
+        return marshal.dumps((RENDER_CACHE_VERSION, checksum, layout))
+
+    @classmethod
+    def load(cls, data: bytes, checksum: str, content: str) -> "RenderedDocument | None":
+        """Rebuild a document from dump() data and the content it was dumped for.
+
+        Returns:
+            The document without task keys, or None if the data is unreadable,
+            from another cache version or for content with a different checksum
+        """
+        try:
+            version, cached_checksum, layout = marshal.loads(data)
+        except (EOFError, ValueError, TypeError):
+            return None
+        if version != RENDER_CACHE_VERSION or cached_checksum != checksum:
+            return None
+        (
+            inputs,
+            task_ids,
+            task_elements,
+            has_relationships,
+            timestamp_elements,
+            relationships,
+            relationships_element,
+            element_count,
+            spans,
+        ) = layout
+
+        lines = content.split("\n")
+        lines.pop()  # The content ends with a newline
+        elements: list[str] = []
+        position = 0
+        for index, count in spans:
+            single = index - len(elements)  # One-line elements before this one
+            elements.extend(lines[position : position + single])
+            position += single
+            elements.append("\n".join(lines[position : position + count]))
+            position += count
+        elements.extend(lines[position:])
+        if len(elements) != element_count:
+            return None
+        return cls(
+            inputs=inputs,
+            task_ids=task_ids,
+            has_relationships=has_relationships,
+            elements=elements,
+            task_elements=task_elements,
+            timestamp_elements=timestamp_elements,
+            relationships=relationships,
+            relationships_element=relationships_element,
         )
 
-        full_content = "\n".join(lines)
-        return "\n".join(line.rstrip() for line in full_content.splitlines()) + "\n"
+
+def _strip_line_ends(element: str) -> str:
+    """Strip trailing whitespace from every line of an element.
+
+    Splits exactly like ``str.splitlines()`` on the whole document would, so the
+    joined elements equal the document with every line stripped.
+    """
+    return "\n".join(line.rstrip() for line in (element + "\n").splitlines())
+
+
+class SectionOrder:
+    """Display order of the Archived or Deleted Tasks section, kept up to date across writes.
+
+    Tasks are grouped by root ID (a root task and its subtasks). Groups are
+    ordered by the most recent date in the group, newest first, then by root
+    serial and root ID; within a group the parent comes first, then its
+    subtasks in reverse order. The group keys are kept in a sorted list, so a
+    write only re-sorts the groups whose tasks moved in or out of the section
+    or changed date, and an unchanged section is not sorted at all.
+    """
+
+    def __init__(self, date_attr: str):
+        self.date_attr = date_attr  # 'archived_at' or 'deleted_at'
+        self._dates: dict[str, datetime | None] = {}  # Date of each task in the section
+        self._groups: dict[str, list[str]] = {}  # Root ID -> task IDs in group order
+        self._group_keys: dict[str, tuple] = {}  # Root ID -> its key in _sorted_keys
+        self._sorted_keys: list[tuple] = []  # (max date, root serial, root ID), ascending
+        self._order: list[str] = []  # Task IDs in display order
+
+    def order(self, tasks: list[Task]) -> list[Task]:
+        """Return the section's tasks in display order."""
+        dates = {task.id: getattr(task, self.date_attr, None) for task in tasks}
+        if dates != self._dates:
+            self._update(dates)
+        by_id = {task.id: task for task in tasks}
+        return [by_id[task_id] for task_id in self._order]
+
+    def _update(self, dates: dict[str, datetime | None]) -> None:
+        changed_roots = {
+            TaskId.of(task_id).root for task_id, _ in self._dates.items() ^ dates.items()
+        }
+        self._dates = dates
+        members: dict[str, list[TaskId]] = {root: [] for root in changed_roots}
+        for task_id in dates:
+            parsed = TaskId.of(task_id)
+            group = members.get(parsed.root)
+            if group is not None:
+                group.append(parsed)
+
+        for root, task_ids in members.items():
+            previous = self._group_keys.pop(root, None)
+            if previous is not None:
+                del self._sorted_keys[bisect_left(self._sorted_keys, previous)]
+            if not task_ids:
+                del self._groups[root]
+                continue
+            # Parent first, then subtasks in reverse order (highest number first)
+            task_ids.sort(key=lambda t: (t.depth > 0, [-n for n in t.ordinals or ()]))
+            max_date = max(
+                (date for t in task_ids if (date := dates[t.value])), default=datetime.min
+            )
+            key = (max_date, task_ids[0].serial or 0, root)
+            self._groups[root] = [t.value for t in task_ids]
+            self._group_keys[root] = key
+            insort(self._sorted_keys, key)
+
+        self._order = [
+            task_id for key in reversed(self._sorted_keys) for task_id in self._groups[key[2]]
+        ]
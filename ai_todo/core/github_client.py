@@ -5,6 +5,9 @@ from typing import Any
 
 import requests
 
+# Seconds to wait for GitHub to connect or send data; a stalled request must not hang its caller
+REQUEST_TIMEOUT = 30
+
 
 class GitHubClient:
     """GitHub API client for issue management and bug reporting."""
@@ -64,7 +67,9 @@ class GitHubClient:
 
         data = {"title": title, "body": body, "labels": labels or []}
 
-        response = requests.post(url, headers=self._get_headers(), json=data)
+        response = requests.post(
+            url, headers=self._get_headers(), json=data, timeout=REQUEST_TIMEOUT
+        )
         response.raise_for_status()
         result: dict[str, Any] = response.json()
         return result
@@ -74,7 +79,7 @@ class GitHubClient:
         owner, repo = self._get_repo_info()
         url = f"{self.api_base}/repos/{owner}/{repo}/issues/{issue_number}"
 
-        response = requests.get(url, headers=self._get_headers())
+        response = requests.get(url, headers=self._get_headers(), timeout=REQUEST_TIMEOUT)
         response.raise_for_status()
         result: dict[str, Any] = response.json()
         return result
@@ -84,7 +89,7 @@ class GitHubClient:
         owner, repo = self._get_repo_info()
         url = f"{self.api_base}/repos/{owner}/{repo}/issues/{issue_number}/comments"
 
-        response = requests.get(url, headers=self._get_headers())
+        response = requests.get(url, headers=self._get_headers(), timeout=REQUEST_TIMEOUT)
         response.raise_for_status()
         result: list[dict[str, Any]] = response.json()
         return result
@@ -100,7 +105,9 @@ class GitHubClient:
         if labels:
             params["labels"] = ",".join(labels)
 
-        response = requests.get(url, headers=self._get_headers(), params=params)
+        response = requests.get(
+            url, headers=self._get_headers(), params=params, timeout=REQUEST_TIMEOUT
+        )
         response.raise_for_status()
         result: list[dict[str, Any]] = response.json()
         return result
@@ -116,7 +123,9 @@ class GitHubClient:
 
         data = {"body": body}
 
-        response = requests.post(url, headers=self._get_headers(), json=data)
+        response = requests.post(
+            url, headers=self._get_headers(), json=data, timeout=REQUEST_TIMEOUT
+        )
         response.raise_for_status()
         result: dict[str, Any] = response.json()
         return result
@@ -0,0 +1,169 @@
+"""Cross-process advisory locking for TODO.md read-modify-write cycles.
+
+Writers (CLI commands, MCP servers, git hooks) serialize on a lock file in
+``.ai-todo/state/lock``. The lock is an OS advisory lock (flock(), or
+msvcrt.locking() on Windows), so it is released automatically when the
+holding process dies. While held, the lock file names its holder.
+"""
+
+import os
+import socket
+import sys
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+from ai_todo.core.config import Config
+from ai_todo.core.exceptions import LockTimeoutError
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None  # type: ignore[assignment]
+    import msvcrt
+
+DEFAULT_LOCK_TIMEOUT = 10.0  # Seconds to wait for another writer
+
+
+def _try_lock(fd: int) -> bool:
+    try:
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            os.lseek(fd, 0, os.SEEK_SET)
+            msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+    except OSError:
+        return False
+    return True
+
+
+def _unlock(fd: int) -> None:
+    if fcntl is not None:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+    else:
+        os.lseek(fd, 0, os.SEEK_SET)
+        msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+
+
+def _describe_holder() -> str:
+    command = " ".join(os.path.basename(arg) if i == 0 else arg for i, arg in enumerate(sys.argv))
+    return (
+        f"pid={os.getpid()} host={socket.gethostname()} "
+        f"since={datetime.now().isoformat(timespec='seconds')} command={command[:200]}"
+    )
+
+
+class FileLock:
+    """Exclusive lock on a lock file, shared by all threads of a process.
+
+    Re-entrant: nested acquisitions by the thread that holds it succeed at once,
+    so an operation can call other locked operations.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._mutex = threading.RLock()
+        self._depth = 0
+        self._fd: int | None = None
+
+    def holder(self) -> str | None:
+        """Describe the current holder as recorded in the lock file, if any."""
+        try:
+            return self.path.read_text(encoding="utf-8").strip() or None
+        except OSError:
+            return None
+
+    def acquire(self, timeout: float = DEFAULT_LOCK_TIMEOUT) -> None:
+        """Acquire the lock, waiting at most ``timeout`` seconds.
+
+        Raises:
+            LockTimeoutError: If another thread or process still holds the lock
+        """
+        deadline = time.monotonic() + timeout
+        if not self._mutex.acquire(timeout=max(timeout, 0)):
+            raise self._timeout_error(timeout)
+        if self._depth:
+            self._depth += 1
+            return
+        try:
+            self._fd = self._lock_file(deadline, timeout)
+        except BaseException:
+            self._mutex.release()
+            raise
+        self._depth = 1
+
+    def _lock_file(self, deadline: float, timeout: float) -> int:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        delay = 0.002
+        while not _try_lock(fd):
+            if time.monotonic() >= deadline:
+                os.close(fd)
+                raise self._timeout_error(timeout)
+            time.sleep(delay)
+            delay = min(delay * 2, 0.05)
+        try:
+            os.ftruncate(fd, 0)
+            os.lseek(fd, 0, os.SEEK_SET)
+            os.write(fd, (_describe_holder() + "\n").encode("utf-8"))
+        except OSError:
+            pass  # Holder details are diagnostics only
+        return fd
+
+    def _timeout_error(self, timeout: float) -> LockTimeoutError:
+        holder = self.holder()
+        return LockTimeoutError(
+            f"Timed out after {timeout:g}s waiting for the TODO.md write lock "
+            f"({self.path}); held by {holder or 'another thread of this process'}",
+            holder=holder,
+        )
+
+    def release(self) -> None:
+        """Release one level of the lock."""
+        self._depth -= 1
+        if self._depth == 0 and self._fd is not None:
+            fd, self._fd = self._fd, None
+            try:
+                os.ftruncate(fd, 0)
+            except OSError:
+                pass
+            try:
+                _unlock(fd)
+            finally:
+                os.close(fd)
+        self._mutex.release()
+
+    @contextmanager
+    def locked(self, timeout: float = DEFAULT_LOCK_TIMEOUT) -> Iterator[None]:
+        """Hold the lock for the duration of a ``with`` block."""
+        self.acquire(timeout)
+        try:
+            yield
+        finally:
+            self.release()
+
+
+# One FileLock per lock file: flock() locks belong to open files, so a second
+# FileLock on the same path in this process would block on the first
+_locks: dict[str, FileLock] = {}
+_locks_mutex = threading.Lock()
+
+
+def lock_timeout(config: Config) -> float:
+    """Seconds to wait for the write lock (``concurrency.lock_timeout`` in config.yaml)."""
+    return float(config.get("concurrency.lock_timeout", DEFAULT_LOCK_TIMEOUT))
+
+
+def todo_lock(todo_path: str) -> FileLock:
+    """Return the write lock for a TODO.md (``.ai-todo/state/lock`` next to it)."""
+    lock_path = Path(os.path.abspath(todo_path)).parent / ".ai-todo" / "state" / "lock"
+    key = str(lock_path)
+    with _locks_mutex:
+        lock = _locks.get(key)
+        if lock is None:
+            lock = FileLock(lock_path)
+            _locks[key] = lock
+        return lock
@@ -1,7 +1,13 @@
+import sys
 from collections.abc import Callable
 from datetime import datetime
 from pathlib import Path
 
+from ai_todo.core.task import Task
+
+# Persist task dates in TASK_METADATA (see backfill_task_dates())
+TASK_DATES_MIGRATION = "001_persist_task_dates"
+
 
 class MigrationRegistry:
     """Manages migration execution."""
@@ -54,7 +60,8 @@ class MigrationRegistry:
 
         for mid in sorted_ids:
             if mid not in applied:
-                print(f"Running migration: {mid}")
+                # stderr: stdout may be the MCP protocol channel
+                print(f"Running migration: {mid}", file=sys.stderr)
                 try:
                     self._migrations[mid]()
                     applied.append(mid)
@@ -67,3 +74,74 @@ class MigrationRegistry:
             self._save_state(applied)
 
         return executed
+
+
+def run_migrations(todo_path: str) -> list[str]:
+    """Run the pending migrations of the TODO.md at ``todo_path``.
+
+    Returns:
+        IDs of the migrations that ran
+    """
+    from ai_todo.core.file_ops import FileOps
+
+    registry = MigrationRegistry(str(FileOps(todo_path).config_dir))
+    registry.register_migration(TASK_DATES_MIGRATION, lambda: backfill_task_dates(todo_path))
+    return registry.run_pending_migrations()
+
+
+def migration_pending(config_dir: Path, migration_id: str) -> bool:
+    """Return whether a migration has not run yet, without creating any files."""
+    if not (config_dir / "migrations").exists():
+        return True
+    return migration_id not in MigrationRegistry(str(config_dir)).get_applied_migrations()
+
+
+def backfill_task_dates(todo_path: str) -> None:
+    """Rewrite TODO.md so TASK_METADATA carries every task's dates.
+
+    Dates so far only shown on task lines (day precision) are persisted as they
+    parse. Archived tasks whose line shows no date are dated as by
+    date_archived_tasks(), so prune can select them by date.
+    """
+    from ai_todo.core.config import Config
+    from ai_todo.core.file_ops import FileOps
+    from ai_todo.core.locking import lock_timeout, todo_lock
+    from ai_todo.core.task_service import TaskService
+
+    if not Path(todo_path).exists():
+        return
+    file_ops = FileOps(todo_path)
+    config = Config(str(file_ops.config_dir / "config.yaml"))
+    with todo_lock(todo_path).locked(lock_timeout(config)):
+        # Journaled operations must be in TODO.md before it is rewritten
+        TaskService(todo_path).flush()
+        tasks = file_ops.read_tasks()
+        date_archived_tasks(todo_path, tasks, file_ops.state_dir)
+        file_ops.write_tasks(tasks)
+
+
+def date_archived_tasks(todo_path: str, tasks: list[Task], state_dir: Path) -> None:
+    """Set archived_at of archived tasks whose line shows no date, in memory.
+
+    They are dated from git history (one scan, cached in ``state_dir``), or
+    else from their root task.
+    """
+    from ai_todo.core.task import TaskStatus
+    from ai_todo.core.task_id import TaskId
+    from ai_todo.utils.git import get_task_archive_dates
+
+    undated = [t for t in tasks if t.status == TaskStatus.ARCHIVED and t.archived_at is None]
+    if not undated:
+        return
+    history = get_task_archive_dates(todo_path, state_dir / "archive_dates")
+    by_id = {t.id: t for t in tasks}
+    # Root tasks first, so subtasks can fall back to their root's date
+    for task in sorted(undated, key=lambda t: TaskId.of(t.id).depth):
+        commit_date = history.get(task.id)
+        if commit_date is not None:
+            # Local naive time, like the dates set by ai-todo itself
+            task.archived_at = commit_date.astimezone().replace(tzinfo=None)
+            continue
+        root = by_id.get(TaskId.of(task.id).root)
+        if root is not None and root.archived_at is not None:
+            task.archived_at = root.archived_at
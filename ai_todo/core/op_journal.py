@@ -0,0 +1,110 @@
+"""Append-only journal of task operations not yet folded into TODO.md.
+
+In ``concurrency.mode: journal`` a write operation is acknowledged once its
+record (the TaskService method, its arguments and the task IDs it allocated)
+is appended and fsynced to ``.ai-todo/state/op_journal``. Readers replay the
+records over TODO.md (see ``TaskStore``); compaction writes the merged state
+to TODO.md once and removes the journal.
+
+Records are JSON lines. A line without its trailing newline is the remains of
+an append interrupted by a crash; it is ignored and overwritten by the next
+append.
+"""
+
+import json
+import os
+import threading
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+from ai_todo.core.file_ops import _fsync_directory
+
+
+class OpJournal:
+    """Operation journal file. Callers serialize appends with the TODO.md write lock."""
+
+    def __init__(self, path: Path):
+        self.path = path
+
+    def size(self) -> int:
+        """Current size in bytes (0 if there is no journal)."""
+        try:
+            return os.stat(self.path).st_size
+        except FileNotFoundError:
+            return 0
+
+    def read(self, offset: int = 0) -> tuple[list[dict[str, Any]], int]:
+        """Read the complete records after ``offset``.
+
+        Returns:
+            The records and the offset just past the last complete one
+        """
+        try:
+            with open(self.path, "rb") as f:
+                f.seek(offset)
+                data = f.read()
+        except FileNotFoundError:
+            return [], 0
+        end = data.rfind(b"\n") + 1
+        records = [json.loads(line) for line in data[:end].splitlines() if line.strip()]
+        return records, offset + end
+
+    def append(self, record: dict[str, Any], offset: int) -> int:
+        """Write ``record`` at ``offset`` (dropping anything after it) and fsync.
+
+        Args:
+            record: JSON-serializable operation record
+            offset: End of the last complete record, as returned by read()/append()
+
+        Returns:
+            The offset just past the new record
+        """
+        line = json.dumps(record, separators=(",", ":"), default=list).encode("utf-8") + b"\n"
+        created = not self.path.exists()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(self.path, os.O_WRONLY | os.O_CREAT, 0o644)
+        try:
+            os.ftruncate(fd, offset)
+            os.lseek(fd, offset, os.SEEK_SET)
+            os.write(fd, line)
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+        if created:
+            _fsync_directory(self.path.parent)
+        return offset + len(line)
+
+    def reset(self) -> None:
+        """Remove the journal once its records are in TODO.md."""
+        self.path.unlink(missing_ok=True)
+
+
+class JournalCompactor:
+    """Daemon thread that calls ``flush`` every ``interval`` seconds (errors are ignored)."""
+
+    def __init__(self, flush: Callable[[], object], interval: float):
+        self.flush = flush
+        self.interval = interval
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="ai-todo-compactor", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the thread and flush one last time."""
+        self._stopped.set()
+        self._thread.join()
+        self._flush()
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self.interval):
+            self._flush()
+
+    def _flush(self) -> None:
+        try:
+            self.flush()
+        except Exception:
+            # Compaction is retried on the next tick; tools report real errors
+            pass
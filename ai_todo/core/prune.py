@@ -1,12 +1,22 @@
 """Prune functionality for removing old archived tasks from TODO.md."""
 
+from collections.abc import Iterator
 from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
-from pathlib import Path
 
+from ai_todo.core.config import Config
 from ai_todo.core.file_ops import FileOps
-from ai_todo.core.task import Task, TaskStatus
-from ai_todo.utils.git import get_task_archive_date
+from ai_todo.core.locking import lock_timeout, todo_lock
+from ai_todo.core.migrations import (
+    TASK_DATES_MIGRATION,
+    date_archived_tasks,
+    migration_pending,
+    run_migrations,
+)
+from ai_todo.core.prune_archive import PruneArchive
+from ai_todo.core.task import Task, TaskManager, TaskStatus
+from ai_todo.core.task_id import TaskId
+from ai_todo.core.task_service import TaskService
 
 
 @dataclass
@@ -58,11 +68,8 @@ class PruneManager:
         This ensures correct numeric ordering: 9, 10, 10.1, 10.2, 100
         instead of lexicographic ordering: 10, 10.1, 10.2, 100, 9
         """
-        try:
-            return tuple(int(part) for part in task_id.split("."))
-        except ValueError:
-            # Fallback for non-numeric IDs (shouldn't happen in practice)
-            return (0,)
+        # Fallback for non-numeric IDs (shouldn't happen in practice)
+        return TaskId.of(task_id).numbers or (0,)
 
     def identify_tasks_to_prune(
         self,
@@ -116,52 +123,28 @@ class PruneManager:
 
     def _filter_by_age(self, tasks: list[Task], cutoff_date: datetime) -> list[Task]:
         """
-        Filter tasks older than cutoff date.
+        Filter tasks archived before the cutoff date.
+
+        A range query on the archived_at index of TaskManager; archived root
+        tasks without an archive date are never selected.
 
         Args:
             tasks: List of archived tasks
-            cutoff_date: Cutoff datetime (must be timezone-aware in UTC)
+            cutoff_date: Cutoff datetime (naive datetimes are taken as local time)
 
         Returns:
             List of tasks to prune
         """
         to_prune = []
+        hierarchy = TaskManager(tasks)
 
-        for task in tasks:
+        for task in hierarchy.tasks_dated_before(TaskStatus.ARCHIVED, cutoff_date):
             # Skip subtasks - they'll be included with parent
             if "." in task.id:
                 continue
-
-            # Get archive date
-            archive_date = get_task_archive_date(task.id, self.todo_path)
-
-            if archive_date is None:
-                # No date found - skip this task
-                continue
-
-            # Normalize both dates to UTC timezone-aware datetime for comparison
-            # If archive_date is timezone-aware, convert to UTC
-            # If archive_date is naive, assume it's already in UTC
-            if archive_date.tzinfo is not None:
-                archive_date_utc = archive_date.astimezone(timezone.utc)
-            else:
-                # Naive datetime - assume it's already UTC
-                archive_date_utc = archive_date.replace(tzinfo=timezone.utc)
-
-            # cutoff_date should already be UTC-aware from identify_tasks_to_prune
-            # But ensure it's UTC for safety
-            if cutoff_date.tzinfo is not None:
-                cutoff_date_utc = cutoff_date.astimezone(timezone.utc)
-            else:
-                # Naive datetime - assume it's UTC
-                cutoff_date_utc = cutoff_date.replace(tzinfo=timezone.utc)
-
-            # Check if older than cutoff
-            if archive_date_utc < cutoff_date_utc:
-                to_prune.append(task)
-                # Include all subtasks
-                subtasks = [t for t in tasks if t.id.startswith(f"{task.id}.")]
-                to_prune.extend(subtasks)
+            to_prune.append(task)
+            # Include all subtasks
+            to_prune.extend(hierarchy.get_subtasks(task.id))
 
         return to_prune
 
@@ -182,6 +165,7 @@ class PruneManager:
             return []
 
         to_prune = []
+        hierarchy = TaskManager(tasks)
 
         for task in tasks:
             # Skip subtasks - they'll be included with parent
@@ -193,8 +177,7 @@ class PruneManager:
                 if int(task.id) <= max_id:
                     to_prune.append(task)
                     # Include all subtasks
-                    subtasks = [t for t in tasks if t.id.startswith(f"{task.id}.")]
-                    to_prune.extend(subtasks)
+                    to_prune.extend(hierarchy.get_subtasks(task.id))
             except ValueError:
                 continue
 
@@ -208,7 +191,11 @@ class PruneManager:
         from_task: str | None = None,
     ) -> str:
         """
-        Create archive backup file before pruning.
+        Append tasks being pruned to the archive before pruning.
+
+        Root tasks are written in numeric order, each followed by its subtasks,
+        streaming through the hierarchy index into the month's compressed
+        segment (see ai_todo.core.prune_archive).
 
         Args:
             tasks_to_prune: Tasks being pruned
@@ -217,29 +204,23 @@ class PruneManager:
             from_task: Task range filter (if used)
 
         Returns:
-            Path to created archive file
+            Path to the archive segment
 
         Format:
-            .ai-todo/archives/TODO_ARCHIVE_YYYY-MM-DD.md
+            .ai-todo/archives/TODO_ARCHIVE_YYYY-MM.md.gz
         """
-        # Create archives directory
-        config_dir = Path(self.todo_path).parent / ".ai-todo"
-        archives_dir = config_dir / "archives"
-        archives_dir.mkdir(parents=True, exist_ok=True)
-
-        # Generate filename
-        timestamp = datetime.now().strftime("%Y-%m-%d")
-        archive_file = archives_dir / f"TODO_ARCHIVE_{timestamp}.md"
-
-        # Handle filename conflicts
-        counter = 1
-        while archive_file.exists():
-            archive_file = archives_dir / f"TODO_ARCHIVE_{timestamp}_{counter}.md"
-            counter += 1
-
-        # Count tasks and subtasks
-        root_tasks = [t for t in tasks_to_prune if "." not in t.id]
-        subtasks = [t for t in tasks_to_prune if "." in t.id]
+        now = datetime.now()
+        timestamp = now.strftime("%Y-%m-%d")
+
+        # Subtasks whose parent is not pruned start a block of their own
+        hierarchy = TaskManager(tasks_to_prune)
+        pruned_ids = {t.id for t in tasks_to_prune}
+        roots = sorted(
+            (t for t in tasks_to_prune if TaskId.of(t.id).parent not in pruned_ids),
+            key=lambda t: self._task_id_sort_key(t.id),
+        )
+        subtask_count = sum(1 for t in tasks_to_prune if "." in t.id)
+        root_count = len(tasks_to_prune) - subtask_count
 
         # Determine pruning criteria description
         if from_task:
@@ -255,15 +236,14 @@ class PruneManager:
             retention_label = "Retention Period"
             retention_value = f"{days} days"
 
-        # Generate archive content
-        content = f"""# Archived Tasks - Pruned on {timestamp}
+        header = f"""# Archived Tasks - Pruned on {timestamp}
 
-This file contains tasks pruned from TODO.md on {timestamp}.
+This run contains tasks pruned from TODO.md on {timestamp}.
 These tasks are {criteria_desc}.
 
 **Prune Statistics:**
-- Tasks Pruned: {len(root_tasks)} root tasks
-- Subtasks Pruned: {len(subtasks)} subtasks
+- Tasks Pruned: {root_count} root tasks
+- Subtasks Pruned: {subtask_count} subtasks
 - Total: {len(tasks_to_prune)} items
 - {retention_label}: {retention_value}
 - Original TODO.md: {self.todo_path}
@@ -271,90 +251,28 @@ These tasks are {criteria_desc}.
 ## Pruned Tasks
 
 """
-
-        # Add tasks in standard TODO.md format
-        # Sort root tasks numerically for correct ordering
-        root_tasks_sorted = sorted(
-            [t for t in tasks_to_prune if "." not in t.id],
-            key=lambda t: self._task_id_sort_key(t.id),
-        )
-
-        for task in root_tasks_sorted:
-            # Add root task
-            content += self._format_task(task)
-
-            # Add subtasks
-            task_subtasks = [
-                t
-                for t in tasks_to_prune
-                if t.id.startswith(f"{task.id}.") and t.id.count(".") == task.id.count(".") + 1
-            ]
-            for subtask in sorted(task_subtasks, key=lambda t: self._task_id_sort_key(t.id)):
-                content += self._format_task(subtask)
-
-            content += "\n"
-
-        # Add TASK_METADATA section for pruned tasks
-        has_metadata = any(t.created_at is not None for t in tasks_to_prune)
-        if has_metadata:
-            content += "---\n\n## Task Metadata\n\n"
-            content += "<!-- TASK_METADATA\n"
-            content += "# Format: task_id:created_at[:updated_at]\n"
-
-            for task in sorted(tasks_to_prune, key=lambda x: self._task_id_sort_key(x.id)):
-                if task.created_at is not None:
-                    created_str = task.created_at.isoformat()
-                    if task.updated_at is not None and task.updated_at != task.created_at:
-                        updated_str = task.updated_at.isoformat()
-                        content += f"{task.id}:{created_str}:{updated_str}\n"
-                    else:
-                        content += f"{task.id}:{created_str}\n"
-
-            content += "-->\n\n"
-
-        # Add footer
-        content += f"""---
-**Prune Date:** {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}
+        footer = f"""---
+**Prune Date:** {now.strftime("%Y-%m-%d %H:%M:%S")}
 **{retention_label}:** {retention_value}
-**Tasks Pruned:** {len(root_tasks)} tasks, {len(subtasks)} subtasks
+**Tasks Pruned:** {root_count} tasks, {subtask_count} subtasks
 **Original TODO.md:** {self.todo_path}
-"""
-
-        # Write archive file
-        archive_file.write_text(content, encoding="utf-8")
 
-        return str(archive_file)
-
-    def _format_task(self, task: Task) -> str:
-        """
-        Format task for archive file (standard TODO.md format).
-
-        Args:
-            task: Task to format
-
-        Returns:
-            Formatted task string
-        """
-        indent = "  " * task.id.count(".")
-        checkbox = "[x]"  # Archived tasks are completed
-        tags = " ".join(f"`#{tag}`" for tag in sorted(task.tags)) if task.tags else ""
-
-        line = f"{indent}- {checkbox} **#{task.id}** {task.description}"
-        if tags:
-            line += f" {tags}"
-
-        # Add completion date if available
-        if task.completed_at:
-            date_str = task.completed_at.strftime("%Y-%m-%d")
-            line += f" ({date_str})"
+"""
 
-        line += "\n"
+        def subtree(task_id: str) -> Iterator[Task]:
+            children = hierarchy.get_children(task_id)
+            for child in sorted(children, key=lambda t: self._task_id_sort_key(t.id)):
+                yield child
+                yield from subtree(child.id)
 
-        # Add notes
-        for note in task.notes:
-            line += f"{indent}  > {note}\n"
+        archive = PruneArchive(self.file_ops.config_dir / "archives")
+        with archive.append(now) as writer:
+            writer.write(header)
+            for root in roots:
+                writer.add_tree(root, list(subtree(root.id)))
+            writer.write(footer)
 
-        return line
+        return str(archive.segment_path(now))
 
     def prune_tasks(
         self,
@@ -385,9 +303,33 @@ These tasks are {criteria_desc}.
             5. Remove pruned tasks from task list
             6. Write remaining tasks via FileOps
             7. Return result
+
+        Raises:
+            LockTimeoutError: If another writer holds TODO.md for too long
         """
+        if dry_run:
+            return self._prune_tasks(days, older_than, from_task, dry_run, backup)
+        # Files written before task dates were persisted get them once
+        run_migrations(self.todo_path)
+        config = Config(str(self.file_ops.config_dir / "config.yaml"))
+        with todo_lock(self.todo_path).locked(lock_timeout(config)):
+            # Journaled operations must be in TODO.md before it is rewritten
+            TaskService(self.todo_path).flush()
+            return self._prune_tasks(days, older_than, from_task, dry_run, backup)
+
+    def _prune_tasks(
+        self,
+        days: int | None,
+        older_than: str | None,
+        from_task: str | None,
+        dry_run: bool,
+        backup: bool,
+    ) -> PruneResult:
         # Read tasks
         tasks = self.file_ops.read_tasks()
+        if dry_run and migration_pending(self.file_ops.config_dir, TASK_DATES_MIGRATION):
+            # The archive dates the migration would persist, in memory only
+            date_archived_tasks(self.todo_path, tasks, self.file_ops.state_dir)
 
         # Identify tasks to prune
         to_prune = self.identify_tasks_to_prune(
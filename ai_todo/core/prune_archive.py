@@ -0,0 +1,217 @@
+"""Archive of pruned tasks (``.ai-todo/archives/``).
+
+Each prune appends one run to the segment of the current month,
+``TODO_ARCHIVE_<YYYY-MM>.md.gz``: a gzip member with the run's header, then
+members of ~64 KiB of task blocks (root tasks with their subtasks in TODO.md
+format, followed by a TASK_METADATA comment for those tasks), then a member
+with the footer. The segment is a valid multi-member .gz file, so
+``gzip -dc`` shows the whole month as Markdown.
+
+``manifest.tsv`` next to the segments maps root task IDs to the member
+holding their block, so looking up one pruned task (``ai-todo show
+--archived 123``) decompresses that member only. Tab-separated lines:
+``task <root id> <segment> <gzip offset> <gzip length>`` for each block and
+``end <segment> <length>`` after each run. A run cut short by a crash is
+cut off the segment at the last ``end`` by the next append; its tasks are
+still in TODO.md, which prune rewrites only after the run completed.
+"""
+
+import gzip
+import os
+from collections.abc import Iterator
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import BinaryIO
+
+from ai_todo.core.file_ops import TIMESTAMPS_FORMAT_LINE, FileOps
+from ai_todo.core.task import Task, TaskManager
+from ai_todo.core.task_id import TaskId
+from ai_todo.parsers.markdown import parse_markdown
+
+MANIFEST_NAME = "manifest.tsv"
+
+_BLOCK_SIZE = 64 * 1024
+
+
+class ArchiveWriter:
+    """Appends one prune run to a segment. Use PruneArchive.append() to get one."""
+
+    def __init__(self, segment: BinaryIO, name: str):
+        self._segment = segment
+        self._name = name
+        self._blocks: list[str] = []
+        self._metadata: list[str] = []
+        self._roots: list[str] = []
+        self._size = 0
+        self.manifest_lines: list[str] = []
+
+    def write(self, text: str) -> None:
+        """Write free text (the header or footer) as its own member, after any pending tasks."""
+        self._flush_tasks()
+        self._member(text)
+
+    def add_tree(self, root: Task, subtasks: list[Task]) -> None:
+        """Add a root task (or a subtask whose parent is not pruned) with its subtasks.
+
+        Args:
+            root: The task the lookup finds the block by
+            subtasks: Its subtasks, parents before children
+        """
+        for task in (root, *subtasks):
+            block = format_archived_task(task)
+            self._blocks.append(block)
+            self._size += len(block)
+            if task.created_at is not None:
+                self._metadata.append(FileOps._format_timestamps(task) + "\n")
+        self._roots.append(root.id)
+        if self._size >= _BLOCK_SIZE:
+            self._flush_tasks()
+
+    def close(self) -> None:
+        """Write pending tasks and record the end of the run."""
+        self._flush_tasks()
+        self._segment.flush()
+        os.fsync(self._segment.fileno())
+        self.manifest_lines.append(f"end\t{self._name}\t{self._segment.tell()}")
+
+    def _flush_tasks(self) -> None:
+        if not self._roots:
+            return
+        text = "".join(self._blocks) + "\n"
+        if self._metadata:
+            text += "<!-- TASK_METADATA\n" + TIMESTAMPS_FORMAT_LINE + "\n"
+            text += "".join(self._metadata) + "-->\n\n"
+        offset, length = self._member(text)
+        self.manifest_lines += [
+            f"task\t{root_id}\t{self._name}\t{offset}\t{length}" for root_id in self._roots
+        ]
+        self._blocks, self._metadata, self._roots, self._size = [], [], [], 0
+
+    def _member(self, text: str) -> tuple[int, int]:
+        data = gzip.compress(text.encode("utf-8"), compresslevel=6)
+        offset = self._segment.tell()
+        self._segment.write(data)
+        return offset, len(data)
+
+
+class PruneArchive:
+    """Monthly segments of pruned tasks with a manifest for lookups by task ID."""
+
+    def __init__(self, archives_dir: Path):
+        self.archives_dir = archives_dir
+        self.manifest = archives_dir / MANIFEST_NAME
+
+    def segment_path(self, when: datetime) -> Path:
+        """Segment that runs at ``when`` append to."""
+        return self.archives_dir / f"TODO_ARCHIVE_{when:%Y-%m}.md.gz"
+
+    @contextmanager
+    def append(self, when: datetime) -> Iterator[ArchiveWriter]:
+        """Open the segment of ``when`` for one run; the manifest is updated when it completes.
+
+        Callers serialize runs (prune holds the TODO.md lock).
+        """
+        segment = self.segment_path(when)
+        self.archives_dir.mkdir(parents=True, exist_ok=True)
+        with open(segment, "ab") as f:
+            end = self._recorded_end(segment.name)
+            if end is not None and f.tell() > end:
+                f.truncate(end)  # Drop a run that did not complete
+                f.seek(end)
+            start = f.tell()
+            writer = ArchiveWriter(f, segment.name)
+            try:
+                yield writer
+            except BaseException:
+                f.truncate(start)
+                raise
+            writer.close()
+        with open(self.manifest, "a", encoding="utf-8") as m:
+            m.write("".join(line + "\n" for line in writer.manifest_lines))
+
+    def find(self, task_id: str) -> list[Task] | None:
+        """Return a pruned task and its subtasks (parents first), or None if it is not archived.
+
+        The newest run that pruned the task wins. Only the manifest and the one
+        gzip member holding the task are read, and only the task's block is parsed.
+        """
+        try:
+            manifest = b"\n" + self.manifest.read_bytes()
+        except FileNotFoundError:
+            return None
+        key: str | None = task_id
+        while key is not None:
+            start = manifest.rfind(f"\ntask\t{key}\t".encode())
+            if start != -1:
+                break
+            key = TaskId.of(key).parent
+        else:
+            return None
+        line = manifest[start + 1 : manifest.find(b"\n", start + 1)].decode("utf-8")
+        _, _, name, offset, length = line.split("\t")
+        try:
+            with open(self.archives_dir / name, "rb") as f:
+                f.seek(int(offset))
+                text = gzip.decompress(f.read(int(length))).decode("utf-8")
+        except (OSError, EOFError, gzip.BadGzipFile):
+            return None
+        block = _cut_block(text, key)
+        if block is None:
+            return None
+        manager = TaskManager(parse_markdown("## Archived Tasks\n" + block).tasks)
+        task = manager.get_task(task_id)
+        if task is None:
+            return None
+        return [task, *manager.get_subtasks(task_id)]
+
+    def _recorded_end(self, name: str) -> int | None:
+        """Length of the segment after its last completed run, per the manifest."""
+        try:
+            manifest = b"\n" + self.manifest.read_bytes()
+        except FileNotFoundError:
+            return None
+        start = manifest.rfind(f"\nend\t{name}\t".encode())
+        if start == -1:
+            return None
+        end = manifest.find(b"\n", start + 1)
+        return int(manifest[start + 1 : end if end != -1 else None].split(b"\t")[2])
+
+
+def _cut_block(text: str, root_id: str) -> str | None:
+    """Return the lines of one block in a member (task lines and TASK_METADATA), or None."""
+    tasks_part, _, metadata_part = text.partition("<!-- TASK_METADATA\n")
+    lines = tasks_part.splitlines(keepends=True)
+    marker = f"- [x] **#{root_id}** "
+    start = next((i for i, line in enumerate(lines) if line.lstrip(" ").startswith(marker)), None)
+    if start is None:
+        return None
+    indent = len(lines[start]) - len(lines[start].lstrip(" "))
+    end = start + 1
+    # Subtasks and notes are indented deeper; the next block or the blank line ends it
+    while end < len(lines) and lines[end].strip():
+        if len(lines[end]) - len(lines[end].lstrip(" ")) <= indent:
+            break
+        end += 1
+    metadata = [
+        line
+        for line in metadata_part.splitlines(keepends=True)
+        if line.startswith((f"{root_id}:", f"{root_id}."))
+    ]
+    block = "".join(lines[start:end])
+    if metadata:
+        block += "<!-- TASK_METADATA\n" + "".join(metadata) + "-->\n"
+    return block
+
+
+def format_archived_task(task: Task) -> str:
+    """Format a pruned task and its notes as in TODO.md's Archived Tasks section."""
+    indent = "  " * min(task.id.count("."), 2)
+    description = task.description
+    if task.tags:
+        tags = " ".join(f"`{t}`" if t.startswith("#") else f"`#{t}`" for t in sorted(task.tags))
+        description = f"{description} {tags}".strip()
+    line = f"{indent}- [x] **#{task.id}** {description}"
+    if task.archived_at:
+        line += f" ({task.archived_at:%Y-%m-%d})"
+    return line + "\n" + "".join(f"{indent}  > {note}\n" for note in task.notes)
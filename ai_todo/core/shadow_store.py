@@ -0,0 +1,334 @@
+"""Shadow store: the history of verified TODO.md contents, kept as compressed deltas.
+
+The shadow copy is what ``tamper diff`` compares an externally modified
+TODO.md against and what ``tamper accept`` archives as ``original.md``.
+Instead of a full duplicate rewritten on every write, each verified content
+is recorded in a pack file under ``.ai-todo/state/shadow/``: a pack starts
+with a compressed full snapshot and continues with compressed line deltas
+against the previous record, so a write appends roughly the size of its
+change. After ``security.shadow_snapshot_interval`` records (default 50) a
+new pack starts with a fresh snapshot; only the newest
+``security.shadow_history`` packs (default 10) are kept.
+
+Records are addressed by the TODO.md checksum. Each is a text header
+``<checksum> <kind> <recorded_at> <length>`` followed by ``length`` bytes of
+zlib data. A record cut short by a crash is ignored and overwritten by the
+next append, like the operation journal's; a pack whose first record was cut
+short is started over by the next snapshot.
+"""
+
+import json
+import os
+import zlib
+from bisect import bisect_left
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+
+DEFAULT_SNAPSHOT_INTERVAL = 50  # Records per pack (one snapshot, then deltas)
+DEFAULT_KEEP_PACKS = 10
+
+# Lines of the newest record per shadow directory, so a write does not replay the pack
+_head_cache: dict[str, "_Head"] = {}
+
+
+@dataclass
+class ShadowVersion:
+    """A recorded TODO.md content."""
+
+    checksum: str
+    kind: str  # "snapshot" or "delta"
+    recorded_at: datetime
+    size: int  # Compressed bytes stored for this record
+
+
+@dataclass
+class _Record:
+    version: ShadowVersion
+    start: int  # Offset of the payload in the pack
+
+
+@dataclass
+class _Head:
+    pack: Path
+    end: int  # Offset just past the last complete record
+    count: int  # Records in the pack
+    checksum: str
+    lines: list[str]
+
+
+class ShadowStore:
+    """Pack files of verified TODO.md contents. Callers serialize record() with the write lock."""
+
+    def __init__(
+        self,
+        directory: Path,
+        legacy_path: Path | None = None,
+        snapshot_interval: int = DEFAULT_SNAPSHOT_INTERVAL,
+        keep_packs: int = DEFAULT_KEEP_PACKS,
+    ):
+        self.directory = directory
+        # Full shadow copy written by earlier versions, read until the first record.
+        # Never removed: projects may track it in git.
+        self.legacy_path = legacy_path
+        self.snapshot_interval = max(1, snapshot_interval)
+        self.keep_packs = max(1, keep_packs)
+
+    def exists(self) -> bool:
+        """Whether any shadow content is available."""
+        return bool(self._packs()) or (self.legacy_path is not None and self.legacy_path.exists())
+
+    def record(self, content: str, checksum: str) -> None:
+        """Record ``content`` (with checksum ``checksum``) as the newest verified content."""
+        head = self._head()
+        if head is not None and head.checksum == checksum:
+            return  # Already recorded (e.g. an interrupted write being rolled forward)
+        lines = content.splitlines(keepends=True)
+        if head is None or head.count >= self.snapshot_interval:
+            pack = self._next_pack(head)
+            offset, count, kind = 0, 0, "snapshot"
+            payload = zlib.compress(content.encode("utf-8"))
+        else:
+            pack, offset, count, kind = head.pack, head.end, head.count, "delta"
+            ops = line_delta(head.lines, lines)
+            payload = zlib.compress(json.dumps(ops, separators=(",", ":")).encode("utf-8"))
+
+        recorded_at = datetime.now().isoformat(timespec="seconds")
+        header = f"{checksum} {kind} {recorded_at} {len(payload)}\n".encode()
+        end = _append(pack, offset, header + payload)
+        _head_cache[str(self.directory)] = _Head(pack, end, count + 1, checksum, lines)
+
+        if kind == "snapshot":
+            self._drop_old_packs()
+
+    def read(self, checksum: str | None = None) -> str | None:
+        """Return a recorded content.
+
+        Args:
+            checksum: Checksum (or unique prefix) of the version; the newest if omitted
+
+        Returns:
+            The content, or None if no such version is recorded
+        """
+        if checksum is None:
+            head = self._head()
+            if head is not None:
+                return "".join(head.lines)
+            # The newest pack holds no complete record (torn by a crash)
+            for pack in reversed(self._packs()[:-1]):
+                records, _ = _scan(pack)
+                if records:
+                    return "".join(_reconstruct(pack, records, len(records) - 1))
+            if self.legacy_path is not None and self.legacy_path.exists():
+                return self.legacy_path.read_text(encoding="utf-8")
+            return None
+
+        for pack in reversed(self._packs()):
+            records, _ = _scan(pack)
+            for index in range(len(records) - 1, -1, -1):
+                if records[index].version.checksum.startswith(checksum):
+                    return "".join(_reconstruct(pack, records, index))
+        return None
+
+    def history(self) -> list[ShadowVersion]:
+        """Return the recorded versions, oldest first (reads only record headers)."""
+        return [record.version for pack in self._packs() for record in _scan(pack)[0]]
+
+    def _packs(self) -> list[Path]:
+        try:
+            return sorted(self.directory.glob("*.pack"))
+        except OSError:
+            return []
+
+    def _head(self) -> _Head | None:
+        packs = self._packs()
+        if not packs:
+            return None
+        pack = packs[-1]
+        cached = _head_cache.get(str(self.directory))
+        if cached is not None and cached.pack == pack and _size(pack) == cached.end:
+            return cached
+        records, end = _scan(pack)
+        if not records:
+            return None
+        head = _Head(pack, end, len(records), records[-1].version.checksum, [])
+        head.lines = _reconstruct(pack, records, len(records) - 1)
+        _head_cache[str(self.directory)] = head
+        return head
+
+    def _next_pack(self, head: _Head | None) -> Path:
+        """Return the pack a new snapshot starts, given the head of the newest pack."""
+        packs = self._packs()
+        if not packs:
+            return self.directory / f"{1:06d}.pack"
+        if head is None:
+            return packs[-1]  # Its first record was cut short: start the pack over
+        return self.directory / f"{int(packs[-1].stem) + 1:06d}.pack"
+
+    def _drop_old_packs(self) -> None:
+        for pack in self._packs()[: -self.keep_packs]:
+            pack.unlink(missing_ok=True)
+
+
+def line_delta(old: list[str], new: list[str]) -> list[list[int] | str]:
+    """Return operations that rebuild ``new`` from ``old``.
+
+    ``[start, end]`` copies ``old[start:end]``; a string is an inserted line.
+    Runs of equal lines are copied; after a difference the scan resumes where
+    two lines match again, looking a few lines ahead first and then anywhere
+    after the current position. Linear in the file size, unlike a minimal
+    diff, which matters for TODO.md files with tens of thousands of lines.
+    """
+    positions: dict[str, list[int]] | None = None
+    ops: list[list[int] | str] = []
+    i = j = 0
+    while j < len(new):
+        run = _common_run(old, i, new, j)
+        if run:
+            ops.append([i, i + run])
+            i += run
+            j += run
+            continue
+        resync = _resync_nearby(old, new, i, j)
+        if resync is None:
+            if positions is None:
+                positions = {}
+                for index, line in enumerate(old):
+                    positions.setdefault(line, []).append(index)
+            resync = _resync_anywhere(positions, old, new, i, j)
+        if resync is None:
+            ops.append(new[j])
+            j += 1
+        else:
+            ops.extend(new[j : resync[1]])
+            i, j = resync
+    return ops
+
+
+def apply_delta(old: list[str], ops: list[list[int] | str]) -> list[str]:
+    """Rebuild the lines a line_delta() was computed for."""
+    lines: list[str] = []
+    for op in ops:
+        if isinstance(op, str):
+            lines.append(op)
+        else:
+            lines.extend(old[op[0] : op[1]])
+    return lines
+
+
+def _common_run(old: list[str], i: int, new: list[str], j: int) -> int:
+    """Length of the run of equal lines at old[i:] and new[j:] (compared in slices)."""
+    limit = min(len(old) - i, len(new) - j)
+    run, step = 0, 1
+    while run < limit:
+        step = min(step, limit - run)
+        if old[i + run : i + run + step] == new[j + run : j + run + step]:
+            run += step
+            step *= 2
+        elif step == 1:
+            break
+        else:
+            step //= 2
+    return run
+
+
+def _matches(old: list[str], i: int, new: list[str], j: int) -> bool:
+    """Whether old and new continue alike at (i, j) for two lines (or to an end)."""
+    if i >= len(old) or j >= len(new) or old[i] != new[j]:
+        return False
+    return i + 1 >= len(old) or j + 1 >= len(new) or old[i + 1] == new[j + 1]
+
+
+def _resync_nearby(
+    old: list[str], new: list[str], i: int, j: int, window: int = 32
+) -> tuple[int, int] | None:
+    """Closest (i, j) after lines deleted, inserted or changed at (i, j)."""
+    for distance in range(1, window):
+        for candidate in ((i + distance, j), (i, j + distance), (i + distance, j + distance)):
+            if _matches(old, candidate[0], new, candidate[1]):
+                return candidate
+    return None
+
+
+def _resync_anywhere(
+    positions: dict[str, list[int]], old: list[str], new: list[str], i: int, j: int
+) -> tuple[int, int] | None:
+    """First position >= i (among the next few) where old continues like new[j:]."""
+    candidates = positions.get(new[j], [])
+    first = bisect_left(candidates, i)
+    for p in candidates[first : first + 8]:
+        if _matches(old, p, new, j):
+            return p, j
+    return None
+
+
+def _scan(pack: Path) -> tuple[list[_Record], int]:
+    """Read the record headers of a pack.
+
+    Returns:
+        The complete records and the offset just past the last one
+    """
+    records: list[_Record] = []
+    end = 0
+    try:
+        size = _size(pack)
+        with open(pack, "rb") as f:
+            while True:
+                header = f.readline()
+                parts = header.split()
+                if not header.endswith(b"\n") or len(parts) != 4 or not parts[3].isdigit():
+                    break
+                start, length = f.tell(), int(parts[3])
+                if start + length > size:
+                    break  # Payload cut short
+                f.seek(length, os.SEEK_CUR)
+                version = ShadowVersion(
+                    checksum=parts[0].decode(),
+                    kind=parts[1].decode(),
+                    recorded_at=datetime.fromisoformat(parts[2].decode()),
+                    size=length,
+                )
+                records.append(_Record(version, start))
+                end = start + length
+    except FileNotFoundError:
+        pass
+    return records, end
+
+
+def _reconstruct(pack: Path, records: list[_Record], index: int) -> list[str]:
+    """Return the lines of ``records[index]`` by replaying the pack up to it."""
+    data = pack.read_bytes()
+    lines: list[str] = []
+    for record in records[: index + 1]:
+        payload = zlib.decompress(data[record.start : record.start + record.version.size])
+        if record.version.kind == "snapshot":
+            lines = payload.decode("utf-8").splitlines(keepends=True)
+        else:
+            lines = apply_delta(lines, json.loads(payload))
+    return lines
+
+
+def _append(pack: Path, offset: int, data: bytes) -> int:
+    """Write ``data`` at ``offset`` (dropping a torn record after it), fsync, return the end."""
+    from ai_todo.core.file_ops import _fsync_directory
+
+    created = not pack.exists()
+    pack.parent.mkdir(parents=True, exist_ok=True)
+    fd = os.open(pack, os.O_WRONLY | os.O_CREAT, 0o644)
+    try:
+        os.ftruncate(fd, offset)
+        os.lseek(fd, offset, os.SEEK_SET)
+        os.write(fd, data)
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+    if created:
+        _fsync_directory(pack.parent)
+    return offset + len(data)
+
+
+def _size(path: Path) -> int:
+    try:
+        return os.stat(path).st_size
+    except FileNotFoundError:
+        return -1
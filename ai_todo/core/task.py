@@ -1,5 +1,10 @@
+import threading
+from bisect import bisect_left, insort
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
 from dataclasses import dataclass, field
-from datetime import datetime
+from datetime import datetime, timezone
 from enum import Enum
 from typing import Any
 
@@ -13,6 +18,45 @@ class TaskStatus(Enum):
     DELETED = "deleted"
 
 
+# Task date attributes persisted in TASK_METADATA besides created_at/updated_at
+DATE_FIELDS = ("completed_at", "archived_at", "deleted_at", "expires_at")
+
+# Date the TaskManager date index orders each status by (see tasks_dated_before())
+DATE_INDEXED = {TaskStatus.ARCHIVED: "archived_at", TaskStatus.DELETED: "expires_at"}
+
+
+def as_utc(value: datetime) -> datetime:
+    """Return a timezone-aware UTC datetime.
+
+    Naive datetimes are taken as local time, as ai-todo stamps task dates with
+    ``datetime.now()``.
+    """
+    return value.astimezone(timezone.utc)
+
+
+# Time task changes are stamped with instead of the current time (see fixed_time())
+_fixed_time: ContextVar[datetime | None] = ContextVar("fixed_time", default=None)
+
+
+def current_time() -> datetime:
+    """Return the time to stamp task changes with."""
+    return _fixed_time.get() or datetime.now()
+
+
+@contextmanager
+def fixed_time(moment: datetime) -> Iterator[None]:
+    """Stamp task changes made in this thread (and context) with ``moment``.
+
+    Lets an operation replayed from the operation journal produce the dates it
+    had when it first ran.
+    """
+    token = _fixed_time.set(moment)
+    try:
+        yield
+    finally:
+        _fixed_time.reset(token)
+
+
 @dataclass
 class Task:
     """
@@ -35,40 +79,49 @@ class Task:
     status: TaskStatus = TaskStatus.PENDING
     tags: set[str] = field(default_factory=set)
     notes: list[str] = field(default_factory=list)
-    created_at: datetime = field(default_factory=datetime.now)
-    updated_at: datetime = field(default_factory=datetime.now)
+    created_at: datetime = field(default_factory=current_time)
+    updated_at: datetime = field(default_factory=current_time)
     completed_at: datetime | None = None
     archived_at: datetime | None = None
     deleted_at: datetime | None = None
     expires_at: datetime | None = None
 
+    def copy(self) -> "Task":
+        """Return an independent copy (tags and notes are not shared)."""
+        # Copy the instance dict directly; copy.copy() is several times slower
+        clone = Task.__new__(Task)
+        clone.__dict__.update(self.__dict__)
+        clone.tags = set(self.tags)
+        clone.notes = list(self.notes)
+        return clone
+
     def add_tag(self, tag: str) -> None:
         """Add a tag to the task."""
         self.tags.add(tag)
-        self.updated_at = datetime.now()
+        self.updated_at = current_time()
 
     def remove_tag(self, tag: str) -> None:
         """Remove a tag from the task."""
         self.tags.discard(tag)
-        self.updated_at = datetime.now()
+        self.updated_at = current_time()
 
     def add_note(self, note: str) -> None:
         """Add a note to the task."""
         self.notes.append(note)
-        self.updated_at = datetime.now()
+        self.updated_at = current_time()
 
     def mark_completed(self) -> None:
         """Mark task as completed."""
         self.status = TaskStatus.COMPLETED
-        self.completed_at = datetime.now()
-        self.updated_at = datetime.now()
+        self.completed_at = current_time()
+        self.updated_at = current_time()
         self.remove_tag(IN_PROGRESS_TAG)
 
     def mark_archived(self) -> None:
         """Mark task as archived."""
         self.status = TaskStatus.ARCHIVED
-        self.archived_at = datetime.now()
-        self.updated_at = datetime.now()
+        self.archived_at = current_time()
+        self.updated_at = current_time()
         self.remove_tag(IN_PROGRESS_TAG)
         # If task was completed, preserve completed_at
         if not self.completed_at and self.status == TaskStatus.ARCHIVED:
@@ -78,12 +131,12 @@ class Task:
     def mark_deleted(self) -> None:
         """Mark task as deleted."""
         self.status = TaskStatus.DELETED
-        self.deleted_at = datetime.now()
+        self.deleted_at = current_time()
         # Set expiry to 30 days from deletion
         from datetime import timedelta
 
         self.expires_at = self.deleted_at + timedelta(days=30)
-        self.updated_at = datetime.now()
+        self.updated_at = current_time()
         self.remove_tag(IN_PROGRESS_TAG)
 
     def restore(self) -> None:
@@ -100,14 +153,311 @@ class Task:
 
         self.archived_at = None
         self.deleted_at = None
-        self.updated_at = datetime.now()
+        self.updated_at = current_time()
+
+
+@dataclass
+class TaskFilter:
+    """Criteria for TaskManager.find_tasks(); unset fields match every task.
+
+    Attributes:
+        statuses: Match tasks in any of these statuses
+        tags: Match tasks carrying all of these tags (any of them if match_any_tag)
+        match_any_tag: Combine ``tags`` with OR instead of AND
+        id_range: Inclusive (first, last) range of root serials, e.g. (10, 50)
+        parents_only: Only root tasks
+        has_subtasks: Only tasks with at least one matching direct subtask
+    """
+
+    statuses: set[TaskStatus] | None = None
+    tags: list[str] = field(default_factory=list)
+    match_any_tag: bool = False
+    id_range: tuple[int, int] | None = None
+    parents_only: bool = False
+    has_subtasks: bool = False
+
+
+def root_serial(task_id: str) -> int | None:
+    """Return the numeric root serial of a task ID, or None if it has none.
+
+    Examples: "50" -> 50, "50.3" -> 50, "fxstein-50.3" -> 50, "abc" -> None
+    """
+    base = task_id.rsplit("-", 1)[-1].split(".", 1)[0]
+    return int(base) if base.isdigit() else None
 
 
 class TaskManager:
-    """Core task management operations"""
+    """Core task management operations.
+
+    Status and tag changes must go through the manager's methods (not by
+    mutating Task objects directly) so the secondary indexes stay in sync.
+    """
 
     def __init__(self, tasks: list[Task] | None = None):
-        self._tasks: dict[str, Task] = {t.id: t for t in tasks} if tasks else {}
+        self._tasks: dict[str, Task] = {}
+        # Task order (file order) as a doubly linked list of IDs, so tasks can be
+        # moved to the top or next to their parent without rebuilding a list
+        self._prev: dict[str, str | None] = {}
+        self._next: dict[str, str | None] = {}
+        self._head: str | None = None
+        self._tail: str | None = None
+        self._ordered: list[Task] | None = None  # Cached traversal of the linked list
+        # Hierarchy index: direct child IDs per parent ID (in insertion order) and
+        # the highest numeric child ordinal per parent ("1.3" -> 3 for parent "1")
+        self._children: dict[str, list[str]] = {}
+        self._max_child: dict[str, int] = {}
+        # Highest root serial of any task ID ("fxstein-50.3" -> 50)
+        self._max_serial = 0
+        # Secondary indexes for find_tasks(), built on first use: task IDs by status,
+        # by tag and by root serial, plus the (status, tags) each task is indexed under
+        self._by_status: dict[TaskStatus, set[str]] | None = None
+        self._by_tag: dict[str, set[str]] = {}
+        self._by_serial: dict[int, set[str]] = {}
+        # Archived tasks by archived_at and deleted tasks by expires_at, as sorted
+        # (UTC date, task ID) lists; None until the indexes are built
+        self._by_date: dict[TaskStatus, list[tuple[datetime, str]]] | None = None
+        self._indexed: dict[
+            str, tuple[TaskStatus, frozenset[str], tuple[datetime, str] | None]
+        ] = {}
+        self._rank: dict[str, int] | None = None  # Position of each task in file order
+        self._index_lock = threading.Lock()  # Threads sharing a manager build indexes once
+        for task in tasks or []:
+            self._store(task)
+
+    def copy(self) -> "TaskManager":
+        """Return a manager over copies of the tasks, in the same order.
+
+        Copies the order and hierarchy bookkeeping instead of re-inserting every
+        task; the secondary indexes are rebuilt on first use.
+        """
+        clone = TaskManager()
+        clone._tasks = {task_id: task.copy() for task_id, task in self._tasks.items()}
+        clone._prev = dict(self._prev)
+        clone._next = dict(self._next)
+        clone._head, clone._tail = self._head, self._tail
+        clone._children = {parent: list(ids) for parent, ids in self._children.items()}
+        clone._max_child = dict(self._max_child)
+        clone._max_serial = self._max_serial
+        return clone
+
+    def _store(self, task: Task) -> None:
+        """Insert (at the end) or replace a task, keeping the indexes in sync."""
+        if task.id not in self._tasks:
+            self._link_after(task.id, self._tail)
+            parent_id, sep, ordinal = task.id.rpartition(".")
+            if sep:
+                self._children.setdefault(parent_id, []).append(task.id)
+                if ordinal.isdigit():
+                    self._max_child[parent_id] = max(
+                        self._max_child.get(parent_id, 0), int(ordinal)
+                    )
+            serial = root_serial(task.id)
+            if serial is not None and serial > self._max_serial:
+                self._max_serial = serial
+        self._tasks[task.id] = task
+        self._ordered = None
+        self._reindex(task)
+
+    def _link_after(self, task_id: str, anchor_id: str | None) -> None:
+        """Link an unlinked ID after ``anchor_id`` (at the front if None)."""
+        following = self._head if anchor_id is None else self._next[anchor_id]
+        self._prev[task_id] = anchor_id
+        self._next[task_id] = following
+        if anchor_id is None:
+            self._head = task_id
+        else:
+            self._next[anchor_id] = task_id
+        if following is None:
+            self._tail = task_id
+        else:
+            self._prev[following] = task_id
+        self._ordered = None
+        self._rank = None
+
+    def _unlink(self, task_id: str) -> None:
+        previous, following = self._prev.pop(task_id), self._next.pop(task_id)
+        if previous is None:
+            self._head = following
+        else:
+            self._next[previous] = following
+        if following is None:
+            self._tail = previous
+        else:
+            self._prev[following] = previous
+
+    def move_to_top(self, task_id: str) -> None:
+        """Move a task to the first position."""
+        if task_id not in self._tasks:
+            raise ValueError(f"Task {task_id} not found")
+        self._unlink(task_id)
+        self._link_after(task_id, None)
+
+    def move_after(self, task_id: str, anchor_id: str) -> None:
+        """Move a task directly after another task."""
+        if task_id not in self._tasks:
+            raise ValueError(f"Task {task_id} not found")
+        if anchor_id not in self._tasks:
+            raise ValueError(f"Task {anchor_id} not found")
+        if task_id == anchor_id:
+            return
+        self._unlink(task_id)
+        self._link_after(task_id, anchor_id)
+
+    def max_serial(self) -> int:
+        """Return the highest root serial among all task IDs (0 if none)."""
+        return self._max_serial
+
+    def build_indexes(self) -> None:
+        """Build the secondary indexes now instead of on the first query that needs them."""
+        self._status_index()
+
+    def _status_index(self) -> dict[TaskStatus, set[str]]:
+        """Return the status index, building the secondary indexes first if needed."""
+        by_status = self._by_status
+        if by_status is None:
+            with self._index_lock:
+                by_status = self._by_status
+                if by_status is None:
+                    by_status = self._build_indexes()
+        return by_status
+
+    def _build_indexes(self) -> dict[TaskStatus, set[str]]:
+        # Built aside and published with _by_status last: threads reading a shared
+        # manager (see TaskStore) test _by_status and must never see a partial index
+        by_status: dict[TaskStatus, set[str]] = {status: set() for status in TaskStatus}
+        by_tag: dict[str, set[str]] = {}
+        by_serial: dict[int, set[str]] = {}
+        by_date: dict[TaskStatus, list[tuple[datetime, str]]] = {s: [] for s in DATE_INDEXED}
+        indexed = {}
+        for task in self._tasks.values():
+            by_status[task.status].add(task.id)
+            for tag in task.tags:
+                by_tag.setdefault(tag, set()).add(task.id)
+            serial = root_serial(task.id)
+            if serial is not None:
+                by_serial.setdefault(serial, set()).add(task.id)
+            dated = self._dated(task)
+            if dated is not None:
+                by_date[task.status].append(dated)
+            indexed[task.id] = (task.status, frozenset(task.tags), dated)
+        for entries in by_date.values():
+            entries.sort()
+        self._by_tag, self._by_serial, self._by_date = by_tag, by_serial, by_date
+        self._indexed = indexed
+        self._by_status = by_status
+        return by_status
+
+    @staticmethod
+    def _dated(task: Task) -> tuple[datetime, str] | None:
+        """Return the (UTC date, ID) entry of a task in the date index, if it has one."""
+        date_attr = DATE_INDEXED.get(task.status)
+        if date_attr is None:
+            return None
+        value = getattr(task, date_attr)
+        return None if value is None else (as_utc(value), task.id)
+
+    def _reindex(self, task: Task) -> None:
+        """Update the secondary indexes after a task's status, tags or dates changed."""
+        if self._by_status is None:
+            return
+        previous = self._indexed.get(task.id)
+        if previous is None:
+            serial = root_serial(task.id)
+            if serial is not None:
+                self._by_serial.setdefault(serial, set()).add(task.id)
+        else:
+            old_status, old_tags, old_dated = previous
+            self._by_status[old_status].discard(task.id)
+            for tag in old_tags:
+                tagged = self._by_tag[tag]
+                tagged.discard(task.id)
+                if not tagged:
+                    del self._by_tag[tag]
+            if old_dated is not None and self._by_date is not None:
+                entries = self._by_date[old_status]
+                del entries[bisect_left(entries, old_dated)]
+        self._by_status[task.status].add(task.id)
+        for tag in task.tags:
+            self._by_tag.setdefault(tag, set()).add(task.id)
+        dated = self._dated(task)
+        if dated is not None and self._by_date is not None:
+            insort(self._by_date[task.status], dated)
+        self._indexed[task.id] = (task.status, frozenset(task.tags), dated)
+
+    def tasks_dated_before(self, status: TaskStatus, cutoff: datetime) -> list[Task]:
+        """Return tasks of a date-indexed status whose date is before ``cutoff``, oldest first.
+
+        Archived tasks are ordered by archived_at, deleted tasks by expires_at
+        (see DATE_INDEXED); tasks without that date never match. Naive datetimes
+        are taken as local time.
+        """
+        if status not in DATE_INDEXED:
+            raise ValueError(f"Tasks with status {status.value} are not date-indexed")
+        self._status_index()
+        entries = self._by_date[status] if self._by_date is not None else []
+        end = bisect_left(entries, (as_utc(cutoff),))
+        return [self._tasks[task_id] for _, task_id in entries[:end]]
+
+    def _ordered_tasks(self) -> list[Task]:
+        """Return the cached file-order traversal (do not modify the list)."""
+        if self._ordered is None:
+            ordered = []
+            task_id = self._head
+            while task_id is not None:
+                ordered.append(self._tasks[task_id])
+                task_id = self._next[task_id]
+            self._ordered = ordered
+        return self._ordered
+
+    def find_tasks(self, task_filter: TaskFilter) -> list[Task]:
+        """Return tasks matching a filter, in file order.
+
+        Status, tag and ID-range criteria are answered from inverted indexes by
+        set intersection, so the cost follows the number of matches rather than
+        the number of tasks.
+        """
+        by_status = self._status_index()
+        candidates: set[str] | None = None
+
+        def narrow(ids: set[str]) -> None:
+            nonlocal candidates
+            candidates = ids if candidates is None else candidates & ids
+
+        if task_filter.statuses is not None:
+            narrow(set().union(*(by_status[status] for status in task_filter.statuses)))
+        if task_filter.tags:
+            tagged = [self._by_tag.get(tag, set()) for tag in task_filter.tags]
+            if task_filter.match_any_tag:
+                narrow(set().union(*tagged))
+            else:
+                narrow(set.intersection(*tagged))
+        if task_filter.id_range is not None:
+            first, last = task_filter.id_range
+            if last - first < len(self._by_serial):
+                serials = (s for s in range(first, last + 1) if s in self._by_serial)
+            else:
+                serials = (s for s in self._by_serial if first <= s <= last)
+            narrow(set().union(*(self._by_serial[s] for s in serials)))
+
+        if candidates is None:
+            tasks = list(self._ordered_tasks())
+        else:
+            if self._rank is None:
+                self._rank = {task.id: i for i, task in enumerate(self._ordered_tasks())}
+            tasks = [
+                self._tasks[task_id] for task_id in sorted(candidates, key=self._rank.__getitem__)
+            ]
+
+        if task_filter.has_subtasks:
+            matched = {task.id for task in tasks}
+            tasks = [
+                task
+                for task in tasks
+                if any(child in matched for child in self._children.get(task.id, ()))
+            ]
+        if task_filter.parents_only:
+            tasks = [task for task in tasks if "." not in task.id]
+        return tasks
 
     def get_task(self, task_id: str) -> Task | None:
         """Retrieve a task by ID."""
@@ -118,15 +468,11 @@ class TaskManager:
     ) -> Task:
         """Add a new task."""
         if not task_id:
-            # Fallback: Find max integer ID from existing tasks
-            max_id = 0
-            for tid in self._tasks:
-                if tid.isdigit():
-                    max_id = max(max_id, int(tid))
-            task_id = str(max_id + 1)
+            # Fallback: next integer ID after the highest serial in use
+            task_id = str(self._max_serial + 1)
 
         task = Task(id=task_id, description=description, tags=set(tags) if tags else set())
-        self._tasks[task_id] = task
+        self._store(task)
         return task
 
     def add_subtask(
@@ -144,17 +490,10 @@ class TaskManager:
         if not task_id:
             # Find next subtask ID
             # Format: parent_id.sub_id (e.g. 1.1, 1.2)
-            prefix = f"{parent_id}."
-            max_sub = 0
-            for tid in self._tasks:
-                if tid.startswith(prefix):
-                    suffix = tid[len(prefix) :]
-                    if suffix.isdigit():
-                        max_sub = max(max_sub, int(suffix))
-            task_id = f"{prefix}{max_sub + 1}"
+            task_id = f"{parent_id}.{self.max_child_ordinal(parent_id) + 1}"
 
         task = Task(id=task_id, description=description, tags=set(tags) if tags else set())
-        self._tasks[task_id] = task
+        self._store(task)
         return task
 
     def complete_task(self, task_id: str) -> Task:
@@ -163,6 +502,7 @@ class TaskManager:
         if not task:
             raise ValueError(f"Task {task_id} not found")
         task.mark_completed()
+        self._reindex(task)
         return task
 
     def delete_task(self, task_id: str) -> Task:
@@ -171,6 +511,7 @@ class TaskManager:
         if not task:
             raise ValueError(f"Task {task_id} not found")
         task.mark_deleted()
+        self._reindex(task)
         return task
 
     def archive_task(self, task_id: str) -> Task:
@@ -179,6 +520,7 @@ class TaskManager:
         if not task:
             raise ValueError(f"Task {task_id} not found")
         task.mark_archived()
+        self._reindex(task)
         return task
 
     def restore_task(self, task_id: str) -> Task:
@@ -187,6 +529,7 @@ class TaskManager:
         if not task:
             raise ValueError(f"Task {task_id} not found")
         task.restore()
+        self._reindex(task)
         return task
 
     def modify_task(
@@ -199,12 +542,13 @@ class TaskManager:
 
         if description is not None:
             task.description = description
-            task.updated_at = datetime.now()
+            task.updated_at = current_time()
 
         if tags is not None:
             task.tags = set(tags)
-            task.updated_at = datetime.now()
+            task.updated_at = current_time()
 
+        self._reindex(task)
         return task
 
     def undo_task(self, task_id: str) -> Task:
@@ -219,6 +563,7 @@ class TaskManager:
         # Explicitly clear completed_at to ensure it goes back to PENDING
         task.completed_at = None
         task.restore()
+        self._reindex(task)
         return task
 
     def start_task(self, task_id: str) -> Task:
@@ -231,6 +576,7 @@ class TaskManager:
             raise ValueError(f"Task {task_id} is not pending (status: {task.status.value})")
 
         task.add_tag(IN_PROGRESS_TAG)
+        self._reindex(task)
         return task
 
     def stop_task(self, task_id: str) -> Task:
@@ -240,12 +586,35 @@ class TaskManager:
             raise ValueError(f"Task {task_id} not found")
 
         task.remove_tag(IN_PROGRESS_TAG)
+        self._reindex(task)
+        return task
+
+    def set_tags(self, task_id: str, tags: list[str]) -> Task:
+        """Replace all tags of a task."""
+        task = self.get_task(task_id)
+        if not task:
+            raise ValueError(f"Task {task_id} not found")
+        task.tags = set(tags)
+        self._reindex(task)
         return task
 
     def get_subtasks(self, parent_id: str) -> list[Task]:
-        """Get all subtasks of a parent task."""
-        prefix = f"{parent_id}."
-        return [task for task_id, task in self._tasks.items() if task_id.startswith(prefix)]
+        """Get all subtasks of a parent task (the whole subtree, parents before children)."""
+        subtasks: list[Task] = []
+        pending = list(reversed(self._children.get(parent_id, ())))
+        while pending:
+            task_id = pending.pop()
+            subtasks.append(self._tasks[task_id])
+            pending.extend(reversed(self._children.get(task_id, ())))
+        return subtasks
+
+    def get_children(self, parent_id: str) -> list[Task]:
+        """Get the direct subtasks of a task (one level down only)."""
+        return [self._tasks[task_id] for task_id in self._children.get(parent_id, ())]
+
+    def max_child_ordinal(self, parent_id: str) -> int:
+        """Return the highest numeric subtask ordinal under a parent (0 if none)."""
+        return self._max_child.get(parent_id, 0)
 
     def add_note_to_task(self, task_id: str, note: str) -> Task:
         """Add a note to a task. Handles multi-line notes by splitting on newlines."""
@@ -266,7 +635,7 @@ class TaskManager:
         if not task.notes:
             raise ValueError(f"Task {task_id} has no notes to delete")
         task.notes.clear()
-        task.updated_at = datetime.now()
+        task.updated_at = current_time()
         return task
 
     def update_notes_for_task(self, task_id: str, new_note: str) -> Task:
@@ -281,27 +650,16 @@ class TaskManager:
         for line in new_note.split("\n"):
             if line.strip():
                 task.notes.append(line.strip())
-        task.updated_at = datetime.now()
+        task.updated_at = current_time()
         return task
 
     def list_tasks(self, filters: dict[str, Any] | None = None) -> list[Task]:
-        """List tasks matching filters."""
+        """List tasks matching filters ("status": TaskStatus, "tag": str)."""
         if not filters:
-            return list(self._tasks.values())
-
-        result = []
-        for task in self._tasks.values():
-            match = True
-
-            if "status" in filters:
-                if task.status != filters["status"]:
-                    match = False
-
-            if "tag" in filters:
-                if filters["tag"] not in task.tags:
-                    match = False
-
-            if match:
-                result.append(task)
-
-        return result
+            return list(self._ordered_tasks())
+        return self.find_tasks(
+            TaskFilter(
+                statuses={filters["status"]} if "status" in filters else None,
+                tags=[filters["tag"]] if "tag" in filters else [],
+            )
+        )
@@ -0,0 +1,94 @@
+"""Parsed, interned task IDs.
+
+Task IDs look like ``50``, ``50.3``, ``50.3.1`` or, with a user or branch
+prefix, ``fxstein-50.3``. Instead of splitting the ID string wherever its
+structure is needed (indentation, hierarchy, ordering), ``TaskId.of()``
+parses each distinct ID once and returns the same TaskId for it afterwards.
+
+Tasks and the indexes keep the plain ID string: dicts keyed by exact ``str``
+take CPython's fast lookup path, which a ``str`` subclass would lose for every
+dict holding one. Code that needs the structure asks ``TaskId.of(task.id)``.
+"""
+
+_interned: dict[str, "TaskId"] = {}
+
+
+class TaskId:
+    """A task ID with its parsed parts (compares and hashes like the ID string).
+
+    Attributes:
+        value: The ID string
+        root: ID of the root task ("fxstein-50" for "fxstein-50.3")
+        parent: ID of the parent task ("fxstein-50"), or None for a root task
+        depth: Nesting depth (0 for a root task, 1 for a subtask, ...)
+        prefix: User or branch prefix ("fxstein"), or "" if there is none
+        base: The ID without its prefix ("50.3")
+        serial: Numeric root serial (50), or None if the root has none
+        ordinals: Subtask ordinals ((3,)), or None if one is not a number
+        numbers: (serial, *ordinals) for an all-numeric ID without prefix, else None
+        sort_key: Numeric ordering key, (serial or 0, *ordinals)
+    """
+
+    __slots__ = (
+        "value",
+        "root",
+        "parent",
+        "depth",
+        "prefix",
+        "base",
+        "serial",
+        "ordinals",
+        "numbers",
+        "sort_key",
+    )
+
+    def __init__(self, value: str):
+        self.value = value
+        root, dot, rest = value.partition(".")
+        self.root = root
+        if dot:
+            self.parent: str | None = value.rpartition(".")[0]
+            parts = rest.split(".")
+            self.depth = len(parts)
+            try:
+                ordinals: tuple[int, ...] | None = tuple(map(int, parts))
+            except ValueError:
+                ordinals = None
+        else:
+            self.parent, self.depth, ordinals = None, 0, ()
+        self.ordinals = ordinals
+        if "-" in root:
+            self.prefix, _, serial = root.rpartition("-")
+            self.base = value[len(self.prefix) + 1 :]
+        else:
+            self.prefix, serial, self.base = "", root, value
+        number = int(serial) if serial.isdecimal() else None
+        self.serial = number
+        self.numbers = (
+            (number, *ordinals)
+            if number is not None and ordinals is not None and not self.prefix
+            else None
+        )
+        self.sort_key = (number or 0, *(ordinals or ()))
+
+    @staticmethod
+    def of(value: str) -> "TaskId":
+        """Return the interned TaskId for the ID string ``value``."""
+        task_id = _interned.get(value)
+        if task_id is None:
+            task_id = _interned[value] = TaskId(value)
+        return task_id
+
+    def __str__(self) -> str:
+        return self.value
+
+    def __repr__(self) -> str:
+        return f"TaskId({self.value!r})"
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, TaskId):
+            return self.value == other.value
+        return self.value == other
+
+    def __hash__(self) -> int:
+        return hash(self.value)
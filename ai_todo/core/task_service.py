@@ -0,0 +1,994 @@
+"""Task operations shared by the CLI and the MCP server.
+
+Each operation reads the resident task state once, applies its changes in
+memory, writes TODO.md at most once and returns a result object. Formatting
+the result for humans is left to the caller (see ``ai_todo.cli.formatters``).
+"""
+
+import functools
+import inspect
+import random
+import re
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, TypeVar, cast
+
+from ai_todo.core.config import Config
+from ai_todo.core.coordination import CoordinationManager
+from ai_todo.core.exceptions import ConcurrentModificationError
+from ai_todo.core.locking import lock_timeout, todo_lock
+from ai_todo.core.prune_archive import PruneArchive
+from ai_todo.core.task import (
+    Task,
+    TaskFilter,
+    TaskManager,
+    TaskStatus,
+    fixed_time,
+    root_serial,
+)
+from ai_todo.core.task_id import TaskId
+from ai_todo.core.task_store import Fingerprint, TaskStore, get_task_store
+
+TAG_PATTERN = re.compile(r"`#([a-zA-Z0-9_-]+)`")
+RANGE_PATTERN = re.compile(r"^(\d+(?:\.\d+)*)\.(\d+)$")  # "104.3" -> base "104", number 3
+ROOT_RANGE_PATTERN = re.compile(r"^\d+-\d+$")
+RELATIONSHIP_TYPES = ("completed-by", "depends-on", "blocks", "related-to", "duplicate-of")
+CONCURRENCY_MODES = ("lock", "optimistic", "journal")
+DEFAULT_OPTIMISTIC_RETRIES = 5
+DEFAULT_COMPACT_OPS = 100  # Journaled operations that trigger a TODO.md write
+DEFAULT_COMPACT_INTERVAL = 5.0  # Seconds before journaled operations are written anyway
+
+
+@dataclass
+class TaskResult:
+    """Result of an operation on a single task."""
+
+    task: Task
+
+
+@dataclass
+class TasksResult:
+    """Result of an operation on several tasks; per-task failures do not abort the rest."""
+
+    tasks: list[Task] = field(default_factory=list)
+    errors: list[str] = field(default_factory=list)
+
+
+@dataclass
+class NotesResult(TaskResult):
+    """Result of replacing or clearing a task's notes."""
+
+    previous_count: int  # Number of notes before the operation (0 means nothing changed)
+
+
+@dataclass
+class RestoreResult:
+    """Result of restoring a task to the Tasks section."""
+
+    task: Task
+    subtasks: list[Task] = field(default_factory=list)  # Subtasks restored along with it
+
+
+@dataclass
+class RestoreTasksResult:
+    """Result of restoring several tasks; per-task failures do not abort the rest."""
+
+    restored: list[RestoreResult] = field(default_factory=list)
+    errors: list[tuple[str, str]] = field(default_factory=list)  # (task ID, error message)
+
+
+@dataclass
+class TaskDetails:
+    """A task with its subtasks and relationships, for display."""
+
+    task: Task
+    subtasks: list[Task]
+    relationships: dict[str, list[str]]
+
+
+@dataclass
+class FlushResult:
+    """Result of folding the operation journal into TODO.md."""
+
+    operations: int  # Journaled operations written (0 if the journal was empty)
+
+
+@dataclass
+class BatchResult:
+    """Results of a batch, one (operation, result) pair per operation in order."""
+
+    results: list[tuple[dict[str, Any], Any]] = field(default_factory=list)
+
+
+def parse_status(value: str) -> TaskStatus:
+    """Parse a status name like 'pending' (case-insensitive)."""
+    try:
+        return TaskStatus(value.strip().lower())
+    except ValueError:
+        valid = ", ".join(status.value for status in TaskStatus)
+        raise ValueError(f"Invalid status '{value}'. Valid statuses: {valid}") from None
+
+
+def parse_id_range(value: str) -> tuple[int, int]:
+    """Parse a root task ID range like '10-50' (or a single ID '10') into (first, last)."""
+    first, _, last = value.strip().partition("-")
+    if not first.isdigit() or not (last or first).isdigit():
+        raise ValueError(f"Invalid ID range '{value}'. Use FIRST-LAST, e.g. 10-50")
+    start, end = int(first), int(last or first)
+    if start > end:
+        raise ValueError(f"Invalid ID range '{value}': {start} is greater than {end}")
+    return start, end
+
+
+def expand_task_range(task_id: str) -> list[str]:
+    """Expand a task range like '104.3-104.10' into a list of task IDs."""
+    if "-" not in task_id:
+        return [task_id]
+
+    start_str, end_str = task_id.split("-", 1)
+    # Extract base and numbers
+    # Pattern: "104.3" -> base="104", num=3
+    start_match = RANGE_PATTERN.match(start_str)
+    end_match = RANGE_PATTERN.match(end_str)
+
+    if not start_match or not end_match:
+        return [task_id]  # Invalid range, return as-is
+
+    start_base = start_match.group(1)
+    start_num = int(start_match.group(2) or 0)
+    end_base = end_match.group(1)
+    end_num = int(end_match.group(2) or 0)
+
+    # If bases don't match, can't expand
+    if start_base != end_base:
+        return [task_id]
+
+    return [f"{start_base}.{num}" for num in range(start_num, end_num + 1)]
+
+
+def expand_task_ids(
+    manager: TaskManager, task_ids: list[str], with_subtasks: bool = False
+) -> list[str]:
+    """Expand task IDs and selectors into task IDs, each listed once.
+
+    Besides plain task IDs, accepts these selectors, resolved against the
+    manager's indexes (matches are listed in file order):
+
+    - ``104.3-104.10``: the subtasks 104.3 to 104.10
+    - ``10-50``: the root tasks numbered 10 to 50
+    - ``104.*``: every subtask below task 104
+    - ``tag:bug``: the tasks tagged ``bug``
+    - ``status:pending``: the tasks in a status
+
+    Args:
+        manager: Loaded tasks to resolve selectors against
+        task_ids: Task IDs and selectors
+        with_subtasks: Also include the subtasks of every selected task
+
+    Raises:
+        ValueError: If a status selector names an unknown status
+    """
+    expanded: dict[str, None] = {}
+    for selector in task_ids:
+        for task_id in _select(manager, selector.strip()):
+            expanded.setdefault(task_id)
+            if with_subtasks:
+                for subtask in manager.get_subtasks(task_id):
+                    expanded.setdefault(subtask.id)
+    return list(expanded)
+
+
+def _select(manager: TaskManager, selector: str) -> list[str]:
+    """Return the task IDs one selector of expand_task_ids() stands for."""
+    kind, sep, value = selector.partition(":")
+    if sep and kind == "tag":
+        tag = value.lstrip("#")
+        return [task.id for task in manager.find_tasks(TaskFilter(tags=[tag]))]
+    if sep and kind == "status":
+        statuses = {parse_status(value)}
+        return [task.id for task in manager.find_tasks(TaskFilter(statuses=statuses))]
+    if selector.endswith(".*"):
+        return [task.id for task in manager.get_subtasks(selector[:-2])]
+    if ROOT_RANGE_PATTERN.match(selector):
+        task_filter = TaskFilter(id_range=parse_id_range(selector), parents_only=True)
+        return [task.id for task in manager.find_tasks(task_filter)]
+    if "-" in selector:
+        return expand_task_range(selector)
+    return [selector]
+
+
+# Write operations by method name, for replaying the operation journal
+_WRITE_OPERATIONS: dict[str, Callable[..., Any]] = {}
+_Method = TypeVar("_Method", bound=Callable[..., Any])
+
+
+def _write_operation(method: _Method) -> _Method:  # noqa: UP047
+    """Run a TaskService method as one read-modify-write cycle safe against other writers.
+
+    Nested calls (an operation calling another, or operations inside a batch)
+    run as part of the outer cycle.
+    """
+    signature = inspect.signature(method)
+
+    @functools.wraps(method)
+    def wrapper(self: "TaskService", *args: Any, **kwargs: Any) -> Any:
+        if self._writing or self._batch_manager is not None:
+            return method(self, *args, **kwargs)
+        self._writing = True
+        self._operation = (method.__name__, signature, args, kwargs)
+        # One time for the whole operation, so the journal can replay it with the same dates
+        self._started_at = time.time()
+        try:
+            with fixed_time(datetime.fromtimestamp(self._started_at)):
+                return self._run_write(functools.partial(method, self, *args, **kwargs))
+        finally:
+            self._writing = False
+            self._expected = None
+            self._operation = None
+            self._allocated_ids = []
+
+    _WRITE_OPERATIONS[method.__name__] = method
+    return cast(_Method, wrapper)
+
+
+class TaskService:
+    """Task operations on one TODO.md, returning result objects instead of printing.
+
+    Writers are serialized across processes by the lock in ``.ai-todo/state/lock``
+    (see ``ai_todo.core.locking``). With ``concurrency.mode: optimistic`` in
+    config.yaml the lock is only held while writing: an operation whose TODO.md
+    changed since it was read is retried from scratch, up to
+    ``concurrency.retries`` times. ``concurrency.lock_timeout`` sets how many
+    seconds to wait for the lock.
+
+    With ``concurrency.mode: journal`` an operation is appended to the
+    operation journal (see ``ai_todo.core.op_journal``) instead of rewriting
+    TODO.md, and the journal is folded into TODO.md once it holds
+    ``concurrency.compact_ops`` operations or its oldest is
+    ``concurrency.compact_interval`` seconds old, or on flush().
+    """
+
+    def __init__(self, todo_path: str = "TODO.md", store: TaskStore | None = None):
+        """
+        Initialize TaskService with TODO.md path.
+
+        Args:
+            todo_path: Path to TODO.md file
+            store: Resident task state to use (default: the shared store for todo_path)
+        """
+        self.todo_path = todo_path
+        self.store = store or get_task_store(todo_path)
+        self._config: Config | None = None
+        self._coordination: CoordinationManager | None = None
+        self._writing = False  # Inside a write operation (see _write_operation)
+        self._expected: Fingerprint | None = None  # What the optimistic operation read
+        self._operation: tuple[str, inspect.Signature, tuple, dict] | None = None
+        self._started_at = 0.0  # time.time() the current write operation started
+        self._allocated_ids: list[str] = []  # Task IDs the current operation allocated
+        self._replay_ids: list[str] | None = None  # IDs to reuse while replaying the journal
+        # Set while a batch runs: the shared working manager and deferred post-save steps
+        self._batch_manager: TaskManager | None = None
+        self._after_save: list[Callable[[], None]] = []
+        self._pending_serial = 0  # Highest serial issued but not yet written
+
+    def _get_config(self) -> Config:
+        if self._config is None:
+            config_dir = Path(self.todo_path).parent / ".ai-todo"
+            if not config_dir.exists():
+                config_dir = Path(self.todo_path).parent / ".todo.ai"
+            self._config = Config(str(config_dir / "config.yaml"))
+        return self._config
+
+    def _coordination_manager(self) -> CoordinationManager:
+        if self._coordination is None:
+            self._coordination = CoordinationManager(self._get_config())
+        return self._coordination
+
+    def _concurrency_mode(self) -> str:
+        mode = self._get_config().get("concurrency.mode", "lock")
+        if not isinstance(mode, str) or mode not in CONCURRENCY_MODES:
+            raise ValueError(
+                f"Invalid concurrency.mode '{mode}'. Valid modes: {', '.join(CONCURRENCY_MODES)}"
+            )
+        return mode
+
+    def _optimistic(self) -> bool:
+        return self._concurrency_mode() == "optimistic"
+
+    def compact_interval(self) -> float | None:
+        """Seconds between journal compactions, or None unless in journal mode."""
+        if self._concurrency_mode() != "journal":
+            return None
+        return self._compact_interval()
+
+    def _compact_interval(self) -> float:
+        config = self._get_config()
+        return float(config.get("concurrency.compact_interval", DEFAULT_COMPACT_INTERVAL))
+
+    def _lock_timeout(self) -> float:
+        return lock_timeout(self._get_config())
+
+    def _run_write(self, operation: Callable[[], Any]) -> Any:
+        """Run a write operation under the configured concurrency control."""
+        if not self._optimistic():
+            with todo_lock(self.todo_path).locked(self._lock_timeout()):
+                return operation()
+
+        retries = int(self._get_config().get("concurrency.retries", DEFAULT_OPTIMISTIC_RETRIES))
+        for attempt in range(retries + 1):
+            try:
+                return operation()
+            except ConcurrentModificationError:
+                # The operation may have touched store.file_ops; start over from disk
+                self.store.invalidate()
+                if attempt == retries:
+                    raise ConcurrentModificationError(
+                        f"TODO.md kept changing while writing (gave up after {retries} retries)"
+                    ) from None
+                time.sleep(random.uniform(0, 0.01 * 2**attempt))
+
+    def _save(self, manager: TaskManager, tasks: list[Task] | None = None) -> None:
+        if self._operation is not None and self._concurrency_mode() == "journal":
+            self._journal(self._operation, TaskManager(tasks) if tasks is not None else manager)
+            return
+        action, task_id = self._log_target()
+        if self._expected is None:
+            self.store.save(manager, tasks, action, task_id)
+            return
+        # Optimistic mode: hold the lock only to check nothing changed and write
+        with todo_lock(self.todo_path).locked(self._lock_timeout()):
+            self.store.save(manager, tasks, action, task_id, expected=self._expected)
+
+    def _log_target(self) -> tuple[str, str]:
+        """Return the operation log action and task IDs (comma-separated) of this write."""
+        if self._operation is None:
+            return "UPDATE", ""
+        name, signature, args, kwargs = self._operation
+        arguments = signature.bind(self, *args, **kwargs).arguments
+        task_ids = list(self._allocated_ids)
+        for key in ("task_id", "parent_id", "task_ids"):
+            value = arguments.get(key)
+            task_ids.extend([value] if isinstance(value, str) else value or [])
+        return name.upper(), ",".join(dict.fromkeys(task_ids))
+
+    def _journal(
+        self, operation: tuple[str, inspect.Signature, tuple, dict], manager: TaskManager
+    ) -> None:
+        """Append the current operation to the journal; compact if it is due."""
+        name, signature, args, kwargs = operation
+        arguments = signature.bind(self, *args, **kwargs).arguments
+        arguments.pop("self")
+        record = {
+            "at": self._started_at,  # Replayed under this time (see replay_journal())
+            "op": name,
+            "args": arguments,
+            "ids": self._allocated_ids,
+        }
+        self.store.append_journal(record, manager)
+
+        count, started = self.store.journal_status()
+        config = self._get_config()
+        compact_ops = int(config.get("concurrency.compact_ops", DEFAULT_COMPACT_OPS))
+        if count >= compact_ops or time.time() - (started or 0) >= self._compact_interval():
+            self._compact()
+
+    def _compact(self) -> int:
+        count = self.store.journal_status()[0]
+        if count:
+            self.store.save(self.store.get_manager(), action="COMPACT")
+            # Trash emptying is deferred while deletions are journaled
+            self._empty_trash()
+        return count
+
+    def _allocate_id(self, generate: Callable[[], str]) -> str:
+        """Return a new task ID, or the one recorded for it when replaying the journal."""
+        if self._replay_ids is not None:
+            if not self._replay_ids:
+                raise ValueError("Journal record is missing an allocated task ID")
+            return self._replay_ids.pop(0)
+        task_id = generate()
+        self._allocated_ids.append(task_id)
+        return task_id
+
+    def _begin(self) -> TaskManager:
+        """Return the TaskManager an operation should modify."""
+        if self._batch_manager is not None:
+            return self._batch_manager
+        if self._writing and self._optimistic():
+            manager, self._expected = self.store.checkout()
+            return manager
+        return self.store.get_manager()
+
+    def _commit(
+        self,
+        manager: TaskManager,
+        tasks: list[Task] | None = None,
+        after_save: Callable[[], None] | None = None,
+    ) -> None:
+        """Persist an operation's changes, or keep them in memory while a batch runs.
+
+        Args:
+            manager: TaskManager returned by _begin()
+            tasks: Tasks in the order to write them (default: the manager's order)
+            after_save: Step to run once the changes are on disk
+        """
+        if self._batch_manager is not None:
+            if tasks is not None:
+                self._batch_manager = TaskManager(tasks)
+            if after_save and after_save not in self._after_save:
+                self._after_save.append(after_save)
+            return
+        self._save(manager, tasks)
+        if after_save:
+            after_save()
+
+    def _reader(self) -> TaskManager:
+        """Return the manager to read from (the working state while a batch runs)."""
+        if self._batch_manager is not None:
+            return self._batch_manager
+        return self.store.get_manager(readonly=True)
+
+    # Queries
+
+    def list_tasks(
+        self,
+        tag: str | None = None,
+        incomplete_only: bool = False,
+        parents_only: bool = False,
+        has_subtasks: bool = False,
+        tags: list[str] | None = None,
+        match_any: bool = False,
+        statuses: list[str] | None = None,
+        id_range: str | None = None,
+    ) -> list[Task]:
+        """Return tasks in file order (shared objects; do not modify).
+
+        Args:
+            tag: Only tasks carrying this tag
+            incomplete_only: Only pending tasks
+            parents_only: Only root tasks
+            has_subtasks: Only tasks with at least one (matching) subtask
+            tags: Only tasks carrying all of these tags (any of them with match_any)
+            match_any: Match tasks carrying any of ``tags`` instead of all
+            statuses: Only tasks in one of these statuses (pending, completed, archived, deleted)
+            id_range: Only tasks under root IDs in this inclusive range ("10-50" or "10")
+
+        Raises:
+            ValueError: If a status or the ID range is invalid
+        """
+        task_filter = TaskFilter(
+            tags=([tag] if tag else []) + list(tags or []),
+            match_any_tag=match_any,
+            id_range=parse_id_range(id_range) if id_range else None,
+            parents_only=parents_only,
+            has_subtasks=has_subtasks,
+        )
+        if statuses:
+            task_filter.statuses = {parse_status(status) for status in statuses}
+        if incomplete_only:
+            pending = {TaskStatus.PENDING}
+            task_filter.statuses = (
+                pending if task_filter.statuses is None else task_filter.statuses & pending
+            )
+        return self._reader().find_tasks(task_filter)
+
+    def get_task(self, task_id: str) -> Task | None:
+        """Return a task by ID (shared object; do not modify)."""
+        return self._reader().get_task(task_id)
+
+    def show_task(self, task_id: str) -> TaskDetails:
+        """Return a task with its subtasks and relationships.
+
+        Raises:
+            ValueError: If the task does not exist
+        """
+        manager = self._reader()
+        task = manager.get_task(task_id)
+        if not task:
+            raise ValueError(f"Task #{task_id} not found")
+        return TaskDetails(
+            task=task,
+            subtasks=sorted(manager.get_subtasks(task_id), key=lambda t: t.id),
+            relationships=self.store.file_ops.get_relationships(task_id),
+        )
+
+    def show_archived_task(self, task_id: str) -> TaskDetails:
+        """Return a task pruned from TODO.md, with its subtasks, from the prune archive.
+
+        Raises:
+            ValueError: If no prune archived the task
+        """
+        found = PruneArchive(self.store.file_ops.config_dir / "archives").find(task_id)
+        if not found:
+            raise ValueError(f"Task #{task_id} not found in the prune archive")
+        return TaskDetails(task=found[0], subtasks=found[1:], relationships={})
+
+    # Adding tasks
+
+    @_write_operation
+    def add_task(self, description: str, tags: list[str], notes: str | None = None) -> TaskResult:
+        """Add a new task (with optional notes) at the top of the Tasks section."""
+        manager = self._begin()
+        file_ops = self.store.file_ops
+        new_id = self._allocate_id(
+            lambda: self._coordination_manager().get_next_task_id(manager, file_ops)
+        )
+
+        task = manager.add_task(description, tags, task_id=new_id)
+        if notes:
+            manager.add_note_to_task(task.id, notes)
+
+        # Record the new serial in .ai-todo.serial once the task is on disk
+        serial = root_serial(new_id)
+        if serial is not None:
+            self._pending_serial = max(self._pending_serial, serial)
+
+        # CRITICAL: New tasks must appear at the TOP of the Tasks section
+        manager.move_to_top(task.id)
+        self._commit(manager, after_save=self._write_serial)
+        return TaskResult(task)
+
+    def _write_serial(self) -> None:
+        if self._pending_serial:
+            self.store.file_ops.set_serial(self._pending_serial)
+            self._pending_serial = 0
+
+    @_write_operation
+    def add_subtask(
+        self, parent_id: str, description: str, tags: list[str], notes: str | None = None
+    ) -> TaskResult:
+        """Add a subtask (with optional notes) directly below its parent.
+
+        Raises:
+            ValueError: If the parent does not exist or nesting is too deep
+        """
+        manager = self._begin()
+        parent = manager.get_task(parent_id)
+        if not parent:
+            raise ValueError(f"Parent task {parent_id} not found")
+
+        # Check nesting depth (allow 3 levels: task → subtask → sub-subtask)
+        if parent.id.count(".") >= 2:
+            raise ValueError("Maximum nesting depth is 3 levels (task.subtask.sub-subtask)")
+
+        subtask_id = self._allocate_id(
+            lambda: self._coordination_manager().get_next_subtask_id(parent_id, manager)
+        )
+        subtask = manager.add_subtask(parent_id, description, tags, task_id=subtask_id)
+        if notes:
+            manager.add_note_to_task(subtask.id, notes)
+
+        # Insert immediately after the parent (newest subtask on top)
+        manager.move_after(subtask.id, parent_id)
+        self._commit(manager)
+        return TaskResult(subtask)
+
+    # Status changes
+
+    @_write_operation
+    def complete_tasks(self, task_ids: list[str], with_subtasks: bool = False) -> TasksResult:
+        """Mark task(s) as completed."""
+        manager = self._begin()
+        result = TasksResult()
+        for task_id in self._expand(manager, task_ids, with_subtasks, result):
+            try:
+                result.tasks.append(manager.complete_task(task_id))
+            except ValueError as e:
+                result.errors.append(str(e))
+
+        if result.tasks:
+            self._commit(manager)
+        return result
+
+    @_write_operation
+    def delete_tasks(self, task_ids: list[str], with_subtasks: bool = True) -> TasksResult:
+        """Soft delete task(s) to the Deleted section, then empty expired trash."""
+        manager = self._begin()
+        result = TasksResult()
+        for task_id in self._expand(manager, task_ids, with_subtasks, result):
+            try:
+                result.tasks.append(manager.delete_task(task_id))
+            except ValueError as e:
+                result.errors.append(str(e))
+
+        if result.tasks:
+            self._commit(manager, after_save=self._empty_trash)
+        return result
+
+    @staticmethod
+    def _expand(
+        manager: TaskManager, task_ids: list[str], with_subtasks: bool, result: TasksResult
+    ) -> list[str]:
+        """expand_task_ids(), reporting an invalid selector as an error of the result."""
+        try:
+            return expand_task_ids(manager, task_ids, with_subtasks)
+        except ValueError as e:
+            result.errors.append(str(e))
+            return []
+
+    def _empty_trash(self) -> None:
+        # Auto-run empty trash after deletion (silent)
+        if self.store.journal_status()[0]:
+            return  # Runs when the journal is compacted
+        try:
+            from ai_todo.core.empty_trash import EmptyTrashManager
+
+            EmptyTrashManager(self.todo_path).empty_trash(dry_run=False)
+        except Exception:
+            # Fail silently - don't block delete operation
+            pass
+
+    @_write_operation
+    def archive_tasks(
+        self, task_ids: list[str], reason: str | None = None, with_subtasks: bool = True
+    ) -> TasksResult:
+        """Move task(s) to the Archived Tasks section."""
+        manager = self._begin()
+        result = TasksResult()
+        # Process in reverse order so parent ends up on top (newest) in Archived Tasks
+        for task_id in reversed(self._expand(manager, task_ids, with_subtasks, result)):
+            try:
+                task = manager.archive_task(task_id)
+                if reason:
+                    manager.add_note_to_task(task_id, f"Reason: {reason}")
+                result.tasks.append(task)
+            except ValueError as e:
+                result.errors.append(str(e))
+
+        if result.tasks:
+            self._commit(manager)
+        return result
+
+    @_write_operation
+    def restore_task(self, task_id: str) -> RestoreResult:
+        """Restore a task (and any missing subtasks) from Deleted or Archived Tasks.
+
+        Raises:
+            ValueError: If the task does not exist
+        """
+        manager = self._begin()
+        result = self._restore(manager, task_id)
+        self._commit(manager)
+        return result
+
+    @_write_operation
+    def restore_tasks(self, task_ids: list[str]) -> RestoreTasksResult:
+        """Restore several tasks (and any missing subtasks), writing TODO.md once.
+
+        Each task ends up where restoring the tasks one at a time, in the given
+        order, would put it.
+        """
+        manager = self._begin()
+        result = RestoreTasksResult()
+        for task_id in task_ids:
+            try:
+                result.restored.append(self._restore(manager, task_id))
+            except ValueError as e:
+                result.errors.append((task_id, str(e)))
+
+        if result.restored:
+            self._commit(manager)
+        return result
+
+    def _restore(self, manager: TaskManager, task_id: str) -> RestoreResult:
+        """Restore a task in ``manager`` and move it (and its restored subtasks) into place."""
+        task = manager.restore_task(task_id)
+
+        # CRITICAL: Positioning depends on whether this is a root task or subtask
+        parent_id = TaskId.of(task_id).parent
+        if parent_id is not None and manager.get_task(parent_id) is not None:
+            # Subtask: insert after parent (at the top if the parent is missing)
+            manager.move_after(task_id, parent_id)
+        else:
+            # Root task: Put at the TOP of the Tasks section
+            manager.move_to_top(task_id)
+
+        # Idempotent/Self-healing restore: also restore subtasks that are still
+        # ARCHIVED or DELETED (e.g. after an earlier, incomplete restore)
+        restored_subtasks = []
+        for subtask in manager.get_subtasks(task_id):
+            if subtask.status in (TaskStatus.ARCHIVED, TaskStatus.DELETED):
+                manager.restore_task(subtask.id)
+                restored_subtasks.append(subtask)
+
+        # Move restored subtasks directly below the restored task, newest first
+        for subtask in sorted(restored_subtasks, key=lambda t: TaskId.of(t.id).sort_key):
+            manager.move_after(subtask.id, task_id)
+
+        return RestoreResult(task, restored_subtasks)
+
+    @_write_operation
+    def undo_task(self, task_id: str) -> TaskResult:
+        """Reopen (undo) a completed task."""
+        manager = self._begin()
+        task = manager.undo_task(task_id)
+        self._commit(manager)
+        return TaskResult(task)
+
+    @_write_operation
+    def start_task(self, task_id: str) -> TaskResult:
+        """Mark a task as in progress."""
+        manager = self._begin()
+        task = manager.start_task(task_id)
+        self._commit(manager)
+        return TaskResult(task)
+
+    @_write_operation
+    def stop_task(self, task_id: str) -> TaskResult:
+        """Stop progress on a task."""
+        manager = self._begin()
+        task = manager.stop_task(task_id)
+        self._commit(manager)
+        return TaskResult(task)
+
+    # Content changes
+
+    @_write_operation
+    def modify_task(
+        self,
+        task_id: str,
+        description: str,
+        tags: list[str] | None = None,
+        notes: str | None = None,
+    ) -> TaskResult:
+        """Modify a task's description, tags and optionally its notes.
+
+        Args:
+            task_id: ID of the task to modify
+            description: New description; inline `#tag` markers become tags
+            tags: New tags (existing tags are kept if none are given)
+            notes: Replacement notes; "" clears them, None leaves them unchanged
+
+        Raises:
+            ValueError: If the task does not exist
+        """
+        manager = self._begin()
+        existing_task = manager.get_task(task_id)
+        if not existing_task:
+            raise ValueError(f"Task {task_id} not found")
+
+        # Extract tags from description if they're in backticks (format: `#tag`)
+        found_tags = TAG_PATTERN.findall(description)
+        description = TAG_PATTERN.sub("", description).strip()
+
+        # Combine tags from description and explicit tags argument
+        # CRITICAL: If no new tags provided, preserve existing tags
+        if tags:
+            all_tags: list[str] | None = list(set(found_tags + tags))
+        elif found_tags:
+            all_tags = found_tags
+        else:
+            all_tags = list(existing_task.tags) if existing_task.tags else None
+
+        task = manager.modify_task(task_id, description, all_tags)
+        if notes is not None:
+            task.notes.clear()
+            if notes:
+                manager.add_note_to_task(task_id, notes)
+
+        self._commit(manager)
+        return TaskResult(task)
+
+    @_write_operation
+    def set_tags(self, task_id: str, tags: list[str]) -> TaskResult:
+        """Replace all tags of a task."""
+        manager = self._begin()
+        task = manager.set_tags(task_id, tags)
+        self._commit(manager)
+        return TaskResult(task)
+
+    @_write_operation
+    def add_note(self, task_id: str, note_text: str) -> TaskResult:
+        """Add a (possibly multi-line) note to a task."""
+        manager = self._begin()
+        task = manager.add_note_to_task(task_id, note_text)
+        self._commit(manager)
+        return TaskResult(task)
+
+    @_write_operation
+    def delete_notes(self, task_id: str) -> NotesResult:
+        """Delete all notes from a task; a task without notes is left unchanged."""
+        manager = self._begin()
+        task = manager.get_task(task_id)
+        if not task:
+            raise ValueError(f"Task {task_id} not found")
+
+        previous_count = len(task.notes)
+        if previous_count:
+            manager.delete_notes_from_task(task_id)
+            self._commit(manager)
+        return NotesResult(task, previous_count)
+
+    @_write_operation
+    def update_notes(self, task_id: str, new_note_text: str) -> NotesResult:
+        """Replace all notes of a task that already has notes."""
+        manager = self._begin()
+        task = manager.get_task(task_id)
+        if not task:
+            raise ValueError(f"Task {task_id} not found")
+        if not task.notes:
+            raise ValueError(
+                f"Task #{task_id} has no notes to update\n"
+                f"Hint: Use 'note {task_id} \"text\"' to add notes"
+            )
+
+        previous_count = len(task.notes)
+        manager.update_notes_for_task(task_id, new_note_text)
+        self._commit(manager)
+        return NotesResult(task, previous_count)
+
+    @_write_operation
+    def relate(self, task_id: str, rel_type: str, target_ids: list[str]) -> TaskResult:
+        """Add (or replace) a relationship of one type for a task."""
+        manager = self._begin()
+        task = manager.get_task(task_id)
+        if not task:
+            raise ValueError(f"Task #{task_id} not found")
+        if rel_type not in RELATIONSHIP_TYPES:
+            raise ValueError(
+                f"Invalid relationship type '{rel_type}'\n"
+                f"Valid types: {', '.join(RELATIONSHIP_TYPES)}"
+            )
+
+        self.store.file_ops.add_relationship(task_id, rel_type, target_ids)
+        self._commit(manager)
+        return TaskResult(task)
+
+    @_write_operation
+    def set_description(self, task_id: str, description: str) -> NotesResult:
+        """Set a task's notes to ``description``, or clear them with "".
+
+        Returns:
+            NotesResult whose previous_count is the number of notes replaced
+        """
+        if description == "":
+            return self.delete_notes(task_id)
+        task = self._reader().get_task(task_id)
+        if task and task.notes:
+            return self.update_notes(task_id, description)
+        return NotesResult(self.add_note(task_id, description).task, 0)
+
+    # Operation journal
+
+    def flush(self) -> FlushResult:
+        """Write journaled operations to TODO.md now (e.g. before a git commit).
+
+        Returns:
+            FlushResult with the number of operations written
+        """
+        if not self.store.journal.size():
+            return FlushResult(0)
+        with todo_lock(self.todo_path).locked(self._lock_timeout()):
+            return FlushResult(self._compact())
+
+    def replay_journal(self, manager: TaskManager, records: list[dict[str, Any]]) -> TaskManager:
+        """Apply journal records to ``manager`` in memory (used by TaskStore).
+
+        Each record runs with the time it was journaled as the current time, so
+        the task dates are those of the original operation. Records that no
+        longer apply (TODO.md was edited underneath the journal) are skipped.
+
+        Returns:
+            The manager holding the result
+        """
+        self._batch_manager = manager
+        try:
+            for record in records:
+                self._replay_ids = list(record.get("ids", []))
+                try:
+                    with fixed_time(datetime.fromtimestamp(record["at"])):
+                        if record["op"] == "batch":
+                            for operation in record["args"]["operations"]:
+                                self._apply_batch_operation(operation)
+                        else:
+                            _WRITE_OPERATIONS[record["op"]](self, **record["args"])
+                except (KeyError, TypeError, ValueError):
+                    continue
+            return self._batch_manager
+        finally:
+            self._batch_manager = None
+            self._replay_ids = None
+            self._after_save = []
+            self._pending_serial = 0
+
+    # Batches
+
+    @_write_operation
+    def batch(self, operations: list[dict[str, Any]]) -> BatchResult:
+        """Apply several operations to one in-memory state and write TODO.md once.
+
+        Each operation is a dict with an ``op`` name (see BATCH_OPERATIONS) and
+        the arguments of the matching MCP tool, e.g.
+        ``{"op": "complete", "task_ids": ["12", "13"]}``. The batch is all or
+        nothing: if any operation fails or reports an error, nothing is written.
+
+        Args:
+            operations: Operations to apply, in order
+
+        Returns:
+            BatchResult with one (operation, result) pair per operation
+
+        Raises:
+            ValueError: If an operation is invalid or fails
+        """
+        result = BatchResult()
+        self._batch_manager = self._begin()
+        self._after_save = []
+        self._pending_serial = 0
+        try:
+            for index, operation in enumerate(operations, start=1):
+                name = operation.get("op") if isinstance(operation, dict) else None
+                try:
+                    result.results.append((operation, self._apply_batch_operation(operation)))
+                except ValueError as e:
+                    raise ValueError(f"Operation {index} ({name}) failed: {e}") from e
+            manager = self._batch_manager
+        except Exception:
+            # Operations may have touched store.file_ops (relationships); reload from disk
+            self.store.invalidate()
+            raise
+        finally:
+            self._batch_manager = None
+
+        if result.results:
+            self._save(manager)
+            for step in self._after_save:
+                step()
+        self._after_save = []
+        return result
+
+    def _apply_batch_operation(self, operation: Any) -> Any:
+        if not isinstance(operation, dict):
+            raise ValueError("Each operation must be an object with an 'op' field")
+        arguments = dict(operation)
+        name = arguments.pop("op", None)
+        apply = BATCH_OPERATIONS.get(name)
+        if apply is None:
+            raise ValueError(
+                f"Unknown operation '{name}'\nValid operations: {', '.join(BATCH_OPERATIONS)}"
+            )
+        try:
+            op_result = apply(self, **arguments)
+        except TypeError as e:
+            raise ValueError(f"Invalid arguments: {e}") from e
+        if isinstance(op_result, TasksResult) and op_result.errors:
+            raise ValueError("; ".join(op_result.errors))
+        return op_result
+
+
+# Batch operation names mapped to service calls; arguments mirror the MCP tools
+BATCH_OPERATIONS: dict[str, Callable[..., Any]] = {
+    "add": lambda service, title, description=None, tags=None: service.add_task(
+        title, tags or [], notes=description
+    ),
+    "add_subtask": lambda service, parent_id, title, description=None, tags=None: (
+        service.add_subtask(parent_id, title, tags or [], notes=description)
+    ),
+    "complete": lambda service, task_ids, with_subtasks=False: service.complete_tasks(
+        task_ids, with_subtasks
+    ),
+    "undo": lambda service, task_id: service.undo_task(task_id),
+    "start": lambda service, task_id: service.start_task(task_id),
+    "stop": lambda service, task_id: service.stop_task(task_id),
+    "modify": lambda service, task_id, title, description=None, tags=None: service.modify_task(
+        task_id, title, tags or [], notes=description
+    ),
+    "set_tags": lambda service, task_id, tags: service.set_tags(task_id, tags),
+    "set_description": lambda service, task_id, description: service.set_description(
+        task_id, description
+    ),
+    "note": lambda service, task_id, note: service.add_note(task_id, note),
+    "delete": lambda service, task_ids, with_subtasks=True: service.delete_tasks(
+        task_ids, with_subtasks
+    ),
+    "archive": lambda service, task_ids, reason=None, with_subtasks=True: service.archive_tasks(
+        task_ids, reason, with_subtasks
+    ),
+    "restore": lambda service, task_ids: service.restore_tasks(task_ids),
+    "relate": lambda service, task_id, rel_type, target_ids: service.relate(
+        task_id, rel_type, target_ids
+    ),
+}
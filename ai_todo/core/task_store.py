@@ -0,0 +1,281 @@
+"""Resident task state reused across calls in long-running processes (MCP server)."""
+
+import os
+import threading
+from pathlib import Path
+from typing import Any
+
+from ai_todo.core.config import Config
+from ai_todo.core.exceptions import ConcurrentModificationError
+from ai_todo.core.file_ops import FileOps
+from ai_todo.core.locking import lock_timeout, todo_lock
+from ai_todo.core.op_journal import OpJournal
+from ai_todo.core.task import Task, TaskManager
+
+# (size, mtime_ns, inode) of TODO.md or None if missing, plus the stored checksum
+Fingerprint = tuple[tuple[int, int, int] | None, bytes | None]
+
+
+class TaskStore:
+    """Keep one FileOps and TaskManager loaded for a TODO.md.
+
+    Every access revalidates the loaded state with a stat() of TODO.md and the
+    checksum recorded in ``.ai-todo/state/checksum``. Both are unchanged unless
+    TODO.md was edited or another process wrote it, so the common case costs
+    two small syscalls instead of an integrity check and a full parse. When
+    either changes, integrity is verified again (raising TamperError in
+    tamper-proof mode) and the tasks are reloaded.
+
+    Read-only callers share the resident TaskManager and must not mutate it.
+    Writers get a TaskManager over copies of the tasks, so an operation that
+    fails halfway never leaves the resident state out of sync with the file.
+
+    Operations recorded in the operation journal (``concurrency.mode: journal``,
+    see ``ai_todo.core.op_journal``) but not yet written to TODO.md are replayed
+    over it, so the resident state is always TODO.md plus the journal. A
+    stat() of the journal detects records appended by other processes.
+
+    Thread-safe: threads reading (the MCP server's read pool) and one writing
+    share the resident state. A save replaces the manager instead of changing
+    it, so a reader keeps a consistent snapshot; while the save writes TODO.md,
+    readers get the state it replaces. Reloading from disk holds the TODO.md
+    write lock, taken before the store's lock as writers do.
+    """
+
+    def __init__(self, todo_path: str = "TODO.md", interface: str = "CLI"):
+        self.todo_path = todo_path
+        self.interface = interface
+        self._file_ops: FileOps | None = None
+        self._manager: TaskManager | None = None
+        self._fingerprint: Fingerprint | None = None
+        state_dir = Path(os.path.abspath(todo_path)).parent / ".ai-todo" / "state"
+        self.journal = OpJournal(state_dir / "op_journal")
+        self._journal_offset = 0  # End of the journal records in the resident state
+        self._journal_records = 0
+        self._journal_started: float | None = None  # Time of the oldest unwritten record
+        self._replaying = False
+        self._saving = False  # A save is writing TODO.md; the resident state is still the old one
+        self._version = 0  # Incremented whenever the resident manager is replaced
+        self._lock = threading.RLock()
+
+    def _current_fingerprint(self, file_ops: FileOps) -> Fingerprint:
+        try:
+            st = os.stat(self.todo_path)
+            file_key = (st.st_size, st.st_mtime_ns, st.st_ino)
+        except FileNotFoundError:
+            file_key = None
+        try:
+            checksum = file_ops.checksum_path.read_bytes()
+        except OSError:
+            checksum = None
+        return file_key, checksum
+
+    def _load(self) -> tuple[FileOps, TaskManager]:
+        """(Re)load tasks from disk, verifying integrity first."""
+        self._fingerprint = None
+        if self._file_ops is None:
+            self._file_ops = FileOps(self.todo_path, interface=self.interface)
+        else:
+            self._file_ops.verify_integrity()
+        self._manager = manager = TaskManager(self._file_ops.read_tasks())
+        self._version += 1
+        self._fingerprint = self._current_fingerprint(self._file_ops)
+        self._journal_offset = self._journal_records = 0
+        self._journal_started = None
+        return self._file_ops, self._apply_journal(manager)
+
+    def _revalidate(self) -> tuple[FileOps, TaskManager]:
+        with self._lock:
+            current = self._current_state()
+            if current is not None:
+                return current
+        # Loading may verify integrity under the TODO.md lock: take it before the store
+        # lock, in the order writers do, so a reloading reader never waits on the writer
+        # while the writer waits on it
+        config = Config(str(Path(self.todo_path).parent / ".ai-todo" / "config.yaml"))
+        with todo_lock(self.todo_path).locked(lock_timeout(config)), self._lock:
+            return self._current_state() or self._load()
+
+    def _current_state(self) -> tuple[FileOps, TaskManager] | None:
+        """Return the resident state if it matches the file (replaying new journal records)."""
+        file_ops, manager = self._file_ops, self._manager
+        if file_ops is None or manager is None:
+            return None
+        if self._replaying or self._saving:
+            return file_ops, manager
+        if self._fingerprint is None or self._current_fingerprint(file_ops) != self._fingerprint:
+            return None
+        journal_size = self.journal.size()
+        if journal_size != self._journal_offset:
+            if journal_size < self._journal_offset:
+                # Folded into TODO.md by someone else without changing it
+                return None
+            return file_ops, self._apply_journal(manager)
+        return file_ops, manager
+
+    def _apply_journal(self, manager: TaskManager) -> TaskManager:
+        """Replay journal records appended since the resident ``manager`` was built.
+
+        Returns:
+            The new resident TaskManager (``manager`` itself if there was nothing new)
+        """
+        records, end = self.journal.read(self._journal_offset)
+        self._journal_offset = end
+        if not records:
+            return manager
+        # Replay over copies: readers may still hold the previous resident tasks
+        manager = manager.copy()
+        from ai_todo.core.task_service import TaskService
+
+        self._replaying = True
+        try:
+            manager = TaskService(self.todo_path, store=self).replay_journal(manager, records)
+        finally:
+            self._replaying = False
+        self._manager = manager
+        self._version += 1
+        self._journal_records += len(records)
+        if self._journal_started is None:
+            self._journal_started = records[0].get("at")
+        return manager
+
+    @property
+    def file_ops(self) -> FileOps:
+        """FileOps holding the current relationships and structure snapshot."""
+        return self._revalidate()[0]
+
+    @property
+    def version(self) -> int:
+        """Number of the current resident state; it changes whenever the tasks may have.
+
+        Use it to key data derived from the tasks. Read it before the manager:
+        data built from a newer state under an older version is only rebuilt
+        once more.
+        """
+        self._revalidate()
+        return self._version
+
+    def get_manager(self, readonly: bool = False) -> TaskManager:
+        """Return a TaskManager for the current file contents.
+
+        Args:
+            readonly: Return the shared resident manager (callers must not mutate it)
+
+        Returns:
+            The resident TaskManager, or one over copied tasks for writers
+        """
+        manager = self._revalidate()[1]
+        if readonly:
+            return manager
+        return manager.copy()
+
+    def checkout(self) -> tuple[TaskManager, Fingerprint | None]:
+        """Return a writer TaskManager and the fingerprint of the state it copies.
+
+        Pass the fingerprint to save(expected=...) to detect concurrent writers.
+        """
+        while True:
+            self._revalidate()
+            with self._lock:
+                current = self._current_state()
+                if current is not None:
+                    return current[1].copy(), self._fingerprint
+
+    def journal_status(self) -> tuple[int, float | None]:
+        """Return the number of journaled operations not in TODO.md and the oldest one's time."""
+        self._revalidate()
+        with self._lock:
+            return self._journal_records, self._journal_started
+
+    def append_journal(self, record: dict[str, Any], manager: TaskManager) -> None:
+        """Journal an operation instead of writing TODO.md and make its result resident.
+
+        The caller holds the write lock and built ``manager`` from get_manager()
+        after the last revalidation, so it already includes every earlier record.
+
+        Args:
+            record: Operation record (see ``ai_todo.core.op_journal``)
+            manager: TaskManager with the operation applied
+        """
+        with self._lock:
+            self._journal_offset = self.journal.append(record, self._journal_offset)
+            self._manager = manager
+            self._version += 1
+            self._journal_records += 1
+            if self._journal_started is None:
+                self._journal_started = record.get("at")
+
+    def save(
+        self,
+        manager: TaskManager,
+        tasks: list[Task] | None = None,
+        action: str = "UPDATE",
+        task_id: str = "",
+        expected: Fingerprint | None = None,
+    ) -> None:
+        """Write tasks to TODO.md and make them the resident state.
+
+        Writing the state (which includes the journaled operations) removes the
+        operation journal.
+
+        Args:
+            manager: TaskManager holding the modified tasks
+            tasks: Tasks in the order to write them (default: the manager's order)
+            action: Action name for logging (default: UPDATE)
+            task_id: Task ID associated with action (default: empty)
+            expected: Fingerprint from checkout(); refuse to write if TODO.md changed since
+
+        Raises:
+            ConcurrentModificationError: If ``expected`` no longer matches TODO.md
+        """
+        with self._lock:
+            file_ops, previous = self._revalidate()
+            if expected is not None and self._fingerprint != expected:
+                raise ConcurrentModificationError("TODO.md was changed by another writer")
+            # Until the new state is resident, readers keep getting the one being replaced
+            self._saving = True
+        try:
+            tasks = manager.list_tasks() if tasks is None else tasks
+            journaled = bool(self._journal_offset or self.journal.size())
+            # Without journaled operations the resident tasks are TODO.md as read
+            file_ops.write_tasks(
+                tasks, action, task_id, previous=None if journaled else previous.get_task
+            )
+            if journaled:
+                self.journal.reset()
+            # The new state as a re-read of the file would give it, parsing only what changed
+            saved = TaskManager(file_ops.written_tasks(tasks, previous.get_task))
+        except Exception:
+            with self._lock:
+                # FileOps state may be half-updated; start over from disk next time
+                self._file_ops = None
+                self.invalidate()
+                self._saving = False
+            raise
+        with self._lock:
+            self._manager = saved
+            self._version += 1
+            self._journal_offset = self._journal_records = 0
+            self._journal_started = None
+            self._fingerprint = self._current_fingerprint(file_ops)
+            self._saving = False
+
+    def invalidate(self) -> None:
+        """Force a reload from disk on the next access."""
+        self._fingerprint = None
+
+
+# Resident stores per absolute TODO.md path, shared by the CLI commands and the MCP server
+_task_stores: dict[str, TaskStore] = {}
+_task_stores_lock = threading.Lock()
+
+
+def get_task_store(todo_path: str = "TODO.md") -> TaskStore:
+    """Return the resident TaskStore for a TODO.md path."""
+    # Key by absolute path: relative paths change meaning when the working directory does
+    abs_path = os.path.abspath(todo_path)
+    store = _task_stores.get(abs_path)
+    if store is None:
+        with _task_stores_lock:
+            store = _task_stores.setdefault(abs_path, TaskStore(abs_path))
+    return store
@@ -1,39 +1,35 @@
 """MCP server for ai-todo."""
 
 import asyncio
+import functools
+import hashlib
 import io
 import json
 import sys
+import threading
+from collections.abc import Callable
+from concurrent.futures import Executor, ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
+from typing import Any, TypeVar
 
 from fastmcp import FastMCP
 
+from ai_todo.cli import formatters
 from ai_todo.cli.commands import (
-    add_command,
-    add_subtask_command,
-    archive_command,
-    complete_command,
     config_command,
-    delete_command,
-    delete_note_command,
     detect_coordination_tool_command,
     lint_command,
-    list_command,
-    modify_command,
-    note_command,
     reformat_command,
-    relate_command,
     reorder_command,
     resolve_conflicts_command,
-    restore_command,
     setup_coordination_tool_command,
-    show_command,
     switch_mode_tool_command,
-    undo_command,
-    update_note_command,
 )
 from ai_todo.core.exceptions import TamperError
+from ai_todo.core.task import TaskManager
+from ai_todo.core.task_id import TaskId
+from ai_todo.core.task_service import TaskService, expand_task_ids
 
 # Initialize FastMCP
 mcp = FastMCP("ai-todo")
@@ -47,31 +43,130 @@ SESSION_COMPLETIONS: dict[str, datetime] = {}
 ARCHIVE_COOLDOWN_SECONDS = 60
 
 
-def _capture_output(func, *args, **kwargs) -> str:
-    """Capture stdout from a function call."""
-    old_stdout = sys.stdout
-    sys.stdout = captured_output = io.StringIO()
+# sys.stdout is process-wide; never let two tools redirect it at the same time
+_capture_lock = threading.Lock()
+
+# Tools run off the event loop so one slow call does not stall the others. Reads
+# run concurrently on the resident state they share (see TaskStore); writes run
+# one at a time on a single writer thread, in the order they arrive; network and
+# subprocess work (PyPI, GitHub, uv) gets its own bounded pool and a timeout.
+READ_WORKERS = 4
+BLOCKING_WORKERS = 2
+BLOCKING_TIMEOUT_SECONDS = 60
+UPDATE_TIMEOUT_SECONDS = 180  # uv itself gives up after 120 seconds
+_readers = ThreadPoolExecutor(READ_WORKERS, thread_name_prefix="ai-todo-read")
+_writer = ThreadPoolExecutor(1, thread_name_prefix="ai-todo-write")
+_blocking = ThreadPoolExecutor(BLOCKING_WORKERS, thread_name_prefix="ai-todo-blocking")
+
+T = TypeVar("T")
+
+# Resource JSON by URI: (key of the source state it was built from, version, text)
+_resource_cache: dict[str, tuple[tuple, str, str]] = {}
+RESOURCE_POLL_SECONDS = 2.0
+_subscriptions: dict[str, set[Any]] = {}  # Subscribed URI -> sessions to notify
+_notified: dict[str, str] = {}  # Subscribed URI -> version subscribers last heard of
+_resources_changed: asyncio.Event | None = None  # Set after writes to check resources now
+_resource_watcher: asyncio.Task | None = None
+
+
+def _tamper_message(e: TamperError) -> str:
+    return (
+        f"⛔ TAMPER DETECTED: TODO.md has been modified externally.\n"
+        f"Expected hash: {e.expected_hash[:8]}...\n"
+        f"Actual hash:   {e.actual_hash[:8]}...\n\n"
+        f"Use 'accept_tamper' tool to resolve."
+    )
+
+
+def _run(operation: Callable[[TaskService], str]) -> str:
+    """Run a task service operation and return its formatted output."""
     try:
-        func(*args, **kwargs)
-        return captured_output.getvalue() or "Success"
+        return operation(TaskService(CURRENT_TODO_PATH)) or "Success"
     except TamperError as e:
-        return (
-            f"⛔ TAMPER DETECTED: TODO.md has been modified externally.\n"
-            f"Expected hash: {e.expected_hash[:8]}...\n"
-            f"Actual hash:   {e.actual_hash[:8]}...\n\n"
-            f"Use 'accept_tamper' tool to resolve."
-        )
+        return _tamper_message(e)
     except Exception as e:
         return f"Error: {str(e)}"
+
+
+def _capture_output(func, *args, **kwargs) -> str:
+    """Capture stdout from a CLI command (for tools without a service operation)."""
+    with _capture_lock:
+        old_stdout = sys.stdout
+        sys.stdout = captured_output = io.StringIO()
+        try:
+            func(*args, **kwargs)
+            return captured_output.getvalue() or "Success"
+        except TamperError as e:
+            return _tamper_message(e)
+        except Exception as e:
+            return f"Error: {str(e)}"
+        finally:
+            sys.stdout = old_stdout
+
+
+async def _in_thread(  # noqa: UP047 (type parameter syntax needs Python 3.12)
+    executor: Executor, func: Callable[[], T], timeout: float | None = None
+) -> T:
+    """Run ``func`` on one of the executor's threads and await its result."""
+    return await asyncio.wait_for(
+        asyncio.get_running_loop().run_in_executor(executor, func), timeout
+    )
+
+
+async def _read(operation: Callable[[TaskService], str]) -> str:
+    """Run a read-only task service operation on the read pool."""
+    return await _in_thread(_readers, functools.partial(_run, operation))
+
+
+async def _on_writer(func: Callable[[], T]) -> T:  # noqa: UP047
+    """Run ``func`` on the writer thread, then have subscribers' resources checked."""
+    try:
+        return await _in_thread(_writer, func)
     finally:
-        sys.stdout = old_stdout
+        # Index the new state on the writer thread rather than in the next reads
+        _writer.submit(_warm_task_store, CURRENT_TODO_PATH)
+        if _resources_changed is not None:
+            _resources_changed.set()
+
+
+async def _write(operation: Callable[[TaskService], str]) -> str:
+    """Run a task service operation that changes TODO.md on the writer thread."""
+    return await _on_writer(functools.partial(_run, operation))
+
+
+async def _capture(executor: Executor, func, *args, **kwargs) -> str:
+    """Run a CLI command on ``executor`` and return its captured stdout."""
+    call = functools.partial(_capture_output, func, *args, **kwargs)
+    if executor is _writer:
+        return await _on_writer(call)
+    return await _in_thread(executor, call)
+
+
+async def _blocking_call(
+    description: str, func: Callable[..., str], *args, timeout: float | None = None, **kwargs
+) -> str:
+    """Run network or subprocess work on the blocking pool, giving up after a timeout.
+
+    The thread finishes the call in the background; the tool returns an error
+    instead of waiting for it.
+    """
+    try:
+        return await _in_thread(
+            _blocking,
+            functools.partial(func, *args, **kwargs),
+            BLOCKING_TIMEOUT_SECONDS if timeout is None else timeout,
+        )
+    except TimeoutError:
+        return f"Error: {description} timed out"
 
 
 # Basic Task Operations
 
 
 @mcp.tool()
-def add_task(title: str, description: str | None = None, tags: list[str] | None = None) -> str:
+async def add_task(
+    title: str, description: str | None = None, tags: list[str] | None = None
+) -> str:
     """Add a new task to TODO.md.
 
     Args:
@@ -79,25 +174,15 @@ def add_task(title: str, description: str | None = None, tags: list[str] | None
         description: Optional detailed notes for the task
         tags: Optional list of tags
     """
-    if tags is None:
-        tags = []
-    result = _capture_output(add_command, title, tags, todo_path=CURRENT_TODO_PATH)
-
-    # If description provided and task was added successfully, add notes
-    if description and "Added:" in result:
-        # Extract task ID from result (format: "Added: #123 ...")
-        import re
-
-        match = re.search(r"Added: #(\S+)", result)
-        if match:
-            task_id = match.group(1)
-            _capture_output(note_command, task_id, description, todo_path=CURRENT_TODO_PATH)
-
-    return result
+    return await _write(
+        lambda service: formatters.format_added(
+            service.add_task(title, tags or [], notes=description)
+        )
+    )
 
 
 @mcp.tool()
-def add_subtask(
+async def add_subtask(
     parent_id: str, title: str, description: str | None = None, tags: list[str] | None = None
 ) -> str:
     """Add a subtask to an existing task.
@@ -108,51 +193,74 @@ def add_subtask(
         description: Optional detailed notes for the subtask
         tags: Optional list of tags
     """
-    if tags is None:
-        tags = []
-    result = _capture_output(
-        add_subtask_command, parent_id, title, tags, todo_path=CURRENT_TODO_PATH
+    return await _write(
+        lambda service: formatters.format_added_subtask(
+            service.add_subtask(parent_id, title, tags or [], notes=description)
+        )
     )
 
-    # If description provided and subtask was added successfully, add notes
-    if description and "Added subtask:" in result:
-        import re
 
-        match = re.search(r"Added subtask: #(\S+)", result)
-        if match:
-            task_id = match.group(1)
-            _capture_output(note_command, task_id, description, todo_path=CURRENT_TODO_PATH)
-
-    return result
+def _record_completions(tasks) -> None:
+    # Track completion time for archive cooldown (session-based)
+    completed_at = datetime.now()
+    for task in tasks:
+        SESSION_COMPLETIONS[task.id] = completed_at
 
 
 @mcp.tool()
-def complete_task(task_ids: list[str], with_subtasks: bool = False) -> str:
+async def complete_task(task_ids: list[str], with_subtasks: bool = False) -> str:
     """Mark task(s) as complete.
 
     Args:
-        task_ids: List of task IDs (1 to n items)
+        task_ids: List of task IDs (1 to n items) or selectors: 104.3-104.10, 10-50 (root
+            tasks), 104.* (all subtasks of 104), tag:bug, status:pending
         with_subtasks: Include subtasks in operation
     """
-    result = _capture_output(complete_command, task_ids, with_subtasks, todo_path=CURRENT_TODO_PATH)
-    # Track completion time for archive cooldown (session-based)
-    for task_id in task_ids:
-        if "Completed:" in result or "Error" not in result:
-            SESSION_COMPLETIONS[task_id] = datetime.now()
-    return result
+
+    def complete(service: TaskService) -> str:
+        result = service.complete_tasks(task_ids, with_subtasks)
+        _record_completions(result.tasks)
+        return formatters.format_completed(result)
+
+    return await _write(complete)
+
+
+def _as_list(value: str | list[str] | None) -> list[str]:
+    """Accept a list or a comma-separated string."""
+    if value is None:
+        return []
+    if isinstance(value, str):
+        value = value.split(",")
+    return [item.strip() for item in value if item.strip()]
 
 
 @mcp.tool()
-def list_tasks(status: str | None = None, tag: str | None = None) -> str:
+async def list_tasks(
+    status: str | list[str] | None = None,
+    tag: str | list[str] | None = None,
+    match_any: bool = False,
+    id_range: str | None = None,
+    parents_only: bool = False,
+) -> str:
     """List tasks from TODO.md.
 
     Args:
-        status: Filter by status (pending, completed, archived). currently only 'pending' supported via incomplete_only=True
-        tag: Filter by tag
+        status: Filter by status or list of statuses (pending, completed, archived, deleted)
+        tag: Filter by tag or list of tags (tasks must carry all of them by default)
+        match_any: Match tasks carrying any of the given tags instead of all
+        id_range: Only tasks under root IDs in this inclusive range, e.g. "10-50"
+        parents_only: Only root tasks (no subtasks)
     """
-    incomplete_only = status == "pending"
-    return _capture_output(
-        list_command, tag=tag, incomplete_only=incomplete_only, todo_path=CURRENT_TODO_PATH
+    return await _read(
+        lambda service: formatters.format_task_list(
+            service.list_tasks(
+                tags=_as_list(tag),
+                match_any=match_any,
+                statuses=_as_list(status),
+                id_range=id_range,
+                parents_only=parents_only,
+            )
+        )
     )
 
 
@@ -160,7 +268,7 @@ def list_tasks(status: str | None = None, tag: str | None = None) -> str:
 
 
 @mcp.tool()
-def modify_task(
+async def modify_task(
     task_id: str, title: str, description: str | None = None, tags: list[str] | None = None
 ) -> str:
     """Modify a task's title, description, and/or tags.
@@ -171,65 +279,147 @@ def modify_task(
         description: Optional new detailed notes (replaces existing notes if provided)
         tags: Optional list of tags (preserves existing tags if not provided)
     """
-    if tags is None:
-        tags = []
-    result = _capture_output(modify_command, task_id, title, tags, todo_path=CURRENT_TODO_PATH)
-
-    # If description provided and modify was successful, update notes
-    if description is not None and "Modified:" in result:
-        if description == "":
-            # Clear notes
-            _capture_output(delete_note_command, task_id, todo_path=CURRENT_TODO_PATH)
-        else:
-            # Set/replace notes
-            _capture_output(update_note_command, task_id, description, todo_path=CURRENT_TODO_PATH)
-
-    return result
+    return await _write(
+        lambda service: formatters.format_modified(
+            service.modify_task(task_id, title, tags or [], notes=description)
+        )
+    )
 
 
 @mcp.tool()
-def delete_task(task_ids: list[str], with_subtasks: bool = True) -> str:
+async def delete_task(task_ids: list[str], with_subtasks: bool = True) -> str:
     """Delete task(s) and move to Deleted section.
 
     Args:
-        task_ids: List of task IDs (1 to n items)
+        task_ids: List of task IDs (1 to n items) or selectors: 104.3-104.10, 10-50 (root
+            tasks), 104.* (all subtasks of 104), tag:bug, status:pending
         with_subtasks: Include subtasks (default: True)
     """
-    return _capture_output(delete_command, task_ids, with_subtasks, todo_path=CURRENT_TODO_PATH)
+    return await _write(
+        lambda service: formatters.format_deleted(service.delete_tasks(task_ids, with_subtasks))
+    )
+
+
+def _archive_cooldown_message(
+    manager: TaskManager, task_ids: list[str], completing: set[str] | None = None
+) -> str:
+    """Return a refusal if a root task was completed too recently to archive, else "".
+
+    Selectors are resolved against ``manager`` first; archiving any task of a
+    root (the root or its subtasks) counts as archiving that root.
+    """
+    # Session-based cooldown check for root tasks completed in this session
+    roots = dict.fromkeys(TaskId.of(task_id).root for task_id in expand_task_ids(manager, task_ids))
+    for root in roots:
+        if completing and root in completing:
+            return f"Task #{root} requires human review before archiving."
+        if root in SESSION_COMPLETIONS:
+            elapsed = (datetime.now() - SESSION_COMPLETIONS[root]).total_seconds()
+            if elapsed < ARCHIVE_COOLDOWN_SECONDS:
+                return f"Task #{root} requires human review before archiving."
+    return ""
 
 
 @mcp.tool()
-def archive_task(
+async def archive_task(
     task_ids: list[str], reason: str | None = None, with_subtasks: bool = False
 ) -> str:
     """Archive task(s) to Recently Completed section.
 
     Args:
-        task_ids: List of task IDs (1 to n items)
+        task_ids: List of task IDs (1 to n items) or selectors: 104.3-104.10, 10-50 (root
+            tasks), 104.* (all subtasks of 104), tag:bug, status:pending
         reason: Optional reason for archiving
         with_subtasks: Include subtasks (default: False)
     """
-    # Session-based cooldown check for root tasks completed in this session
-    for task_id in task_ids:
-        if "." not in task_id and task_id in SESSION_COMPLETIONS:
-            elapsed = (datetime.now() - SESSION_COMPLETIONS[task_id]).total_seconds()
-            if elapsed < ARCHIVE_COOLDOWN_SECONDS:
-                return f"Task #{task_id} requires human review before archiving."
-    return _capture_output(archive_command, task_ids, reason, todo_path=CURRENT_TODO_PATH)
+
+    def archive(service: TaskService) -> str:
+        manager = service.store.get_manager(readonly=True)
+        cooldown_message = _archive_cooldown_message(manager, task_ids)
+        if cooldown_message:
+            return cooldown_message
+        return formatters.format_archived(service.archive_tasks(task_ids, reason))
+
+    return await _write(archive)
 
 
 @mcp.tool()
-def restore_task(task_ids: list[str]) -> str:
+async def restore_task(task_ids: list[str]) -> str:
     """Restore task(s) from Deleted or Archived back to Tasks section.
 
     Args:
         task_ids: List of task IDs (1 to n items)
     """
-    return _capture_output(restore_command, task_ids, todo_path=CURRENT_TODO_PATH)
+    return await _write(
+        lambda service: formatters.format_restored_tasks(service.restore_tasks(task_ids))
+    )
+
+
+@mcp.tool()
+async def batch(operations: list[dict]) -> str:
+    """Apply several task operations at once, writing TODO.md a single time.
+
+    All or nothing: if any operation fails, no changes are written.
+
+    Args:
+        operations: List of operations, each an object with an "op" name plus the
+            arguments of the matching tool. Supported ops: add (title, description,
+            tags), add_subtask (parent_id, title, description, tags), complete
+            (task_ids, with_subtasks), undo/start/stop (task_id), modify (task_id,
+            title, description, tags), set_tags (task_id, tags), set_description
+            (task_id, description), note (task_id, note), delete (task_ids,
+            with_subtasks), archive (task_ids, reason, with_subtasks), restore
+            (task_ids), relate (task_id, rel_type, target_ids).
+
+    Example:
+        batch([{"op": "complete", "task_ids": ["12"]},
+               {"op": "note", "task_id": "13", "note": "Blocked on #12"}])
+    """
+
+    def run(service: TaskService) -> str:
+        manager = service.store.get_manager(readonly=True)
+        completing: set[str] = set()  # Tasks completed by earlier operations of the batch
+        for operation in operations:
+            if not isinstance(operation, dict):
+                continue
+            if operation.get("op") == "archive":
+                cooldown_message = _archive_cooldown_message(
+                    manager, operation.get("task_ids") or [], completing
+                )
+                if cooldown_message:
+                    return cooldown_message
+            elif operation.get("op") == "complete":
+                completing.update(
+                    expand_task_ids(
+                        manager,
+                        operation.get("task_ids") or [],
+                        bool(operation.get("with_subtasks")),
+                    )
+                )
+        try:
+            result = service.batch(operations)
+        except ValueError as e:
+            return f"Error: {e}\nNo changes were written"
+        for operation, op_result in result.results:
+            if operation["op"] == "complete":
+                _record_completions(op_result.tasks)
+        return formatters.format_batch(result)
+
+    return await _write(run)
+
+
+@mcp.tool()
+async def flush() -> str:
+    """Write journaled task operations to TODO.md.
+
+    Only needed with `concurrency.mode: journal`, where changes are first
+    recorded in .ai-todo/state/op_journal. Call before committing TODO.md.
+    """
+    return await _write(lambda service: formatters.format_flushed(service.flush()))
 
 
 @mcp.tool()
-def prune_tasks(
+async def prune_tasks(
     days: int | None = None,
     older_than: str | None = None,
     from_task: str | None = None,
@@ -276,9 +466,8 @@ def prune_tasks(
     """
     from ai_todo.core.prune import PruneManager
 
-    try:
-        prune_mgr = PruneManager(CURRENT_TODO_PATH)
-        result = prune_mgr.prune_tasks(
+    def prune():
+        return PruneManager(CURRENT_TODO_PATH).prune_tasks(
             days=days,
             older_than=older_than,
             from_task=from_task,
@@ -286,6 +475,9 @@ def prune_tasks(
             backup=backup,
         )
 
+    try:
+        result = await _on_writer(prune)
+
         return {
             "tasks_pruned": result.tasks_pruned,
             "subtasks_pruned": result.subtasks_pruned,
@@ -299,7 +491,7 @@ def prune_tasks(
 
 
 @mcp.tool()
-def empty_trash(dry_run: bool = False) -> dict:
+async def empty_trash(dry_run: bool = False) -> dict:
     """
     Permanently remove expired deleted tasks (30-day retention).
 
@@ -329,8 +521,9 @@ def empty_trash(dry_run: bool = False) -> dict:
     from ai_todo.core.empty_trash import EmptyTrashManager
 
     try:
-        manager = EmptyTrashManager(CURRENT_TODO_PATH)
-        result = manager.empty_trash(dry_run=dry_run)
+        result = await _on_writer(
+            lambda: EmptyTrashManager(CURRENT_TODO_PATH).empty_trash(dry_run=dry_run)
+        )
 
         # Format user-friendly message
         if result.total_removed == 0:
@@ -356,40 +549,40 @@ def empty_trash(dry_run: bool = False) -> dict:
 
 
 @mcp.tool()
-def undo_task(task_id: str) -> str:
+async def undo_task(task_id: str) -> str:
     """Reopen (undo) a completed task."""
-    return _capture_output(undo_command, task_id, todo_path=CURRENT_TODO_PATH)
+    return await _write(lambda service: formatters.format_reopened(service.undo_task(task_id)))
 
 
 @mcp.tool()
-def start_task(task_id: str) -> str:
+async def start_task(task_id: str) -> str:
     """Mark a task as in progress."""
-    from ai_todo.cli.commands import start_command
-
-    return _capture_output(start_command, task_id, todo_path=CURRENT_TODO_PATH)
+    return await _write(lambda service: formatters.format_started(service.start_task(task_id)))
 
 
 @mcp.tool()
-def stop_task(task_id: str) -> str:
+async def stop_task(task_id: str) -> str:
     """Stop progress on a task."""
-    from ai_todo.cli.commands import stop_command
-
-    return _capture_output(stop_command, task_id, todo_path=CURRENT_TODO_PATH)
+    return await _write(lambda service: formatters.format_stopped(service.stop_task(task_id)))
 
 
 @mcp.tool()
-def get_active_tasks() -> str:
+async def get_active_tasks() -> str:
     """Get a list of all currently active tasks (marked #inprogress)."""
-    return _capture_output(
-        list_command, tag="inprogress", incomplete_only=True, todo_path=CURRENT_TODO_PATH
+    return await _read(
+        lambda service: formatters.format_task_list(
+            service.list_tasks(tag="inprogress", incomplete_only=True)
+        )
     )
 
 
 @mcp.prompt()
-def active_context() -> str:
+async def active_context() -> str:
     """Get the current active context (in-progress tasks)."""
-    return _capture_output(
-        list_command, tag="inprogress", incomplete_only=True, todo_path=CURRENT_TODO_PATH
+    return await _read(
+        lambda service: formatters.format_task_list(
+            service.list_tasks(tag="inprogress", incomplete_only=True)
+        )
     )
 
 
@@ -397,7 +590,7 @@ def active_context() -> str:
 
 
 @mcp.tool()
-def set_description(task_id: str, description: str) -> str:
+async def set_description(task_id: str, description: str) -> str:
     """Set or clear a task's description (notes).
 
     This is idempotent - calling with the same description has no additional effect.
@@ -406,24 +599,15 @@ def set_description(task_id: str, description: str) -> str:
         task_id: ID of the task
         description: The description text. Use "" (empty string) to clear.
     """
-    if description == "":
-        return _capture_output(delete_note_command, task_id, todo_path=CURRENT_TODO_PATH)
-    else:
-        # Check if task has existing notes - if so, update; otherwise add
-        from ai_todo.cli.commands import get_manager
-
-        manager = get_manager(CURRENT_TODO_PATH)
-        task = manager.get_task(task_id)
-        if task and task.notes:
-            return _capture_output(
-                update_note_command, task_id, description, todo_path=CURRENT_TODO_PATH
-            )
-        else:
-            return _capture_output(note_command, task_id, description, todo_path=CURRENT_TODO_PATH)
+    return await _write(
+        lambda service: formatters.format_description_set(
+            service.set_description(task_id, description), description
+        )
+    )
 
 
 @mcp.tool()
-def set_tags(task_id: str, tags: list[str]) -> str:
+async def set_tags(task_id: str, tags: list[str]) -> str:
     """Set a task's tags (replaces all existing tags).
 
     This is idempotent - calling with the same tags has no additional effect.
@@ -432,38 +616,34 @@ def set_tags(task_id: str, tags: list[str]) -> str:
         task_id: ID of the task
         tags: List of tags. Use [] (empty list) to clear all tags.
     """
-    from ai_todo.cli.commands import get_manager, save_changes
-
-    manager = get_manager(CURRENT_TODO_PATH)
-    task = manager.get_task(task_id)
-    if not task:
-        return f"Error: Task {task_id} not found"
-
-    # Set tags (replaces existing)
-    task.tags = set(tags)
-    save_changes(manager, CURRENT_TODO_PATH)
-
-    if tags:
-        tag_str = " ".join([f"`#{tag}`" for tag in sorted(tags)])
-        return f"Set tags on #{task_id}: {tag_str}"
-    else:
-        return f"Cleared tags from #{task_id}"
+    return await _write(lambda service: formatters.format_tags_set(service.set_tags(task_id, tags)))
 
 
 # Phase 3: Task Display and Relationships
 
 
 @mcp.tool()
-def show_task(task_id: str) -> str:
-    """Display task with subtasks, relationships, and notes."""
-    return _capture_output(show_command, task_id, todo_path=CURRENT_TODO_PATH)
+async def show_task(task_id: str, archived: bool = False) -> str:
+    """Display task with subtasks, relationships, and notes.
+
+    Args:
+        task_id: ID of the task
+        archived: Look the task up in the prune archive (tasks pruned from TODO.md)
+    """
+    return await _read(
+        lambda service: formatters.format_task_details(
+            service.show_archived_task(task_id) if archived else service.show_task(task_id)
+        )
+    )
 
 
 @mcp.tool()
-def relate_task(task_id: str, rel_type: str, target_ids: list[str]) -> str:
+async def relate_task(task_id: str, rel_type: str, target_ids: list[str]) -> str:
     """Add task relationship (completed-by, depends-on, blocks, related-to, duplicate-of)."""
-    return _capture_output(
-        relate_command, task_id, rel_type, target_ids, todo_path=CURRENT_TODO_PATH
+    return await _write(
+        lambda service: formatters.format_relationship_added(
+            service.relate(task_id, rel_type, target_ids), rel_type, target_ids
+        )
     )
 
 
@@ -471,48 +651,55 @@ def relate_task(task_id: str, rel_type: str, target_ids: list[str]) -> str:
 
 
 @mcp.tool()
-def lint() -> str:
+async def lint() -> str:
     """Identify formatting issues (indentation, checkboxes)."""
-    return _capture_output(lint_command, todo_path=CURRENT_TODO_PATH)
+    return await _capture(_readers, lint_command, todo_path=CURRENT_TODO_PATH)
 
 
 @mcp.tool()
-def reformat(dry_run: bool = False) -> str:
+async def reformat(dry_run: bool = False) -> str:
     """Apply formatting fixes."""
-    return _capture_output(reformat_command, dry_run, todo_path=CURRENT_TODO_PATH)
+    return await _capture(_writer, reformat_command, dry_run, todo_path=CURRENT_TODO_PATH)
 
 
 @mcp.tool()
-def reorder() -> str:
+async def reorder() -> str:
     """Reorder subtasks to match reverse-chronological order (newest on top)."""
-    return _capture_output(reorder_command, todo_path=CURRENT_TODO_PATH)
+    return await _capture(_writer, reorder_command, todo_path=CURRENT_TODO_PATH)
 
 
 @mcp.tool()
-def resolve_conflicts(dry_run: bool = False) -> str:
+async def resolve_conflicts(dry_run: bool = False) -> str:
     """Detect and resolve duplicate task IDs."""
-    return _capture_output(resolve_conflicts_command, dry_run, todo_path=CURRENT_TODO_PATH)
+    return await _capture(_writer, resolve_conflicts_command, dry_run, todo_path=CURRENT_TODO_PATH)
 
 
 # Phase 5: Configuration and Setup
 
 
 @mcp.tool()
-def show_config() -> str:
+async def show_config() -> str:
     """Show current configuration."""
-    return _capture_output(config_command, todo_path=CURRENT_TODO_PATH)
+    return await _capture(_readers, config_command, todo_path=CURRENT_TODO_PATH)
 
 
 @mcp.tool()
-def detect_coordination() -> str:
+async def detect_coordination() -> str:
     """Detect available coordination options based on system."""
-    return _capture_output(detect_coordination_tool_command, todo_path=CURRENT_TODO_PATH)
+    return await _blocking_call(
+        "Coordination detection",
+        _capture_output,
+        detect_coordination_tool_command,
+        todo_path=CURRENT_TODO_PATH,
+    )
 
 
 @mcp.tool()
-def setup_coordination(coord_type: str) -> str:
+async def setup_coordination(coord_type: str) -> str:
     """Set up coordination service (github-issues, counterapi)."""
-    return _capture_output(
+    return await _blocking_call(
+        "Coordination setup",
+        _capture_output,
         setup_coordination_tool_command,
         coord_type,
         interactive=False,
@@ -521,10 +708,10 @@ def setup_coordination(coord_type: str) -> str:
 
 
 @mcp.tool()
-def switch_mode(mode: str, force: bool = False, renumber: bool = False) -> str:
+async def switch_mode(mode: str, force: bool = False, renumber: bool = False) -> str:
     """Switch numbering mode (single-user, multi-user, branch, enhanced)."""
-    return _capture_output(
-        switch_mode_tool_command, mode, force, renumber, todo_path=CURRENT_TODO_PATH
+    return await _capture(
+        _writer, switch_mode_tool_command, mode, force, renumber, todo_path=CURRENT_TODO_PATH
     )
 
 
@@ -532,7 +719,7 @@ def switch_mode(mode: str, force: bool = False, renumber: bool = False) -> str:
 
 
 @mcp.tool()
-def version() -> str:
+async def version() -> str:
     """Return the current ai-todo version."""
     from ai_todo import __version__
 
@@ -540,7 +727,7 @@ def version() -> str:
 
 
 @mcp.tool()
-def check_update() -> str:
+async def check_update() -> str:
     """Check if an ai-todo update is available, respecting version constraints.
 
     In development mode, suggests using 'restart' tool instead of version checking.
@@ -561,12 +748,11 @@ def check_update() -> str:
 
     # Get project root from TODO path
     project_root = Path(CURRENT_TODO_PATH).parent
-    info = check_for_updates(project_root)
-    return info.message
+    return await _blocking_call("Update check", lambda: check_for_updates(project_root).message)
 
 
 @mcp.tool()
-def update(restart: bool = True) -> str:
+async def update(restart: bool = True) -> str:
     """Update ai-todo to the latest version and optionally restart.
 
     In development mode, this just restarts the server to pick up code changes.
@@ -598,7 +784,14 @@ def update(restart: bool = True) -> str:
 
     # Production mode: perform actual update
     project_root = Path(CURRENT_TODO_PATH).parent
-    success, message = perform_update(restart=restart, project_root=project_root)
+    try:
+        success, message = await _in_thread(
+            _blocking,
+            functools.partial(perform_update, restart=restart, project_root=project_root),
+            UPDATE_TIMEOUT_SECONDS,
+        )
+    except TimeoutError:
+        return "Error: Update timed out"
 
     if success and restart:
         import threading
@@ -614,15 +807,51 @@ def update(restart: bool = True) -> str:
     return message
 
 
+@mcp.tool()
+async def view_log(
+    lines: int = 50,
+    filter: str | None = None,
+    task_id: str | None = None,
+    since: str | None = None,
+    before: str | None = None,
+) -> dict:
+    """
+    Page through the operation log, newest entries first.
+
+    Args:
+        lines: Number of entries per page (default: 50)
+        filter: Only entries containing this text (case-insensitive)
+        task_id: Only entries for this task ID
+        since: Only entries at or after this date (YYYY-MM-DD)
+        before: next_cursor of the previous page, to continue with older entries
+
+    Returns:
+        dict with keys:
+            - entries: Log lines, newest first
+            - next_cursor: Pass as `before` for the next page (None at the end)
+    """
+    from ai_todo.cli.system_ops import find_log_file
+    from ai_todo.core.action_log import ActionLog
+
+    def read_page() -> dict:
+        log_file = find_log_file(CURRENT_TODO_PATH)
+        if log_file is None:
+            return {"entries": [], "next_cursor": None}
+        page = ActionLog(log_file).read(lines, filter, task_id=task_id, since=since, before=before)
+        return {"entries": [e.line for e in page.entries], "next_cursor": page.next_cursor}
+
+    return await _in_thread(_readers, read_page)
+
+
 # Phase 7: Tamper Detection
 
 
 @mcp.tool()
-def accept_tamper(reason: str) -> str:
+async def accept_tamper(reason: str) -> str:
     """Accept external changes to TODO.md."""
     from ai_todo.cli.tamper_ops import tamper_accept_command
 
-    return _capture_output(tamper_accept_command, reason, todo_path=CURRENT_TODO_PATH)
+    return await _capture(_writer, tamper_accept_command, reason, todo_path=CURRENT_TODO_PATH)
 
 
 # =============================================================================
@@ -653,23 +882,21 @@ def _get_open_tasks_data(todo_path: str) -> dict:
     from ai_todo.cli.commands import get_manager
     from ai_todo.core.task import IN_PROGRESS_TAG
 
-    manager = get_manager(todo_path)
+    manager = get_manager(todo_path, readonly=True)
     tasks = manager.list_tasks()
 
-    # Filter to open tasks: pending status OR has inprogress tag
-    open_tasks = [
-        t for t in tasks if t.status.value == "pending" or IN_PROGRESS_TAG in (t.tags or set())
-    ]
+    def is_open(task) -> bool:
+        # Open tasks: pending status OR has inprogress tag
+        return task.status.value == "pending" or IN_PROGRESS_TAG in (task.tags or set())
 
     # Only include root tasks (not subtasks)
-    root_tasks = [t for t in open_tasks if "." not in t.id]
+    root_tasks = [t for t in tasks if "." not in t.id and is_open(t)]
 
     # Add subtask count for each root task
     result_tasks = []
     for task in root_tasks:
         task_dict = _task_to_dict(task)
-        subtasks = [t for t in open_tasks if t.id.startswith(f"{task.id}.")]
-        task_dict["subtask_count"] = len(subtasks)
+        task_dict["subtask_count"] = sum(1 for t in manager.get_subtasks(task.id) if is_open(t))
         result_tasks.append(task_dict)
 
     return {
@@ -688,7 +915,7 @@ def _get_active_tasks_data(todo_path: str) -> dict:
     from ai_todo.cli.commands import get_manager
     from ai_todo.core.task import IN_PROGRESS_TAG
 
-    manager = get_manager(todo_path)
+    manager = get_manager(todo_path, readonly=True)
     tasks = manager.list_tasks()
 
     # Filter to active tasks (has inprogress tag)
@@ -709,12 +936,10 @@ def _get_task_data(task_id: str, todo_path: str) -> dict:
 
     Returns dict with task, subtasks, relationships, and timestamp.
     """
-    from ai_todo.cli.commands import get_manager
-    from ai_todo.core.file_ops import FileOps
+    from ai_todo.cli.commands import get_task_store
 
-    file_ops = FileOps(todo_path)
-    file_ops.read_tasks()  # Initialize file_ops with task data
-    manager = get_manager(todo_path)
+    store = get_task_store(todo_path)
+    manager = store.get_manager(readonly=True)
 
     task = manager.get_task(task_id)
     if not task:
@@ -725,7 +950,7 @@ def _get_task_data(task_id: str, todo_path: str) -> dict:
     subtask_dicts = [_task_to_dict(s) for s in sorted(subtasks, key=lambda t: t.id)]
 
     # Get relationships
-    relationships = file_ops.get_relationships(task_id) or {}
+    relationships = store.file_ops.get_relationships(task_id) or {}
 
     return {
         "task": _task_to_dict(task),
@@ -773,43 +998,171 @@ def _get_config_data(todo_path: str) -> dict:
     }
 
 
+def _config_stamp(todo_path: str) -> tuple:
+    """(size, mtime) of config.yaml and the serial file: changes when the config resource may."""
+    config_dir = Path(todo_path).parent / ".ai-todo"
+    stamp: list[tuple[int, int] | None] = []
+    for path in (config_dir / "config.yaml", config_dir / ".ai-todo.serial"):
+        try:
+            st = path.stat()
+            stamp.append((st.st_size, st.st_mtime_ns))
+        except OSError:
+            stamp.append(None)
+    return tuple(stamp)
+
+
+def _resource_json(uri: str) -> tuple[str, str]:
+    """Return (version, JSON text) of a resource, built again only when its source changed.
+
+    The version is a hash of the content (without the timestamp, which is when
+    it was built), so it stays the same for unchanged data across restarts.
+    """
+    from ai_todo.cli.commands import get_task_store
+
+    todo_path = CURRENT_TODO_PATH
+    build: Callable[[], dict]
+    if uri == "config://settings":
+        key: tuple = (uri, todo_path, _config_stamp(todo_path))
+        build = functools.partial(_get_config_data, todo_path)
+    else:
+        store = get_task_store(todo_path)
+        key = (uri, store.todo_path, store.version)
+        if uri == "tasks://open":
+            build = functools.partial(_get_open_tasks_data, todo_path)
+        elif uri == "tasks://active":
+            build = functools.partial(_get_active_tasks_data, todo_path)
+        else:
+            build = functools.partial(_get_task_data, uri.removeprefix("tasks://"), todo_path)
+    cached = _resource_cache.get(uri)
+    if cached is not None and cached[0] == key:
+        return cached[1], cached[2]
+    data = build()
+    timestamp = data.pop("timestamp", None)
+    body = json.dumps(data, indent=2)
+    version = hashlib.sha256(body.encode()).hexdigest()[:16]
+    # Add the version and build time before the closing brace instead of serializing again
+    text = f'{body[:-2]},\n  "version": "{version}",\n  "timestamp": {json.dumps(timestamp)}\n}}'
+    _resource_cache[uri] = (key, version, text)
+    return version, text
+
+
+async def _read_resource(uri: str) -> str:
+    return (await _in_thread(_readers, functools.partial(_resource_json, uri)))[1]
+
+
 @mcp.resource("tasks://open", mime_type="application/json")
-def get_open_tasks() -> str:
+async def get_open_tasks() -> str:
     """List of all open tasks (pending and in-progress).
 
-    Returns JSON with task list, count, and timestamp.
+    Returns JSON with task list, count, version and timestamp.
     """
-    return json.dumps(_get_open_tasks_data(CURRENT_TODO_PATH), indent=2)
+    return await _read_resource("tasks://open")
 
 
 @mcp.resource("tasks://active", mime_type="application/json")
-def get_active_tasks_resource() -> str:
+async def get_active_tasks_resource() -> str:
     """List of currently active tasks (marked #inprogress).
 
-    Returns JSON with task list, count, and timestamp.
+    Returns JSON with task list, count, version and timestamp.
     """
-    return json.dumps(_get_active_tasks_data(CURRENT_TODO_PATH), indent=2)
+    return await _read_resource("tasks://active")
 
 
 @mcp.resource("tasks://{task_id}", mime_type="application/json")
-def get_task_resource(task_id: str) -> str:
+async def get_task_resource(task_id: str) -> str:
     """Details of a specific task including subtasks and relationships.
 
     Args:
         task_id: The task ID (e.g., "262" or "262.1")
 
-    Returns JSON with task details, subtasks, relationships, and timestamp.
+    Returns JSON with task details, subtasks, relationships, version and timestamp.
     """
-    return json.dumps(_get_task_data(task_id, CURRENT_TODO_PATH), indent=2)
+    return await _read_resource(f"tasks://{task_id}")
 
 
 @mcp.resource("config://settings", mime_type="application/json")
-def get_config_resource() -> str:
+async def get_config_resource() -> str:
     """Current ai-todo configuration.
 
-    Returns JSON with numbering mode, security settings, and coordination config.
+    Returns JSON with numbering mode, security settings, coordination config,
+    version and timestamp.
     """
-    return json.dumps(_get_config_data(CURRENT_TODO_PATH), indent=2)
+    return await _read_resource("config://settings")
+
+
+# Resource subscriptions: after writes through this server, and every
+# RESOURCE_POLL_SECONDS for changes made elsewhere (CLI, editor, git), the
+# subscribed resources' versions are compared and sessions get a
+# notifications/resources/updated for each one that changed.
+_low_level = mcp._mcp_server
+_get_capabilities = _low_level.get_capabilities
+
+
+def _capabilities_with_subscribe(*args, **kwargs):
+    # The MCP SDK always reports resources.subscribe=False; this server handles subscriptions
+    capabilities = _get_capabilities(*args, **kwargs)
+    if capabilities.resources is not None:
+        capabilities.resources.subscribe = True
+    return capabilities
+
+
+_low_level.get_capabilities = _capabilities_with_subscribe  # type: ignore[method-assign]
+
+
+@_low_level.subscribe_resource()
+async def _subscribe(uri) -> None:
+    global _resources_changed, _resource_watcher
+
+    uri = str(uri)
+    sessions = _subscriptions.setdefault(uri, set())
+    if not sessions:
+        try:
+            _notified[uri] = (await _in_thread(_readers, functools.partial(_resource_json, uri)))[0]
+        except Exception:
+            _notified.pop(uri, None)
+    sessions.add(_low_level.request_context.session)
+    if _resource_watcher is None or _resource_watcher.done():
+        _resources_changed = asyncio.Event()
+        _resource_watcher = asyncio.create_task(_watch_resources())
+
+
+@_low_level.unsubscribe_resource()
+async def _unsubscribe(uri) -> None:
+    uri = str(uri)
+    sessions = _subscriptions.get(uri, set())
+    sessions.discard(_low_level.request_context.session)
+    if not sessions:
+        _subscriptions.pop(uri, None)
+        _notified.pop(uri, None)
+
+
+async def _watch_resources() -> None:
+    """Notify subscribers of changed resources until nothing is subscribed."""
+    while _subscriptions:
+        assert _resources_changed is not None
+        try:
+            await asyncio.wait_for(_resources_changed.wait(), RESOURCE_POLL_SECONDS)
+        except TimeoutError:
+            pass
+        _resources_changed.clear()
+        await _notify_resource_updates()
+
+
+async def _notify_resource_updates() -> None:
+    """Send notifications/resources/updated for subscribed resources whose version changed."""
+    for uri, sessions in list(_subscriptions.items()):
+        try:
+            version = (await _in_thread(_readers, functools.partial(_resource_json, uri)))[0]
+        except Exception:
+            continue  # Tampered or unreadable; reading the resource reports it
+        if _notified.get(uri) == version:
+            continue
+        _notified[uri] = version
+        for session in list(sessions):
+            try:
+                await session.send_resource_updated(uri)
+            except Exception:
+                sessions.discard(session)  # Disconnected
 
 
 AI_TODO_CURSOR_RULE = """---
@@ -879,6 +1232,34 @@ def _auto_empty_trash(todo_path: str):
         pass
 
 
+def _warm_task_store(todo_path: str):
+    """Load the resident task state with its indexes, so reads do not wait for them (silent)."""
+    from ai_todo.cli.commands import get_task_store
+
+    try:
+        get_task_store(todo_path).get_manager(readonly=True).build_indexes()
+    except Exception:
+        # Tamper or read errors are reported by the first tool call instead
+        pass
+
+
+def _start_journal_compactor(todo_path: str):
+    """In journal mode, fold journaled operations into TODO.md in the background."""
+    import atexit
+
+    from ai_todo.core.op_journal import JournalCompactor
+
+    try:
+        interval = TaskService(todo_path).compact_interval()
+    except Exception:
+        return
+    if interval is None:
+        return
+    compactor = JournalCompactor(lambda: TaskService(todo_path).flush(), interval)
+    compactor.start()
+    atexit.register(compactor.stop)
+
+
 def run_server(root_path: str = "."):
     """Run the MCP server."""
     global CURRENT_TODO_PATH
@@ -894,6 +1275,12 @@ def run_server(root_path: str = "."):
     # Auto-run empty trash on startup (silent)
     _auto_empty_trash(CURRENT_TODO_PATH)
 
+    # Load tasks into the resident store so the first tool call is served from memory
+    _warm_task_store(CURRENT_TODO_PATH)
+
+    # Write journaled operations to TODO.md periodically and on exit
+    _start_journal_compactor(CURRENT_TODO_PATH)
+
     # Run the server using stdio transport
     mcp.run(transport="stdio")
 
@@ -0,0 +1,162 @@
+"""Binary on-disk cache for parsed TODO.md content.
+
+A ParseResult is flattened into plain tuples/dicts/strings and serialized with
+``marshal``: compact, fast to load and unable to execute code on load. Each
+cache blob carries the SHA-256 checksum of the content it was built from, so a
+read only uses it when the current file hashes to the same value.
+"""
+
+import marshal
+from dataclasses import fields
+from datetime import datetime
+
+from ai_todo.core.task import Task, TaskStatus
+from ai_todo.parsers.markdown import FileStructureSnapshot, ParseResult
+
+# Bump when the encoded layout changes; older blobs are then ignored
+CACHE_VERSION = 2
+
+_SNAPSHOT_FIELDS = tuple(f.name for f in fields(FileStructureSnapshot))
+_STATUS_BY_VALUE = {status.value: status for status in TaskStatus}
+
+
+def _encode_date(value: datetime | None, parsed_at: datetime) -> str | None:
+    """Encode a datetime as ISO text; "" marks the parse-time placeholder."""
+    if value is None:
+        return None
+    if value == parsed_at:
+        return ""
+    return value.isoformat()
+
+
+def _decode_date(value: str | None, now: datetime) -> datetime | None:
+    if value is None:
+        return None
+    if value == "":
+        return now
+    return datetime.fromisoformat(value)
+
+
+def dump_parse_result(result: ParseResult, checksum: str) -> bytes:
+    """Serialize a ParseResult for the content identified by ``checksum``.
+
+    Task created_at/updated_at are not stored: the parser takes them from
+    TASK_METADATA or, failing that, the parse time, so the loader re-derives
+    them the same way. Other dates equal to the parse time are stored as
+    placeholders and re-filled with the load time.
+    """
+    parsed_at = result.parsed_at
+    tasks = tuple(
+        (
+            t.id,
+            t.description,
+            t.status.value,
+            tuple(t.tags),
+            tuple(t.notes),
+            _encode_date(t.completed_at, parsed_at),
+            _encode_date(t.archived_at, parsed_at),
+            _encode_date(t.deleted_at, parsed_at),
+            _encode_date(t.expires_at, parsed_at),
+        )
+        for t in result.tasks
+    )
+    timestamps = {
+        task_id: tuple((key, value.isoformat()) for key, value in ts.items())
+        for task_id, ts in result.task_timestamps.items()
+    }
+    snapshot = tuple(getattr(result.snapshot, name) for name in _SNAPSHOT_FIELDS)
+    payload = (
+        tasks,
+        snapshot,
+        result.header_lines,
+        result.footer_lines,
+        result.metadata_lines,
+        result.relationships,
+        timestamps,
+        result.interleaved_content,
+        result.deleted_task_formats,
+        result.tasks_header_format,
+        result.has_original_header,
+    )
+    return marshal.dumps((CACHE_VERSION, checksum, payload))
+
+
+def load_parse_result(data: bytes, checksum: str) -> ParseResult | None:
+    """Rebuild a ParseResult from cache data.
+
+    Returns:
+        The cached ParseResult, or None if the data is unreadable, from another
+        cache version, or was built from content with a different checksum
+    """
+    try:
+        version, cached_checksum, payload = marshal.loads(data)
+    except (EOFError, ValueError, TypeError):
+        return None
+    if version != CACHE_VERSION or cached_checksum != checksum:
+        return None
+
+    (
+        tasks_data,
+        snapshot_data,
+        header_lines,
+        footer_lines,
+        metadata_lines,
+        relationships,
+        timestamps,
+        interleaved_content,
+        deleted_task_formats,
+        tasks_header_format,
+        has_original_header,
+    ) = payload
+
+    now = datetime.now()
+    fromisoformat = datetime.fromisoformat
+    task_timestamps = {
+        task_id: {key: fromisoformat(value) for key, value in ts}
+        for task_id, ts in timestamps.items()
+    }
+    no_timestamps: dict[str, datetime] = {}
+
+    tasks = []
+    for (
+        task_id,
+        description,
+        status,
+        tags,
+        notes,
+        completed_at,
+        archived_at,
+        deleted_at,
+        expires_at,
+    ) in tasks_data:
+        ts = task_timestamps.get(task_id, no_timestamps)
+        tasks.append(
+            Task(
+                id=task_id,
+                description=description,
+                status=_STATUS_BY_VALUE[status],
+                tags=set(tags),
+                notes=list(notes),
+                created_at=ts.get("created_at", now),
+                updated_at=ts.get("updated_at", ts.get("created_at", now)),
+                completed_at=_decode_date(completed_at, now) if completed_at is not None else None,
+                archived_at=fromisoformat(archived_at) if archived_at else None,
+                deleted_at=fromisoformat(deleted_at) if deleted_at else None,
+                expires_at=fromisoformat(expires_at) if expires_at else None,
+            )
+        )
+
+    return ParseResult(
+        tasks=tasks,
+        snapshot=FileStructureSnapshot(*snapshot_data),
+        header_lines=header_lines,
+        footer_lines=footer_lines,
+        metadata_lines=metadata_lines,
+        relationships=relationships,
+        task_timestamps=task_timestamps,
+        interleaved_content=interleaved_content,
+        deleted_task_formats=deleted_task_formats,
+        tasks_header_format=tasks_header_format,
+        has_original_header=has_original_header,
+        parsed_at=now,
+    )
@@ -0,0 +1,466 @@
+"""Single-pass parser for TODO.md.
+
+The parser walks the file exactly once and produces everything FileOps needs:
+the Task list, relationships, timestamps, interleaved content and the
+immutable FileStructureSnapshot used to preserve the file layout on write.
+"""
+
+import re
+from dataclasses import dataclass, field
+from datetime import datetime
+
+from ai_todo.core.task import DATE_FIELDS, Task, TaskStatus
+
+# Regex patterns (compiled once at import time)
+# Match [ ], [x], or [D] checkboxes
+TASK_PATTERN = re.compile(r"^\s*-\s*\[([ xD])\]\s*\*\*#([0-9\.]+)\*\*\s*(.*)$")
+TAG_PATTERN = re.compile(r"`#([a-zA-Z0-9_-]+)`")
+SECTION_PATTERN = re.compile(r"^##\s+(.*)$")
+# Also match single # for "Tasks" section (common format)
+SINGLE_SECTION_PATTERN = re.compile(r"^#\s+Tasks\s*$")
+RELATIONSHIP_PATTERN = re.compile(r"^([0-9\.]+):([a-z-]+):(.+)$")
+SECOND_TIMESTAMP_PATTERN = re.compile(r":(\d{4}-\d{2}-\d{2}T)")
+ARCHIVE_DATE_PATTERN = re.compile(r" \(([0-9]{4}-[0-9]{2}-[0-9]{2})\)$")
+DELETION_PATTERN = re.compile(
+    r"\(deleted ([0-9]{4}-[0-9]{2}-[0-9]{2}), expires ([0-9]{4}-[0-9]{2}-[0-9]{2})\)"
+)
+DELETION_STRIP_PATTERN = re.compile(
+    r" *\(deleted [0-9]{4}-[0-9]{2}-[0-9]{2}, expires [0-9]{4}-[0-9]{2}-[0-9]{2}\)"
+)
+
+# Sections that contain tasks
+TASK_SECTIONS = frozenset({"Tasks", "Recently Completed", "Archived Tasks", "Deleted Tasks"})
+ARCHIVE_SECTIONS = frozenset({"Recently Completed", "Archived Tasks"})
+
+# Dates a task line shows, per status; a date stored in TASK_METADATA replaces them
+# only when it falls on the same day (otherwise the line was edited by hand)
+LINE_DATES = {
+    TaskStatus.COMPLETED: ("completed_at",),
+    TaskStatus.ARCHIVED: ("archived_at",),
+    TaskStatus.DELETED: ("deleted_at", "expires_at"),
+}
+
+
+@dataclass(frozen=True)
+class FileStructureSnapshot:
+    """Immutable snapshot of file structure captured from pristine file.
+
+    This snapshot is captured ONCE when FileOps first reads a file, and
+    is never modified, even if the file is re-read after modifications.
+    This ensures consistent structure preservation across all operations.
+    """
+
+    # Tasks section header format
+    tasks_header_format: str  # "# Tasks" or "## Tasks"
+
+    # Blank line preservation
+    blank_after_tasks_header: bool  # True if blank line after header
+    blank_between_tasks: bool  # True if blank lines between tasks in Tasks section
+    blank_after_tasks_section: bool  # True if blank line after Tasks (before other sections)
+
+    # File sections
+    header_lines: tuple[str, ...]  # Immutable tuple of header lines
+    footer_lines: tuple[str, ...]  # Immutable tuple of footer lines
+
+    # Metadata
+    has_original_header: bool  # True if file had header before Tasks section
+    metadata_lines: tuple[str, ...]  # HTML comments, relationships, etc.
+
+    # Interleaved content (non-task lines in Tasks section)
+    # Key: task_id (of preceding task), Value: tuple[str, ...] (lines of comments/whitespace)
+    # Preserves user comments, notes, or other content between tasks
+    interleaved_content: dict[str, tuple[str, ...]]
+
+    # Original task order in Tasks section (to preserve order of existing tasks)
+    # New tasks (not in this list) should appear first, then existing tasks in this order
+    original_task_order: tuple[str, ...]
+
+
+def create_default_snapshot() -> FileStructureSnapshot:
+    """Create a default structure snapshot for files that don't exist yet."""
+    return FileStructureSnapshot(
+        tasks_header_format="## Tasks",
+        blank_after_tasks_header=True,
+        blank_between_tasks=False,
+        blank_after_tasks_section=False,
+        header_lines=(),
+        footer_lines=(),
+        has_original_header=False,
+        metadata_lines=(),
+        interleaved_content={},
+        original_task_order=(),
+    )
+
+
+@dataclass
+class ParseResult:
+    """Everything extracted from one pass over TODO.md."""
+
+    tasks: list[Task]
+    snapshot: FileStructureSnapshot
+    header_lines: list[str] = field(default_factory=list)
+    footer_lines: list[str] = field(default_factory=list)
+    metadata_lines: list[str] = field(default_factory=list)
+    relationships: dict[str, dict[str, list[str]]] = field(default_factory=dict)
+    task_timestamps: dict[str, dict[str, datetime]] = field(default_factory=dict)
+    # Interleaved content for all task sections (the snapshot only keeps the Tasks section)
+    interleaved_content: dict[str, list[str]] = field(default_factory=dict)
+    # task_id -> original checkbox for tasks already in the Deleted Tasks section
+    deleted_task_formats: dict[str, str] = field(default_factory=dict)
+    tasks_header_format: str | None = None
+    has_original_header: bool = False
+    # Time of the parse; used for tasks without persisted timestamps
+    parsed_at: datetime = field(default_factory=datetime.now)
+
+
+def _parse_timestamps(timestamps_part: str) -> dict[str, datetime]:
+    """Parse the ``created_at[:updated_at] [field=timestamp ...]`` part of a TASK_METADATA line.
+
+    Fields are the task dates of DATE_FIELDS (e.g. ``archived_at=2026-01-28T10:00:00``);
+    unknown fields are ignored.
+
+    Raises:
+        ValueError: If a timestamp is malformed
+    """
+    timestamps_part, *date_fields = timestamps_part.split(" ")
+    # Look for a second ISO timestamp (starts with year), e.g. ":2026-01-28T"
+    second_ts_match = SECOND_TIMESTAMP_PATTERN.search(timestamps_part)
+    if second_ts_match:
+        split_pos = second_ts_match.start()
+        timestamps = {
+            "created_at": datetime.fromisoformat(timestamps_part[:split_pos]),
+            "updated_at": datetime.fromisoformat(timestamps_part[split_pos + 1 :]),
+        }
+    else:
+        # Only created_at
+        timestamps = {"created_at": datetime.fromisoformat(timestamps_part)}
+    for date_field in date_fields:
+        name, _, value = date_field.partition("=")
+        if name in DATE_FIELDS:
+            timestamps[name] = datetime.fromisoformat(value)
+    return timestamps
+
+
+def _apply_stored_dates(task: Task, timestamps: dict[str, datetime], now: datetime) -> None:
+    """Replace the dates derived from a task line with the ones from TASK_METADATA.
+
+    Only dates the task has in its current state are replaced. A date the line
+    shows (see LINE_DATES) is kept if the stored one falls on another day; the
+    parse-time placeholder ``now`` is always replaced.
+    """
+    line_dates = LINE_DATES.get(task.status, ())
+    for name in DATE_FIELDS:
+        stored = timestamps.get(name)
+        if stored is None:
+            continue
+        current = getattr(task, name)
+        if current is None:
+            continue
+        if current is now or name not in line_dates or current.date() == stored.date():
+            setattr(task, name, stored)
+
+
+def _parse_task_line(
+    completed_char: str, task_id: str, description: str, section: str, now: datetime
+) -> Task:
+    """Build a Task from the pieces of a matched task line."""
+    # Extract tags and remove them from description (format: `#tag`)
+    tags = set(TAG_PATTERN.findall(description))
+    if tags:
+        description = TAG_PATTERN.sub("", description).strip()
+
+    # Parse archive/completion date if present: (YYYY-MM-DD) at end of description
+    archived_at = None
+    line_date = None
+    archive_date_match = ARCHIVE_DATE_PATTERN.search(description)
+    if archive_date_match:
+        try:
+            date_str = archive_date_match.group(1)
+            # Always remove date from description to avoid duplication (format_task adds it back)
+            description = description[: archive_date_match.start()].strip()
+            line_date = datetime.fromisoformat(date_str)
+
+            # Only use as archived_at if in Archived section
+            if section in ARCHIVE_SECTIONS:
+                archived_at = line_date
+        except ValueError:
+            pass
+
+    # Determine status - section takes precedence over checkbox
+    # Fix for GitHub Issue #49: Tasks in archived sections should be ARCHIVED
+    # regardless of checkbox state (handles orphan subtasks with [ ] under [x] parents)
+    status = TaskStatus.PENDING
+    completed_at = None
+    if section in ARCHIVE_SECTIONS:
+        status = TaskStatus.ARCHIVED
+        # Fix for #204: Treat archived tasks as completed for restore purposes
+        if completed_char == "x":
+            completed_at = archived_at or now
+    elif section == "Deleted Tasks":
+        status = TaskStatus.DELETED
+    elif completed_char == "x":
+        # Only in Tasks section: [x] means COMPLETED, on the date the line shows
+        # (TASK_METADATA refines it to the exact time)
+        status = TaskStatus.COMPLETED
+        completed_at = line_date or now
+
+    # Check for [D] checkbox (deleted tasks) - overrides status
+    if completed_char == "D":
+        status = TaskStatus.DELETED
+
+    # Parse deletion metadata if present: (deleted YYYY-MM-DD, expires YYYY-MM-DD)
+    deleted_at = None
+    expires_at = None
+    if status == TaskStatus.DELETED:
+        deletion_match = DELETION_PATTERN.search(description)
+        if deletion_match:
+            try:
+                deleted_at = datetime.fromisoformat(deletion_match.group(1))
+                expires_at = datetime.fromisoformat(deletion_match.group(2))
+                description = DELETION_STRIP_PATTERN.sub("", description).strip()
+            except ValueError:
+                pass
+
+    task = Task(
+        id=task_id,
+        description=description.strip(),
+        status=status,
+        tags=tags,
+        created_at=now,
+        updated_at=now,
+    )
+    if deleted_at:
+        task.deleted_at = deleted_at
+    if expires_at:
+        task.expires_at = expires_at
+    if archived_at:
+        task.archived_at = archived_at
+    if completed_at:
+        task.completed_at = completed_at
+    return task
+
+
+def parse_markdown(content: str) -> ParseResult:
+    """Parse TODO.md content into tasks, metadata and a structure snapshot in one pass.
+
+    Args:
+        content: Full TODO.md text
+
+    Returns:
+        ParseResult with tasks, relationships, timestamps, preserved lines and snapshot
+    """
+    lines = content.splitlines()
+    line_count = len(lines)
+    now = datetime.now()
+
+    tasks: list[Task] = []
+    header_lines: list[str] = []
+    footer_lines: list[str] = []
+    metadata_lines: list[str] = []
+    relationships: dict[str, dict[str, list[str]]] = {}
+    task_timestamps: dict[str, dict[str, datetime]] = {}
+    interleaved_content: dict[str, list[str]] = {}
+    snapshot_interleaved: dict[str, list[str]] = {}
+    deleted_task_formats: dict[str, str] = {}
+
+    tasks_header_format: str | None = None
+    has_original_header = False
+    blank_after_tasks_header = False
+    blank_between_tasks = False
+    blank_after_tasks_section = False
+    tasks_in_section: list[str] = []  # Task IDs in the Tasks section, in file order
+
+    current_task: Task | None = None
+    current_section = "Header"  # Start in Header mode
+    seen_tasks_section = False
+    in_relationships_section = False
+    in_timestamps_section = False
+    in_metadata_section = False
+
+    for line_idx, line in enumerate(lines):
+        line_stripped = line.strip()
+
+        # Separator lines may indicate footer start; they are regenerated on write
+        if line_stripped == "---":
+            continue
+
+        # Both section header forms start with "#"; skip the regexes for all other lines
+        is_heading = line.startswith("#")
+
+        # Single # Tasks section (common format)
+        if is_heading and SINGLE_SECTION_PATTERN.match(line):
+            tasks_header_format = line
+            if not seen_tasks_section and not header_lines:
+                has_original_header = False
+            if line_idx + 1 < line_count and lines[line_idx + 1].strip() == "":
+                blank_after_tasks_header = True
+            current_section = "Tasks"
+            seen_tasks_section = True
+            current_task = None
+            in_metadata_section = False
+            continue
+
+        # Section header
+        section_match = SECTION_PATTERN.match(line) if is_heading else None
+        if section_match:
+            section_name = section_match.group(1).strip()
+            if section_name in TASK_SECTIONS:
+                if current_section == "Header" and section_name == "Tasks" and not header_lines:
+                    has_original_header = False
+                if section_name == "Tasks":
+                    tasks_header_format = line
+                    blank_after_tasks_header = (
+                        line_idx + 1 < line_count and lines[line_idx + 1].strip() == ""
+                    )
+                    tasks_in_section = []
+                elif section_name in ARCHIVE_SECTIONS:
+                    # Blank line before this section (after Tasks)?
+                    if (
+                        current_section == "Tasks"
+                        and tasks_in_section
+                        and line_idx > 0
+                        and lines[line_idx - 1].strip() == ""
+                    ):
+                        blank_after_tasks_section = True
+                current_section = section_name
+                seen_tasks_section = True
+                current_task = None
+                in_metadata_section = False
+                continue
+            elif section_name == "Task Metadata":
+                in_metadata_section = True
+                metadata_lines.append(line)
+                continue
+            elif current_section != "Header" and not in_metadata_section:
+                # Unknown section past "Tasks" is treated as footer
+                current_section = "Footer"
+
+        # Footer start via separator
+        if (
+            line_stripped == "------------------"
+            and current_section != "Header"
+            and not in_metadata_section
+        ):
+            current_section = "Footer"
+
+        # Timestamps / relationships blocks (even without Task Metadata header)
+        if line_stripped == "<!-- TASK_METADATA":
+            in_timestamps_section = True
+            in_metadata_section = True
+            metadata_lines.append(line)
+            continue
+        if line_stripped == "<!-- TASK RELATIONSHIPS":
+            in_relationships_section = True
+            in_metadata_section = True
+            metadata_lines.append(line)
+            continue
+
+        if in_metadata_section:
+            metadata_lines.append(line)
+            if in_timestamps_section:
+                if line_stripped == "-->":
+                    in_timestamps_section = False
+                elif ":" in line_stripped and not line_stripped.startswith("#"):
+                    # Format: task_id:created_at[:updated_at] [date_field=timestamp ...]
+                    first_colon = line_stripped.index(":")
+                    try:
+                        task_timestamps[line_stripped[:first_colon]] = _parse_timestamps(
+                            line_stripped[first_colon + 1 :]
+                        )
+                    except ValueError:
+                        pass  # Skip malformed timestamp lines
+            elif in_relationships_section:
+                if line_stripped == "-->":
+                    in_relationships_section = False
+                else:
+                    # Format: task_id:rel_type:targets (targets space-separated)
+                    rel_match = RELATIONSHIP_PATTERN.match(line_stripped)
+                    if rel_match:
+                        rel_task_id, rel_type, targets = rel_match.groups()
+                        relationships.setdefault(rel_task_id, {})[rel_type] = targets.split()
+            continue
+
+        if current_section == "Header":
+            header_lines.append(line)
+            has_original_header = True
+            continue
+
+        if current_section == "Footer":
+            footer_lines.append(line)
+            continue
+
+        # Task sections: task/subtask line
+        task_match = TASK_PATTERN.match(line)
+        if task_match:
+            completed_char, task_id, description = task_match.groups()
+            task = _parse_task_line(completed_char, task_id, description, current_section, now)
+            # Preserve original checkbox format for tasks already in Deleted section
+            if current_section == "Deleted Tasks" and task.status == TaskStatus.DELETED:
+                deleted_task_formats[task_id] = completed_char
+            if current_section == "Tasks":
+                if tasks_in_section and line_idx > 0 and lines[line_idx - 1].strip() == "":
+                    blank_between_tasks = True
+                tasks_in_section.append(task_id)
+            tasks.append(task)
+            current_task = task
+            continue
+
+        # Notes (blockquotes) belong to the current task
+        if current_task and line_stripped.startswith(">"):
+            current_task.notes.append(line_stripped[1:].strip())
+            current_task.updated_at = now
+            continue
+
+        # Phase 10: Capture interleaved content (non-task, non-note, non-blank lines)
+        if current_section in TASK_SECTIONS and current_task and line_stripped:
+            # Skip orphaned ai-todo timestamp lines (GitHub Issue #47)
+            if line_stripped.startswith("**ai-todo**") and "Last Updated:" in line_stripped:
+                continue
+
+            # Other metadata HTML comments start a metadata block, not interleaved content
+            if line_stripped.startswith("<!-- TASK"):
+                in_metadata_section = True
+                continue
+
+            interleaved_content.setdefault(current_task.id, []).append(line)
+            if current_section == "Tasks":
+                snapshot_interleaved.setdefault(current_task.id, []).append(line)
+
+    # Apply timestamps from TASK_METADATA to tasks
+    if task_timestamps:
+        for task in tasks:
+            ts = task_timestamps.get(task.id)
+            if ts:
+                if "created_at" in ts:
+                    task.created_at = ts["created_at"]
+                    # Written without updated_at when it equals created_at
+                    task.updated_at = ts.get("updated_at", task.created_at)
+                _apply_stored_dates(task, ts, now)
+
+    snapshot = FileStructureSnapshot(
+        tasks_header_format=tasks_header_format or "## Tasks",
+        blank_after_tasks_header=blank_after_tasks_header,
+        blank_between_tasks=blank_between_tasks,
+        blank_after_tasks_section=blank_after_tasks_section,
+        header_lines=tuple(header_lines),
+        footer_lines=tuple(footer_lines),
+        has_original_header=has_original_header,
+        metadata_lines=tuple(metadata_lines),
+        interleaved_content={k: tuple(v) for k, v in snapshot_interleaved.items()},
+        original_task_order=tuple(tasks_in_section),
+    )
+
+    return ParseResult(
+        tasks=tasks,
+        snapshot=snapshot,
+        header_lines=header_lines,
+        footer_lines=footer_lines,
+        metadata_lines=metadata_lines,
+        relationships=relationships,
+        task_timestamps=task_timestamps,
+        interleaved_content=interleaved_content,
+        deleted_task_formats=deleted_task_formats,
+        tasks_header_format=tasks_header_format,
+        has_original_header=has_original_header,
+        parsed_at=now,
+    )
@@ -1,9 +1,23 @@
+import hashlib
+import marshal
 import re
 import subprocess
 from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
 
+# Task ID as written in commit messages: 129, 129.1 or fxstein-129.1
+_TASK_ID = r"(?<![\w.-])(?:[\w-]+-)?\d+(?:\.\d+)*(?![\w-])"
+_TASK_ID_PATTERN = re.compile(_TASK_ID)
+_TASK_REF_PATTERN = re.compile(rf"#({_TASK_ID})")
+_ARCHIVED_TASK_PATTERN = re.compile(r"\[x\]\s+\*\*#([^*\s]+)\*\*.*\((\d{4}-\d{2}-\d{2})\)")
+
+# Bump when the layout of the on-disk archive date cache changes
+ARCHIVE_DATES_CACHE_VERSION = 1
+
+# Commit dates per task ID, keyed by (TODO.md path, refs fingerprint)
+_archive_dates: dict[tuple[str, str], dict[str, datetime]] = {}
+
 
 @dataclass
 class GitLogEntry:
@@ -70,43 +84,122 @@ def get_task_archive_date(task_id: str, todo_path: str) -> datetime | None:
         datetime of when task was archived, or None if not found
 
     Algorithm:
-        1. Try git log: search for commits mentioning task archive
-        2. Parse most recent matching commit timestamp
-        3. If no git match, fall back to parsing task metadata (YYYY-MM-DD)
-        4. Return None if neither method succeeds
+        1. Look the task up in the commit dates of get_task_archive_dates()
+        2. If no git match, fall back to parsing task metadata (YYYY-MM-DD)
+        3. Return None if neither method succeeds
+    """
+    archive_date = get_task_archive_dates(todo_path).get(task_id)
+    if archive_date is None:
+        archive_date = parse_archive_date_from_metadata(task_id, todo_path)
+    return archive_date
+
+
+def get_task_archive_dates(
+    todo_path: str, cache_path: str | Path | None = None
+) -> dict[str, datetime]:
+    """
+    Map every task ID referenced by TODO.md commits to its newest commit date.
+
+    One ``git log --all`` over the commits touching TODO.md is scanned. A commit
+    references a task when its message contains ``#<id>`` or names the ID after
+    "archive" on the same line (the pattern the per-task ``--grep`` used). The
+    result is cached in-process and, with ``cache_path``, on disk, keyed by the
+    fingerprint of HEAD and all refs, so history is rescanned only after it
+    changed.
+
+    Args:
+        todo_path: Path to TODO.md file
+        cache_path: Optional file to persist the map in (e.g. .ai-todo/state)
+
+    Returns:
+        Dict of task ID -> timezone-aware commit date; empty outside git
     """
-    # Try git log first
+    path = Path(todo_path).resolve()
+    refs = _refs_fingerprint(path.parent)
+    if refs is None:
+        return {}
+    key = (str(path), refs)
+    dates = _archive_dates.get(key)
+    if dates is None and cache_path is not None:
+        dates = _load_archive_dates(Path(cache_path), refs)
+    if dates is None:
+        dates = _scan_archive_dates(path)
+        if cache_path is not None:
+            _store_archive_dates(Path(cache_path), refs, dates)
+    _archive_dates[key] = dates
+    return dates
+
+
+def _refs_fingerprint(cwd: Path) -> str | None:
+    """Hash of HEAD and every ref, or None without git history."""
     try:
-        # Escape task_id for regex (e.g., "129.1" -> "129\.1")
-        escaped_task_id = re.escape(task_id)
-        # Use extended regex with OR (|) to match EITHER pattern
         result = subprocess.run(
-            [
-                "git",
-                "log",
-                "--all",
-                "--extended-regexp",
-                f"--grep=archive.*{escaped_task_id}|#{escaped_task_id}",
-                "--format=%ai",
-                "--",
-                todo_path,
-            ],
+            ["git", "show-ref", "--head"],
             capture_output=True,
             text=True,
-            cwd=str(Path(todo_path).parent),
+            cwd=str(cwd),
             check=False,
         )
+    except OSError:
+        return None
+    if result.returncode != 0 or not result.stdout.strip():
+        return None
+    return hashlib.sha256(result.stdout.encode("utf-8")).hexdigest()
 
-        if result.returncode == 0 and result.stdout.strip():
-            # Parse first (most recent) date
-            date_str = result.stdout.strip().split("\n")[0]
+
+def _scan_archive_dates(path: Path) -> dict[str, datetime]:
+    try:
+        result = subprocess.run(
+            ["git", "log", "--all", "--format=%x1e%ai%x00%B", "--", str(path)],
+            capture_output=True,
+            text=True,
+            cwd=str(path.parent),
+            check=False,
+        )
+    except OSError:
+        return {}
+    if result.returncode != 0:
+        return {}
+
+    dates: dict[str, datetime] = {}
+    # Commits come newest first; the first commit naming a task wins
+    for record in result.stdout.split("\x1e")[1:]:
+        date_str, _, message = record.partition("\x00")
+        task_ids = set(_TASK_REF_PATTERN.findall(message))
+        for line in message.splitlines():
+            start = line.find("archive")
+            if start >= 0:
+                task_ids.update(_TASK_ID_PATTERN.findall(line, start + len("archive")))
+        new_ids = task_ids.difference(dates)
+        if not new_ids:
+            continue
+        try:
             # Format: "2026-01-28 10:30:45 -0800"
-            return datetime.strptime(date_str, "%Y-%m-%d %H:%M:%S %z")
-    except Exception:
-        pass  # Fall through to fallback
+            date = datetime.strptime(date_str.strip(), "%Y-%m-%d %H:%M:%S %z")
+        except ValueError:
+            continue
+        for task_id in new_ids:
+            dates[task_id] = date
+    return dates
+
 
-    # Fallback: Parse metadata from archived task line
-    return parse_archive_date_from_metadata(task_id, todo_path)
+def _load_archive_dates(cache_path: Path, refs: str) -> dict[str, datetime] | None:
+    try:
+        version, cached_refs, dates = marshal.loads(cache_path.read_bytes())
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+    if version != ARCHIVE_DATES_CACHE_VERSION or cached_refs != refs:
+        return None
+    return {task_id: datetime.fromisoformat(value) for task_id, value in dates.items()}
+
+
+def _store_archive_dates(cache_path: Path, refs: str, dates: dict[str, datetime]) -> None:
+    payload = {task_id: value.isoformat() for task_id, value in dates.items()}
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        cache_path.write_bytes(marshal.dumps((ARCHIVE_DATES_CACHE_VERSION, refs, payload)))
+    except OSError:
+        pass
 
 
 def parse_archive_date_from_metadata(task_id: str, todo_path: str) -> datetime | None:
@@ -124,19 +217,32 @@ def parse_archive_date_from_metadata(task_id: str, todo_path: str) -> datetime |
     """
     try:
         content = Path(todo_path).read_text(encoding="utf-8")
-        # Look for archived task with ID
-        # Pattern matches: [x] **#129** ... (2026-01-28)
-        pattern = rf"\[x\]\s+\*\*#{re.escape(task_id)}\*\*.*\((\d{{4}}-\d{{2}}-\d{{2}})\)"
-        match = re.search(pattern, content)
-
-        if match:
-            date_str = match.group(1)
-            # Parse as naive datetime (no timezone)
-            return datetime.strptime(date_str, "%Y-%m-%d")
-    except Exception:
-        pass
+    except OSError:
+        return None
+    return parse_archive_dates_from_content(content).get(task_id)
+
+
+def parse_archive_dates_from_content(content: str) -> dict[str, datetime]:
+    """
+    Parse the dates of all completed task lines of TODO.md content.
 
-    return None
+    Format: - [x] **#129** Task description (2026-01-28)
+
+    Args:
+        content: TODO.md content
+
+    Returns:
+        Dict of task ID -> naive datetime of the line's (last) date
+    """
+    dates: dict[str, datetime] = {}
+    for match in _ARCHIVED_TASK_PATTERN.finditer(content):
+        task_id = match.group(1)
+        if task_id not in dates:
+            try:
+                dates[task_id] = datetime.strptime(match.group(2), "%Y-%m-%d")
+            except ValueError:
+                continue
+    return dates
 
 
 def get_git_log_entries(task_id: str, todo_path: str) -> list[GitLogEntry]:
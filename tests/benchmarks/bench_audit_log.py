@@ -0,0 +1,83 @@
+"""Benchmark logging operations: open/append/close per entry vs the buffered writer.
+
+Each operation is logged to the shared and the local audit log, as FileOps
+does. "per entry" resolves the user and timestamp and opens both files for
+every entry (as ``_log_action`` did); the buffered writers keep the files
+open and flush once per operation (a write transaction) or once per batch
+of operations.
+
+Usage:
+    python tests/benchmarks/bench_audit_log.py [--ops 10000] [--batch 100]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from ai_todo.core.action_log import ActionLog, format_entry  # noqa: E402
+from ai_todo.core.file_ops import _log_timestamp, _log_user  # noqa: E402
+
+
+def per_entry(paths: list[Path], op_count: int) -> None:
+    for index in range(op_count):
+        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        user = os.environ.get("USER") or os.environ.get("USERNAME") or "unknown"
+        line = f"{timestamp} | {user} | CLI | UPDATE | {index} | abcd1234 | "
+        for path in paths:
+            with open(path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+
+
+def buffered(paths: list[Path], op_count: int, batch: int, json_lines: bool = False) -> None:
+    logs = [ActionLog(path, rotate_days=0) for path in paths]
+    for index in range(op_count):
+        fields = {
+            "timestamp": _log_timestamp(),
+            "user": _log_user(),
+            "interface": "CLI",
+            "action": "UPDATE",
+            "task_id": str(index),
+            "checksum": "abcd1234",
+            "description": "",
+        }
+        line = format_entry(fields, json_lines=json_lines)
+        for log in logs:
+            log.append(line)
+        if (index + 1) % batch == 0:
+            for log in logs:
+                log.flush()
+    for log in logs:
+        log.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--ops", type=int, default=10_000)
+    parser.add_argument("--batch", type=int, default=100)
+    args = parser.parse_args()
+
+    variants = {
+        "per entry": lambda paths: per_entry(paths, args.ops),
+        "flush per op": lambda paths: buffered(paths, args.ops, 1),
+        f"flush per {args.batch}": lambda paths: buffered(paths, args.ops, args.batch),
+        "json, flush per op": lambda paths: buffered(paths, args.ops, 1, json_lines=True),
+    }
+    print(f"{args.ops} logged operations, 2 log files")
+    print(f"{'variant':>20} {'total':>10} {'per op':>10}")
+    for name, run in variants.items():
+        with tempfile.TemporaryDirectory() as tmp:
+            paths = [Path(tmp) / ".ai-todo.log", Path(tmp) / "audit.log"]
+            start = time.perf_counter()
+            run(paths)
+            total_ms = (time.perf_counter() - start) * 1000
+        print(f"{name:>20} {total_ms:>8.1f}ms {total_ms / args.ops * 1000:>8.1f}us")
+
+
+if __name__ == "__main__":
+    main()
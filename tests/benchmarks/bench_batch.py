@@ -0,0 +1,109 @@
+"""Benchmark the batch API against the same operations issued one by one.
+
+Also times a bulk import of new tasks and subtasks in one batch.
+
+Usage:
+    python tests/benchmarks/bench_batch.py [--tasks 5000] [--ops 500]
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from common import generate_todo  # noqa: E402
+
+from ai_todo.core.task_service import BATCH_OPERATIONS, TaskService  # noqa: E402
+
+
+def build_operations(task_count: int, op_count: int) -> list[dict]:
+    """A mix of completes, tags, notes, starts and relationships on active root tasks."""
+    roots = task_count // 4
+    # Active (non-archived, non-deleted) pending roots: bucket 1..5 in generate_todo
+    active = [str(root) for root in range(roots, 0, -1) if 1 <= root % 10 <= 5]
+    operations = []
+    for index in range(op_count):
+        task_id = active[index % len(active)]
+        kind = index % 5
+        if kind == 0:
+            operations.append({"op": "complete", "task_ids": [f"{task_id}.1"]})
+        elif kind == 1:
+            operations.append({"op": "set_tags", "task_id": task_id, "tags": ["bench", "batch"]})
+        elif kind == 2:
+            operations.append({"op": "note", "task_id": task_id, "note": f"Batch note {index}"})
+        elif kind == 3:
+            operations.append({"op": "start", "task_id": f"{task_id}.2"})
+        else:
+            target = active[(index + 1) % len(active)]
+            operations.append(
+                {
+                    "op": "relate",
+                    "task_id": task_id,
+                    "rel_type": "related-to",
+                    "target_ids": [target],
+                }
+            )
+    return operations
+
+
+def build_import(task_count: int) -> list[dict]:
+    """Bulk import: ``task_count`` new tasks, each with one subtask."""
+    operations = [
+        {"op": "add", "title": f"Imported {i}", "tags": ["import"]} for i in range(task_count)
+    ]
+    operations += [
+        {"op": "add_subtask", "parent_id": str(i + 1), "title": "Imported subtask"}
+        for i in range(task_count)
+    ]
+    return operations
+
+
+def run(todo_text: str, operations: list[dict], batched: bool) -> float:
+    """Apply operations to a fresh TODO.md and return the elapsed time in ms."""
+    with tempfile.TemporaryDirectory() as tmp:
+        todo_path = Path(tmp) / "TODO.md"
+        todo_path.write_text(todo_text, encoding="utf-8")
+        service = TaskService(str(todo_path))
+        service.list_tasks()  # Warm the resident store, as a running MCP server would be
+
+        start = time.perf_counter()
+        if batched:
+            service.batch(operations)
+        else:
+            for operation in operations:
+                arguments = dict(operation)
+                BATCH_OPERATIONS[arguments.pop("op")](service, **arguments)
+        return (time.perf_counter() - start) * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tasks", type=int, default=5_000)
+    parser.add_argument("--ops", type=int, default=500)
+    parser.add_argument("--import-tasks", type=int, default=5_000)
+    parser.add_argument(
+        "--individual-ops", type=int, default=50, help="Ops to time one by one (extrapolated)"
+    )
+    args = parser.parse_args()
+
+    todo_text = generate_todo(args.tasks)
+    operations = build_operations(args.tasks, args.ops)
+
+    batch_ms = run(todo_text, operations, batched=True)
+    sample = operations[: args.individual_ops]
+    individual_ms = run(todo_text, sample, batched=False) / len(sample) * len(operations)
+
+    print(f"{args.tasks} tasks, {args.ops} operations")
+    print(f"{'batch':>24} {batch_ms:>10.1f}ms")
+    print(f"{'one by one (estimated)':>24} {individual_ms:>10.1f}ms")
+
+    import_ms = run("## Tasks\n", build_import(args.import_tasks), batched=True)
+    label = f"import {args.import_tasks}+{args.import_tasks}"
+    print(f"{label:>24} {import_ms:>10.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
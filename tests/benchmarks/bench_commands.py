@@ -0,0 +1,75 @@
+"""Benchmark CLI commands as a fresh `ai-todo` process runs them.
+
+Each sample clears the in-process caches (resident task stores, parsed
+config files) first, so it pays what a new process pays apart from Python
+start-up and imports. Also times a bare ``FileOps()`` (the integrity check).
+
+Usage:
+    python tests/benchmarks/bench_commands.py [--tasks 5000] [--repeat 5]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from click.testing import CliRunner  # noqa: E402
+from common import generate_todo, measure  # noqa: E402
+
+from ai_todo.cli.main import cli  # noqa: E402
+from ai_todo.core import config as config_module  # noqa: E402
+from ai_todo.core import task_store  # noqa: E402
+from ai_todo.core.file_ops import FileOps  # noqa: E402
+
+COMMANDS = [
+    ["list"],
+    ["show", "1"],
+    ["add-task", "Benchmark task", "#bench"],
+    ["set-tags", "1", "bench"],
+    ["complete", "2.1"],
+]
+
+
+def fresh_process() -> None:
+    task_store._task_stores.clear()
+    getattr(config_module, "_config_cache", {}).clear()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tasks", type=int, default=5_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        todo_path = Path(tmp) / "TODO.md"
+        todo_path.write_text(generate_todo(args.tasks), encoding="utf-8")
+        (Path(tmp) / ".ai-todo").mkdir()
+        (Path(tmp) / ".ai-todo" / "config.yaml").write_text("security:\n  tamper_proof: true\n")
+        os.environ["TODO_FILE"] = str(todo_path)
+        runner = CliRunner()
+        FileOps(str(todo_path))  # Record the initial checksum
+
+        def file_ops() -> None:
+            fresh_process()
+            FileOps(str(todo_path))
+
+        print(f"{args.tasks} tasks, {todo_path.stat().st_size / 1e6:.1f} MB")
+        print(f"{'FileOps()':>24} {measure(file_ops, args.repeat):>10.2f}ms")
+        for command in COMMANDS:
+
+            def run(command: list[str] = command) -> None:
+                fresh_process()
+                result = runner.invoke(cli, command, catch_exceptions=False)
+                if result.exit_code:
+                    raise RuntimeError(result.output)
+
+            run()  # Make the file state settle (first write, parse cache)
+            print(f"{' '.join(command):>24} {measure(run, args.repeat):>10.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""Benchmark a burst of single mutations: lock mode vs the operation journal.
+
+Each mutation is a separate TaskService call, as an agent issuing tool calls
+would make. Journal mode acknowledges after an fsynced journal append and
+writes TODO.md once per ``compact_ops`` operations; the final flush is timed
+separately.
+
+Usage:
+    python tests/benchmarks/bench_journal.py [--tasks 5000] [--ops 200] [--compact-ops 100]
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from common import generate_todo  # noqa: E402
+
+from ai_todo.core.task_service import TaskService  # noqa: E402
+from ai_todo.core.task_store import TaskStore  # noqa: E402
+
+
+def run(todo_text: str, op_count: int, mode: str, compact_ops: int) -> tuple[float, float]:
+    """Return (ms for op_count mutations, ms for the final flush)."""
+    with tempfile.TemporaryDirectory() as tmp:
+        todo_path = Path(tmp) / "TODO.md"
+        todo_path.write_text(todo_text, encoding="utf-8")
+        config_dir = Path(tmp) / ".ai-todo"
+        config_dir.mkdir()
+        (config_dir / "config.yaml").write_text(
+            f"concurrency:\n  mode: {mode}\n  compact_ops: {compact_ops}\n"
+            "  compact_interval: 3600\n"
+        )
+        service = TaskService(str(todo_path), store=TaskStore(str(todo_path)))
+        service.list_tasks()  # Warm the resident store, as a running MCP server would be
+
+        start = time.perf_counter()
+        for index in range(op_count):
+            if index % 2:
+                service.set_tags("1", [f"burst{index}"])
+            else:
+                service.add_task(f"Burst {index}", ["burst"])
+        ops_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        service.flush()
+        return ops_ms, (time.perf_counter() - start) * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tasks", type=int, default=5_000)
+    parser.add_argument("--ops", type=int, default=200)
+    parser.add_argument("--compact-ops", type=int, default=100)
+    args = parser.parse_args()
+
+    todo_text = generate_todo(args.tasks)
+    print(f"{args.tasks} tasks, {args.ops} single operations")
+    print(f"{'mode':>10} {'total':>10} {'per op':>10} {'flush':>10}")
+    for mode in ("lock", "journal"):
+        ops_ms, flush_ms = run(todo_text, args.ops, mode, args.compact_ops)
+        per_op = ops_ms / args.ops
+        print(f"{mode:>10} {ops_ms:>8.1f}ms {per_op:>8.2f}ms {flush_ms:>8.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
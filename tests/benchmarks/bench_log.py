@@ -0,0 +1,82 @@
+"""Benchmark operation log queries: whole-file scan vs the rotating, indexed log.
+
+"scan" reads a single unrotated log and filters it in memory (as ``ai-todo
+log`` did); "indexed" queries the same entries rotated into 1 MiB gzip
+segments, reading newest first.
+
+Usage:
+    python tests/benchmarks/bench_log.py [--entries 200000] [--repeat 5]
+"""
+
+import argparse
+import sys
+import tempfile
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from common import measure  # noqa: E402
+
+from ai_todo.core.action_log import DEFAULT_ROTATE_BYTES, ActionLog  # noqa: E402
+
+
+def log_lines(count: int) -> list[str]:
+    start = datetime(2025, 1, 1)
+    return [
+        f"{(start + timedelta(minutes=i)).strftime('%Y-%m-%d %H:%M:%S')} | user | CLI | "
+        f"COMPLETE_TASKS | {i % 5000 + 1} | {i:08x} | Completed task {i % 5000 + 1}"
+        for i in range(count)
+    ]
+
+
+def build_rotated(log: ActionLog, lines: list[str]) -> None:
+    chunk: list[str] = []
+    size = 0
+    for line in lines:
+        chunk.append(line)
+        size += len(line) + 1
+        if size >= DEFAULT_ROTATE_BYTES:
+            log.path.write_text("\n".join(chunk) + "\n", encoding="utf-8")
+            log.rotate()
+            chunk, size = [], 0
+    log.path.write_text("\n".join(chunk) + "\n", encoding="utf-8")
+
+
+def scan(path: Path, lines: int, filter_text: str | None = None) -> list[str]:
+    entries = [line for line in path.read_text(encoding="utf-8").splitlines() if line.strip()]
+    if filter_text:
+        entries = [line for line in entries if filter_text.lower() in line.lower()]
+    return entries[-lines:]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entries", type=int, default=200_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    lines = log_lines(args.entries)
+    with tempfile.TemporaryDirectory() as tmp:
+        flat = Path(tmp) / "flat.log"
+        flat.write_text("\n".join(lines) + "\n", encoding="utf-8")
+        log = ActionLog(Path(tmp) / "rotated" / "ai-todo.log", keep_segments=1000)
+        log.path.parent.mkdir()
+        build_rotated(log, lines)
+
+        print(f"{args.entries} entries, {flat.stat().st_size / 1e6:.1f} MB")
+        print(f"{'query':>28} {'scan':>10} {'indexed':>10}")
+        queries = [
+            ("last 50", {}, None),
+            ("last 50, --filter", {"filter_text": "task 42"}, "task 42"),
+            ("last 20, --task", {"task_id": "42"}, "| 42 |"),
+        ]
+        for name, kwargs, needle in queries:
+            count = 20 if "task_id" in kwargs else 50
+            scan_ms = measure(lambda n=needle, c=count: scan(flat, c, n), args.repeat)
+            read_ms = measure(lambda k=kwargs, c=count: log.read(c, **k), args.repeat)
+            print(f"{name:>28} {scan_ms:>8.1f}ms {read_ms:>8.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""Benchmark simultaneous MCP tool calls: tools on the event loop vs reader/writer threads.
+
+Starts N list/show calls together with writes (start_task/stop_task) and one
+slow network call (check_update against a PyPI that answers after
+``--network-ms``). "on loop" runs every tool inline on the event loop, as the
+synchronous tools did; "threads" uses the server's read pool, single writer
+thread and blocking pool. Reports the wall time of the whole mix and the
+p50/p95 latency of the reads, counted from when the mix was submitted.
+
+Usage:
+    python tests/benchmarks/bench_mcp_concurrency.py [--tasks 5000] [--calls 20 100] [--writes 10]
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from common import generate_todo  # noqa: E402
+
+import ai_todo.core.updater as updater  # noqa: E402
+import ai_todo.mcp.server as server  # noqa: E402
+
+
+def _tool(name: str):
+    return server.mcp._tool_manager._tools[name].fn
+
+
+async def _on_loop(executor, func, timeout=None):
+    """Stand-in for server._in_thread that runs the call on the event loop."""
+    return func()
+
+
+async def run_mix(reads: int, writes: int, root_id: str) -> tuple[float, float, float]:
+    """Return (wall ms, p50 read ms, p95 read ms) for one mix of simultaneous calls."""
+
+    async def timed(call) -> float:
+        # From when all calls were submitted, as a client waiting for its answer sees it
+        await call
+        return (time.perf_counter() - start) * 1000
+
+    read_calls = [
+        _tool("show_task")(task_id=root_id) if n % 2 else _tool("list_tasks")(tag="missing")
+        for n in range(reads)
+    ]
+    write_calls = [
+        _tool("start_task" if n % 2 == 0 else "stop_task")(task_id=root_id) for n in range(writes)
+    ]
+    start = time.perf_counter()
+    latencies = await asyncio.gather(
+        _tool("check_update")(), *(timed(call) for call in read_calls), *write_calls
+    )
+    wall = (time.perf_counter() - start) * 1000
+    samples = sorted(latencies[1 : reads + 1])
+    return wall, statistics.median(samples), samples[int(len(samples) * 0.95) - 1]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tasks", type=int, default=5_000)
+    parser.add_argument("--calls", type=int, nargs="+", default=[20, 100])
+    parser.add_argument("--writes", type=int, default=10)
+    parser.add_argument("--network-ms", type=float, default=200)
+    args = parser.parse_args()
+
+    def slow_pypi(project_root):
+        time.sleep(args.network_ms / 1000)
+        return SimpleNamespace(message="up to date")
+
+    updater.is_dev_mode = lambda: False
+    updater.check_for_updates = slow_pypi
+    threaded = server._in_thread
+
+    with tempfile.TemporaryDirectory() as tmp:
+        todo_path = Path(tmp) / "TODO.md"
+        todo_path.write_text(generate_todo(args.tasks), encoding="utf-8")
+        server.CURRENT_TODO_PATH = str(todo_path)
+        root_id = str(args.tasks // 4 - 1)
+        asyncio.run(_tool("list_tasks")())  # Load the resident state
+
+        print(f"{args.tasks} tasks, {args.writes} writes, network call {args.network_ms:.0f}ms")
+        print(f"{'reads':>6} {'mode':>8} {'wall':>10} {'read p50':>10} {'read p95':>10}")
+        for reads in args.calls:
+            for mode, in_thread in (("on loop", _on_loop), ("threads", threaded)):
+                server._in_thread = in_thread
+                wall, p50, p95 = asyncio.run(run_mix(reads, args.writes, root_id))
+                print(f"{reads:>6} {mode:>8} {wall:>8.1f}ms {p50:>8.2f}ms {p95:>8.2f}ms")
+        server._in_thread = threaded
+        server._writer.submit(lambda: None).result()  # Let the last write finish
+
+
+if __name__ == "__main__":
+    main()
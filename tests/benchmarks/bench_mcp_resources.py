@@ -0,0 +1,76 @@
+"""Benchmark MCP resource reads: building the JSON on every read vs the cached payload.
+
+"rebuild" is what every read did: build the resource's dicts from the task
+state and ``json.dumps(..., indent=2)`` them (for tasks://{id} after parsing
+TODO.md a second time). "cached" is ``_resource_json()`` while TODO.md is
+unchanged; "after write" is the first read after a task changed, which
+builds the payload and hashes it for its version.
+
+Usage:
+    python tests/benchmarks/bench_mcp_resources.py [--sizes 1000 5000 20000] [--repeat 20]
+"""
+
+import argparse
+import json
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from common import generate_todo, measure  # noqa: E402
+
+import ai_todo.mcp.server as server  # noqa: E402
+from ai_todo.cli.commands import get_task_store  # noqa: E402
+from ai_todo.core.file_ops import FileOps  # noqa: E402
+
+
+def rebuild(uri: str, todo_path: str) -> str:
+    """A resource read as it was: build the data and serialize it."""
+    if uri == "tasks://open":
+        return json.dumps(server._get_open_tasks_data(todo_path), indent=2)
+    if uri == "config://settings":
+        return json.dumps(server._get_config_data(todo_path), indent=2)
+    FileOps(todo_path).read_tasks()  # The second parse the task resource used to do
+    return json.dumps(server._get_task_data(uri.removeprefix("tasks://"), todo_path), indent=2)
+
+
+def bench_resources(task_count: int, repeat: int) -> list[tuple[str, float, float, float]]:
+    """Return (uri, rebuild ms, cached ms, after write ms) per resource."""
+    with tempfile.TemporaryDirectory() as tmp:
+        todo_path = Path(tmp) / "TODO.md"
+        todo_path.write_text(generate_todo(task_count), encoding="utf-8")
+        server.CURRENT_TODO_PATH = str(todo_path)
+        root_id = str(task_count // 4 - 1)
+        get_task_store(str(todo_path)).get_manager(readonly=True)
+
+        results = []
+        for uri in ("tasks://open", f"tasks://{root_id}", "config://settings"):
+            rebuild_ms = measure(lambda uri=uri: rebuild(uri, str(todo_path)), repeat)
+            server._resource_json(uri)
+            cached_ms = measure(lambda uri=uri: server._resource_json(uri), repeat)
+
+            def after_write(uri=uri) -> None:
+                server._resource_cache.clear()  # As a write does by changing the task state
+                server._resource_json(uri)
+
+            results.append((uri, rebuild_ms, cached_ms, measure(after_write, repeat)))
+        return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 5_000, 20_000])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'tasks':>8} {'resource':>18} {'rebuild':>10} {'cached':>10} {'after write':>12}")
+    for size in args.sizes:
+        for uri, rebuild_ms, cached_ms, after_ms in bench_resources(size, args.repeat):
+            print(
+                f"{size:>8} {uri:>18} {rebuild_ms:>8.2f}ms {cached_ms:>8.3f}ms {after_ms:>10.2f}ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
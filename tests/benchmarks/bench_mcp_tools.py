@@ -0,0 +1,75 @@
+"""Benchmark MCP tool latency against a resident server process.
+
+Tools are invoked the way the server runs them: repeated calls in one process
+on the same TODO.md. Reports p50/p95 per tool.
+
+Usage:
+    python tests/benchmarks/bench_mcp_tools.py [--tasks 5000] [--calls 200]
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from common import generate_todo  # noqa: E402
+
+import ai_todo.mcp.server as server  # noqa: E402
+
+
+def _tool(name: str):
+    return server.mcp._tool_manager._tools[name].fn
+
+
+def bench_tool(name: str, kwargs: dict, calls: int) -> tuple[float, float]:
+    """Return (p50 ms, p95 ms) for ``calls`` invocations of a tool."""
+    fn = _tool(name)
+
+    async def run() -> list[float]:
+        samples = []
+        for _ in range(calls):
+            start = time.perf_counter()
+            await fn(**kwargs)
+            samples.append((time.perf_counter() - start) * 1000)
+        return samples
+
+    samples = sorted(asyncio.run(run()))
+    return statistics.median(samples), samples[int(len(samples) * 0.95) - 1]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tasks", type=int, default=5_000)
+    parser.add_argument("--calls", type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        todo_path = Path(tmp) / "TODO.md"
+        todo_path.write_text(generate_todo(args.tasks), encoding="utf-8")
+        server.CURRENT_TODO_PATH = str(todo_path)
+        root_id = str(args.tasks // 4 - 1)
+
+        cases = [
+            ("show_task", {"task_id": root_id}),
+            ("get_active_tasks", {}),
+            ("list_tasks", {"tag": "missing"}),
+            ("list_tasks", {"tag": ["bench", "missing"], "match_any": True, "id_range": "10-20"}),
+            ("list_tasks", {"status": ["deleted"], "id_range": "1-100"}),
+            ("start_task", {"task_id": root_id}),
+        ]
+        print(f"{args.tasks} tasks, {args.calls} calls per tool")
+        print(f"{'tool':>38} {'p50':>10} {'p95':>10}")
+        for name, kwargs in cases:
+            label = name if name != "list_tasks" else f"list {sorted(kwargs)}"
+            calls = args.calls if name != "start_task" else max(1, args.calls // 10)
+            p50, p95 = bench_tool(name, kwargs, calls)
+            print(f"{label:>38} {p50:>8.2f}ms {p95:>8.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""Benchmark TODO.md parsing (FileOps.read_tasks) at 1k, 10k and 100k tasks.
+
+Each sample uses a fresh FileOps, which is what every CLI invocation pays:
+the structure snapshot and the task list are both built from the file.
+"cold parse" removes the on-disk parse cache before every read; "cached" reads
+hit it. Run this script on two revisions to compare them.
+
+Usage:
+    python tests/benchmarks/bench_parser.py [--sizes 1000 10000 100000] [--repeat 5]
+"""
+
+import argparse
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from common import generate_todo, measure  # noqa: E402
+
+from ai_todo.core.file_ops import FileOps  # noqa: E402
+
+
+def bench_read(task_count: int, repeat: int) -> tuple[int, float, float, float]:
+    """Return (file size in bytes, cold parse ms, cached read ms, warm read ms)."""
+    with tempfile.TemporaryDirectory() as tmp:
+        todo_path = Path(tmp) / "TODO.md"
+        todo_path.write_text(generate_todo(task_count), encoding="utf-8")
+
+        def cold_read() -> None:
+            ops = FileOps(str(todo_path), skip_verify=True)
+            ops.invalidate_parse_cache()
+            ops.read_tasks()
+
+        def cached_read() -> None:
+            FileOps(str(todo_path), skip_verify=True).read_tasks()
+
+        warm_ops = FileOps(str(todo_path), skip_verify=True)
+        warm_ops.read_tasks()
+
+        cold = measure(cold_read, repeat)
+        cached_read()
+        cached = measure(cached_read, repeat)
+        warm = measure(warm_ops.read_tasks, repeat)
+        return todo_path.stat().st_size, cold, cached, warm
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'tasks':>8} {'size':>10} {'cold parse':>12} {'cached':>12} {'warm read':>12}")
+    for size in args.sizes:
+        file_size, cold, cached, warm = bench_read(size, args.repeat)
+        print(
+            f"{size:>8} {file_size / 1024:>8.0f}KB {cold:>10.1f}ms {cached:>10.1f}ms {warm:>10.1f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
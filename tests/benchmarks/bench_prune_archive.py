@@ -0,0 +1,106 @@
+"""Benchmark prune backups: one Markdown file built by string concatenation vs the segment writer.
+
+"single file" builds the whole backup with ``+=`` and writes a new
+TODO_ARCHIVE_<date>.md (what every prune did); "segment" streams the same
+tasks into the month's gzip segment with ``create_archive_backup()``.
+"lookup" reads one pruned task through the manifest; "full read" is the
+alternative without it: decompress and parse the whole segment.
+
+Usage:
+    python tests/benchmarks/bench_prune_archive.py [--sizes 1000 10000 40000] [--repeat 5]
+"""
+
+import argparse
+import gzip
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from common import generate_todo, measure  # noqa: E402
+
+from ai_todo.core.file_ops import FileOps  # noqa: E402
+from ai_todo.core.prune import PruneManager  # noqa: E402
+from ai_todo.core.prune_archive import PruneArchive  # noqa: E402
+from ai_todo.core.task import Task, TaskManager, TaskStatus  # noqa: E402
+from ai_todo.parsers.markdown import parse_markdown  # noqa: E402
+
+
+def write_single_file(tasks: list[Task], path: Path) -> None:
+    """The former backup: concatenate one string and write it to a new file."""
+    content = "# Archived Tasks\n\n## Pruned Tasks\n\n"
+    hierarchy = TaskManager(tasks)
+    roots = sorted((t for t in tasks if "." not in t.id), key=lambda t: int(t.id))
+    for root in roots:
+        for task in [root, *hierarchy.get_children(root.id)]:
+            indent = "  " * task.id.count(".")
+            content += f"{indent}- [x] **#{task.id}** {task.description}\n"
+            for note in task.notes:
+                content += f"{indent}  > {note}\n"
+        content += "\n"
+    content += "<!-- TASK_METADATA\n"
+    for task in tasks:
+        content += f"{task.id}:{task.created_at.isoformat()}\n"
+    content += "-->\n"
+    path.write_text(content, encoding="utf-8")
+
+
+def bench_archive(task_count: int, repeat: int) -> tuple[int, float, float, int, int, float, float]:
+    """Return (pruned tasks, single ms, segment ms, single bytes, segment bytes, lookup ms,
+    full read ms)."""
+    with tempfile.TemporaryDirectory() as tmp:
+        todo_path = Path(tmp) / "TODO.md"
+        todo_path.write_text(generate_todo(task_count), encoding="utf-8")
+        tasks = FileOps(str(todo_path), skip_verify=True).read_tasks()
+        pruned = [t for t in tasks if t.status == TaskStatus.ARCHIVED]
+        manager = PruneManager(str(todo_path))
+        archives = Path(tmp) / ".ai-todo" / "archives"
+        single = Path(tmp) / "TODO_ARCHIVE_single.md"
+
+        def segment() -> str:
+            shutil.rmtree(archives, ignore_errors=True)
+            return manager.create_archive_backup(pruned, days=30)
+
+        single_ms = measure(lambda: write_single_file(pruned, single), repeat)
+        segment_ms = measure(segment, repeat)
+        segment_path = Path(segment())
+        archive = PruneArchive(archives)
+        middle = sorted(t.id for t in pruned if "." not in t.id)[len(pruned) // 8]
+
+        def full_read() -> None:
+            text = gzip.decompress(segment_path.read_bytes()).decode("utf-8")
+            parse_markdown(text.replace("## Pruned Tasks", "## Archived Tasks"))
+
+        return (
+            len(pruned),
+            single_ms,
+            segment_ms,
+            single.stat().st_size,
+            segment_path.stat().st_size,
+            measure(lambda: archive.find(middle), repeat),
+            measure(full_read, repeat),
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 40_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(
+        f"{'tasks':>8} {'pruned':>7} {'single file':>12} {'segment':>10} {'md size':>9}"
+        f" {'gz size':>9} {'lookup':>9} {'full read':>10}"
+    )
+    for size in args.sizes:
+        count, single, segment, md_bytes, gz_bytes, lookup, full = bench_archive(size, args.repeat)
+        print(
+            f"{size:>8} {count:>7} {single:>10.1f}ms {segment:>8.1f}ms {md_bytes // 1024:>7}KB"
+            f" {gz_bytes // 1024:>7}KB {lookup:>7.2f}ms {full:>8.1f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""Benchmark prune's archive-date lookup: one git log per root task vs one history scan.
+
+Builds a throwaway repository whose history has one "Archive task #N" commit
+touching TODO.md per archived task (via ``git fast-import``). "per task" runs
+the former ``git log --all --grep`` for every task and re-reads TODO.md for
+the metadata fallback; "scan" is ``get_task_archive_dates()`` without a
+cache; "cached" reloads the map persisted for the unchanged refs.
+
+Usage:
+    python tests/benchmarks/bench_prune_history.py [--tasks 300 3000] [--sample 100]
+"""
+
+import argparse
+import re
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from ai_todo.utils import git  # noqa: E402
+from ai_todo.utils.git import get_task_archive_dates  # noqa: E402
+
+
+def build_history(repo: Path, task_count: int) -> None:
+    """Create one commit per archived task with git fast-import."""
+    subprocess.run(["git", "init", "-q", str(repo)], check=True)
+    commands: list[str] = []
+    start = 1_700_000_000
+    for task in range(1, task_count + 1):
+        content = f"# TODO\n\n- [x] **#{task}** Task {task} (2026-01-01)\n".encode()
+        message = f"Archive task #{task}\n".encode()
+        when = start + task * 60
+        commands.append(
+            f"commit refs/heads/main\n"
+            f"committer Bench <bench@example.com> {when} +0000\n"
+            f"data {len(message)}\n{message.decode()}\n"
+            f"M 644 inline TODO.md\ndata {len(content)}\n{content.decode()}\n"
+        )
+    subprocess.run(
+        ["git", "fast-import", "--quiet"],
+        input="".join(commands).encode(),
+        cwd=repo,
+        check=True,
+    )
+    subprocess.run(["git", "checkout", "-q", "main"], cwd=repo, check=True)
+
+
+def per_task_lookup(todo_path: Path, task_id: str) -> datetime | None:
+    """The former lookup: a --grep git log per task plus a re-read of TODO.md."""
+    escaped = re.escape(task_id)
+    result = subprocess.run(
+        [
+            "git",
+            "log",
+            "--all",
+            "--extended-regexp",
+            f"--grep=archive.*{escaped}|#{escaped}",
+            "--format=%ai",
+            "--",
+            str(todo_path),
+        ],
+        capture_output=True,
+        text=True,
+        cwd=str(todo_path.parent),
+        check=False,
+    )
+    if result.stdout.strip():
+        return datetime.strptime(result.stdout.split("\n")[0], "%Y-%m-%d %H:%M:%S %z")
+    content = todo_path.read_text(encoding="utf-8")
+    match = re.search(rf"\[x\]\s+\*\*#{escaped}\*\*.*\((\d{{4}}-\d{{2}}-\d{{2}})\)", content)
+    return datetime.strptime(match.group(1), "%Y-%m-%d") if match else None
+
+
+def timed(func) -> float:
+    start = time.perf_counter()
+    func()
+    return (time.perf_counter() - start) * 1000
+
+
+def bench_history(task_count: int, sample: int) -> tuple[float, float, float]:
+    """Return (per-task ms extrapolated to all tasks, scan ms, cached ms)."""
+    with tempfile.TemporaryDirectory() as tmp:
+        repo = Path(tmp)
+        build_history(repo, task_count)
+        todo_path = repo / "TODO.md"
+        cache_path = repo / ".ai-todo" / "state" / "archive_dates"
+
+        sample = min(sample, task_count)
+        per_task = timed(lambda: [per_task_lookup(todo_path, str(t)) for t in range(1, sample + 1)])
+
+        git._archive_dates.clear()
+        scan = timed(lambda: get_task_archive_dates(str(todo_path), cache_path))
+        git._archive_dates.clear()
+        cached = timed(lambda: get_task_archive_dates(str(todo_path), cache_path))
+        assert len(get_task_archive_dates(str(todo_path))) == task_count
+        return per_task * task_count / sample, scan, cached
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tasks", type=int, nargs="+", default=[300, 3_000])
+    parser.add_argument(
+        "--sample", type=int, default=100, help="tasks timed per-task (then extrapolated)"
+    )
+    args = parser.parse_args()
+
+    print(f"{'tasks':>8} {'per task (est.)':>16} {'scan':>10} {'cached':>10}")
+    for task_count in args.tasks:
+        per_task, scan, cached = bench_history(task_count, args.sample)
+        print(f"{task_count:>8} {per_task:>14.0f}ms {scan:>8.1f}ms {cached:>8.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Benchmark ordering the Archived and Deleted sections: sorting every write vs SectionOrder.
+
+"sort" orders both sections from scratch (what every full render did);
+"unchanged" reuses the orders of the previous write, as when an active task
+was added; "one moved" archives or restores a single root task between
+writes. "full render" times a whole render after adding an active task,
+with the section orders kept by FileOps.
+
+Usage:
+    python tests/benchmarks/bench_sections.py [--sizes 1000 10000 20000] [--repeat 5]
+"""
+
+import argparse
+import sys
+import tempfile
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from common import generate_todo, measure  # noqa: E402
+
+from ai_todo.core.file_ops import FileOps, SectionOrder  # noqa: E402
+from ai_todo.core.task import Task, TaskStatus  # noqa: E402
+
+
+def bench_sections(task_count: int, repeat: int) -> tuple[int, float, float, float, float]:
+    """Return (archived and deleted tasks, sort ms, unchanged ms, one moved ms, full render ms)."""
+    with tempfile.TemporaryDirectory() as tmp:
+        todo_path = Path(tmp) / "TODO.md"
+        todo_path.write_text(generate_todo(task_count), encoding="utf-8")
+        ops = FileOps(str(todo_path), skip_verify=True)
+        tasks = ops.read_tasks()
+        archived = [t for t in tasks if t.status == TaskStatus.ARCHIVED]
+        deleted = [t for t in tasks if t.status == TaskStatus.DELETED]
+
+        def sort() -> None:
+            SectionOrder("archived_at").order(archived)
+            SectionOrder("deleted_at").order(deleted)
+
+        archived_order, deleted_order = SectionOrder("archived_at"), SectionOrder("deleted_at")
+
+        def unchanged() -> None:
+            archived_order.order(archived)
+            deleted_order.order(deleted)
+
+        moving = Task(id="999999", description="Moving", status=TaskStatus.ARCHIVED)
+        moving.archived_at = datetime.now()
+        sections = iter(range(10**9))
+
+        def one_moved() -> None:
+            current = archived + [moving] if next(sections) % 2 else archived
+            archived_order.order(current)
+            deleted_order.order(deleted)
+
+        snapshot = ops._structure_snapshot
+        new_task = Task(id="999998", description="Added")
+
+        def full_render() -> None:
+            ops._render_document([new_task, *tasks], snapshot)
+
+        unchanged()
+        return (
+            len(archived) + len(deleted),
+            measure(sort, repeat),
+            measure(unchanged, repeat),
+            measure(one_moved, repeat),
+            measure(full_render, repeat),
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 20_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(
+        f"{'tasks':>8} {'sections':>9} {'sort':>10} {'unchanged':>10} {'one moved':>10}"
+        f" {'full render':>12}"
+    )
+    for size in args.sizes:
+        count, sort, unchanged, moved, render = bench_sections(size, args.repeat)
+        print(
+            f"{size:>8} {count:>9} {sort:>8.2f}ms {unchanged:>8.2f}ms {moved:>8.2f}ms"
+            f" {render:>10.1f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
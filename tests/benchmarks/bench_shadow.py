@@ -0,0 +1,89 @@
+"""Benchmark recording the shadow copy for single-task edits: full copy vs shadow store.
+
+"full copy" rewrites the whole last-valid TODO.md (as before the shadow
+store); "shadow store" appends a compressed line delta, with a snapshot every
+``security.shadow_snapshot_interval`` records. Reports time and bytes written
+per edit, and the time to read back the newest and the oldest version.
+
+Usage:
+    python tests/benchmarks/bench_shadow.py [--sizes 1000 10000 20000] [--edits 100]
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from common import generate_todo  # noqa: E402
+
+from ai_todo.core import shadow_store  # noqa: E402
+from ai_todo.core.file_ops import atomic_write_text  # noqa: E402
+from ai_todo.core.shadow_store import ShadowStore  # noqa: E402
+
+
+def edited_versions(todo_text: str, edits: int) -> list[str]:
+    """Successive contents, each completing one more task in the middle of the file."""
+    lines = todo_text.splitlines(keepends=True)
+    open_lines = [i for i, line in enumerate(lines) if line.startswith("- [ ] ")]
+    middle = len(open_lines) // 2
+    versions = []
+    for index in open_lines[middle : middle + edits]:
+        lines[index] = lines[index].replace("- [ ] ", "- [x] ", 1)
+        versions.append("".join(lines))
+    return versions
+
+
+def bench(task_count: int, edits: int) -> None:
+    todo_text = generate_todo(task_count)
+    versions = edited_versions(todo_text, edits)
+    with tempfile.TemporaryDirectory() as tmp:
+        shadow_path = Path(tmp) / "TODO.md"
+        start = time.perf_counter()
+        for content in versions:
+            atomic_write_text(shadow_path, content)
+        full_ms = (time.perf_counter() - start) * 1000 / len(versions)
+        full_bytes = len(versions[-1].encode("utf-8"))
+
+        store = ShadowStore(Path(tmp) / "shadow")
+        store.record(todo_text, "0" * 64)
+        start = time.perf_counter()
+        for index, content in enumerate(versions, 1):
+            store.record(content, f"{index:064x}")
+        store_ms = (time.perf_counter() - start) * 1000 / len(versions)
+        written = sum(v.size for v in store.history()[1:])
+
+        shadow_store._head_cache.clear()
+        start = time.perf_counter()
+        store.read()
+        newest_ms = (time.perf_counter() - start) * 1000
+        start = time.perf_counter()
+        store.read(f"{1:064x}")
+        oldest_ms = (time.perf_counter() - start) * 1000
+
+    print(
+        f"{task_count:>8} {full_ms:>9.2f}ms {full_bytes / 1024:>8.0f}KB "
+        f"{store_ms:>9.2f}ms {written / len(versions) / 1024:>8.1f}KB "
+        f"{newest_ms:>9.1f}ms {oldest_ms:>9.1f}ms"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 20_000])
+    parser.add_argument("--edits", type=int, default=100)
+    args = parser.parse_args()
+
+    print(f"{'':>8} {'full copy':>21} {'shadow store':>21} {'read back':>21}")
+    print(
+        f"{'tasks':>8} {'per edit':>11} {'written':>10} {'per edit':>11} {'written':>10} "
+        f"{'newest':>11} {'oldest':>10}"
+    )
+    for size in args.sizes:
+        bench(size, args.edits)
+
+
+if __name__ == "__main__":
+    main()
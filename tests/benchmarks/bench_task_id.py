@@ -0,0 +1,83 @@
+"""Microbenchmark task-ID handling: string splitting vs parsed, interned TaskIds.
+
+"parse" turns ID strings as read from TODO.md into what the code uses (the
+plain string, or ``TaskId.of()``, whose first call per ID parses it). The
+render loop does per-task work of a write: indentation, parent lookup, root
+grouping and the numeric sort key, once with string operations and once
+with TaskId attributes.
+
+Usage:
+    python tests/benchmarks/bench_task_id.py [--tasks 20000] [--repeat 5]
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from common import measure  # noqa: E402
+
+from ai_todo.core import task_id as task_id_module  # noqa: E402
+from ai_todo.core.task_id import TaskId  # noqa: E402
+
+
+def generate_ids(count: int) -> list[str]:
+    ids: list[str] = []
+    root = 0
+    while len(ids) < count:
+        root += 1
+        ids.append(str(root))
+        for sub in range(3, 0, -1):
+            ids.append(f"{root}.{sub}")
+            if sub == 1:
+                ids.append(f"{root}.{sub}.1")
+    return ids[:count]
+
+
+def render_strings(ids: list[str]) -> None:
+    groups: dict[str, list[str]] = {}
+    for task_id in ids:
+        indent = "  " * min(task_id.count("."), 2)
+        parent = task_id.rsplit(".", 1)[0] if "." in task_id else None
+        groups.setdefault(task_id.split(".")[0], []).append(indent + (parent or ""))
+    sorted(ids, key=lambda t: [int(x) for x in t.split(".")])
+
+
+def render_task_ids(ids: list[TaskId]) -> None:
+    groups: dict[str, list[str]] = {}
+    for task_id in ids:
+        indent = "  " * min(task_id.depth, 2)
+        parent = task_id.parent
+        groups.setdefault(task_id.root, []).append(indent + (parent or ""))
+    sorted(ids, key=lambda t: t.sort_key)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tasks", type=int, default=20_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    ids = generate_ids(args.tasks)
+    fresh = [str(int(i)) if "." not in i else ".".join(i.split(".")) for i in ids]
+
+    def parse_cold() -> None:
+        task_id_module._interned.clear()
+        [TaskId.of(i) for i in fresh]
+
+    task_ids = [TaskId.of(i) for i in ids]
+    results = [
+        ("parse: str", measure(lambda: [str(i) for i in fresh], args.repeat)),
+        ("parse: TaskId (first)", measure(parse_cold, args.repeat)),
+        ("parse: TaskId (interned)", measure(lambda: [TaskId.of(i) for i in fresh], args.repeat)),
+        ("render: str", measure(lambda: render_strings(ids), args.repeat)),
+        ("render: TaskId", measure(lambda: render_task_ids(task_ids), args.repeat)),
+    ]
+    print(f"{args.tasks} task IDs")
+    for name, ms in results:
+        print(f"{name:>26} {ms:>8.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
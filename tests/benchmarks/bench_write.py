@@ -0,0 +1,58 @@
+"""Benchmark FileOps.write_tasks for a single-task edit: full render vs incremental.
+
+"full" drops the remembered document before each write, which is what the
+first write of a process pays; "incremental" re-renders only the edited task.
+
+Usage:
+    python tests/benchmarks/bench_write.py [--sizes 1000 10000 20000] [--repeat 5]
+"""
+
+import argparse
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from common import generate_todo, measure  # noqa: E402
+
+from ai_todo.core.file_ops import FileOps  # noqa: E402
+
+
+def bench_write(task_count: int, repeat: int) -> tuple[int, float, float]:
+    """Return (file size in bytes, full write ms, incremental write ms)."""
+    with tempfile.TemporaryDirectory() as tmp:
+        todo_path = Path(tmp) / "TODO.md"
+        todo_path.write_text(generate_todo(task_count), encoding="utf-8")
+        ops = FileOps(str(todo_path), skip_verify=True)
+        tasks = ops.read_tasks()
+        task = tasks[len(tasks) // 2]
+        edits = iter(range(10**9))
+
+        def edit_and_write() -> None:
+            task.tags = {f"edit{next(edits)}"}
+            ops.write_tasks(tasks)
+
+        def full_write() -> None:
+            ops._rendered = None
+            edit_and_write()
+
+        full = measure(full_write, repeat)
+        incremental = measure(edit_and_write, repeat)
+        return todo_path.stat().st_size, full, incremental
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 20_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'tasks':>8} {'size':>10} {'full':>12} {'incremental':>12}")
+    for size in args.sizes:
+        file_size, full, incremental = bench_write(size, args.repeat)
+        print(f"{size:>8} {file_size / 1024:>8.0f}KB {full:>10.1f}ms {incremental:>10.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
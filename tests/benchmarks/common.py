@@ -0,0 +1,109 @@
+"""Shared helpers for the ai-todo benchmarks.
+
+Benchmarks are plain scripts (not collected by pytest). Run them from the
+repository root, e.g. ``python tests/benchmarks/bench_parser.py``.
+"""
+
+import statistics
+import time
+from collections.abc import Callable
+from datetime import datetime, timedelta
+
+
+def generate_todo(task_count: int, subtasks_per_root: int = 3) -> str:
+    """Generate a realistic TODO.md with roughly ``task_count`` tasks.
+
+    The file mixes active, completed, archived and deleted tasks, subtasks,
+    notes, tags, relationships and a TASK_METADATA block.
+    """
+    group = subtasks_per_root + 1
+    roots = max(1, task_count // group)
+    base = datetime(2026, 1, 1, 9, 0, 0)
+
+    active: list[str] = []
+    archived: list[str] = []
+    deleted: list[str] = []
+    metadata: list[str] = []
+    relationships: list[str] = []
+
+    for root in range(roots, 0, -1):
+        created = base + timedelta(minutes=root)
+        bucket = root % 10
+        if bucket < 6:
+            checkbox, target = ("x" if bucket == 0 else " "), active
+            suffix = ""
+        elif bucket < 9:
+            checkbox, target = "x", archived
+            suffix = f" ({(created + timedelta(days=2)).strftime('%Y-%m-%d')})"
+        else:
+            checkbox, target = "D", deleted
+            deleted_at = created + timedelta(days=3)
+            expires_at = deleted_at + timedelta(days=30)
+            suffix = (
+                f" (deleted {deleted_at.strftime('%Y-%m-%d')}, "
+                f"expires {expires_at.strftime('%Y-%m-%d')})"
+            )
+
+        if target is active and target:
+            target.append("")
+        target.append(f"- [{checkbox}] **#{root}** Root task {root} `#bench`{suffix}")
+        target.append(f"  > Note for task {root}")
+        metadata.append(
+            f"{root}:{created.isoformat()}:{(created + timedelta(hours=1)).isoformat()}"
+        )
+        for sub in range(subtasks_per_root, 0, -1):
+            sub_id = f"{root}.{sub}"
+            target.append(f"  - [{checkbox}] **#{sub_id}** Subtask {sub_id}{suffix}")
+            metadata.append(f"{sub_id}:{created.isoformat()}")
+        if root % 25 == 0 and root > 1:
+            relationships.append(f"{root}:depends-on:{root - 1}")
+
+    lines = [
+        "# ai-todo Task List",
+        "",
+        "> ⚠️ **MANAGED FILE**: Do not edit manually. Use `ai-todo` (CLI/MCP) to manage tasks.",
+        "",
+        "## Tasks",
+        "",
+        *active,
+        "",
+        "---",
+        "",
+        "## Archived Tasks",
+        *archived,
+        "",
+        "---",
+        "",
+        "## Deleted Tasks",
+        *deleted,
+        "",
+        "---",
+        "",
+        "## Task Metadata",
+        "",
+        "Task relationships and dependencies (managed by ai-todo).",
+        "View with: `ai-todo show <task-id>`",
+        "",
+        "<!-- TASK_METADATA",
+        "# Format: task_id:created_at[:updated_at]",
+        *sorted(metadata),
+        "-->",
+        "",
+        "<!-- TASK RELATIONSHIPS",
+        *relationships,
+        "-->",
+        "",
+        "---",
+        "**ai-todo** | Last Updated: 2026-01-01 12:00:00",
+    ]
+    return "\n".join(lines) + "\n"
+
+
+def measure(func: Callable[[], object], repeat: int = 5) -> float:
+    """Return the median wall time of ``func`` in milliseconds."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
@@ -481,3 +481,99 @@ def test_relationship_workflow(isolated_cli):
     # Show task to verify relationship
     result = isolated_cli.invoke(cli, ["show", task1_id])
     assert result.exit_code == 0
+
+
+def test_list_command_filters(isolated_cli):
+    """Test list filters by status, tags and ID range."""
+    isolated_cli.invoke(cli, ["add-task", "Task 1", "#bug"])
+    isolated_cli.invoke(cli, ["add-task", "Task 2", "#ui"])
+    isolated_cli.invoke(cli, ["add-task", "Task 3", "#bug", "#ui"])
+    isolated_cli.invoke(cli, ["complete", "1"])
+
+    result = isolated_cli.invoke(cli, ["list", "--tag", "bug", "--tag", "ui"])
+    assert result.exit_code == 0
+    assert "**#3**" in result.output
+    assert "**#1**" not in result.output and "**#2**" not in result.output
+
+    result = isolated_cli.invoke(
+        cli, ["list", "--tag", "bug,ui", "--any-tag", "--status", "pending"]
+    )
+    assert "**#3**" in result.output and "**#2**" in result.output
+    assert "**#1**" not in result.output
+
+    result = isolated_cli.invoke(cli, ["list", "--range", "1-2"])
+    assert "**#1**" in result.output and "**#2**" in result.output
+    assert "**#3**" not in result.output
+
+    result = isolated_cli.invoke(cli, ["list", "--status", "done"])
+    assert result.exit_code == 1
+    assert "Invalid status 'done'" in result.output
+
+
+def test_batch_command(isolated_cli):
+    """Test batch command applies JSON operations from stdin."""
+    isolated_cli.invoke(cli, ["add-task", "Task 1"])
+    operations = (
+        '[{"op": "add", "title": "Task 2", "tags": ["batch"]},'
+        ' {"op": "complete", "task_ids": ["1"]},'
+        ' {"op": "set_description", "task_id": "2", "description": "Notes"}]'
+    )
+    result = isolated_cli.invoke(cli, ["batch"], input=operations)
+    assert result.exit_code == 0
+    assert "Added: #2 Task 2 `#batch`" in result.output
+    assert "Completed: #1 Task 1" in result.output
+    assert "Applied 3 operation(s)" in result.output
+
+    result = isolated_cli.invoke(cli, ["show", "2"])
+    assert "> Notes" in result.output
+
+
+def test_batch_command_error_writes_nothing(isolated_cli):
+    """Test batch command rolls back when an operation fails."""
+    isolated_cli.invoke(cli, ["add-task", "Task 1"])
+    operations = '[{"op": "complete", "task_ids": ["1"]}, {"op": "start", "task_id": "9"}]'
+    result = isolated_cli.invoke(cli, ["batch"], input=operations)
+    assert result.exit_code == 1
+    assert "Operation 2 (start) failed" in result.output
+    assert "No changes were written" in result.output
+
+    result = isolated_cli.invoke(cli, ["list"])
+    assert "[ ] **#1** Task 1" in result.output
+
+
+def test_flush_command(isolated_cli):
+    """Test flush writes journaled operations to TODO.md."""
+    with open(".ai-todo/config.yaml", "a") as config:
+        config.write("concurrency:\n  mode: journal\n")
+    isolated_cli.invoke(cli, ["add-task", "Task 0"])
+    isolated_cli.invoke(cli, ["flush"])
+    isolated_cli.invoke(cli, ["add-task", "Task 1"])
+
+    result = isolated_cli.invoke(cli, ["list"])
+    assert "**#2** Task 1" in result.output
+    assert "Task 1" not in Path("TODO.md").read_text(encoding="utf-8")
+
+    result = isolated_cli.invoke(cli, ["flush"])
+    assert result.exit_code == 0
+    assert "Wrote 1 journaled operation(s) to TODO.md" in result.output
+    assert "**#2** Task 1" in Path("TODO.md").read_text(encoding="utf-8")
+
+    result = isolated_cli.invoke(cli, ["flush"])
+    assert "Nothing to flush" in result.output
+
+
+def test_log_command_shows_newest_entries(isolated_cli):
+    """Test log prints the newest entries, oldest first, with filters."""
+    for index in range(3):
+        isolated_cli.invoke(cli, ["add-task", f"Task {index}"])
+    isolated_cli.invoke(cli, ["complete", "2"])
+
+    result = isolated_cli.invoke(cli, ["log", "--lines", "2"])
+    assert result.exit_code == 0
+    entries = [line for line in result.output.splitlines() if " | " in line]
+    assert len(entries) == 2
+    assert "| COMPLETE_TASKS | 2 |" in entries[-1]
+
+    result = isolated_cli.invoke(cli, ["log", "--task", "1"])
+    entries = [line for line in result.output.splitlines() if " | " in line]
+    assert [line.split(" | ")[3] for line in entries] == ["ADD_TASK"]
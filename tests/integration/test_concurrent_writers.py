@@ -0,0 +1,67 @@
+"""Stress test: several processes adding and completing tasks in one TODO.md at once."""
+
+import multiprocessing
+
+import pytest
+
+from ai_todo.core.task import TaskStatus
+from ai_todo.core.task_service import TaskService
+
+WORKERS = 4
+TASKS_PER_WORKER = 15
+
+pytestmark = pytest.mark.skipif(
+    "fork" not in multiprocessing.get_all_start_methods(), reason="needs fork()"
+)
+
+
+def worker(todo_path: str, worker_id: int, start, errors) -> None:
+    try:
+        service = TaskService(todo_path)
+        start.wait()
+        for i in range(TASKS_PER_WORKER):
+            task = service.add_task(f"Worker {worker_id} task {i}", [f"w{worker_id}"]).task
+            service.complete_tasks([task.id])
+    except Exception as e:  # Reported to the parent, which fails the test
+        errors.put(f"worker {worker_id}: {e!r}")
+
+
+@pytest.mark.parametrize("mode", ["lock", "optimistic", "journal"])
+def test_parallel_add_and_complete_loses_no_updates(tmp_path, mode):
+    todo_file = tmp_path / "TODO.md"
+    todo_file.write_text("## Tasks\n", encoding="utf-8")
+    config_dir = tmp_path / ".ai-todo"
+    config_dir.mkdir()
+    (config_dir / "config.yaml").write_text(
+        "security:\n  tamper_proof: true\n"
+        f"concurrency:\n  mode: {mode}\n  lock_timeout: 60\n  retries: 100\n"
+        "  compact_ops: 7\n"
+    )
+    TaskService(str(todo_file)).list_tasks()  # Initialize the checksum before racing
+
+    context = multiprocessing.get_context("fork")
+    start = context.Event()
+    errors = context.Queue()
+    processes = [
+        context.Process(target=worker, args=(str(todo_file), worker_id, start, errors))
+        for worker_id in range(WORKERS)
+    ]
+    for process in processes:
+        process.start()
+    start.set()
+    for process in processes:
+        process.join(timeout=120)
+
+    reported = []
+    while not errors.empty():
+        reported.append(errors.get())
+    assert reported == []
+    assert all(process.exitcode == 0 for process in processes)
+
+    TaskService(str(todo_file)).flush()
+    tasks = TaskService(str(todo_file)).list_tasks()
+    assert len(tasks) == WORKERS * TASKS_PER_WORKER
+    assert sorted(int(task.id) for task in tasks) == list(range(1, len(tasks) + 1))
+    assert all(task.status == TaskStatus.COMPLETED for task in tasks)
+    for worker_id in range(WORKERS):
+        assert len([t for t in tasks if t.tags == {f"w{worker_id}"}]) == TASKS_PER_WORKER
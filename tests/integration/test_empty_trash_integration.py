@@ -1,5 +1,6 @@
 """Integration tests for empty trash functionality (CLI and MCP)."""
 
+import asyncio
 import io
 import sys
 from datetime import UTC, datetime, timedelta
@@ -75,7 +76,7 @@ def call_mcp_tool(tool_name: str, arguments: dict, todo_path: str):
     if not tool:
         raise ValueError(f"Unknown tool: {tool_name}")
 
-    return tool.fn(**arguments)
+    return asyncio.run(tool.fn(**arguments))
 
 
 def manually_set_task_expiration(todo_path: str, task_id: str, expires_days_ago: int):
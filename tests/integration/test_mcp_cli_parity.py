@@ -99,7 +99,7 @@ async def capture_mcp_output(tool_name: str, arguments: dict, todo_path: str) ->
     # Call the tool function with arguments
     # We use the underlying function 'fn' to bypass FastMCP runtime overhead for unit testing
     try:
-        result = tool.fn(**arguments)
+        result = await tool.fn(**arguments)
         return result
     except Exception as e:
         return f"Error calling tool {tool_name}: {e}"
@@ -442,6 +442,7 @@ async def test_all_mcp_tools_exist():
         "accept_tamper",
         # Info
         "version",
+        "view_log",
     }
 
     # Verify all tools exist
@@ -470,6 +471,39 @@ async def test_mcp_archive_cooldown_blocks_immediate_archive(test_todo_file):
     assert "Archived" not in archive_output
 
 
+@pytest.mark.asyncio
+@pytest.mark.parametrize("selector", ["1-1", "tag:test", "status:completed", "2.*"])
+async def test_mcp_archive_cooldown_resolves_selectors(test_todo_file, selector):
+    """Test the archive cooldown applies to tasks selected by ranges, tags and statuses."""
+    mcp_server_module.SESSION_COMPLETIONS.clear()
+    await capture_mcp_output("complete_task", {"task_ids": ["1", "2"]}, test_todo_file)
+
+    archive_output = await capture_mcp_output(
+        "archive_task", {"task_ids": [selector]}, test_todo_file
+    )
+    assert "requires human review" in archive_output
+    assert "Archived" not in archive_output
+
+
+@pytest.mark.asyncio
+async def test_mcp_batch_archive_cooldown_resolves_selectors(test_todo_file):
+    """Test a batch cannot archive a task an earlier operation completed via a selector."""
+    mcp_server_module.SESSION_COMPLETIONS.clear()
+
+    batch_output = await capture_mcp_output(
+        "batch",
+        {
+            "operations": [
+                {"op": "complete", "task_ids": ["tag:test"]},
+                {"op": "archive", "task_ids": ["1-1"]},
+            ]
+        },
+        test_todo_file,
+    )
+    assert "Task #1 requires human review" in batch_output
+    assert "- [ ] **#1** First task" in Path(test_todo_file).read_text(encoding="utf-8")
+
+
 @pytest.mark.asyncio
 async def test_mcp_archive_cooldown_allows_non_session_tasks(test_todo_file):
     """Test MCP archive allows archiving tasks NOT completed in current session."""
@@ -501,3 +535,20 @@ async def test_mcp_archive_cooldown_allows_non_session_tasks(test_todo_file):
 
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
+
+
+@pytest.mark.asyncio
+async def test_mcp_view_log_pages_through_history(test_todo_file):
+    """Test view_log returns the newest entries and a cursor for older ones."""
+    for description in ("Third task", "Fourth task", "Fifth task"):
+        await capture_mcp_output("add_task", {"title": description}, test_todo_file)
+
+    first = await capture_mcp_output("view_log", {"lines": 2}, test_todo_file)
+    assert len(first["entries"]) == 2
+    assert "| ADD_TASK | 5 |" in first["entries"][0]
+
+    second = await capture_mcp_output(
+        "view_log", {"lines": 2, "before": first["next_cursor"]}, test_todo_file
+    )
+    assert "| ADD_TASK | 3 |" in second["entries"][0]
+    assert second["entries"][0] not in first["entries"]
@@ -0,0 +1,72 @@
+"""MCP tools run off the event loop: concurrent reads, one writer, bounded blocking calls."""
+
+import asyncio
+import re
+import threading
+import time
+
+import pytest
+
+import ai_todo.mcp.server as server
+
+
+def _tool(name: str):
+    return server.mcp._tool_manager._tools[name].fn
+
+
+@pytest.fixture
+def todo_path(tmp_path, monkeypatch):
+    todo_file = tmp_path / "TODO.md"
+    todo_file.write_text("# Tasks\n\n## Tasks\n\n", encoding="utf-8")
+    monkeypatch.setattr(server, "CURRENT_TODO_PATH", str(todo_file))
+    return todo_file
+
+
+async def test_concurrent_writes_are_serialized(todo_path):
+    add_task, list_tasks = _tool("add_task"), _tool("list_tasks")
+
+    results = await asyncio.gather(
+        *(add_task(title=f"Task {n}") for n in range(20)),
+        *(list_tasks() for _ in range(20)),
+    )
+
+    assert all("Added" in result for result in results[:20])
+    content = todo_path.read_text(encoding="utf-8")
+    titles = re.findall(r"\*\*#\d+\*\* (Task \d+)", content)
+    assert sorted(titles) == sorted(f"Task {n}" for n in range(20))
+    assert all(f"**#{n}**" in content for n in range(1, 21))
+
+
+async def test_slow_blocking_call_does_not_stall_reads(todo_path, monkeypatch):
+    await _tool("add_task")(title="Readable")
+    release = threading.Event()
+
+    def slow_check(project_root):
+        release.wait(5)
+        raise AssertionError("not reached")
+
+    monkeypatch.setattr("ai_todo.core.updater.is_dev_mode", lambda: False)
+    monkeypatch.setattr("ai_todo.core.updater.check_for_updates", slow_check)
+    check = asyncio.ensure_future(_tool("check_update")())
+    try:
+        start = time.perf_counter()
+        listing = await asyncio.wait_for(_tool("list_tasks")(), 2)
+        assert "Readable" in listing
+        assert time.perf_counter() - start < 2
+        assert not check.done()
+    finally:
+        release.set()
+        with pytest.raises(AssertionError):
+            await check
+
+
+async def test_blocking_call_times_out(todo_path, monkeypatch):
+    release = threading.Event()
+    monkeypatch.setattr(server, "BLOCKING_TIMEOUT_SECONDS", 0.1)
+    monkeypatch.setattr(
+        server, "detect_coordination_tool_command", lambda **kwargs: release.wait(5)
+    )
+    try:
+        assert await _tool("detect_coordination")() == "Error: Coordination detection timed out"
+    finally:
+        release.set()
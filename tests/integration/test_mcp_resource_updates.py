@@ -0,0 +1,75 @@
+"""MCP resource subscriptions: clients are notified when a subscribed resource changes."""
+
+import asyncio
+import json
+
+import pytest
+from fastmcp import Client
+
+import ai_todo.mcp.server as server
+
+
+@pytest.fixture
+def todo_path(tmp_path, monkeypatch):
+    todo_file = tmp_path / "TODO.md"
+    todo_file.write_text("# Tasks\n\n## Tasks\n\n- [ ] **#1** First\n", encoding="utf-8")
+    monkeypatch.setattr(server, "CURRENT_TODO_PATH", str(todo_file))
+    monkeypatch.setattr(server, "RESOURCE_POLL_SECONDS", 0.05)
+    monkeypatch.setattr(server, "_resource_cache", {})
+    monkeypatch.setattr(server, "_subscriptions", {})
+    monkeypatch.setattr(server, "_notified", {})
+    yield todo_file
+    if server._resource_watcher is not None:
+        server._resource_watcher.cancel()
+    server._resources_changed = server._resource_watcher = None
+
+
+async def _updates(client_updates: list, count: int) -> list:
+    for _ in range(100):
+        if len(client_updates) >= count:
+            break
+        await asyncio.sleep(0.02)
+    return client_updates
+
+
+async def test_subscriber_notified_after_write(todo_path):
+    updates: list[str] = []
+
+    async def on_message(message):
+        updates.append(str(message.root.params.uri))
+
+    async with Client(server.mcp, message_handler=on_message) as client:
+        init = client.initialize_result
+        assert init.capabilities.resources.subscribe is True
+        before = json.loads((await client.read_resource("tasks://1"))[0].text)
+
+        await client.session.subscribe_resource("tasks://1")
+        await client.session.subscribe_resource("tasks://active")
+        await client.call_tool("start_task", {"task_id": "1"})
+        assert sorted(await _updates(updates, 2)) == ["tasks://1", "tasks://active"]
+
+        after = json.loads((await client.read_resource("tasks://1"))[0].text)
+        assert after["version"] != before["version"]
+        assert "inprogress" in after["task"]["tags"]
+
+        # Writes that leave a resource unchanged do not notify
+        updates.clear()
+        await client.session.unsubscribe_resource("tasks://active")
+        await client.call_tool("add_task", {"title": "Unrelated"})
+        await asyncio.sleep(0.2)
+        assert updates == []
+
+
+async def test_subscriber_notified_of_changes_made_elsewhere(todo_path):
+    updates: list[str] = []
+
+    async def on_message(message):
+        updates.append(str(message.root.params.uri))
+
+    async with Client(server.mcp, message_handler=on_message) as client:
+        await client.session.subscribe_resource("tasks://open")
+        with open(todo_path, "a", encoding="utf-8") as f:
+            f.write("- [ ] **#2** Added in an editor\n")
+        assert await _updates(updates, 1) == ["tasks://open"]
+        data = json.loads((await client.read_resource("tasks://open"))[0].text)
+        assert data["count"] == 2
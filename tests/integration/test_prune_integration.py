@@ -1,5 +1,7 @@
 """Integration tests for prune functionality (CLI and MCP)."""
 
+import asyncio
+import gzip
 import io
 import sys
 from pathlib import Path
@@ -90,7 +92,7 @@ def call_mcp_tool(tool_name: str, arguments: dict, todo_path: str):
     if not tool:
         raise ValueError(f"Unknown tool: {tool_name}")
 
-    return tool.fn(**arguments)
+    return asyncio.run(tool.fn(**arguments))
 
 
 # CLI Integration Tests
@@ -145,7 +147,7 @@ def test_cli_prune_from_task_dry_run(test_prune_file):
 def test_cli_prune_with_backup(test_prune_file):
     """Test CLI prune creates backup file with metadata."""
     archives_dir = Path(test_prune_file).parent / ".ai-todo" / "archives"
-    initial_backups = len(list(archives_dir.glob("*.md")))
+    initial_backups = len(list(archives_dir.glob("*.md.gz")))
 
     output = capture_cli_output(
         prune_command,
@@ -162,19 +164,19 @@ def test_cli_prune_with_backup(test_prune_file):
     assert "Archive backup:" in output
 
     # Verify backup file exists
-    final_backups = len(list(archives_dir.glob("*.md")))
+    final_backups = len(list(archives_dir.glob("*.md.gz")))
     assert final_backups == initial_backups + 1
 
     # Verify backup has metadata
-    backup_file = list(archives_dir.glob("*.md"))[0]
-    backup_content = backup_file.read_text()
+    backup_file = list(archives_dir.glob("*.md.gz"))[0]
+    backup_content = gzip.decompress(backup_file.read_bytes()).decode()
     assert "TASK_METADATA" in backup_content
 
 
 def test_cli_prune_no_backup(test_prune_file):
     """Test CLI prune without backup creation."""
     archives_dir = Path(test_prune_file).parent / ".ai-todo" / "archives"
-    initial_backups = len(list(archives_dir.glob("*.md")))
+    initial_backups = len(list(archives_dir.glob("*.md.gz")))
 
     output = capture_cli_output(
         prune_command,
@@ -270,7 +272,7 @@ def test_mcp_prune_with_backup(test_prune_file):
     assert backup_path.exists()
 
     # Verify backup content includes metadata
-    backup_content = backup_path.read_text()
+    backup_content = gzip.decompress(backup_path.read_bytes()).decode()
     assert "<!-- TASK_METADATA" in backup_content
     assert "# Format: task_id:created_at[:updated_at]" in backup_content
     assert "**#1**" in backup_content
@@ -357,7 +359,7 @@ def test_backup_includes_metadata(test_prune_file):
     )
 
     backup_path = Path(result["archive_path"])
-    backup_content = backup_path.read_text()
+    backup_content = gzip.decompress(backup_path.read_bytes()).decode()
 
     # Verify TASK_METADATA section exists
     assert "<!-- TASK_METADATA" in backup_content
@@ -367,8 +369,8 @@ def test_backup_includes_metadata(test_prune_file):
     assert ":created_at" in backup_content or "T" in backup_content  # Has timestamps
 
 
-def test_backup_conflict_handling(test_prune_file):
-    """Test that multiple prunes create separate backup files."""
+def test_backup_same_month_appends_to_segment(test_prune_file):
+    """Test that multiple prunes in a month append to one archive segment."""
     # First prune
     result1 = call_mcp_tool(
         "prune_tasks",
@@ -383,12 +385,11 @@ def test_backup_conflict_handling(test_prune_file):
         test_prune_file,
     )
 
-    # Verify different backup files (second might be None if nothing to prune)
-    if result2["archive_path"]:
-        assert result1["archive_path"] != result2["archive_path"]
-        assert Path(result2["archive_path"]).exists()
-
-    assert Path(result1["archive_path"]).exists()
+    # Both runs are in the same segment, in order
+    assert result1["archive_path"] == result2["archive_path"]
+    backup_content = gzip.decompress(Path(result1["archive_path"]).read_bytes()).decode()
+    assert backup_content.count("# Archived Tasks - Pruned on") == 2
+    assert backup_content.index("**#1**") < backup_content.index("**#3**")
 
 
 def test_prune_metadata_removal(test_prune_file):
@@ -518,3 +519,25 @@ def test_end_to_end_workflow(test_prune_file):
     assert result["archive_path"] is not None
     backup_path = Path(result["archive_path"])
     assert backup_path.exists()
+
+
+def test_show_archived_task_after_prune(test_prune_file):
+    """Test that a pruned task can be shown from the archive (CLI and MCP)."""
+    from ai_todo.cli.commands import show_command
+
+    call_mcp_tool(
+        "prune_tasks",
+        {"from_task": "2", "dry_run": False, "backup": True},
+        test_prune_file,
+    )
+
+    output = capture_cli_output(show_command, "2", todo_path=test_prune_file)
+    assert "not found" in output
+
+    output = capture_cli_output(show_command, "2", archived=True, todo_path=test_prune_file)
+    assert "**#2** Second task" in output
+
+    result = call_mcp_tool("show_task", {"task_id": "1", "archived": True}, test_prune_file)
+    assert "**#1** First task" in result
+    result = call_mcp_tool("show_task", {"task_id": "3", "archived": True}, test_prune_file)
+    assert "not found in the prune archive" in result
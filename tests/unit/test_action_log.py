@@ -0,0 +1,182 @@
+"""Unit tests for the rotating operation log."""
+
+import gzip
+import json
+import os
+import time
+
+import pytest
+
+from ai_todo.core import action_log
+from ai_todo.core.action_log import ActionLog, format_entry, get_action_log
+
+
+def entry(index, task_id=None, day="2026-01-10"):
+    task = task_id or str(index)
+    return f"{day} 12:00:{index % 60:02d} | user | CLI | UPDATE | {task} | abcd1234 | Entry {index}"
+
+
+def fill(log, count, **kwargs):
+    """Log ``count`` entries, one write transaction (flush) each."""
+    for index in range(count):
+        log.append(entry(index, **kwargs))
+        log.flush()
+
+
+@pytest.fixture
+def log(tmp_path):
+    return ActionLog(tmp_path / ".ai-todo.log", rotate_bytes=2000, rotate_days=0)
+
+
+def test_read_returns_newest_first(log):
+    fill(log, 10)
+
+    page = log.read(3)
+    assert [e.line for e in page.entries] == [entry(9), entry(8), entry(7)]
+    assert log.read(50, filter_text="ENTRY 4").entries[0].line == entry(4)
+
+
+def test_reverse_reader_handles_lines_across_blocks(log, monkeypatch):
+    monkeypatch.setattr(action_log, "_BLOCK_SIZE", 7)
+    log.path.write_text("# Header\n\n" + "".join(entry(i) + "\n" for i in range(5)))
+
+    assert [e.line for e in log.read(10).entries] == [entry(i) for i in range(4, -1, -1)]
+
+
+def test_log_rotates_into_indexed_gzip_segments(log, tmp_path):
+    fill(log, 60)
+
+    segments = sorted(tmp_path.glob(".ai-todo.log.*.gz"))
+    assert segments
+    assert sorted(tmp_path.glob(".ai-todo.log.*.idx"))
+    assert os.path.getsize(log.path) < 2000
+    assert gzip.decompress(segments[0].read_bytes()).decode().startswith(entry(0))
+    # Nothing is lost across the segments
+    assert [e.line for e in log.read(100).entries] == [entry(i) for i in range(59, -1, -1)]
+
+
+def test_only_newest_segments_are_kept(tmp_path):
+    log = ActionLog(tmp_path / "audit.log", rotate_bytes=500, rotate_days=0, keep_segments=2)
+    fill(log, 60)
+
+    assert len(list(tmp_path.glob("audit.log.*.gz"))) == 2
+    assert log.read(100).entries[0].line == entry(59)
+
+
+def test_pages_follow_cursors_across_rotation(log):
+    fill(log, 10)
+    first = log.read(4)
+    fill(log, 30)  # Rotates the file the cursor points into
+
+    second = log.read(4, before=first.next_cursor)
+    assert [e.line for e in second.entries] == [entry(5), entry(4), entry(3), entry(2)]
+    last = log.read(4, before=second.next_cursor)
+    assert [e.line for e in last.entries] == [entry(1), entry(0)]
+    assert last.next_cursor is None
+
+
+def test_task_and_since_filters_use_the_segment_index(log, monkeypatch):
+    for index in range(40):
+        log.append(entry(index, task_id="7" if index % 10 == 0 else "1", day="2026-01-01"))
+        log.flush()
+    for index in range(40, 45):
+        log.append(entry(index, task_id="1", day="2026-02-01"))
+        log.flush()
+
+    read_paths = []
+    real_read_source = action_log._read_source
+    monkeypatch.setattr(
+        action_log,
+        "_read_source",
+        lambda path, *args: read_paths.append(path) or real_read_source(path, *args),
+    )
+    page = log.read(10, task_id="7")
+    assert [e.line for e in page.entries] == [entry(i, "7", "2026-01-01") for i in (30, 20, 10, 0)]
+
+    read_paths.clear()
+    page = log.read(50, since="2026-02-01")
+    assert len(page.entries) == 5
+    assert len(read_paths) <= 2  # Older segments are skipped by their time range
+
+
+def test_log_rotates_by_age(tmp_path):
+    log = ActionLog(tmp_path / ".ai-todo.log", rotate_days=1)
+    log.append(entry(0, day=time.strftime("%Y-%m-%d", time.localtime(time.time() - 3 * 86400))))
+    log.flush()
+    log.append(entry(1, day=time.strftime("%Y-%m-%d")))
+    log.flush()
+
+    assert len(list(tmp_path.glob(".ai-todo.log.*.gz"))) == 1
+    assert [e.line for e in log.read(1).entries] == [entry(1, day=time.strftime("%Y-%m-%d"))]
+
+
+def test_invalid_cursor_is_rejected(log):
+    fill(log, 2)
+    with pytest.raises(ValueError, match="Invalid log cursor"):
+        log.read(before="nonsense")
+
+
+def test_entries_are_buffered_until_flush(log):
+    log.append(entry(0))
+    log.append(entry(1))
+    assert not log.path.exists()
+
+    log.flush()
+    assert log.path.read_text() == entry(0) + "\n" + entry(1) + "\n"
+
+
+def test_full_buffer_is_flushed(log, monkeypatch):
+    monkeypatch.setattr(action_log, "MAX_BUFFERED", 3)
+    for index in range(3):
+        log.append(entry(index))
+
+    assert log.path.read_text().count("\n") == 3
+
+
+def test_writer_reopens_a_file_rotated_elsewhere(tmp_path):
+    path = tmp_path / ".ai-todo.log"
+    log = ActionLog(path, rotate_days=0)
+    fill(log, 1)
+    ActionLog(path, rotate_days=0).rotate()  # Another process rotates the file
+    fill(log, 2)
+
+    assert path.read_text() == entry(0) + "\n" + entry(1) + "\n"
+    assert [e.line for e in log.read(5).entries] == [entry(1), entry(0), entry(0)]
+
+
+def test_json_lines_are_queried_like_text(log):
+    fields = {"timestamp": "2026-03-01 10:00:00", "user": "u", "action": "ADD", "task_id": "5"}
+    log.append(format_entry(fields, json_lines=True))
+    log.append(entry(1, task_id="6"))
+
+    page = log.read(5, task_id="5")
+    assert len(page.entries) == 1
+    assert page.entries[0].timestamp == "2026-03-01 10:00:00"
+    assert '"action": "ADD"' in page.entries[0].line
+    assert format_entry(fields) == "2026-03-01 10:00:00 | u |  | ADD | 5 |  | "
+
+
+def test_get_action_log_shares_one_writer_per_file(tmp_path):
+    first = get_action_log(tmp_path / "a.log", rotate_bytes=100)
+    second = get_action_log(tmp_path / "a.log", rotate_bytes=200)
+
+    assert first is second
+    assert first.rotate_bytes == 200
+    assert get_action_log(tmp_path / "b.log") is not first
+
+
+def test_file_ops_logs_json_lines_when_configured(tmp_path):
+    from ai_todo.core.file_ops import FileOps
+
+    (tmp_path / ".ai-todo").mkdir()
+    (tmp_path / ".ai-todo" / "config.yaml").write_text("logging:\n  format: json\n")
+    todo_file = tmp_path / "TODO.md"
+    todo_file.write_text("## Tasks\n\n- [ ] **#1** Task 1\n", encoding="utf-8")
+
+    file_ops = FileOps(str(todo_file))
+    file_ops.write_tasks(file_ops.read_tasks(), "UPDATE", "1")
+
+    for path in (file_ops.log_path, file_ops.audit_log_path):
+        last = path.read_text().splitlines()[-1]
+        assert json.loads(last)["action"] == "UPDATE"
+        assert json.loads(last)["task_id"] == "1"
@@ -58,3 +58,29 @@ def test_helper_methods(temp_config_file):
 
     assert config.get_numbering_mode() == "enhanced"
     assert config.get_coordination_type() == "counterapi"
+
+
+def test_parsed_config_is_cached_until_the_file_changes(temp_config_file, monkeypatch):
+    temp_config_file.write_text("mode: branch\n", encoding="utf-8")
+    parses = []
+    real_safe_load = yaml.safe_load
+    monkeypatch.setattr(yaml, "safe_load", lambda text: parses.append(text) or real_safe_load(text))
+
+    assert Config(str(temp_config_file)).get("mode") == "branch"
+    assert Config(str(temp_config_file)).get("mode") == "branch"
+    assert len(parses) == 1
+
+    temp_config_file.write_text("mode: multi-user\n", encoding="utf-8")
+    assert Config(str(temp_config_file)).get("mode") == "multi-user"
+    assert len(parses) == 2
+
+
+def test_set_does_not_leak_into_other_instances(temp_config_file):
+    temp_config_file.write_text("mode: branch\n", encoding="utf-8")
+    reader = Config(str(temp_config_file))
+    writer = Config(str(temp_config_file))
+
+    writer.set("coordination.type", "none")
+
+    assert reader.get("coordination.type") is None
+    assert Config(str(temp_config_file)).get("coordination.type") == "none"
@@ -0,0 +1,99 @@
+"""Crash injection for TODO.md writes.
+
+A write makes four steps in order: it replaces the write journal, TODO.md and
+the checksum, then appends to the shadow store. The harness kills the write
+(with a BaseException, so no cleanup handler runs as if the process died)
+before each step and after the last one, then opens the file again in
+tamper-proof mode.
+"""
+
+import pytest
+
+import ai_todo.core.file_ops as file_ops_module
+from ai_todo.core.exceptions import TamperError
+from ai_todo.core.file_ops import FileOps
+from ai_todo.core.shadow_store import ShadowStore
+
+# Number of atomic writes that complete before the crash
+CRASH_POINTS = [0, 1, 2, 3, 4]
+
+
+class SimulatedCrash(BaseException):
+    """Stands in for the process being killed mid-write."""
+
+
+@pytest.fixture
+def todo_file(tmp_path):
+    todo_file = tmp_path / "TODO.md"
+    todo_file.write_text("## Tasks\n\n- [ ] **#1** Task 1\n", encoding="utf-8")
+    config_dir = tmp_path / ".ai-todo"
+    config_dir.mkdir()
+    (config_dir / "config.yaml").write_text("security:\n  tamper_proof: true\n")
+    return todo_file
+
+
+def crash_after(monkeypatch, completed_writes: int) -> None:
+    """Let ``completed_writes`` write steps finish, then crash."""
+    real_write = file_ops_module.atomic_write_text
+    real_record = ShadowStore.record
+    calls = []
+
+    def step(target, run):
+        if len(calls) == completed_writes:
+            raise SimulatedCrash(target)
+        calls.append(target)
+        run()
+        if len(calls) == completed_writes == 4:
+            raise SimulatedCrash("before removing the journal")
+
+    def crashing_write(path, text, sync_dir=True):
+        step(path, lambda: real_write(path, text, sync_dir=sync_dir))
+
+    def crashing_record(self, content, checksum):
+        step(self.directory, lambda: real_record(self, content, checksum))
+
+    monkeypatch.setattr(ShadowStore, "record", crashing_record)
+    monkeypatch.setattr(file_ops_module, "atomic_write_text", crashing_write)
+
+
+def write_new_content(todo_file):
+    ops = FileOps(str(todo_file))
+    tasks = ops.read_tasks()
+    tasks[0].description = "Renamed"
+    ops.write_tasks(tasks)
+
+
+@pytest.mark.parametrize("completed_writes", CRASH_POINTS)
+def test_crash_during_write_recovers_consistently(todo_file, monkeypatch, completed_writes):
+    FileOps(str(todo_file))  # Initialize checksum and shadow copy
+    old_content = todo_file.read_text(encoding="utf-8")
+
+    crash_after(monkeypatch, completed_writes)
+    with pytest.raises(SimulatedCrash):
+        write_new_content(todo_file)
+    monkeypatch.undo()
+
+    # Restart: must not raise TamperError and must leave a consistent state
+    ops = FileOps(str(todo_file))
+    content = todo_file.read_text(encoding="utf-8")
+    if completed_writes >= 2:
+        assert "**#1** Renamed" in content
+    else:
+        assert content == old_content
+    assert ops.checksum_path.read_text(encoding="utf-8").strip() == ops.calculate_checksum(content)
+    assert ops.shadow.read() == content
+    assert not ops.journal_path.exists()
+    assert not list(todo_file.parent.glob("TODO.md.*.tmp"))
+
+
+def test_external_edit_after_crash_is_still_tamper(todo_file, monkeypatch):
+    FileOps(str(todo_file))
+
+    crash_after(monkeypatch, 1)  # Journal written, TODO.md not replaced
+    with pytest.raises(SimulatedCrash):
+        write_new_content(todo_file)
+    monkeypatch.undo()
+
+    todo_file.write_text("## Tasks\n\n- [ ] **#1** Edited by hand\n", encoding="utf-8")
+    with pytest.raises(TamperError):
+        FileOps(str(todo_file))
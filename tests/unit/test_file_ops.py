@@ -1,7 +1,11 @@
+import shutil
+import subprocess
+from datetime import datetime
+
 import pytest
 
-from ai_todo.core.file_ops import FileOps, FileStructureSnapshot
-from ai_todo.core.task import Task, TaskStatus
+from ai_todo.core.file_ops import FileOps, FileStructureSnapshot, SectionOrder
+from ai_todo.core.task import Task, TaskManager, TaskStatus
 
 
 @pytest.fixture
@@ -23,6 +27,33 @@ def test_init_creates_config_dir(tmp_path):
     assert (tmp_path / ".ai-todo").is_dir()
 
 
+@pytest.mark.skipif(shutil.which("git") is None, reason="git not installed")
+def test_local_state_is_ignored_by_git(tmp_path):
+    from ai_todo.core.task_service import TaskService
+
+    subprocess.run(["git", "init", "-q", str(tmp_path)], check=True)
+    todo_path = tmp_path / "TODO.md"
+    service = TaskService(str(todo_path))
+    service.add_task("First", tags=[])
+    service.add_task("Second", tags=[])
+    service.flush()
+
+    status = subprocess.run(
+        ["git", "status", "--porcelain", "--untracked-files=all", ".ai-todo/state"],
+        cwd=tmp_path,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    untracked = sorted(line[3:] for line in status.splitlines())
+    # Only the state shared through git before the caches existed
+    assert untracked == [
+        ".ai-todo/state/.gitignore",
+        ".ai-todo/state/audit.log",
+        ".ai-todo/state/checksum",
+    ]
+
+
 def test_read_tasks_empty(file_ops):
     tasks = file_ops.read_tasks()
     assert len(tasks) == 0
@@ -961,3 +992,138 @@ def test_backfill_timestamps_preserves_existing_created_at(tmp_path):
     ops.backfill_timestamps(task)
 
     assert task.created_at == original_created
+
+
+def _without_footer(content: str) -> str:
+    return content.rsplit("**ai-todo** | Last Updated:", 1)[0]
+
+
+def test_incremental_write_matches_full_render(tmp_path):
+    """Writes that keep the layout re-render only changed blocks, with identical output."""
+    todo_path = tmp_path / "TODO.md"
+    todo_path.write_text(
+        "## Tasks\n\n- [ ] **#2** Task 2 `#bug`\n  > Note\n  - [ ] **#2.1** Subtask\n\n"
+        "- [ ] **#1** Task 1\n",
+        encoding="utf-8",
+    )
+    ops = FileOps(str(todo_path))
+    tasks = ops.read_tasks()
+    ops.add_relationship("1", "blocks", ["2"])
+    ops.write_tasks(tasks)
+    first = ops._rendered
+
+    tasks[0].tags = {"feature"}
+    tasks[1].notes.append("Subtask note   ")
+    ops.add_relationship("1", "blocks", ["2", "2.1"])
+    ops.write_tasks(tasks)
+
+    assert ops._rendered is first  # Updated in place, no full render
+    content = todo_path.read_text(encoding="utf-8")
+    assert "**#2** Task 2 `#feature`" in content
+    assert "    > Subtask note\n" in content
+    assert "1:blocks:2 2.1" in content
+    assert _without_footer(content) == _without_footer(
+        ops._generate_markdown(tasks, ops._structure_snapshot)
+    )
+
+
+def test_task_dates_round_trip_through_metadata(tmp_path):
+    """Exact completion, archive and deletion times survive a write and a fresh read."""
+    todo_path = tmp_path / "TODO.md"
+    todo_path.write_text("## Tasks\n\n- [ ] **#2** Task 2\n\n- [ ] **#1** Task 1\n", "utf-8")
+    ops = FileOps(str(todo_path))
+    tasks = ops.read_tasks()
+    tasks[0].mark_completed()
+    tasks[1].mark_deleted()
+    ops.write_tasks(tasks)
+    completed_at, deleted_at = tasks[0].completed_at, tasks[1].deleted_at
+
+    tasks[0].mark_archived()
+    ops.write_tasks(tasks)  # Archiving re-renders in place or fully; both persist dates
+    archived_at = tasks[0].archived_at
+
+    by_id = {t.id: t for t in FileOps(str(todo_path)).read_tasks()}
+    assert by_id["2"].completed_at == completed_at
+    assert by_id["2"].archived_at == archived_at
+    assert by_id["1"].deleted_at == deleted_at
+    assert by_id["1"].expires_at == tasks[1].expires_at
+    assert f"archived_at={archived_at.isoformat()}" in todo_path.read_text(encoding="utf-8")
+
+
+def test_completing_and_reopening_a_task_write_incrementally(tmp_path):
+    """Status changes that keep a task in the Tasks section re-render only its block."""
+    todo_path = tmp_path / "TODO.md"
+    todo_path.write_text(
+        "## Tasks\n\n"
+        + "\n".join(f"- [ ] **#{n}** Task {n}\n  > Note {n}\n" for n in range(2000, 0, -1)),
+        encoding="utf-8",
+    )
+    ops = FileOps(str(todo_path))
+    manager = TaskManager(ops.read_tasks())
+    ops.write_tasks(manager.list_tasks())
+    first = ops._rendered
+
+    manager.complete_task("1000")
+    ops.write_tasks(manager.list_tasks())
+    assert ops._rendered is first
+    assert "- [x] **#1000** Task 1000 (" in todo_path.read_text(encoding="utf-8")
+
+    manager.undo_task("1000")
+    ops.write_tasks(manager.list_tasks())
+    assert ops._rendered is first
+    content = todo_path.read_text(encoding="utf-8")
+    assert "- [ ] **#1000** Task 1000\n" in content
+    assert _without_footer(content) == _without_footer(
+        ops._generate_markdown(manager.list_tasks(), ops._structure_snapshot)
+    )
+
+
+def test_incremental_write_falls_back_on_structure_change(tmp_path):
+    todo_path = tmp_path / "TODO.md"
+    todo_path.write_text("## Tasks\n\n- [ ] **#2** Task 2\n\n- [ ] **#1** Task 1\n")
+    ops = FileOps(str(todo_path))
+    tasks = ops.read_tasks()
+    ops.write_tasks(tasks)
+    first = ops._rendered
+
+    tasks[1].status = TaskStatus.ARCHIVED
+    ops.write_tasks(tasks)
+
+    assert ops._rendered is not first
+    content = todo_path.read_text(encoding="utf-8")
+    assert content.index("## Archived Tasks") < content.index("**#1** Task 1")
+
+
+def test_metadata_heading_is_stable_across_writes(tmp_path):
+    """The generated Task Metadata heading is kept, not dropped on every other write."""
+    todo_path = tmp_path / "TODO.md"
+    todo_path.write_text("## Tasks\n\n- [ ] **#1** Task 1\n", encoding="utf-8")
+
+    contents = []
+    for _ in range(3):
+        ops = FileOps(str(todo_path))
+        ops.write_tasks(ops.read_tasks())
+        contents.append(todo_path.read_text(encoding="utf-8"))
+
+    assert all(content.count("## Task Metadata") == 1 for content in contents)
+
+
+def _archived(task_id: str, day: int) -> Task:
+    task = Task(id=task_id, description=f"Task {task_id}", status=TaskStatus.ARCHIVED)
+    task.archived_at = datetime(2026, 1, day)
+    return task
+
+
+def test_section_order_updates_incrementally(monkeypatch):
+    """Groups are ordered newest first, parent before subtasks; unchanged sections skip sorting."""
+    tasks = [_archived("10.1", 20), _archived("5", 10), _archived("10", 15), _archived("10.2", 20)]
+    order = SectionOrder("archived_at")
+    assert [t.id for t in order.order(tasks)] == ["10", "10.2", "10.1", "5"]
+
+    tasks += [_archived("7", 25), _archived("5.1", 26)]
+    del tasks[0]
+    assert [t.id for t in order.order(tasks)] == ["5", "5.1", "7", "10", "10.2"]
+    assert order.order(tasks) == SectionOrder("archived_at").order(list(reversed(tasks)))
+
+    monkeypatch.setattr(SectionOrder, "_update", lambda self, dates: pytest.fail("re-sorted"))
+    assert [t.id for t in order.order(tasks)] == ["5", "5.1", "7", "10", "10.2"]
@@ -3,7 +3,7 @@ from unittest.mock import MagicMock, patch
 
 import pytest
 
-from ai_todo.core.github_client import GitHubClient
+from ai_todo.core.github_client import REQUEST_TIMEOUT, GitHubClient
 
 
 @pytest.fixture
@@ -69,7 +69,9 @@ def test_get_issue(mock_repo_info, mock_get, github_client):
 
     assert issue["number"] == 1
     mock_get.assert_called_with(
-        "https://api.github.com/repos/owner/repo/issues/1", headers=github_client._get_headers()
+        "https://api.github.com/repos/owner/repo/issues/1",
+        headers=github_client._get_headers(),
+        timeout=REQUEST_TIMEOUT,
     )
 
 
@@ -92,6 +94,7 @@ def test_get_issue_comments(mock_repo_info, mock_get, github_client):
     mock_get.assert_called_with(
         "https://api.github.com/repos/owner/repo/issues/123/comments",
         headers=github_client._get_headers(),
+        timeout=REQUEST_TIMEOUT,
     )
 
 
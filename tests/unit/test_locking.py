@@ -0,0 +1,129 @@
+"""Unit tests for the TODO.md write lock and optimistic concurrency."""
+
+import subprocess
+import sys
+import textwrap
+
+import pytest
+
+from ai_todo.core.exceptions import ConcurrentModificationError, LockTimeoutError
+from ai_todo.core.locking import FileLock, todo_lock
+from ai_todo.core.task_service import TaskService
+from ai_todo.core.task_store import TaskStore
+
+
+@pytest.fixture
+def todo_file(tmp_path):
+    todo_file = tmp_path / "TODO.md"
+    todo_file.write_text("## Tasks\n\n- [ ] **#1** Task 1\n", encoding="utf-8")
+    config_dir = tmp_path / ".ai-todo"
+    config_dir.mkdir()
+    (config_dir / "config.yaml").write_text("security:\n  tamper_proof: true\n")
+    return todo_file
+
+
+def set_concurrency(todo_file, **settings):
+    lines = "".join(f"  {key}: {value}\n" for key, value in settings.items())
+    config_path = todo_file.parent / ".ai-todo" / "config.yaml"
+    config_path.write_text(f"security:\n  tamper_proof: true\nconcurrency:\n{lines}")
+
+
+@pytest.fixture
+def lock_holder(todo_file):
+    """A separate process holding the write lock until its stdin is closed."""
+    script = textwrap.dedent(
+        f"""
+        import sys
+        from ai_todo.core.locking import todo_lock
+        with todo_lock({str(todo_file)!r}).locked():
+            print("locked", flush=True)
+            sys.stdin.read()
+        """
+    )
+    process = subprocess.Popen(
+        [sys.executable, "-c", script], stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True
+    )
+    assert process.stdout.readline().strip() == "locked"
+    yield process
+    process.stdin.close()
+    process.wait(timeout=10)
+
+
+def test_lock_is_reentrant(tmp_path):
+    lock = FileLock(tmp_path / "lock")
+
+    with lock.locked(timeout=0.1), lock.locked(timeout=0.1):
+        assert "pid=" in lock.holder()
+    assert lock.holder() is None
+
+
+def test_todo_lock_is_shared_per_file(todo_file):
+    assert todo_lock(str(todo_file)) is todo_lock(str(todo_file.parent / "." / "TODO.md"))
+
+
+def test_timeout_names_the_holder(todo_file, lock_holder):
+    with pytest.raises(LockTimeoutError, match=r"Timed out after 0.2s") as excinfo:
+        todo_lock(str(todo_file)).acquire(timeout=0.2)
+
+    assert f"pid={lock_holder.pid}" in excinfo.value.holder
+
+
+def test_writes_wait_for_the_lock(todo_file, lock_holder):
+    set_concurrency(todo_file, lock_timeout=0.2)
+    service = TaskService(str(todo_file), store=TaskStore(str(todo_file)))
+
+    with pytest.raises(LockTimeoutError):
+        service.add_task("Blocked", [])
+
+    lock_holder.stdin.close()
+    lock_holder.wait(timeout=10)
+    assert service.add_task("Unblocked", []).task.id == "2"
+
+
+def test_optimistic_write_retries_after_concurrent_change(todo_file, monkeypatch):
+    set_concurrency(todo_file, mode="optimistic")
+    service = TaskService(str(todo_file), store=TaskStore(str(todo_file)))
+    other = TaskService(str(todo_file), store=TaskStore(str(todo_file)))
+    checkouts = []
+    real_checkout = service.store.checkout
+
+    def racing_checkout():
+        checkout = real_checkout()
+        if not checkouts:
+            other.add_task("From another writer", [])
+        checkouts.append(checkout)
+        return checkout
+
+    monkeypatch.setattr(service.store, "checkout", racing_checkout)
+
+    result = service.add_task("Retried", [])
+
+    assert len(checkouts) == 2
+    assert result.task.id == "3"
+    ids = {task.id for task in TaskService(str(todo_file)).list_tasks()}
+    assert ids == {"1", "2", "3"}
+
+
+def test_optimistic_write_gives_up_after_retries(todo_file, monkeypatch):
+    set_concurrency(todo_file, mode="optimistic", retries=2)
+    service = TaskService(str(todo_file), store=TaskStore(str(todo_file)))
+    other = TaskService(str(todo_file), store=TaskStore(str(todo_file)))
+    real_checkout = service.store.checkout
+
+    def always_racing_checkout():
+        checkout = real_checkout()
+        other.add_task("From another writer", [])
+        return checkout
+
+    monkeypatch.setattr(service.store, "checkout", always_racing_checkout)
+
+    with pytest.raises(ConcurrentModificationError, match="after 2 retries"):
+        service.complete_tasks(["1"])
+
+
+def test_invalid_concurrency_mode(todo_file):
+    set_concurrency(todo_file, mode="eventual")
+    service = TaskService(str(todo_file), store=TaskStore(str(todo_file)))
+
+    with pytest.raises(ValueError, match="Invalid concurrency.mode 'eventual'"):
+        service.add_task("Task", [])
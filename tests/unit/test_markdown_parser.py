@@ -0,0 +1,155 @@
+"""Unit tests for the single-pass TODO.md parser."""
+
+from datetime import datetime
+
+from ai_todo.core.file_ops import FileOps
+from ai_todo.core.task import TaskStatus
+from ai_todo.parsers.markdown import parse_markdown
+
+CONTENT = """# ai-todo Task List
+
+> Warning
+
+## Tasks
+
+- [ ] **#2** Task 2 `#bug`
+  > Note for 2
+  - [x] **#2.1** Subtask 2.1
+# User comment
+
+- [ ] **#1** Task 1
+
+## Archived Tasks
+- [x] **#3** Archived task (2026-01-15)
+
+## Deleted Tasks
+- [D] **#4** Deleted task (deleted 2026-01-10, expires 2026-02-09)
+
+---
+
+## Task Metadata
+
+<!-- TASK_METADATA
+# Format: task_id:created_at[:updated_at]
+1:2026-01-01T10:00:00:2026-01-02T11:00:00
+2:2026-01-03T10:00:00
+-->
+
+<!-- TASK RELATIONSHIPS
+1:depends-on:2 3
+-->
+
+---
+**ai-todo** | Last Updated: 2026-01-20 10:00:00
+"""
+
+
+def test_parse_tasks_and_metadata_in_one_pass():
+    result = parse_markdown(CONTENT)
+
+    assert [t.id for t in result.tasks] == ["2", "2.1", "1", "3", "4"]
+    by_id = {t.id: t for t in result.tasks}
+    assert by_id["2"].tags == {"bug"}
+    assert by_id["2"].notes == ["Note for 2"]
+    assert by_id["2.1"].status == TaskStatus.COMPLETED
+    assert by_id["3"].status == TaskStatus.ARCHIVED
+    assert by_id["3"].archived_at == datetime(2026, 1, 15)
+    assert by_id["3"].description == "Archived task"
+    assert by_id["4"].status == TaskStatus.DELETED
+    assert by_id["4"].expires_at == datetime(2026, 2, 9)
+    assert by_id["4"].description == "Deleted task"
+
+    assert result.relationships == {"1": {"depends-on": ["2", "3"]}}
+    assert by_id["1"].created_at == datetime(2026, 1, 1, 10, 0)
+    assert by_id["1"].updated_at == datetime(2026, 1, 2, 11, 0)
+    assert result.task_timestamps["2"] == {"created_at": datetime(2026, 1, 3, 10, 0)}
+    assert by_id["2"].updated_at == by_id["2"].created_at  # Not written when equal
+    assert result.deleted_task_formats == {"4": "D"}
+    assert result.interleaved_content == {"2.1": ["# User comment"]}
+
+
+def test_parse_builds_snapshot_from_same_pass():
+    snapshot = parse_markdown(CONTENT).snapshot
+
+    assert snapshot.tasks_header_format == "## Tasks"
+    assert snapshot.blank_after_tasks_header is True
+    assert snapshot.blank_between_tasks is True
+    assert snapshot.has_original_header is True
+    assert snapshot.header_lines == ("# ai-todo Task List", "", "> Warning", "")
+    assert snapshot.original_task_order == ("2", "2.1", "1")
+    assert snapshot.interleaved_content == {"2.1": ("# User comment",)}
+    assert snapshot.metadata_lines[0] == "## Task Metadata"
+    assert "<!-- TASK RELATIONSHIPS" in snapshot.metadata_lines
+
+
+def test_snapshot_interleaved_content_limited_to_tasks_section():
+    content = """## Tasks
+- [ ] **#1** Task 1
+
+## Archived Tasks
+- [x] **#2** Archived
+Stray line
+"""
+    result = parse_markdown(content)
+
+    assert result.interleaved_content == {"2": ["Stray line"]}
+    assert result.snapshot.interleaved_content == {}
+
+
+def test_read_tasks_reads_file_once(tmp_path, monkeypatch):
+    todo_path = tmp_path / "TODO.md"
+    todo_path.write_text(CONTENT, encoding="utf-8")
+    ops = FileOps(str(todo_path), skip_verify=True)
+
+    calls = []
+    original_read_text = type(todo_path).read_text
+
+    def counting_read_text(self, *args, **kwargs):
+        if self == ops.todo_path:
+            calls.append(self)
+        return original_read_text(self, *args, **kwargs)
+
+    monkeypatch.setattr(type(todo_path), "read_text", counting_read_text)
+    tasks = ops.read_tasks()
+
+    assert len(tasks) == 5
+    assert len(calls) == 1
+    assert ops._structure_snapshot is not None
+    assert ops._structure_snapshot.original_task_order == ("2", "2.1", "1")
+
+
+def test_task_dates_persisted_in_metadata():
+    content = """## Tasks
+- [x] **#1** Completed (2026-01-20)
+- [x] **#2** Completed, edited by hand (2026-01-25)
+
+## Archived Tasks
+- [x] **#3** Archived (2026-01-15)
+
+## Deleted Tasks
+- [D] **#4** Deleted (deleted 2026-01-10, expires 2026-02-09)
+
+<!-- TASK_METADATA
+1:2026-01-01T10:00:00 completed_at=2026-01-20T17:30:00
+2:2026-01-01T10:00:00 completed_at=2026-01-20T17:30:00
+3:2026-01-01T10:00:00:2026-01-15T09:00:00 completed_at=2026-01-14T12:00:00 archived_at=2026-01-15T09:00:00
+4:2026-01-01T10:00:00 deleted_at=2026-01-10T08:00:00 expires_at=2026-02-09T08:00:00 future=x
+-->
+"""
+    by_id = {t.id: t for t in parse_markdown(content).tasks}
+
+    assert by_id["1"].completed_at == datetime(2026, 1, 20, 17, 30)
+    # The line shows another day than the stored date: the line wins
+    assert by_id["2"].completed_at == datetime(2026, 1, 25)
+    assert by_id["3"].updated_at == datetime(2026, 1, 15, 9, 0)
+    assert by_id["3"].archived_at == datetime(2026, 1, 15, 9, 0)
+    assert by_id["3"].completed_at == datetime(2026, 1, 14, 12, 0)
+    assert by_id["4"].deleted_at == datetime(2026, 1, 10, 8, 0)
+    assert by_id["4"].expires_at == datetime(2026, 2, 9, 8, 0)
+
+
+def test_completed_date_taken_from_task_line():
+    result = parse_markdown("## Tasks\n- [x] **#1** Done (2026-01-12)\n")
+
+    assert result.tasks[0].completed_at == datetime(2026, 1, 12)
+    assert result.tasks[0].description == "Done"
@@ -2,7 +2,7 @@
 
 from unittest.mock import MagicMock, patch
 
-from ai_todo.core.task import Task, TaskStatus
+from ai_todo.core.task import Task, TaskManager, TaskStatus
 
 
 class TestTaskToDict:
@@ -79,13 +79,13 @@ class TestGetOpenTasksData:
         """Test that subtasks are not included in main list but counted."""
         from ai_todo.mcp.server import _get_open_tasks_data
 
-        mock_manager = MagicMock()
-        mock_manager.list_tasks.return_value = [
-            Task(id="1", description="Root task", status=TaskStatus.PENDING),
-            Task(id="1.1", description="Subtask 1", status=TaskStatus.PENDING),
-            Task(id="1.2", description="Subtask 2", status=TaskStatus.PENDING),
-        ]
-        mock_get_manager.return_value = mock_manager
+        mock_get_manager.return_value = TaskManager(
+            [
+                Task(id="1", description="Root task", status=TaskStatus.PENDING),
+                Task(id="1.1", description="Subtask 1", status=TaskStatus.PENDING),
+                Task(id="1.2", description="Subtask 2", status=TaskStatus.PENDING),
+            ]
+        )
 
         result = _get_open_tasks_data("TODO.md")
 
@@ -126,24 +126,17 @@ class TestGetActiveTasksData:
 class TestGetTaskData:
     """Tests for _get_task_data helper function."""
 
-    @patch("ai_todo.core.file_ops.FileOps")
-    @patch("ai_todo.cli.commands.get_manager")
-    def test_returns_task_with_subtasks(self, mock_get_manager, mock_file_ops_class):
+    @patch("ai_todo.cli.commands.get_task_store")
+    def test_returns_task_with_subtasks(self, mock_get_task_store):
         """Test that task helper returns task with subtasks."""
         from ai_todo.mcp.server import _get_task_data
 
         task = Task(id="1", description="Root task", status=TaskStatus.PENDING)
         subtask = Task(id="1.1", description="Subtask", status=TaskStatus.COMPLETED)
 
-        mock_manager = MagicMock()
-        mock_manager.get_task.return_value = task
-        mock_manager.get_subtasks.return_value = [subtask]
-        mock_get_manager.return_value = mock_manager
-
-        mock_file_ops = MagicMock()
-        mock_file_ops.read_tasks.return_value = [task, subtask]
-        mock_file_ops.get_relationships.return_value = {"depends-on": ["2"]}
-        mock_file_ops_class.return_value = mock_file_ops
+        mock_store = mock_get_task_store.return_value
+        mock_store.get_manager.return_value = TaskManager([task, subtask])
+        mock_store.file_ops.get_relationships.return_value = {"depends-on": ["2"]}
 
         result = _get_task_data("1", "TODO.md")
 
@@ -152,19 +145,12 @@ class TestGetTaskData:
         assert result["subtasks"][0]["id"] == "1.1"
         assert result["relationships"] == {"depends-on": ["2"]}
 
-    @patch("ai_todo.core.file_ops.FileOps")
-    @patch("ai_todo.cli.commands.get_manager")
-    def test_returns_error_for_nonexistent_task(self, mock_get_manager, mock_file_ops_class):
+    @patch("ai_todo.cli.commands.get_task_store")
+    def test_returns_error_for_nonexistent_task(self, mock_get_task_store):
         """Test that task helper returns error for missing task."""
         from ai_todo.mcp.server import _get_task_data
 
-        mock_manager = MagicMock()
-        mock_manager.get_task.return_value = None
-        mock_get_manager.return_value = mock_manager
-
-        mock_file_ops = MagicMock()
-        mock_file_ops.read_tasks.return_value = []
-        mock_file_ops_class.return_value = mock_file_ops
+        mock_get_task_store.return_value.get_manager.return_value = TaskManager([])
 
         result = _get_task_data("999", "TODO.md")
 
@@ -241,3 +227,62 @@ class TestGetConfigData:
         assert result["coordination"]["enabled"] is True
         assert result["coordination"]["type"] == "github-issues"
         assert result["numbering"]["next_id"] == 43
+
+
+class TestResourceCache:
+    """Tests for the cached resource JSON and its version."""
+
+    def _setup(self, tmp_path, monkeypatch):
+        import ai_todo.mcp.server as server
+
+        todo_file = tmp_path / "TODO.md"
+        todo_file.write_text("# Tasks\n\n## Tasks\n\n- [ ] **#1** First\n", encoding="utf-8")
+        monkeypatch.setattr(server, "CURRENT_TODO_PATH", str(todo_file))
+        monkeypatch.setattr(server, "_resource_cache", {})
+        return server
+
+    def test_payload_reused_until_tasks_change(self, tmp_path, monkeypatch):
+        """Test that the JSON is built once per task state and versioned by content."""
+        import json
+
+        from ai_todo.core.task_service import TaskService
+
+        server = self._setup(tmp_path, monkeypatch)
+        version, text = server._resource_json("tasks://open")
+        assert server._resource_json("tasks://open") == (version, text)
+        assert server._resource_json("tasks://open")[1] is text
+        data = json.loads(text)
+        assert data["version"] == version
+        assert data["count"] == 1
+        assert "timestamp" in data
+
+        TaskService(server.CURRENT_TODO_PATH).add_task("Second", [])
+        new_version, new_text = server._resource_json("tasks://open")
+        assert new_version != version
+        assert json.loads(new_text)["count"] == 2
+
+    def test_version_depends_on_content_only(self, tmp_path, monkeypatch):
+        """Test that rebuilding unchanged data keeps its version."""
+        server = self._setup(tmp_path, monkeypatch)
+        version, _ = server._resource_json("tasks://1")
+        server._resource_cache.clear()
+        assert server._resource_json("tasks://1")[0] == version
+        assert server._resource_json("tasks://active")[0] != version
+
+    def test_config_payload_follows_config_file(self, tmp_path, monkeypatch):
+        """Test that config://settings is rebuilt when config.yaml changes."""
+        server = self._setup(tmp_path, monkeypatch)
+        builds = []
+        get_config_data = server._get_config_data
+        monkeypatch.setattr(
+            server, "_get_config_data", lambda path: builds.append(path) or get_config_data(path)
+        )
+        server._resource_json("config://settings")
+        server._resource_json("config://settings")
+        assert len(builds) == 1
+
+        config_file = tmp_path / ".ai-todo" / "config.yaml"
+        config_file.parent.mkdir(exist_ok=True)
+        config_file.write_text("mode: multi-user\n", encoding="utf-8")
+        server._resource_json("config://settings")
+        assert len(builds) == 2
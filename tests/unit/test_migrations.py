@@ -1,6 +1,10 @@
+from datetime import datetime, timezone
+from unittest.mock import patch
+
 import pytest
 
-from ai_todo.core.migrations import MigrationRegistry
+from ai_todo.core.file_ops import FileOps
+from ai_todo.core.migrations import TASK_DATES_MIGRATION, MigrationRegistry, run_migrations
 
 
 @pytest.fixture
@@ -61,3 +65,56 @@ def test_migration_error(migration_registry):
 
     # Should not be marked as applied
     assert "001_fail" not in migration_registry.get_applied_migrations()
+
+
+def test_backfill_task_dates(tmp_path):
+    todo_path = tmp_path / "TODO.md"
+    todo_path.write_text(
+        "## Tasks\n\n- [ ] **#3** Active\n\n"
+        "## Archived Tasks\n"
+        "- [x] **#2** Dated (2026-01-15)\n"
+        "- [x] **#1** Undated\n"
+        "  - [x] **#1.1** Undated subtask\n",
+        encoding="utf-8",
+    )
+    history = {"1": datetime(2026, 1, 3, 12, 0, tzinfo=timezone.utc)}
+
+    with patch("ai_todo.utils.git.get_task_archive_dates", return_value=history):
+        assert run_migrations(str(todo_path)) == [TASK_DATES_MIGRATION]
+        assert run_migrations(str(todo_path)) == []
+
+    content = todo_path.read_text(encoding="utf-8")
+    assert "2:" in content and "archived_at=2026-01-15T00:00:00" in content
+    by_id = {t.id: t for t in FileOps(str(todo_path)).read_tasks()}
+    assert by_id["1"].archived_at == history["1"].astimezone().replace(tzinfo=None)
+    assert by_id["1.1"].archived_at == by_id["1"].archived_at
+    assert by_id["3"].archived_at is None
+
+
+def test_dry_runs_leave_the_migration_pending(tmp_path):
+    from ai_todo.core.empty_trash import EmptyTrashManager
+    from ai_todo.core.migrations import migration_pending
+    from ai_todo.core.prune import PruneManager
+
+    todo_path = tmp_path / "TODO.md"
+    todo_path.write_text(
+        "## Tasks\n\n- [ ] **#3** Active\n\n"
+        "## Archived Tasks\n"
+        "- [x] **#2** Recent (2100-01-15)\n"
+        "- [x] **#1** Undated\n"
+        "  - [x] **#1.1** Undated subtask\n",
+        encoding="utf-8",
+    )
+    before = todo_path.read_text(encoding="utf-8")
+    history = {"1": datetime(2026, 1, 3, 12, 0, tzinfo=timezone.utc)}
+
+    with patch("ai_todo.utils.git.get_task_archive_dates", return_value=history):
+        result = PruneManager(str(todo_path)).prune_tasks(days=30, dry_run=True)
+    EmptyTrashManager(str(todo_path)).empty_trash(dry_run=True)
+
+    # Dated in memory as the migration would, without writing anything
+    assert result.pruned_task_ids == ["1", "1.1"]
+    assert todo_path.read_text(encoding="utf-8") == before
+    config_dir = FileOps(str(todo_path)).config_dir
+    assert migration_pending(config_dir, TASK_DATES_MIGRATION)
+    assert not (config_dir / "migrations").exists()
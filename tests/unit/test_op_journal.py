@@ -0,0 +1,150 @@
+"""Unit tests for the operation journal (concurrency.mode: journal)."""
+
+import json
+import time
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+
+import ai_todo.core.task_service as task_service
+from ai_todo.core.op_journal import OpJournal
+from ai_todo.core.task import TaskStatus
+from ai_todo.core.task_service import TaskService
+from ai_todo.core.task_store import TaskStore
+
+BASE = "## Tasks\n\n- [ ] **#2** Task 2\n  - [ ] **#2.1** Subtask 2.1\n- [ ] **#1** Task 1\n"
+
+
+@pytest.fixture
+def todo_file(tmp_path):
+    todo_file = tmp_path / "TODO.md"
+    todo_file.write_text(BASE, encoding="utf-8")
+    config_dir = tmp_path / ".ai-todo"
+    config_dir.mkdir()
+    (config_dir / "config.yaml").write_text(
+        "security:\n  tamper_proof: true\n"
+        "concurrency:\n  mode: journal\n  compact_ops: 100\n  compact_interval: 3600\n"
+    )
+    return todo_file
+
+
+def new_service(todo_file):
+    return TaskService(str(todo_file), store=TaskStore(str(todo_file)))
+
+
+def task_state(service):
+    return [(t.id, t.description, t.status, sorted(t.tags), t.notes) for t in service.list_tasks()]
+
+
+def test_operations_are_journaled_not_written(todo_file):
+    service = new_service(todo_file)
+    before = todo_file.read_text(encoding="utf-8")
+
+    assert service.add_task("Task 3", ["new"]).task.id == "3"
+    service.complete_tasks(["1"])
+    service.relate("3", "depends-on", ["2"])
+
+    assert todo_file.read_text(encoding="utf-8") == before
+    records = [json.loads(line) for line in service.store.journal.path.read_text().splitlines()]
+    assert [r["op"] for r in records] == ["add_task", "complete_tasks", "relate"]
+    assert records[0]["ids"] == ["3"]
+    assert service.get_task("1").status == TaskStatus.COMPLETED
+
+
+def test_other_readers_merge_the_journal(todo_file):
+    writer = new_service(todo_file)
+    reader = new_service(todo_file)
+    reader.list_tasks()  # Resident state built before the journal existed
+
+    writer.add_task("Task 3", ["new"], notes="Details")
+    writer.add_subtask("3", "Subtask 3.1", [])
+    writer.batch(
+        [{"op": "set_tags", "task_id": "1", "tags": ["x"]}, {"op": "start", "task_id": "2"}]
+    )
+    writer.relate("3", "blocks", ["1"])
+
+    assert task_state(reader) == task_state(writer)
+    assert reader.show_task("3").relationships == {"blocks": ["1"]}
+
+
+def test_replay_reuses_allocated_ids(todo_file):
+    writer = new_service(todo_file)
+    writer.add_task("Task 3", [])
+    # The serial file is already past 3; replay must not allocate a new ID
+    assert writer.store.file_ops.get_serial() == 3
+
+    assert new_service(todo_file).get_task("3").description == "Task 3"
+
+
+def test_flush_writes_journal_to_todo(todo_file):
+    service = new_service(todo_file)
+    service.add_task("Task 3", ["new"])
+    service.delete_tasks(["1"])
+    service.archive_tasks(["2"])
+
+    assert service.flush().operations == 3
+
+    assert not service.store.journal.path.exists()
+    content = todo_file.read_text(encoding="utf-8")
+    assert "**#3** Task 3 `#new`" in content
+    assert "- [D] **#1** Task 1" in content
+    assert "- [x] **#2** Task 2" in content
+    assert task_state(new_service(todo_file)) == task_state(service)
+    assert service.flush().operations == 0
+
+
+def test_replay_keeps_operation_times(todo_file, monkeypatch):
+    clock = [1_700_000_000.0]
+    monkeypatch.setattr(
+        task_service, "time", SimpleNamespace(time=lambda: clock[0], sleep=time.sleep)
+    )
+    writer = new_service(todo_file)
+    writer.add_task("Task 3", [])
+    clock[0] += 5
+    writer.complete_tasks(["3"])
+    clock[0] += 5
+
+    # Another process replays the journal and writes it to TODO.md
+    assert new_service(todo_file).flush().operations == 2
+
+    task = new_service(todo_file).get_task("3")
+    assert task.created_at == datetime.fromtimestamp(1_700_000_000.0)
+    assert task.completed_at == task.updated_at == datetime.fromtimestamp(1_700_000_005.0)
+    written = writer.get_task("3")
+    assert (written.created_at, written.completed_at) == (task.created_at, task.completed_at)
+
+
+def test_journal_is_compacted_after_compact_ops(todo_file):
+    config = todo_file.parent / ".ai-todo" / "config.yaml"
+    config.write_text(config.read_text().replace("compact_ops: 100", "compact_ops: 3"))
+    service = new_service(todo_file)
+
+    service.add_task("Task 3", [])
+    service.add_task("Task 4", [])
+    assert "Task 4" not in todo_file.read_text(encoding="utf-8")
+    service.add_task("Task 5", [])
+
+    assert "**#5** Task 5" in todo_file.read_text(encoding="utf-8")
+    assert not service.store.journal.path.exists()
+
+
+def test_failed_operation_is_not_journaled(todo_file):
+    service = new_service(todo_file)
+
+    with pytest.raises(ValueError, match="Parent task 9 not found"):
+        service.add_subtask("9", "Orphan", [])
+
+    assert not service.store.journal.path.exists()
+
+
+def test_torn_record_is_ignored_and_overwritten(tmp_path):
+    journal = OpJournal(tmp_path / "op_journal")
+    end = journal.append({"op": "a"}, 0)
+    with open(journal.path, "ab") as f:
+        f.write(b'{"op": "tor')  # Append interrupted by a crash
+
+    assert journal.read() == ([{"op": "a"}], end)
+    end = journal.append({"op": "b"}, end)
+    assert journal.read() == ([{"op": "a"}, {"op": "b"}], end)
+    assert journal.size() == end
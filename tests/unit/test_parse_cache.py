@@ -0,0 +1,137 @@
+"""Unit tests for the on-disk parse cache."""
+
+from datetime import datetime
+
+import pytest
+
+from ai_todo.core import file_ops as file_ops_module
+from ai_todo.core.file_ops import FileOps
+from ai_todo.parsers.cache import dump_parse_result, load_parse_result
+from ai_todo.parsers.markdown import parse_markdown
+
+CONTENT = """# Project
+
+## Tasks
+
+- [ ] **#2** Task 2 `#bug`
+  > Note for 2
+  - [x] **#2.1** Subtask 2.1
+- [ ] **#1** Task 1
+
+## Archived Tasks
+- [x] **#3** Archived task (2026-01-15)
+
+## Deleted Tasks
+- [D] **#4** Deleted task (deleted 2026-01-10, expires 2026-02-09)
+
+---
+
+## Task Metadata
+
+<!-- TASK_METADATA
+1:2026-01-01T10:00:00:2026-01-02T11:00:00
+-->
+
+<!-- TASK RELATIONSHIPS
+1:depends-on:2
+-->
+"""
+
+
+def _task_state(tasks):
+    return [
+        (
+            t.id,
+            t.description,
+            t.status,
+            t.tags,
+            t.notes,
+            t.archived_at,
+            t.deleted_at,
+            t.expires_at,
+            t.completed_at is None,
+        )
+        for t in tasks
+    ]
+
+
+@pytest.fixture
+def todo_file(tmp_path):
+    todo_file = tmp_path / "TODO.md"
+    todo_file.write_text(CONTENT, encoding="utf-8")
+    config_dir = tmp_path / ".ai-todo"
+    config_dir.mkdir()
+    (config_dir / "config.yaml").write_text("security:\n  tamper_proof: false\n")
+    return todo_file
+
+
+def test_round_trip_matches_parse():
+    parsed = parse_markdown(CONTENT)
+    loaded = load_parse_result(dump_parse_result(parsed, "abc"), "abc")
+
+    assert loaded is not None
+    assert _task_state(loaded.tasks) == _task_state(parsed.tasks)
+    assert loaded.snapshot == parsed.snapshot
+    assert loaded.relationships == parsed.relationships
+    assert loaded.task_timestamps == parsed.task_timestamps
+    assert loaded.interleaved_content == parsed.interleaved_content
+    assert loaded.metadata_lines == parsed.metadata_lines
+    assert loaded.header_lines == parsed.header_lines
+    assert loaded.deleted_task_formats == parsed.deleted_task_formats
+    assert loaded.tasks_header_format == parsed.tasks_header_format
+
+
+def test_load_uses_persisted_timestamps_and_load_time():
+    parsed = parse_markdown(CONTENT)
+    before = datetime.now()
+    loaded = load_parse_result(dump_parse_result(parsed, "abc"), "abc")
+    by_id = {t.id: t for t in loaded.tasks}
+
+    assert by_id["1"].created_at == datetime(2026, 1, 1, 10, 0)
+    assert by_id["1"].updated_at == datetime(2026, 1, 2, 11, 0)
+    # Tasks without persisted timestamps look freshly parsed
+    assert by_id["2"].created_at >= before
+    assert by_id["2.1"].completed_at >= before
+
+
+@pytest.mark.parametrize("data", [b"", b"not marshal data", b"\x00\x01"])
+def test_load_rejects_corrupt_data(data):
+    assert load_parse_result(data, "abc") is None
+
+
+def test_load_rejects_other_checksum():
+    data = dump_parse_result(parse_markdown(CONTENT), "abc")
+    assert load_parse_result(data, "def") is None
+
+
+def test_read_tasks_uses_cache_on_hash_match(todo_file, monkeypatch):
+    first = FileOps(str(todo_file)).read_tasks()
+    assert (todo_file.parent / ".ai-todo" / "state" / "parse_cache").exists()
+
+    def fail_parse(content):
+        raise AssertionError("parse_markdown should not run on a cache hit")
+
+    monkeypatch.setattr(file_ops_module, "parse_markdown", fail_parse)
+    second = FileOps(str(todo_file)).read_tasks()
+
+    assert _task_state(second) == _task_state(first)
+
+
+def test_read_tasks_reparses_changed_content(todo_file):
+    FileOps(str(todo_file), skip_verify=True).read_tasks()
+    todo_file.write_text(CONTENT.replace("Task 1", "Renamed"), encoding="utf-8")
+
+    tasks = FileOps(str(todo_file), skip_verify=True).read_tasks()
+
+    assert {t.id: t.description for t in tasks}["1"] == "Renamed"
+
+
+def test_external_edit_invalidates_cache(todo_file):
+    FileOps(str(todo_file)).read_tasks()
+    cache_path = todo_file.parent / ".ai-todo" / "state" / "parse_cache"
+    assert cache_path.exists()
+
+    todo_file.write_text(CONTENT + "\n- [ ] **#5** External\n", encoding="utf-8")
+    FileOps(str(todo_file))
+
+    assert not cache_path.exists()
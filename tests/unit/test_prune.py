@@ -1,5 +1,6 @@
 """Unit tests for prune functionality."""
 
+import gzip
 import re
 import tempfile
 from datetime import datetime, timedelta, timezone
@@ -10,12 +11,35 @@ import pytest
 
 from ai_todo.core.prune import PruneManager, PruneResult
 from ai_todo.core.task import Task, TaskStatus
-from ai_todo.utils.git import get_task_archive_date, parse_archive_date_from_metadata
+from ai_todo.utils import git
+from ai_todo.utils.git import (
+    get_task_archive_date,
+    get_task_archive_dates,
+    parse_archive_date_from_metadata,
+)
 
 
 class TestGitHistoryParsing:
     """Test git history analysis functions."""
 
+    @pytest.fixture(autouse=True)
+    def clear_archive_dates(self):
+        git._archive_dates.clear()
+        yield
+        git._archive_dates.clear()
+
+    @staticmethod
+    def fake_git(log_output, refs="abc123 HEAD\n"):
+        """subprocess.run stand-in answering ``git show-ref`` and ``git log``."""
+
+        def run(args, **_kwargs):
+            result = MagicMock()
+            result.returncode = 0 if refs else 1
+            result.stdout = refs if args[1] == "show-ref" else log_output
+            return result
+
+        return run
+
     def test_get_task_archive_date_from_git_log(self):
         """Test parsing archive date from git log."""
         with tempfile.NamedTemporaryFile(mode="w", suffix=".md", delete=False) as f:
@@ -23,12 +47,9 @@ class TestGitHistoryParsing:
             f.write("# TODO\n")
 
         try:
-            # Mock subprocess to return a date
+            log_output = "\x1e2026-01-15 10:30:45 -0800\x00Archive task #129\n\n"
             with patch("ai_todo.utils.git.subprocess.run") as mock_run:
-                mock_result = MagicMock()
-                mock_result.returncode = 0
-                mock_result.stdout = "2026-01-15 10:30:45 -0800\n"
-                mock_run.return_value = mock_result
+                mock_run.side_effect = self.fake_git(log_output)
 
                 result = get_task_archive_date("129", todo_path)
 
@@ -37,41 +58,58 @@ class TestGitHistoryParsing:
                 assert result.month == 1
                 assert result.day == 15
 
-                # Verify git command uses extended-regexp for OR logic
-                mock_run.assert_called_once()
-                call_args = mock_run.call_args[0][0]
-                assert "--extended-regexp" in call_args
-                assert "--grep=archive.*129|#129" in call_args
+                # One git log over all refs, not a --grep per task
+                log_calls = [c for c in mock_run.call_args_list if c[0][0][1] == "log"]
+                assert len(log_calls) == 1
+                assert "--all" in log_calls[0][0][0]
         finally:
             Path(todo_path).unlink()
 
-    def test_get_task_archive_date_escapes_subtask_dots(self):
-        """Test that subtask IDs with dots are properly escaped in regex."""
+    def test_get_task_archive_dates_single_scan(self):
+        """Test that one history scan maps every referenced task to its newest commit."""
         with tempfile.NamedTemporaryFile(mode="w", suffix=".md", delete=False) as f:
             todo_path = f.name
             f.write("# TODO\n")
 
         try:
-            # Mock subprocess to return a date
+            log_output = (
+                "\x1e2026-02-01 09:00:00 +0000\x00archive 129.1 and #13\n\n"
+                "\x1e2026-01-15 10:30:45 -0800\x00archive task #129\nSee #1300\n\n"
+                "\x1e2026-01-01 08:00:00 +0000\x00Complete #13\n\n"
+            )
             with patch("ai_todo.utils.git.subprocess.run") as mock_run:
-                mock_result = MagicMock()
-                mock_result.returncode = 0
-                mock_result.stdout = "2026-01-15 10:30:45 -0800\n"
-                mock_run.return_value = mock_result
-
-                # Test with subtask ID containing dots
-                result = get_task_archive_date("129.1", todo_path)
+                mock_run.side_effect = self.fake_git(log_output)
 
-                assert result is not None
+                dates = get_task_archive_dates(todo_path)
+                assert set(dates) == {"129.1", "13", "129", "1300"}
+                assert dates["13"].month == 2  # Newest commit wins
+                assert dates["129"].day == 15
 
-                # Verify dot is escaped in git grep pattern
-                mock_run.assert_called_once()
-                call_args = mock_run.call_args[0][0]
-                # The dot should be escaped as \. in the pattern
-                assert r"--grep=archive.*129\.1|#129\.1" in call_args
+                # Cached per refs state: no further git log
+                get_task_archive_date("129", todo_path)
+                log_calls = [c for c in mock_run.call_args_list if c[0][0][1] == "log"]
+                assert len(log_calls) == 1
         finally:
             Path(todo_path).unlink()
 
+    def test_get_task_archive_dates_cache_file(self, tmp_path):
+        """Test that the scan is persisted per refs state."""
+        todo_path = str(tmp_path / "TODO.md")
+        cache_path = tmp_path / "archive_dates"
+        log_output = "\x1e2026-01-15 10:30:45 -0800\x00Archive task #129\n\n"
+
+        with patch("ai_todo.utils.git.subprocess.run") as mock_run:
+            mock_run.side_effect = self.fake_git(log_output)
+            assert "129" in get_task_archive_dates(todo_path, cache_path)
+            git._archive_dates.clear()
+
+            mock_run.side_effect = self.fake_git("")
+            assert "129" in get_task_archive_dates(todo_path, cache_path)
+
+            # A new commit changes the refs and triggers a rescan
+            mock_run.side_effect = self.fake_git("", refs="def456 HEAD\n")
+            assert get_task_archive_dates(todo_path, cache_path) == {}
+
     def test_get_task_archive_date_no_git_history(self):
         """Test fallback when git history unavailable."""
         with tempfile.NamedTemporaryFile(mode="w", suffix=".md", delete=False) as f:
@@ -79,12 +117,9 @@ class TestGitHistoryParsing:
             f.write("- [x] **#129** Test task (2026-01-15)\n")
 
         try:
-            # Mock subprocess to return no results
+            # No commits: git show-ref fails
             with patch("ai_todo.utils.git.subprocess.run") as mock_run:
-                mock_result = MagicMock()
-                mock_result.returncode = 0
-                mock_result.stdout = ""
-                mock_run.return_value = mock_result
+                mock_run.side_effect = self.fake_git("", refs="")
 
                 result = get_task_archive_date("129", todo_path)
 
@@ -154,6 +189,7 @@ class TestPruneManager:
             status=TaskStatus.ARCHIVED,
             tags=set(),
             completed_at=datetime.now() - timedelta(days=60),
+            archived_at=datetime.now() - timedelta(days=60),
         )
         tasks.append(old_task)
 
@@ -164,6 +200,7 @@ class TestPruneManager:
             status=TaskStatus.ARCHIVED,
             tags=set(),
             completed_at=datetime.now() - timedelta(days=10),
+            archived_at=datetime.now() - timedelta(days=10),
         )
         tasks.append(recent_task)
 
@@ -174,6 +211,7 @@ class TestPruneManager:
             status=TaskStatus.ARCHIVED,
             tags=set(),
             completed_at=datetime.now() - timedelta(days=45),
+            archived_at=datetime.now() - timedelta(days=45),
         )
         subtask1 = Task(
             id="102.1",
@@ -181,6 +219,7 @@ class TestPruneManager:
             status=TaskStatus.ARCHIVED,
             tags=set(),
             completed_at=datetime.now() - timedelta(days=45),
+            archived_at=datetime.now() - timedelta(days=45),
         )
         subtask2 = Task(
             id="102.2",
@@ -188,6 +227,7 @@ class TestPruneManager:
             status=TaskStatus.ARCHIVED,
             tags=set(),
             completed_at=datetime.now() - timedelta(days=45),
+            archived_at=datetime.now() - timedelta(days=45),
         )
         tasks.extend([parent_task, subtask1, subtask2])
 
@@ -232,29 +272,18 @@ class TestPruneManager:
         """Test filtering tasks by age."""
         manager = PruneManager(temp_todo_file)
 
-        # Mock get_task_archive_date to use completed_at
-        with patch("ai_todo.core.prune.get_task_archive_date") as mock_get_date:
-
-            def get_date(task_id, _path):
-                for task in sample_archived_tasks:
-                    if task.id == task_id:
-                        return task.completed_at
-                return None
-
-            mock_get_date.side_effect = get_date
-
-            # Filter with 30-day cutoff
-            cutoff = datetime.now() - timedelta(days=30)
-            archived = [t for t in sample_archived_tasks if t.status == TaskStatus.ARCHIVED]
-            result = manager._filter_by_age(archived, cutoff)
+        # Filter with 30-day cutoff
+        cutoff = datetime.now() - timedelta(days=30)
+        archived = [t for t in sample_archived_tasks if t.status == TaskStatus.ARCHIVED]
+        result = manager._filter_by_age(archived, cutoff)
 
-            # Should include task 100 (60 days) and 102 (45 days) + subtasks
-            task_ids = {t.id for t in result}
-            assert "100" in task_ids  # Old task
-            assert "102" in task_ids  # Parent task
-            assert "102.1" in task_ids  # Subtask 1
-            assert "102.2" in task_ids  # Subtask 2
-            assert "101" not in task_ids  # Recent task (10 days)
+        # Should include task 100 (60 days) and 102 (45 days) + subtasks
+        task_ids = {t.id for t in result}
+        assert "100" in task_ids  # Old task
+        assert "102" in task_ids  # Parent task
+        assert "102.1" in task_ids  # Subtask 1
+        assert "102.2" in task_ids  # Subtask 2
+        assert "101" not in task_ids  # Recent task (10 days)
 
     def test_filter_by_task_range(self, temp_todo_file, sample_archived_tasks):
         """Test filtering tasks by task ID range."""
@@ -313,23 +342,13 @@ class TestPruneManager:
         """Test identify_tasks_to_prune with default 30-day retention."""
         manager = PruneManager(temp_todo_file)
 
-        with patch("ai_todo.core.prune.get_task_archive_date") as mock_get_date:
-
-            def get_date(task_id, _path):
-                for task in sample_archived_tasks:
-                    if task.id == task_id:
-                        return task.completed_at
-                return None
-
-            mock_get_date.side_effect = get_date
+        result = manager.identify_tasks_to_prune(sample_archived_tasks)
 
-            result = manager.identify_tasks_to_prune(sample_archived_tasks)
-
-            # Should prune old tasks (>30 days)
-            task_ids = {t.id for t in result}
-            assert "100" in task_ids  # 60 days old
-            assert "102" in task_ids  # 45 days old
-            assert "101" not in task_ids  # 10 days old
+        # Should prune old tasks (>30 days)
+        task_ids = {t.id for t in result}
+        assert "100" in task_ids  # 60 days old
+        assert "102" in task_ids  # 45 days old
+        assert "101" not in task_ids  # 10 days old
 
     def test_identify_tasks_to_prune_no_archived(self, temp_todo_file):
         """Test identify_tasks_to_prune with no archived tasks."""
@@ -347,29 +366,19 @@ class TestPruneManager:
         """Test that older_than parameter is not overridden by default days."""
         manager = PruneManager(temp_todo_file)
 
-        with patch("ai_todo.core.prune.get_task_archive_date") as mock_get_date:
-
-            def get_date(task_id, _path):
-                for task in sample_archived_tasks:
-                    if task.id == task_id:
-                        return task.completed_at
-                return None
-
-            mock_get_date.side_effect = get_date
-
-            # Use older_than without specifying days (days=None)
-            # Should use older_than cutoff, not default 30 days
-            result = manager.identify_tasks_to_prune(
-                sample_archived_tasks, days=None, older_than="2025-12-20"
-            )
+        # Use older_than without specifying days (days=None)
+        # Should use older_than cutoff, not default 30 days
+        result = manager.identify_tasks_to_prune(
+            sample_archived_tasks, days=None, older_than="2025-12-20"
+        )
 
-            # Should include only tasks older than 2025-12-20
-            # Task 100 (60 days old ~= 2025-11-30), 102 (45 days old ~= 2025-12-15)
-            # but NOT 101 (10 days old ~= 2026-01-19)
-            task_ids = {t.id for t in result}
-            assert "100" in task_ids
-            assert "102" in task_ids
-            assert "101" not in task_ids
+        # Should include only tasks older than 2025-12-20
+        # Task 100 (60 days old ~= 2025-11-30), 102 (45 days old ~= 2025-12-15)
+        # but NOT 101 (10 days old ~= 2026-01-19)
+        task_ids = {t.id for t in result}
+        assert "100" in task_ids
+        assert "102" in task_ids
+        assert "101" not in task_ids
 
     def test_identify_tasks_from_task_not_overridden(self, temp_todo_file, sample_archived_tasks):
         """Test that from_task parameter is not overridden by default days."""
@@ -390,6 +399,8 @@ class TestPruneManager:
         manager = PruneManager(temp_todo_file)
 
         # Create tasks with different timezone scenarios
+        pst = timezone(timedelta(hours=-8))
+        est = timezone(timedelta(hours=-5))
         tasks = [
             # Task archived 60 days ago in PST (timezone.utc-8)
             Task(
@@ -397,7 +408,7 @@ class TestPruneManager:
                 description="Task in PST",
                 status=TaskStatus.ARCHIVED,
                 tags=set(),
-                completed_at=datetime.now(timezone.utc) - timedelta(days=60),
+                archived_at=(datetime.now(timezone.utc) - timedelta(days=60)).astimezone(pst),
             ),
             # Task archived 10 days ago in EST (timezone.utc-5)
             Task(
@@ -405,37 +416,18 @@ class TestPruneManager:
                 description="Task in EST",
                 status=TaskStatus.ARCHIVED,
                 tags=set(),
-                completed_at=datetime.now(timezone.utc) - timedelta(days=10),
+                archived_at=(datetime.now(timezone.utc) - timedelta(days=10)).astimezone(est),
             ),
         ]
 
-        with patch("ai_todo.core.prune.get_task_archive_date") as mock_get_date:
-
-            def get_date(task_id, _path):
-                if task_id == "100":
-                    # Return timezone-aware datetime in PST
-                    from datetime import timezone as tz
+        # Filter with 30-day cutoff (timezone.utc)
+        cutoff = datetime.now(timezone.utc) - timedelta(days=30)
+        result = manager._filter_by_age(tasks, cutoff)
 
-                    pst = tz(timedelta(hours=-8))
-                    return (datetime.now(timezone.utc) - timedelta(days=60)).astimezone(pst)
-                elif task_id == "101":
-                    # Return timezone-aware datetime in EST
-                    from datetime import timezone as tz
-
-                    est = tz(timedelta(hours=-5))
-                    return (datetime.now(timezone.utc) - timedelta(days=10)).astimezone(est)
-                return None
-
-            mock_get_date.side_effect = get_date
-
-            # Filter with 30-day cutoff (timezone.utc)
-            cutoff = datetime.now(timezone.utc) - timedelta(days=30)
-            result = manager._filter_by_age(tasks, cutoff)
-
-            # Should include only task 100 (60 days old), not 101 (10 days old)
-            task_ids = {t.id for t in result}
-            assert "100" in task_ids
-            assert "101" not in task_ids
+        # Should include only task 100 (60 days old), not 101 (10 days old)
+        task_ids = {t.id for t in result}
+        assert "100" in task_ids
+        assert "101" not in task_ids
 
     def test_filter_by_age_mixed_timezone_naive_aware(self, temp_todo_file):
         """Test handling of mixed naive and timezone-aware archive dates."""
@@ -447,36 +439,27 @@ class TestPruneManager:
                 description="Task with aware date",
                 status=TaskStatus.ARCHIVED,
                 tags=set(),
+                # Timezone-aware datetime (60 days ago in UTC)
+                archived_at=datetime.now(timezone.utc) - timedelta(days=60),
             ),
             Task(
                 id="101",
                 description="Task with naive date",
                 status=TaskStatus.ARCHIVED,
                 tags=set(),
+                # Naive datetime (10 days ago, assumed UTC)
+                archived_at=datetime.now() - timedelta(days=10),
             ),
         ]
 
-        with patch("ai_todo.core.prune.get_task_archive_date") as mock_get_date:
-
-            def get_date(task_id, _path):
-                if task_id == "100":
-                    # Return timezone-aware datetime (60 days ago in UTC)
-                    return datetime.now(timezone.utc) - timedelta(days=60)
-                elif task_id == "101":
-                    # Return naive datetime (10 days ago, assumed UTC)
-                    return datetime.now() - timedelta(days=10)
-                return None
+        # Filter with 30-day cutoff (timezone.utc-aware)
+        cutoff = datetime.now(timezone.utc) - timedelta(days=30)
+        result = manager._filter_by_age(tasks, cutoff)
 
-            mock_get_date.side_effect = get_date
-
-            # Filter with 30-day cutoff (timezone.utc-aware)
-            cutoff = datetime.now(timezone.utc) - timedelta(days=30)
-            result = manager._filter_by_age(tasks, cutoff)
-
-            # Should include only task 100 (60 days old)
-            task_ids = {t.id for t in result}
-            assert "100" in task_ids
-            assert "101" not in task_ids
+        # Should include only task 100 (60 days old)
+        task_ids = {t.id for t in result}
+        assert "100" in task_ids
+        assert "101" not in task_ids
 
     def test_create_archive_backup(self, temp_todo_file, sample_archived_tasks):
         """Test archive backup creation."""
@@ -491,7 +474,7 @@ class TestPruneManager:
         assert Path(archive_path).exists()
 
         # Verify archive content
-        content = Path(archive_path).read_text()
+        content = gzip.decompress(Path(archive_path).read_bytes()).decode()
         assert "# Archived Tasks - Pruned on" in content
         assert "Tasks Pruned: 2 root tasks" in content
         assert "Subtasks Pruned: 2 subtasks" in content
@@ -516,7 +499,7 @@ class TestPruneManager:
 
         archive_path = manager.create_archive_backup(to_prune, older_than="2025-10-01")
 
-        content = Path(archive_path).read_text()
+        content = gzip.decompress(Path(archive_path).read_bytes()).decode()
         assert "archived before 2025-10-01" in content
         assert "Date Filter: Before 2025-10-01" in content
         assert "Retention Period:" not in content
@@ -530,7 +513,7 @@ class TestPruneManager:
 
         archive_path = manager.create_archive_backup(to_prune, from_task="150")
 
-        content = Path(archive_path).read_text()
+        content = gzip.decompress(Path(archive_path).read_bytes()).decode()
         assert "tasks from #1 to #150" in content
         assert "Task Range: #1 to #150" in content
         assert "Retention Period:" not in content
@@ -595,7 +578,7 @@ class TestPruneManager:
         ]
 
         archive_path = manager.create_archive_backup(tasks, days=30)
-        content = Path(archive_path).read_text()
+        content = gzip.decompress(Path(archive_path).read_bytes()).decode()
 
         # Extract task IDs from TASK_METADATA section
         # Pattern: <!-- TASK_METADATA ... task_id:timestamp ... -->
@@ -639,23 +622,13 @@ class TestPruneManager:
 
         # Mock file_ops.read_tasks to return sample tasks
         with patch.object(manager.file_ops, "read_tasks", return_value=sample_archived_tasks):
-            with patch("ai_todo.core.prune.get_task_archive_date") as mock_get_date:
-
-                def get_date(task_id, _path):
-                    for task in sample_archived_tasks:
-                        if task.id == task_id:
-                            return task.completed_at
-                    return None
-
-                mock_get_date.side_effect = get_date
-
-                result = manager.prune_tasks(days=30, dry_run=True)
+            result = manager.prune_tasks(days=30, dry_run=True)
 
-                assert isinstance(result, PruneResult)
-                assert result.dry_run is True
-                assert result.archive_path is None
-                assert result.tasks_pruned > 0
-                assert len(result.pruned_task_ids) > 0
+            assert isinstance(result, PruneResult)
+            assert result.dry_run is True
+            assert result.archive_path is None
+            assert result.tasks_pruned > 0
+            assert len(result.pruned_task_ids) > 0
 
     def test_prune_tasks_with_backup(self, temp_todo_file, sample_archived_tasks):
         """Test prune_tasks with backup creation."""
@@ -664,29 +637,19 @@ class TestPruneManager:
         # Mock file_ops methods
         with patch.object(manager.file_ops, "read_tasks", return_value=sample_archived_tasks):
             with patch.object(manager.file_ops, "write_tasks") as mock_write:
-                with patch("ai_todo.core.prune.get_task_archive_date") as mock_get_date:
-
-                    def get_date(task_id, _path):
-                        for task in sample_archived_tasks:
-                            if task.id == task_id:
-                                return task.completed_at
-                        return None
+                result = manager.prune_tasks(days=30, backup=True)
 
-                    mock_get_date.side_effect = get_date
-
-                    result = manager.prune_tasks(days=30, backup=True)
-
-                    assert isinstance(result, PruneResult)
-                    assert result.dry_run is False
-                    assert result.archive_path is not None
-                    assert Path(result.archive_path).exists()
-                    assert result.tasks_pruned > 0
+                assert isinstance(result, PruneResult)
+                assert result.dry_run is False
+                assert result.archive_path is not None
+                assert Path(result.archive_path).exists()
+                assert result.tasks_pruned > 0
 
-                    # Verify write_tasks was called
-                    assert mock_write.called
+                # Verify write_tasks was called
+                assert mock_write.called
 
-                    # Cleanup
-                    Path(result.archive_path).unlink()
+                # Cleanup
+                Path(result.archive_path).unlink()
 
     def test_prune_tasks_no_backup(self, temp_todo_file, sample_archived_tasks):
         """Test prune_tasks without backup creation."""
@@ -694,19 +657,9 @@ class TestPruneManager:
 
         with patch.object(manager.file_ops, "read_tasks", return_value=sample_archived_tasks):
             with patch.object(manager.file_ops, "write_tasks"):
-                with patch("ai_todo.core.prune.get_task_archive_date") as mock_get_date:
-
-                    def get_date(task_id, _path):
-                        for task in sample_archived_tasks:
-                            if task.id == task_id:
-                                return task.completed_at
-                        return None
-
-                    mock_get_date.side_effect = get_date
-
-                    result = manager.prune_tasks(days=30, backup=False)
+                result = manager.prune_tasks(days=30, backup=False)
 
-                    assert result.archive_path is None
+                assert result.archive_path is None
 
     def test_prune_tasks_no_matches(self, temp_todo_file):
         """Test prune_tasks when no tasks match criteria."""
@@ -720,18 +673,16 @@ class TestPruneManager:
                 status=TaskStatus.ARCHIVED,
                 tags=set(),
                 completed_at=datetime.now() - timedelta(days=5),
+                archived_at=datetime.now() - timedelta(days=5),
             )
         ]
 
         with patch.object(manager.file_ops, "read_tasks", return_value=recent_tasks):
-            with patch("ai_todo.core.prune.get_task_archive_date") as mock_get_date:
-                mock_get_date.return_value = datetime.now() - timedelta(days=5)
-
-                result = manager.prune_tasks(days=30)
+            result = manager.prune_tasks(days=30)
 
-                assert result.tasks_pruned == 0
-                assert result.subtasks_pruned == 0
-                assert result.archive_path is None
+            assert result.tasks_pruned == 0
+            assert result.subtasks_pruned == 0
+            assert result.archive_path is None
 
 
 class TestPruneResult:
@@ -0,0 +1,102 @@
+"""Unit tests for the prune archive (monthly gzip segments with a manifest)."""
+
+import gzip
+from datetime import datetime
+
+import pytest
+
+from ai_todo.core import prune_archive
+from ai_todo.core.prune_archive import PruneArchive
+from ai_todo.core.task import Task, TaskStatus
+
+WHEN = datetime(2026, 3, 14, 9, 30)
+
+
+def archived(task_id, description=None, **fields):
+    task = Task(id=task_id, description=description or f"Task {task_id}", **fields)
+    task.status = TaskStatus.ARCHIVED
+    task.created_at = datetime(2026, 1, 1, 8, 0)
+    task.archived_at = datetime(2026, 2, 1, 12, 0)
+    return task
+
+
+def prune_run(archive, *trees, when=WHEN):
+    with archive.append(when) as writer:
+        writer.write("# Run\n\n")
+        for root, subtasks in trees:
+            writer.add_tree(root, subtasks)
+        writer.write("---\n")
+
+
+def test_find_reads_task_with_subtasks_and_dates(tmp_path):
+    archive = PruneArchive(tmp_path)
+    root = archived("7", tags={"feature"}, notes=["Kept note"])
+    prune_run(archive, (root, [archived("7.1"), archived("7.1.1")]), (archived("8"), []))
+
+    found = archive.find("7")
+    assert [t.id for t in found] == ["7", "7.1", "7.1.1"]
+    assert found[0].tags == {"feature"}
+    assert found[0].notes == ["Kept note"]
+    assert found[0].status == TaskStatus.ARCHIVED
+    assert found[0].archived_at == root.archived_at
+    assert found[0].created_at == root.created_at
+
+    assert [t.id for t in archive.find("7.1")] == ["7.1", "7.1.1"]
+    assert archive.find("9") is None
+    assert archive.find("7.2") is None
+
+
+def test_runs_append_to_month_segment(tmp_path):
+    archive = PruneArchive(tmp_path)
+    prune_run(archive, (archived("1", "First"), []))
+    prune_run(archive, (archived("1", "Restored and pruned again"), []), (archived("2"), []))
+    prune_run(archive, (archived("3"), []), when=datetime(2026, 4, 1))
+
+    march = archive.segment_path(WHEN)
+    assert march.name == "TODO_ARCHIVE_2026-03.md.gz"
+    content = gzip.decompress(march.read_bytes()).decode()
+    assert content.count("# Run") == 2
+    assert "**#3**" not in content
+    # The newest run wins
+    assert archive.find("1")[0].description == "Restored and pruned again"
+    assert archive.find("3")[0].id == "3"
+
+
+def test_find_decompresses_only_the_member_holding_the_task(tmp_path, monkeypatch):
+    monkeypatch.setattr(prune_archive, "_BLOCK_SIZE", 200)
+    archive = PruneArchive(tmp_path)
+    prune_run(archive, *[(archived(str(n)), []) for n in range(1, 101)])
+    manifest = archive.manifest.read_text(encoding="utf-8").splitlines()
+    members = {tuple(line.split("\t")[2:]) for line in manifest if line.startswith("task\t")}
+    assert len(members) > 10
+
+    sizes = []
+    decompress = gzip.decompress
+    monkeypatch.setattr(
+        prune_archive.gzip, "decompress", lambda data: sizes.append(len(data)) or decompress(data)
+    )
+    assert archive.find("50")[0].description == "Task 50"
+    assert len(sizes) == 1
+    assert sizes[0] < archive.segment_path(WHEN).stat().st_size / 10
+
+
+def test_failed_run_is_not_kept(tmp_path):
+    archive = PruneArchive(tmp_path)
+    prune_run(archive, (archived("1"), []))
+    size = archive.segment_path(WHEN).stat().st_size
+
+    with pytest.raises(RuntimeError):
+        with archive.append(WHEN) as writer:
+            writer.add_tree(archived("2"), [])
+            writer.write("partial")
+            raise RuntimeError("interrupted")
+    assert archive.segment_path(WHEN).stat().st_size == size
+
+    # A run cut short by a crash is cut off by the next one
+    with open(archive.segment_path(WHEN), "ab") as f:
+        f.write(gzip.compress(b"- [x] **#2** Crashed\n")[:10])
+    prune_run(archive, (archived("3"), []))
+    content = gzip.decompress(archive.segment_path(WHEN).read_bytes()).decode()
+    assert "**#1**" in content and "**#3**" in content
+    assert "**#2**" not in content
+    assert archive.find("2") is None
@@ -0,0 +1,124 @@
+"""Unit tests for the shadow store (compressed history of verified TODO.md contents)."""
+
+import random
+
+import pytest
+
+from ai_todo.core import shadow_store
+from ai_todo.core.shadow_store import ShadowStore, apply_delta, line_delta
+
+
+@pytest.fixture(autouse=True)
+def no_head_cache():
+    # Every store in a test reads its packs as a new process would
+    shadow_store._head_cache.clear()
+    yield
+    shadow_store._head_cache.clear()
+
+
+def versions(count, seed=7):
+    """Successive TODO.md-like contents, each a small edit of the previous one."""
+    rng = random.Random(seed)
+    lines = [f"- [ ] **#{n}** Task {n}\n" for n in range(1, 200)] + ["\n"] * 20
+    for step in range(count):
+        position = rng.randrange(len(lines))
+        edit = rng.choice(["insert", "delete", "change", "move"])
+        if edit == "insert":
+            lines.insert(position, f"  - [ ] **#{position}.{step}** Added\n")
+        elif edit == "delete" and len(lines) > 1:
+            del lines[position]
+        elif edit == "change":
+            lines[position] = lines[position].replace("[ ]", "[x]")
+        else:
+            lines.append(lines.pop(position))
+        yield "".join(lines)
+
+
+def test_line_delta_round_trips():
+    previous = []
+    for content in versions(200):
+        lines = content.splitlines(keepends=True)
+        assert apply_delta(previous, line_delta(previous, lines)) == lines
+        previous = lines
+
+
+def test_line_delta_stores_only_the_change():
+    old = [f"line {n}\n" for n in range(1000)]
+    new = old[:500] + ["inserted\n"] + old[501:]
+
+    assert line_delta(old, new) == [[0, 500], "inserted\n", [501, 1000]]
+
+
+def test_every_recorded_version_can_be_read(tmp_path):
+    store = ShadowStore(tmp_path / "shadow", snapshot_interval=10, keep_packs=100)
+    recorded = {}
+    for content in versions(35):
+        checksum = f"{len(recorded):064x}"
+        store.record(content, checksum)
+        recorded[checksum] = content
+
+    store = ShadowStore(tmp_path / "shadow", snapshot_interval=10, keep_packs=100)
+    assert [v.checksum for v in store.history()] == list(recorded)
+    assert [v.kind for v in store.history()][:11] == ["snapshot"] + ["delta"] * 9 + ["snapshot"]
+    assert store.read() == content
+    for checksum, expected in recorded.items():
+        assert store.read(checksum) == expected
+    assert store.read("f" * 64) is None
+
+
+def test_only_the_newest_packs_are_kept(tmp_path):
+    store = ShadowStore(tmp_path / "shadow", snapshot_interval=5, keep_packs=2)
+    for index, content in enumerate(versions(23)):
+        store.record(content, f"{index:064x}")
+
+    assert sorted(p.name for p in (tmp_path / "shadow").iterdir()) == [
+        "000004.pack",
+        "000005.pack",
+    ]
+    assert len(store.history()) == 8
+    assert store.read() == content
+
+
+def test_recording_the_head_again_is_a_no_op(tmp_path):
+    store = ShadowStore(tmp_path / "shadow")
+    store.record("a\n", "1" * 64)
+    store.record("a\n", "1" * 64)
+
+    assert len(store.history()) == 1
+
+
+def test_torn_record_is_ignored_and_overwritten(tmp_path):
+    store = ShadowStore(tmp_path / "shadow")
+    store.record("a\nb\n", "1" * 64)
+    store.record("a\nc\n", "2" * 64)
+    pack = next((tmp_path / "shadow").iterdir())
+    data = pack.read_bytes()
+    pack.write_bytes(data[:-3])  # Append of the second record interrupted by a crash
+    shadow_store._head_cache.clear()
+
+    assert store.read() == "a\nb\n"
+    store.record("a\nd\n", "3" * 64)
+    shadow_store._head_cache.clear()
+    assert [v.checksum[0] for v in store.history()] == ["1", "3"]
+    assert store.read() == "a\nd\n"
+
+
+def test_torn_first_record_of_a_pack_starts_it_over(tmp_path):
+    store = ShadowStore(tmp_path / "shadow", snapshot_interval=2)
+    for index, content in enumerate(["c0\n", "c1\n", "c2\n"]):
+        store.record(content, f"{index:064x}")
+    newest = tmp_path / "shadow" / "000002.pack"
+    newest.write_bytes(newest.read_bytes()[:-3])  # Snapshot starting the pack cut short
+    shadow_store._head_cache.clear()
+
+    # The older pack still serves the newest complete record
+    assert store.read() == "c1\n"
+    store.record("c3\n", f"{3:064x}")
+    shadow_store._head_cache.clear()
+    assert sorted(p.name for p in (tmp_path / "shadow").iterdir()) == [
+        "000001.pack",
+        "000002.pack",
+    ]
+    assert [v.checksum[-1] for v in store.history()] == ["0", "1", "3"]
+    assert store.read() == "c3\n"
+    assert store.read(f"{0:064x}") == "c0\n"
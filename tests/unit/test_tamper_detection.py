@@ -1,3 +1,5 @@
+import os
+
 import pytest
 
 from ai_todo.core.exceptions import TamperError
@@ -150,6 +152,97 @@ def test_shadow_copy_update(temp_todo_dir):
     content = "New content"
     file_ops.update_integrity(content)
 
-    shadow_file = temp_todo_dir / ".ai-todo" / "state" / "TODO.md"
-    assert shadow_file.exists()
-    assert shadow_file.read_text(encoding="utf-8") == content
+    assert file_ops.shadow.read() == content
+    assert FileOps(str(todo_file), skip_verify=True).shadow.read() == content
+
+
+def test_tamper_diff_shows_changes_against_shadow(temp_todo_dir, capsys):
+    """Test that tamper diff compares with the last valid and any recorded version."""
+    from ai_todo.cli.tamper_ops import tamper_diff_command, tamper_history_command
+
+    todo_file = temp_todo_dir / "TODO.md"
+    file_ops = FileOps(str(todo_file))
+    first = file_ops.shadow.history()[0].checksum
+    file_ops.update_integrity("# Tasks\n\n- [ ] **#1** Task 1\n- [ ] **#2** Task 2\n")
+    todo_file.write_text("# Tasks\n\n- [ ] **#1** Task 1 edited\n", encoding="utf-8")
+
+    tamper_diff_command(str(todo_file))
+    output = capsys.readouterr().out
+    assert "-- [ ] **#1** Task 1" in output
+    assert "-- [ ] **#2** Task 2" in output
+
+    tamper_diff_command(str(todo_file), version=first[:8])
+    output = capsys.readouterr().out
+    assert "#2" not in output
+    assert "+- [ ] **#1** Task 1 edited" in output
+
+    tamper_history_command(str(todo_file))
+    assert first[:12] in capsys.readouterr().out
+
+
+def test_legacy_shadow_copy_is_used_until_replaced(temp_todo_dir):
+    """Test that a full shadow copy from an older version still serves tamper diff."""
+    todo_file = temp_todo_dir / "TODO.md"
+    legacy = temp_todo_dir / ".ai-todo" / "state" / "TODO.md"
+    legacy.parent.mkdir()
+    legacy.write_text("Legacy content\n", encoding="utf-8")
+
+    file_ops = FileOps(str(todo_file), skip_verify=True)
+    assert file_ops.shadow.read() == "Legacy content\n"
+
+    file_ops.update_integrity("New content\n")
+    assert file_ops.shadow.read() == "New content\n"
+    # Left in place (it may be tracked by git), but no longer read
+    assert legacy.read_text(encoding="utf-8") == "Legacy content\n"
+
+
+def _make_checksum_stat_settled(file_ops):
+    """Backdate TODO.md so checksum.stat no longer counts as written in the same tick."""
+    st = file_ops.todo_path.stat()
+    mtime_ns = st.st_mtime_ns - 10**9
+    os.utime(file_ops.todo_path, ns=(mtime_ns, mtime_ns))
+    file_ops.verify_integrity()  # Hashes once more and records the backdated stat
+    file_ops.read_tasks()  # Fills the parse cache
+
+
+def test_unchanged_file_is_not_rehashed(temp_todo_dir, monkeypatch):
+    todo_file = temp_todo_dir / "TODO.md"
+    file_ops = FileOps(str(todo_file))
+    _make_checksum_stat_settled(file_ops)
+    hashed = []
+    monkeypatch.setattr(FileOps, "calculate_checksum", lambda self, c: hashed.append(c))
+
+    FileOps(str(todo_file))
+    file_ops.read_tasks()
+
+    assert hashed == []
+
+
+def test_same_size_edit_is_detected_with_checksum_stat(temp_todo_dir):
+    todo_file = temp_todo_dir / "TODO.md"
+    config_file = temp_todo_dir / ".ai-todo" / "config.yaml"
+    config_file.write_text("security:\n  tamper_proof: true\n", encoding="utf-8")
+    file_ops = FileOps(str(todo_file))
+    _make_checksum_stat_settled(file_ops)
+
+    todo_file.write_text("# Tasks\n\n- [ ] **#1** Task 2\n", encoding="utf-8")
+
+    with pytest.raises(TamperError):
+        FileOps(str(todo_file))
+
+
+def test_edit_in_the_same_tick_as_the_record_is_detected(temp_todo_dir):
+    todo_file = temp_todo_dir / "TODO.md"
+    config_file = temp_todo_dir / ".ai-todo" / "config.yaml"
+    config_file.write_text("security:\n  tamper_proof: true\n", encoding="utf-8")
+    file_ops = FileOps(str(todo_file))
+    _make_checksum_stat_settled(file_ops)
+    st = todo_file.stat()
+
+    # Same size and, as on a coarse-timestamp file system, the same mtime as recorded
+    todo_file.write_text("# Tasks\n\n- [ ] **#1** Task 2\n", encoding="utf-8")
+    os.utime(todo_file, ns=(st.st_atime_ns, st.st_mtime_ns))
+    os.utime(file_ops.checksum_stat_path, ns=(st.st_mtime_ns, st.st_mtime_ns))
+
+    with pytest.raises(TamperError):
+        FileOps(str(todo_file))
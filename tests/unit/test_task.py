@@ -2,7 +2,7 @@ from datetime import datetime
 
 import pytest
 
-from ai_todo.core.task import Task, TaskManager, TaskStatus
+from ai_todo.core.task import Task, TaskFilter, TaskManager, TaskStatus, root_serial
 
 # ... (previous Task tests remain) ...
 
@@ -189,6 +189,45 @@ def test_manager_get_subtasks(task_manager):
     assert other.id not in {s.id for s in subtasks}
 
 
+def test_manager_get_subtasks_includes_nested_in_tree_order():
+    manager = TaskManager(
+        [
+            Task(id="1", description="Parent"),
+            Task(id="1.2", description="Subtask 2"),
+            Task(id="1.2.1", description="Nested"),
+            Task(id="1.1", description="Subtask 1"),
+            Task(id="10", description="Not a child of 1"),
+            Task(id="10.1", description="Child of 10"),
+        ]
+    )
+
+    assert [t.id for t in manager.get_subtasks("1")] == ["1.2", "1.2.1", "1.1"]
+    assert [t.id for t in manager.get_children("1")] == ["1.2", "1.1"]
+    assert manager.get_subtasks("1.1") == []
+
+
+def test_manager_max_child_ordinal_tracks_adds():
+    manager = TaskManager([Task(id="5", description="Parent"), Task(id="5.7", description="Sub")])
+    assert manager.max_child_ordinal("5") == 7
+    assert manager.max_child_ordinal("9") == 0
+
+    subtask = manager.add_subtask("5", "Next")
+    assert subtask.id == "5.8"
+    manager.add_subtask("5.8", "Nested", task_id="5.8.20")
+    assert manager.max_child_ordinal("5") == 8
+    assert manager.max_child_ordinal("5.8") == 20
+
+
+def test_manager_index_survives_status_changes(task_manager):
+    parent = task_manager.add_task("Parent")
+    subtask = task_manager.add_subtask(parent.id, "Subtask")
+
+    task_manager.delete_task(subtask.id)
+    assert task_manager.get_subtasks(parent.id) == [subtask]
+    task_manager.restore_task(subtask.id)
+    assert task_manager.get_subtasks(parent.id) == [subtask]
+
+
 def test_manager_add_note_to_task(task_manager):
     task = task_manager.add_task("Task with note")
     task = task_manager.add_note_to_task(task.id, "Note 1")
@@ -235,3 +274,104 @@ def test_manager_update_notes_for_task(task_manager):
     task.notes.clear()
     with pytest.raises(ValueError, match="has no notes to update"):
         task_manager.update_notes_for_task(task.id, "New note")
+
+
+def test_root_serial():
+    assert root_serial("50") == 50
+    assert root_serial("50.3.1") == 50
+    assert root_serial("fxstein-50.3") == 50
+    assert root_serial("feature-x-7") == 7
+    assert root_serial("abc") is None
+
+
+def test_manager_max_serial_tracks_adds():
+    manager = TaskManager(
+        [Task(id="3", description="Three"), Task(id="fxstein-12.1", description="Prefixed")]
+    )
+    assert manager.max_serial() == 12
+
+    assert manager.add_task("Next").id == "13"
+    manager.add_task("Explicit", task_id="40")
+    assert manager.max_serial() == 40
+
+
+def test_manager_move_to_top_and_after():
+    manager = TaskManager([Task(id=str(i), description=f"Task {i}") for i in (3, 2, 1)])
+    manager.add_task("Task 4", task_id="4")
+    assert [t.id for t in manager.list_tasks()] == ["3", "2", "1", "4"]
+
+    manager.move_to_top("4")
+    assert [t.id for t in manager.list_tasks()] == ["4", "3", "2", "1"]
+
+    manager.add_subtask("2", "Subtask", task_id="2.1")
+    manager.move_after("2.1", "2")
+    assert [t.id for t in manager.list_tasks()] == ["4", "3", "2", "2.1", "1"]
+
+    manager.move_after("4", "1")
+    assert [t.id for t in manager.list_tasks()] == ["3", "2", "2.1", "1", "4"]
+
+    with pytest.raises(ValueError, match="Task 9 not found"):
+        manager.move_to_top("9")
+
+
+def test_manager_find_tasks_uses_maintained_indexes():
+    manager = TaskManager(
+        [
+            Task(id="12", description="Twelve", tags={"bug", "ui"}),
+            Task(id="12.1", description="Sub", tags={"bug"}),
+            Task(id="11", description="Eleven", tags={"ui"}),
+            Task(id="3", description="Three", tags={"bug"}),
+        ]
+    )
+
+    def ids(**criteria):
+        return [t.id for t in manager.find_tasks(TaskFilter(**criteria))]
+
+    assert ids(tags=["bug", "ui"]) == ["12"]
+    assert ids(tags=["bug", "ui"], match_any_tag=True) == ["12", "12.1", "11", "3"]
+    assert ids(tags=["bug"], id_range=(10, 12)) == ["12", "12.1"]
+    assert ids(tags=["bug"], has_subtasks=True) == ["12"]
+    assert ids(tags=["missing"]) == []
+
+    # Mutations through the manager keep the indexes current
+    manager.complete_task("3")
+    manager.set_tags("11", ["bug"])
+    manager.start_task("12.1")
+    manager.add_task("New bug", tags=["bug"], task_id="20")
+    manager.move_to_top("20")
+
+    assert ids(statuses={TaskStatus.PENDING}, tags=["bug"]) == ["20", "12", "12.1", "11"]
+    assert ids(statuses={TaskStatus.COMPLETED}) == ["3"]
+    assert ids(tags=["ui"]) == ["12"]
+    assert ids(tags=["inprogress"]) == ["12.1"]
+    assert [t.id for t in manager.list_tasks({"status": TaskStatus.COMPLETED})] == ["3"]
+
+
+def test_manager_tasks_dated_before_tracks_status_changes():
+    archived = Task(id="1", description="Old", status=TaskStatus.ARCHIVED)
+    archived.archived_at = datetime(2026, 1, 5)
+    deleted = Task(id="2", description="Trash", status=TaskStatus.DELETED)
+    deleted.expires_at = datetime(2026, 2, 1)
+    manager = TaskManager(
+        [
+            archived,
+            deleted,
+            Task(id="3", description="Active"),
+            Task(id="4", description="Undated", status=TaskStatus.ARCHIVED),
+        ]
+    )
+
+    def ids(status, cutoff):
+        return [t.id for t in manager.tasks_dated_before(status, cutoff)]
+
+    assert ids(TaskStatus.ARCHIVED, datetime(2026, 1, 6)) == ["1"]
+    assert ids(TaskStatus.ARCHIVED, datetime(2026, 1, 5)) == []
+    assert ids(TaskStatus.DELETED, datetime(2026, 3, 1)) == ["2"]
+
+    manager.archive_task("3")  # Archived now: after the first cutoff
+    manager.restore_task("1")
+    assert ids(TaskStatus.ARCHIVED, datetime(2026, 1, 6)) == []
+    assert ids(TaskStatus.ARCHIVED, datetime(2100, 1, 1)) == ["3"]
+
+    with pytest.raises(ValueError):
+        manager.tasks_dated_before(TaskStatus.PENDING, datetime(2026, 1, 1))
@@ -0,0 +1,58 @@
+"""Unit tests for parsed, interned task IDs."""
+
+from ai_todo.core.task_id import TaskId
+
+
+def test_parses_root_task():
+    task_id = TaskId.of("50")
+    assert task_id.root == "50"
+    assert task_id.parent is None
+    assert task_id.depth == 0
+    assert task_id.serial == 50
+    assert task_id.ordinals == ()
+    assert task_id.numbers == (50,)
+
+
+def test_parses_nested_subtask():
+    task_id = TaskId.of("50.3.12")
+    assert task_id.root == "50"
+    assert task_id.parent == "50.3"
+    assert task_id.depth == 2
+    assert task_id.ordinals == (3, 12)
+    assert task_id.numbers == (50, 3, 12)
+    assert task_id.sort_key == (50, 3, 12)
+
+
+def test_parses_prefixed_id():
+    task_id = TaskId.of("fxstein-50.3")
+    assert task_id.prefix == "fxstein"
+    assert task_id.base == "50.3"
+    assert task_id.root == "fxstein-50"
+    assert task_id.parent == "fxstein-50"
+    assert task_id.serial == 50
+    assert task_id.numbers is None
+    assert task_id.sort_key == (50, 3)
+
+
+def test_non_numeric_parts():
+    task_id = TaskId.of("abc.x")
+    assert task_id.serial is None
+    assert task_id.ordinals is None
+    assert task_id.numbers is None
+    assert task_id.sort_key == (0,)
+
+
+def test_of_interns_and_compares_like_the_string():
+    task_id = TaskId.of("7.1")
+    assert TaskId.of("7" + ".1") is task_id
+    assert task_id == "7.1"
+    assert task_id == TaskId("7.1")
+    assert hash(task_id) == hash("7.1")
+    assert str(task_id) == "7.1"
+    assert sorted(
+        [TaskId.of("10.2"), TaskId.of("9"), TaskId.of("10.10")], key=lambda t: t.sort_key
+    ) == [
+        "9",
+        "10.2",
+        "10.10",
+    ]
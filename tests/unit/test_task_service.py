@@ -0,0 +1,297 @@
+"""Unit tests for TaskService."""
+
+import pytest
+
+from ai_todo.core.file_ops import FileOps
+from ai_todo.core.task import TaskManager, TaskStatus
+from ai_todo.core.task_service import TaskService, expand_task_ids, expand_task_range
+from ai_todo.core.task_store import TaskStore
+
+
+@pytest.fixture
+def todo_file(tmp_path):
+    todo_file = tmp_path / "TODO.md"
+    todo_file.write_text(
+        "## Tasks\n\n- [ ] **#2** Task 2 `#bug`\n  - [ ] **#2.1** Subtask 2.1\n"
+        "- [ ] **#1** Task 1\n",
+        encoding="utf-8",
+    )
+    config_dir = tmp_path / ".ai-todo"
+    config_dir.mkdir()
+    (config_dir / "config.yaml").write_text("security:\n  tamper_proof: false\n")
+    return todo_file
+
+
+@pytest.fixture
+def service(todo_file):
+    return TaskService(str(todo_file), store=TaskStore(str(todo_file)))
+
+
+@pytest.fixture
+def write_counter(monkeypatch):
+    calls = []
+    original = FileOps.write_tasks
+
+    def counting_write_tasks(self, *args, **kwargs):
+        calls.append(args)
+        return original(self, *args, **kwargs)
+
+    monkeypatch.setattr(FileOps, "write_tasks", counting_write_tasks)
+    return calls
+
+
+def test_add_task_with_notes_writes_once(service, todo_file, write_counter):
+    result = service.add_task("New task", ["feature"], notes="Details")
+
+    assert result.task.id == "3"
+    assert result.task.notes == ["Details"]
+    assert len(write_counter) == 1
+    content = todo_file.read_text(encoding="utf-8")
+    assert content.index("**#3** New task") < content.index("**#2** Task 2")
+    assert "  > Details" in content
+
+
+def test_add_subtask_with_notes_writes_once(service, todo_file, write_counter):
+    result = service.add_subtask("2", "Subtask 2.2", [], notes="Details")
+
+    assert result.task.id == "2.2"
+    assert len(write_counter) == 1
+    assert service.get_task("2.2").notes == ["Details"]
+
+
+def test_add_subtask_missing_parent(service, write_counter):
+    with pytest.raises(ValueError, match="Parent task 9 not found"):
+        service.add_subtask("9", "Orphan", [])
+    assert write_counter == []
+
+
+def test_complete_tasks_collects_errors(service):
+    result = service.complete_tasks(["1", "9"])
+
+    assert [t.id for t in result.tasks] == ["1"]
+    assert len(result.errors) == 1
+    assert service.get_task("1").status == TaskStatus.COMPLETED
+
+
+def test_modify_task_sets_notes_on_task_without_notes(service):
+    result = service.modify_task("1", "Renamed", notes="New notes")
+
+    assert result.task.description == "Renamed"
+    assert service.get_task("1").notes == ["New notes"]
+
+
+def test_modify_task_preserves_tags_and_clears_notes(service):
+    service.add_note("2", "Old notes")
+
+    service.modify_task("2", "Renamed", notes="")
+
+    task = service.get_task("2")
+    assert task.tags == {"bug"}
+    assert task.notes == []
+
+
+def test_delete_notes_without_notes_does_not_write(service, write_counter):
+    result = service.delete_notes("1")
+
+    assert result.previous_count == 0
+    assert write_counter == []
+
+
+def test_update_notes_requires_existing_notes(service):
+    with pytest.raises(ValueError, match="has no notes to update"):
+        service.update_notes("1", "text")
+
+
+def test_restore_task_restores_subtasks_in_one_write(service, write_counter):
+    service.delete_tasks(["2"])
+    write_counter.clear()
+
+    result = service.restore_task("2")
+
+    assert result.task.id == "2"
+    assert [t.id for t in result.subtasks] == ["2.1"]
+    assert len(write_counter) == 1
+    assert service.get_task("2.1").status == TaskStatus.PENDING
+
+
+def test_restore_tasks_places_all_tasks_in_one_write(service, todo_file, write_counter):
+    service.add_subtask("1", "Subtask 1.1", [])
+    service.archive_tasks(["1", "2"])
+    write_counter.clear()
+
+    result = service.restore_tasks(["2", "1", "9"])
+
+    assert [r.task.id for r in result.restored] == ["2", "1"]
+    assert [t.id for t in result.restored[1].subtasks] == ["1.1"]
+    assert result.errors == [("9", "Task 9 not found")]
+    assert len(write_counter) == 1
+    # Same places as restoring one at a time: later roots on top, subtasks after parents
+    assert [t.id for t in service.list_tasks()] == ["1", "1.1", "2", "2.1"]
+
+
+def test_expand_task_range_handles_nested_ids():
+    assert expand_task_range("104.3-104.5") == ["104.3", "104.4", "104.5"]
+    assert expand_task_range("1.1-1.3") == ["1.1", "1.2", "1.3"]
+    assert expand_task_range("1.2.1-1.2.2") == ["1.2.1", "1.2.2"]
+    assert expand_task_range("fxstein-5") == ["fxstein-5"]
+
+
+def test_expand_task_ids_resolves_selectors(service):
+    service.add_subtask("1", "Subtask 1.1", ["bug"])
+    service.complete_tasks(["2.1"])
+    manager = service.store.get_manager(readonly=True)
+
+    assert expand_task_ids(manager, ["2.*"]) == ["2.1"]
+    assert expand_task_ids(manager, ["1-2"]) == ["2", "1"]
+    assert expand_task_ids(manager, ["tag:bug", "1.1"]) == ["2", "1.1"]
+    assert expand_task_ids(manager, ["status:completed"]) == ["2.1"]
+    assert expand_task_ids(manager, ["tag:bug"], with_subtasks=True) == ["2", "2.1", "1.1"]
+    with pytest.raises(ValueError, match="Invalid status"):
+        expand_task_ids(TaskManager(), ["status:bogus"])
+
+
+def test_complete_tasks_accepts_selectors(service, write_counter):
+    result = service.complete_tasks(["tag:bug", "2.*", "status:bogus"])
+
+    assert result.errors and not result.tasks
+    result = service.complete_tasks(["tag:bug", "2.*"])
+    assert [t.id for t in result.tasks] == ["2", "2.1"]
+    assert len(write_counter) == 1
+
+
+def test_show_task_missing(service):
+    with pytest.raises(ValueError, match="Task #9 not found"):
+        service.show_task("9")
+
+
+def test_list_tasks_filters(service):
+    service.complete_tasks(["1"])
+
+    assert [t.id for t in service.list_tasks(incomplete_only=True)] == ["2", "2.1"]
+    assert [t.id for t in service.list_tasks(tag="bug")] == ["2"]
+    assert [t.id for t in service.list_tasks(parents_only=True)] == ["2", "1"]
+
+
+def test_list_tasks_statuses_tags_and_range(service):
+    service.complete_tasks(["1"])
+    service.set_tags("2.1", ["ui"])
+
+    assert [t.id for t in service.list_tasks(statuses=["completed"])] == ["1"]
+    assert [t.id for t in service.list_tasks(statuses=["Pending", "completed"])] == [
+        "2",
+        "2.1",
+        "1",
+    ]
+    assert [t.id for t in service.list_tasks(tags=["bug", "ui"], match_any=True)] == ["2", "2.1"]
+    assert service.list_tasks(tags=["bug", "ui"]) == []
+    assert [t.id for t in service.list_tasks(id_range="2-5")] == ["2", "2.1"]
+    assert [t.id for t in service.list_tasks(id_range="1")] == ["1"]
+
+
+@pytest.mark.parametrize(
+    "criteria, message",
+    [
+        ({"statuses": ["done"]}, "Invalid status 'done'"),
+        ({"id_range": "a-b"}, "Invalid ID range"),
+        ({"id_range": "5-2"}, "5 is greater than 2"),
+    ],
+)
+def test_list_tasks_rejects_invalid_filters(service, criteria, message):
+    with pytest.raises(ValueError, match=message):
+        service.list_tasks(**criteria)
+
+
+def test_batch_applies_all_operations_in_one_write(service, todo_file, write_counter):
+    result = service.batch(
+        [
+            {"op": "add", "title": "Task 3", "description": "Details", "tags": ["new"]},
+            {"op": "complete", "task_ids": ["1"]},
+            {"op": "set_tags", "task_id": "2", "tags": ["feature"]},
+            {"op": "note", "task_id": "2.1", "note": "Subtask note"},
+            {"op": "relate", "task_id": "3", "rel_type": "depends-on", "target_ids": ["2"]},
+        ]
+    )
+
+    assert [op["op"] for op, _ in result.results] == [
+        "add",
+        "complete",
+        "set_tags",
+        "note",
+        "relate",
+    ]
+    assert len(write_counter) == 1
+    content = todo_file.read_text(encoding="utf-8")
+    assert content.index("**#3** Task 3") < content.index("**#2** Task 2")
+    assert "- [x] **#1** Task 1" in content
+    assert "3:depends-on:2" in content
+    assert service.get_task("2").tags == {"feature"}
+    assert service.get_task("2.1").notes == ["Subtask note"]
+
+
+def test_batch_sees_earlier_operations(service):
+    service.batch(
+        [
+            {"op": "add", "title": "Task 3"},
+            {"op": "add_subtask", "parent_id": "3", "title": "Subtask 3.1"},
+            {"op": "add", "title": "Task 4"},
+        ]
+    )
+
+    assert service.get_task("3.1").description == "Subtask 3.1"
+    assert service.get_task("4") is not None
+
+
+def test_batch_failure_writes_nothing(service, todo_file, write_counter):
+    before = todo_file.read_text(encoding="utf-8")
+
+    with pytest.raises(ValueError, match=r"Operation 3 \(complete\) failed"):
+        service.batch(
+            [
+                {"op": "relate", "task_id": "1", "rel_type": "blocks", "target_ids": ["2"]},
+                {"op": "complete", "task_ids": ["1"]},
+                {"op": "complete", "task_ids": ["9"]},
+            ]
+        )
+
+    assert write_counter == []
+    assert todo_file.read_text(encoding="utf-8") == before
+    assert service.get_task("1").status == TaskStatus.PENDING
+    assert service.store.file_ops.get_relationships("1") == {}
+
+
+@pytest.mark.parametrize(
+    "operation, message",
+    [
+        ({"op": "explode"}, "Unknown operation 'explode'"),
+        ({"op": "complete", "ids": ["1"]}, "Invalid arguments"),
+        ("complete 1", "must be an object"),
+    ],
+)
+def test_batch_rejects_invalid_operations(service, operation, message):
+    with pytest.raises(ValueError, match=message):
+        service.batch([operation])
+
+
+def test_batch_bulk_add_orders_newest_first_and_writes_serial_once(service, todo_file, monkeypatch):
+    serial_writes = []
+    original = FileOps.set_serial
+
+    def counting_set_serial(self, value):
+        serial_writes.append(value)
+        original(self, value)
+
+    monkeypatch.setattr(FileOps, "set_serial", counting_set_serial)
+
+    service.batch([{"op": "add", "title": f"Bulk {i}"} for i in range(50)])
+
+    ids = [t.id for t in service.list_tasks(parents_only=True)]
+    assert ids[:3] == ["52", "51", "50"]
+    assert ids[-2:] == ["2", "1"]
+    assert serial_writes == [52]
+
+
+def test_add_task_respects_higher_stored_serial(service):
+    service.store.file_ops.set_serial(100)
+
+    assert service.add_task("After serial", []).task.id == "101"
+    assert service.store.file_ops.get_serial() == 101
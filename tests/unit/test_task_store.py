@@ -0,0 +1,157 @@
+"""Unit tests for the resident TaskStore."""
+
+import pytest
+
+from ai_todo.core.exceptions import TamperError
+from ai_todo.core.file_ops import FileOps
+from ai_todo.core.task import TaskStatus
+from ai_todo.core.task_service import TaskService
+from ai_todo.core.task_store import TaskStore
+
+
+@pytest.fixture
+def todo_file(tmp_path):
+    todo_file = tmp_path / "TODO.md"
+    todo_file.write_text("## Tasks\n\n- [ ] **#2** Task 2\n- [ ] **#1** Task 1\n", encoding="utf-8")
+    config_dir = tmp_path / ".ai-todo"
+    config_dir.mkdir()
+    (config_dir / "config.yaml").write_text("security:\n  tamper_proof: false\n")
+    return todo_file
+
+
+@pytest.fixture
+def read_counter(monkeypatch):
+    calls = []
+    original = FileOps.read_tasks
+
+    def counting_read_tasks(self):
+        calls.append(self)
+        return original(self)
+
+    monkeypatch.setattr(FileOps, "read_tasks", counting_read_tasks)
+    return calls
+
+
+def test_readonly_manager_is_resident(todo_file, read_counter):
+    store = TaskStore(str(todo_file))
+
+    first = store.get_manager(readonly=True)
+    second = store.get_manager(readonly=True)
+
+    assert first is second
+    assert len(read_counter) == 1
+
+
+def test_writer_gets_copies(todo_file):
+    store = TaskStore(str(todo_file))
+    writer = store.get_manager()
+
+    writer.complete_task("1")
+    writer.get_task("2").tags.add("bug")
+
+    resident = store.get_manager(readonly=True)
+    assert resident.get_task("1").status == TaskStatus.PENDING
+    assert resident.get_task("2").tags == set()
+
+
+def test_save_updates_resident_state(todo_file, read_counter):
+    store = TaskStore(str(todo_file))
+    writer = store.get_manager()
+    writer.complete_task("1")
+
+    store.save(writer)
+    reads_after_save = len(read_counter)
+    resident = store.get_manager(readonly=True)
+
+    assert resident.get_task("1").status == TaskStatus.COMPLETED
+    assert "- [x] **#1** Task 1" in todo_file.read_text(encoding="utf-8")
+    assert len(read_counter) == reads_after_save
+
+
+def state(tasks):
+    return [
+        (t.id, t.description, t.status, t.tags, t.notes, t.created_at, t.updated_at)
+        + (t.completed_at, t.archived_at, t.deleted_at, t.expires_at)
+        for t in tasks
+    ]
+
+
+def test_save_matches_reading_the_file_without_reading_it(todo_file, read_counter):
+    store = TaskStore(str(todo_file))
+    service = TaskService(str(todo_file), store=store)
+    service.add_task("Task 3", ["#bug", "ui"], notes="First note")
+    service.add_subtask("3", "Subtask 3.1 `#inline`", [])
+    service.complete_tasks(["1"])
+    service.archive_tasks(["1"])
+    service.delete_tasks(["2"])
+    service.add_note("3", "Second note")
+    service.restore_task("2")
+    reads = len(read_counter)
+
+    service.set_tags("3", ["#x"])
+
+    assert len(read_counter) == reads
+    resident = store.get_manager(readonly=True).list_tasks()
+    assert state(resident) == state(FileOps(str(todo_file)).read_tasks())
+
+
+def test_first_write_of_a_new_store_is_incremental(todo_file, monkeypatch):
+    """A new process (e.g. a CLI command) re-renders only the changed parts of TODO.md."""
+    service = TaskService(str(todo_file), store=TaskStore(str(todo_file)))
+    service.add_task("Task 3", ["ui"], notes="First note")
+    service.archive_tasks(["1"])
+    service.complete_tasks(["1"])  # Keeps an archive date a read of the file drops
+
+    def full_render(*args):
+        raise AssertionError("full render")
+
+    monkeypatch.setattr(FileOps, "_render_document", full_render)
+    service = TaskService(str(todo_file), store=TaskStore(str(todo_file)))
+    service.add_note("3", "Second note")
+    service.complete_tasks(["2"])
+    monkeypatch.undo()
+
+    content = todo_file.read_text(encoding="utf-8")
+    assert "  > Second note\n" in content
+    fresh = FileOps(str(todo_file))
+    full = fresh._generate_markdown(fresh.read_tasks(), fresh._structure_snapshot)
+    footer = "**ai-todo** | Last Updated:"
+    assert content.rsplit(footer, 1)[0] == full.rsplit(footer, 1)[0]
+
+
+def test_external_edit_reloads(todo_file):
+    store = TaskStore(str(todo_file))
+    store.get_manager(readonly=True)
+
+    todo_file.write_text("## Tasks\n\n- [ ] **#3** External task\n", encoding="utf-8")
+
+    manager = store.get_manager(readonly=True)
+    assert [t.id for t in manager.list_tasks()] == ["3"]
+
+
+def test_write_by_other_file_ops_reloads(todo_file):
+    store = TaskStore(str(todo_file))
+    store.get_manager(readonly=True)
+
+    other = FileOps(str(todo_file))
+    tasks = other.read_tasks()
+    tasks[0].description = "Renamed"
+    other.write_tasks(tasks)
+
+    assert store.get_manager(readonly=True).get_task("2").description == "Renamed"
+
+
+def test_tamper_proof_edit_raises_until_accepted(todo_file):
+    (todo_file.parent / ".ai-todo" / "config.yaml").write_text("security:\n  tamper_proof: true\n")
+    store = TaskStore(str(todo_file))
+    store.get_manager(readonly=True)
+
+    todo_file.write_text("## Tasks\n\n- [ ] **#3** External task\n", encoding="utf-8")
+
+    with pytest.raises(TamperError):
+        store.get_manager(readonly=True)
+    with pytest.raises(TamperError):
+        store.get_manager(readonly=True)
+
+    FileOps(str(todo_file), skip_verify=True).accept_tamper("test")
+    assert store.get_manager(readonly=True).get_task("3") is not None